@@ -158,6 +158,10 @@ CREATE TABLE Retailers (
 ALTER TABLE Retailers COMMENT 'Retailers fullfil the email customers orders';
 
 
+CREATE UNIQUE INDEX retailers_name_idx
+ ON Retailers
+ ( Name );
+
 CREATE TABLE LegacyEmailOrders_0219 (
                 EmailOrderId INT NOT NULL,
                 OrderNumber VARCHAR(10),
@@ -369,9 +373,50 @@ ALTER TABLE Wines MODIFY COLUMN CaseUnitId TINYINT COMMENT 'Type of unit in a ca
 
 ALTER TABLE Wines MODIFY COLUMN CreatedBy VARCHAR(32) COMMENT 'User who created this record';
 
+ALTER TABLE Wines MODIFY COLUMN LastModified DATETIME COMMENT 'When this record was last inserted or modified, must be set to the time of the change for the change feed';
+
 ALTER TABLE Wines MODIFY COLUMN LastModifiedBy VARCHAR(32) COMMENT 'User who last modified this record';
 
 
+CREATE INDEX wines_lastmodified_idx
+ ON Wines
+ ( LastModified, WineId );
+
+
+CREATE TABLE WineFamilies (
+                FamilyId INT AUTO_INCREMENT NOT NULL,
+                ProducerId INT NOT NULL,
+                Name VARCHAR(150) NOT NULL,
+                FamilyHash CHAR(32) NOT NULL,
+                PRIMARY KEY (FamilyId)
+);
+
+ALTER TABLE WineFamilies COMMENT 'A wine of a producer in all of its vintages and bottle sizes';
+
+ALTER TABLE WineFamilies MODIFY COLUMN Name VARCHAR(150) COMMENT 'The wine name w/o the vintage and bottle size';
+
+ALTER TABLE WineFamilies MODIFY COLUMN FamilyHash CHAR(32) COMMENT 'Hash (hex) of the ProducerId and the normalized (lowercase, w/o accents or punctuation) Name';
+
+
+CREATE UNIQUE INDEX winefamilies_familyhash_idx
+ ON WineFamilies
+ ( FamilyHash );
+
+
+CREATE TABLE Wines_WineFamilies (
+                WineId INT NOT NULL,
+                FamilyId INT NOT NULL,
+                PRIMARY KEY (WineId)
+);
+
+ALTER TABLE Wines_WineFamilies COMMENT 'The wine family of each wine';
+
+
+CREATE INDEX wines_winefamilies_familyid_idx
+ ON Wines_WineFamilies
+ ( FamilyId );
+
+
 CREATE TABLE WinePurchases (
                 WineId INT NOT NULL,
                 PurchaseDate DATE NOT NULL,
@@ -446,6 +491,65 @@ ALTER TABLE WinePricing MODIFY COLUMN NJ_MultiCasePrice DECIMAL(8, 2) COMMENT 'N
 ALTER TABLE WinePricing MODIFY COLUMN NJ_MultiCaseQty TINYINT COMMENT 'NJ min # of cases to get multi case price';
 
 
+CREATE TABLE WinePricingHistory (
+                WineId INT NOT NULL,
+                ValidFrom DATE NOT NULL,
+                ValidTo DATE NOT NULL,
+                Available BOOLEAN NOT NULL,
+                SoldOut BOOLEAN NOT NULL,
+                FOBPrice DECIMAL(8,2),
+                FOB_MA DECIMAL(8,2),
+                FOB_ARB DECIMAL(8,2),
+                NY_Wholesale DECIMAL(8,2),
+                NY_MultiCasePrice DECIMAL(8,2),
+                NY_MultiCaseQty TINYINT,
+                NJ_Wholesale DECIMAL(8,2),
+                NJ_MultiCasePrice DECIMAL(8,2),
+                NJ_MultiCaseQty TINYINT,
+                RowHash CHAR(32) NOT NULL,
+                PRIMARY KEY (WineId, ValidFrom)
+);
+
+ALTER TABLE WinePricingHistory COMMENT 'Effective dated versions of the WinePricing prices of each wine from the legacy wine master snapshots (the WineId may no longer be in Wines)';
+
+ALTER TABLE WinePricingHistory MODIFY COLUMN ValidFrom DATE COMMENT 'Date of the snapshot the prices were first in';
+
+ALTER TABLE WinePricingHistory MODIFY COLUMN ValidTo DATE COMMENT 'Date the prices were replaced (exclusive), 9999-12-31 for the current prices';
+
+ALTER TABLE WinePricingHistory MODIFY COLUMN RowHash CHAR(32) COMMENT 'hex hash of the price columns, to compare a snapshot''s prices w/ the current version';
+
+
+CREATE INDEX winepricinghistory_validto_idx
+ ON WinePricingHistory
+ ( ValidTo );
+
+
+CREATE TABLE WinePurchaseHistory (
+                WineId INT NOT NULL,
+                ValidFrom DATE NOT NULL,
+                ValidTo DATE NOT NULL,
+                PurchasePrice DECIMAL(8,2) NOT NULL,
+                TariffDiscount DECIMAL(3,2),
+                RowHash CHAR(32) NOT NULL,
+                PRIMARY KEY (WineId, ValidFrom)
+);
+
+ALTER TABLE WinePurchaseHistory COMMENT 'Effective dated last purchase of each wine from the legacy wine master snapshots (the WineId may no longer be in Wines)';
+
+ALTER TABLE WinePurchaseHistory MODIFY COLUMN ValidFrom DATE COMMENT 'Date of the purchase (LastPurchaseDate_PO)';
+
+ALTER TABLE WinePurchaseHistory MODIFY COLUMN ValidTo DATE COMMENT 'Date of the next purchase (exclusive), 9999-12-31 for the last purchase';
+
+ALTER TABLE WinePurchaseHistory MODIFY COLUMN PurchasePrice DECIMAL(8, 2) COMMENT 'Exporter/Producer''s price, for a case of the wine in Euros, for the purchase on this date';
+
+ALTER TABLE WinePurchaseHistory MODIFY COLUMN RowHash CHAR(32) COMMENT 'hex hash of the purchase date, price and discount, to compare a snapshot''s purchase w/ the last one';
+
+
+CREATE INDEX winepurchasehistory_validto_idx
+ ON WinePurchaseHistory
+ ( ValidTo );
+
+
 CREATE TABLE EmailCustomers (
                 EmailCustomerId INT AUTO_INCREMENT NOT NULL,
                 Title VARCHAR(20),
@@ -466,6 +570,74 @@ ALTER TABLE EmailCustomers MODIFY COLUMN GivenName VARCHAR(100) COMMENT 'A given
 
 ALTER TABLE EmailCustomers MODIFY COLUMN Surname VARCHAR(100) COMMENT 'Family name; Last in most western countries, first in most eastern countries';
 
+ALTER TABLE EmailCustomers MODIFY COLUMN LastModified DATETIME COMMENT 'When this record was last inserted or modified, must be set to the time of the change for the change feed';
+
+
+CREATE INDEX emailcustomers_lastmodified_idx
+ ON EmailCustomers
+ ( LastModified, EmailCustomerId );
+
+
+CREATE TABLE ChangeFeedWatermarks (
+                Consumer VARCHAR(50) NOT NULL,
+                TableName VARCHAR(64) NOT NULL,
+                LastModified DATETIME NOT NULL,
+                LastKey INT NOT NULL,
+                Updated DATETIME NOT NULL,
+                PRIMARY KEY (Consumer, TableName)
+);
+
+ALTER TABLE ChangeFeedWatermarks COMMENT 'The position of each downstream consumer (e.g. an export or price list generator) in the change feed of a table';
+
+ALTER TABLE ChangeFeedWatermarks MODIFY COLUMN LastModified DATETIME COMMENT 'LastModified of the last row the consumer read';
+
+ALTER TABLE ChangeFeedWatermarks MODIFY COLUMN LastKey INT COMMENT 'Key (e.g. WineId) of the last row the consumer read, orders the rows w/ the same LastModified';
+
+ALTER TABLE ChangeFeedWatermarks MODIFY COLUMN Updated DATETIME COMMENT 'When the consumer last read changes of the table';
+
+
+CREATE TABLE EmailCustomerSummaries (
+                EmailCustomerId INT NOT NULL,
+                FirstOrderDate DATE,
+                LastOrderDate DATE,
+                RecencyDays INT,
+                OrderCount INT NOT NULL,
+                LifetimeValue DECIMAL(12,2) DEFAULT 0 NOT NULL,
+                AvgOrderValue DECIMAL(10,2) DEFAULT 0 NOT NULL,
+                AnnualValue DECIMAL(12,2) DEFAULT 0 NOT NULL,
+                LifetimeBottles INT DEFAULT 0 NOT NULL,
+                FavoriteProducerId INT,
+                FavoriteProducers VARCHAR(250),
+                RecencyScore TINYINT NOT NULL,
+                FrequencyScore TINYINT NOT NULL,
+                MonetaryScore TINYINT NOT NULL,
+                Segment VARCHAR(20) NOT NULL,
+                AsOfDate DATE NOT NULL,
+                PRIMARY KEY (EmailCustomerId)
+);
+
+ALTER TABLE EmailCustomerSummaries COMMENT 'Recency, frequency, monetary (RFM) and lifetime value of each customer
+computed from their orders as of AsOfDate, replaced by each computation';
+
+ALTER TABLE EmailCustomerSummaries MODIFY COLUMN RecencyDays INTEGER COMMENT 'Days from the last order to AsOfDate, NULL if no order has a date';
+
+ALTER TABLE EmailCustomerSummaries MODIFY COLUMN LifetimeValue DECIMAL(12, 2) COMMENT 'Sum of the order subtotals';
+
+ALTER TABLE EmailCustomerSummaries MODIFY COLUMN AnnualValue DECIMAL(12, 2) COMMENT 'LifetimeValue per year since the first order (at least 1 year)';
+
+ALTER TABLE EmailCustomerSummaries MODIFY COLUMN LifetimeBottles INTEGER COMMENT 'Bottles (units) of the order items which were matched to wines';
+
+ALTER TABLE EmailCustomerSummaries MODIFY COLUMN FavoriteProducers VARCHAR(250) COMMENT 'Names of the producers the most bottles were ordered from, most first';
+
+ALTER TABLE EmailCustomerSummaries MODIFY COLUMN RecencyScore TINYINT COMMENT 'Quintile (1-5) of the customer by recency, 5 is the most recent';
+
+ALTER TABLE EmailCustomerSummaries MODIFY COLUMN Segment VARCHAR(20) COMMENT 'RFM segment from the recency and frequency scores, ie Champions, At Risk';
+
+
+CREATE INDEX emailcustomersummaries_segment_idx
+ ON EmailCustomerSummaries
+ ( Segment );
+
 
 CREATE TABLE EmailCustomers_LegacyEmailOrders (
                 EmailCustomerId INT NOT NULL,
@@ -484,6 +656,38 @@ ALTER TABLE EmailCustomers_LegacyEmailOrders MODIFY COLUMN NameNeedsReview BOOLE
 ALTER TABLE EmailCustomers_LegacyEmailOrders MODIFY COLUMN ConversionNotes VARCHAR(250) COMMENT 'Notes about the conversion of the legacy order';
 
 
+CREATE UNIQUE INDEX emailcustomers_legacyemailorders_emailorderid_idx
+ ON EmailCustomers_LegacyEmailOrders
+ ( EmailOrderId );
+
+
+CREATE TABLE Wines_LegacyEmailOrders (
+                EmailOrderId INT NOT NULL,
+                N TINYINT NOT NULL,
+                WineId INT,
+                MatchScore DECIMAL(4,3) DEFAULT 0 NOT NULL,
+                NeedsReview BOOLEAN DEFAULT 0 NOT NULL,
+                ConversionNotes VARCHAR(250),
+                PRIMARY KEY (EmailOrderId, N)
+);
+
+ALTER TABLE Wines_LegacyEmailOrders COMMENT 'Map the items of the legacy orders to the wine they were matched to
+along w/ the confidence of the match';
+
+ALTER TABLE Wines_LegacyEmailOrders MODIFY COLUMN N TINYINT COMMENT 'The legacy order item (1-5) i.e. DelItems, DelItem2 ... DelItem5';
+
+ALTER TABLE Wines_LegacyEmailOrders MODIFY COLUMN WineId INTEGER COMMENT 'The matched wine, NULL if no wine matched the item';
+
+ALTER TABLE Wines_LegacyEmailOrders MODIFY COLUMN MatchScore DECIMAL(4, 3) COMMENT 'Confidence of the match from 0 to 1';
+
+ALTER TABLE Wines_LegacyEmailOrders MODIFY COLUMN NeedsReview BOOLEAN COMMENT 'The match needs manual review';
+
+
+CREATE INDEX wines_legacyemailorders_wineid_idx
+ ON Wines_LegacyEmailOrders
+ ( WineId );
+
+
 CREATE TABLE EmailCustomerCreditCards (
                 EmailCustomerId INT NOT NULL,
                 N TINYINT NOT NULL,
@@ -528,7 +732,7 @@ CREATE TABLE Orders (
                 OrderDate DATE NOT NULL,
                 AccountingOrderNo VARCHAR(15) NOT NULL,
                 EmailCustomerId INT NOT NULL,
-                AddressId INT NOT NULL,
+                AddressId INT,
                 RetailerId INT NOT NULL,
                 AdditionalCharges VARCHAR(120),
                 Notes VARCHAR(250),
@@ -539,7 +743,7 @@ ALTER TABLE Orders MODIFY COLUMN OrderDate DATE COMMENT 'Date the order was plac
 
 ALTER TABLE Orders MODIFY COLUMN AccountingOrderNo VARCHAR(15) COMMENT 'Accounting Order number for retailer that includes this order';
 
-ALTER TABLE Orders MODIFY COLUMN AddressId INTEGER COMMENT 'Customer''s selected shipping address for this order';
+ALTER TABLE Orders MODIFY COLUMN AddressId INTEGER COMMENT 'Customer''s selected shipping address for this order (NULL for legacy orders w/o an address)';
 
 ALTER TABLE Orders MODIFY COLUMN Notes VARCHAR(250) COMMENT 'Notes about the order to include on the invoice';
 
@@ -680,6 +884,24 @@ REFERENCES Wines (WineId)
 ON DELETE NO ACTION
 ON UPDATE NO ACTION;
 
+ALTER TABLE WineFamilies ADD CONSTRAINT producers_winefamilies_fk
+FOREIGN KEY (ProducerId)
+REFERENCES Producers (ProducerId)
+ON DELETE NO ACTION
+ON UPDATE NO ACTION;
+
+ALTER TABLE Wines_WineFamilies ADD CONSTRAINT wines_wines_winefamilies_fk
+FOREIGN KEY (WineId)
+REFERENCES Wines (WineId)
+ON DELETE NO ACTION
+ON UPDATE NO ACTION;
+
+ALTER TABLE Wines_WineFamilies ADD CONSTRAINT winefamilies_wines_winefamilies_fk
+FOREIGN KEY (FamilyId)
+REFERENCES WineFamilies (FamilyId)
+ON DELETE NO ACTION
+ON UPDATE NO ACTION;
+
 ALTER TABLE EmailCustomers_ShippingAddresses ADD CONSTRAINT emailcustomers_emailcustomers_address_fk
 FOREIGN KEY (EmailCustomerId)
 REFERENCES EmailCustomers (EmailCustomerId)
@@ -704,6 +926,12 @@ REFERENCES EmailCustomers (EmailCustomerId)
 ON DELETE NO ACTION
 ON UPDATE NO ACTION;
 
+ALTER TABLE EmailCustomerSummaries ADD CONSTRAINT emailcustomers_emailcustomersummaries_fk
+FOREIGN KEY (EmailCustomerId)
+REFERENCES EmailCustomers (EmailCustomerId)
+ON DELETE NO ACTION
+ON UPDATE NO ACTION;
+
 ALTER TABLE EmailCustomers_LegacyEmailOrders ADD CONSTRAINT emailcustomers_emailcustomer_legacyemailorders_fk
 FOREIGN KEY (EmailCustomerId)
 REFERENCES EmailCustomers (EmailCustomerId)
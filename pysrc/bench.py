@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+"""
+################################################################################
+  bench.py
+################################################################################
+
+This is the main module for generating synthetic data and running and comparing
+benchmarks of the chw-action pipeline.
+
+=============== ================================================================
+Created on     October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+import json
+import sys
+
+# Third party imports
+import click
+
+# Local application imports
+from chwbench import benchmarks, synthetic_data
+
+
+@click.command()
+@click.option('--scale', '-s', type=int, default=1, show_default=True,
+              help='Size of the generated data, 1 is about the size of our current data')
+@click.option('--seed', type=int, default=synthetic_data.default_seed, show_default=True,
+              help='Random number generator seed')
+@click.argument('outdir', type=click.Path(file_okay=False))
+def generate(scale, seed, outdir):
+    """
+    Generate synthetic legacy wine master and email orders csv files in OUTDIR
+    """
+    for path in synthetic_data.generate(outdir, scale=scale, seed=seed):
+        print(path)
+
+
+@click.command()
+@click.option('--scale', '-s', type=int, multiple=True, default=(1, 10), show_default=True,
+              help='Scale(s) of the synthetic data to run the benchmark with, may be repeated')
+@click.option('--seed', type=int, default=synthetic_data.default_seed, show_default=True,
+              help='Random number generator seed')
+@click.option('--results-dir', type=click.Path(file_okay=False), default=benchmarks.default_results_dir,
+              show_default=True, help='Directory to write the JSON results file to')
+@click.option('--plan-baseline', type=click.Path(dir_okay=False), default=benchmarks.default_plan_baseline,
+              show_default=True, help='Plan snapshot to check the query plans against after each run')
+@click.option('--temp-indexes', is_flag=True, default=False,
+              help='Create the indexes suggested for the statements of each stage while it runs')
+def run(scale, seed, results_dir, plan_baseline, temp_indexes):
+    """
+    Time each chw-action of the load, migrate and report pipeline
+
+    \b
+    The pipeline is run on a fresh SQLite database loaded with synthetic
+    data for each scale. The results are written to a JSON file.
+    Exits with status 1 if the plan of a statement now scans a table which
+    it didn't scan in the plan baseline, or a statement isn't in the plan
+    baseline (see the plans command).
+    """
+    results_path = benchmarks.run_benchmarks(scale, seed=seed, results_dir=results_dir,
+                                             plan_baseline=plan_baseline, temp_indexes=temp_indexes)
+    print(results_path)
+
+    with open(results_path, encoding='utf-8') as f:
+        results = json.load(f)
+    if any(run.get('plan_regressions') or run.get('plan_unbaselined') for run in results['runs']):
+        sys.exit(1)
+
+
+@click.command()
+@click.option('--scale', '-s', type=int, default=1, show_default=True,
+              help='Scale of the synthetic data to run the pipeline with')
+@click.option('--seed', type=int, default=synthetic_data.default_seed, show_default=True,
+              help='Random number generator seed')
+@click.option('--plan-baseline', type=click.Path(dir_okay=False), default=benchmarks.default_plan_baseline,
+              show_default=True, help='Plan snapshot file to write')
+def plans(scale, seed, plan_baseline):
+    """
+    Save the query plans of the pipeline's statements as the plan baseline
+
+    \b
+    The pipeline is run at the scale and the plans of the statements in the
+    loaded database are saved to the plan baseline which the run command
+    checks the plans against. Update it when a plan change is intended.
+    """
+    benchmarks.save_plan_baseline(scale, seed=seed, plan_baseline=plan_baseline)
+    print(plan_baseline)
+
+
+@click.command()
+@click.option('--repeat', type=int, default=10, show_default=True,
+              help='Number of times to run each command, the median time is reported')
+@click.option('--max-secs', type=float, default=None,
+              help='Exit with status 1 if the median startup time of a command is longer than this')
+def startup(repeat, max_secs):
+    """
+    Measure the startup time of chw-action w/ python -X importtime
+
+    \b
+    Reports the slowest top level imports, and flags startups which import the
+    chwdata modules or the database connectors (which should be lazily loaded).
+    """
+    failed = False
+    for result in benchmarks.run_startup_benchmarks(repeat=repeat):
+        print(f'{result["stage"]}: {result["wall_secs"]:.3f} secs (imports {result["import_secs"]:.3f} secs)')
+        for name, secs in result['top_imports']:
+            print(f'    {secs:8.4f}  {name}')
+        if result['slow_modules'] or (max_secs is not None and result['wall_secs'] > max_secs):
+            failed = True
+
+    if failed:
+        sys.exit(1)
+
+
+@click.command()
+@click.option('--scale', '-s', type=int, multiple=True, default=(10,), show_default=True,
+              help='Scale(s) of the synthetic data to run the benchmark with, may be repeated')
+@click.option('--seed', type=int, default=synthetic_data.default_seed, show_default=True,
+              help='Random number generator seed')
+@click.option('--fetch-size', type=int, default=None,
+              help='Number of rows fetched at a time from streamed results  [default: 1000]')
+def memory(scale, seed, fetch_size):
+    """
+    Measure the peak RSS of each pipeline stage w/ buffered and streamed results
+
+    \b
+    The default cursors buffer their whole result (as the mariadb connector's
+    do) in both runs, the large results read w/ CHW_DB.stream_rows are only
+    streamed in the 2nd run.
+    """
+    print(f'| {"Scale":>5} | {"Stage":40} | {"Buffered MiB":>12} | {"Streamed MiB":>12} |')
+    print(f'| ----: | {"":-<40} | -----------: | -----------: |')
+    for s in scale:
+        for stage, buffered_kb, streamed_kb in benchmarks.measure_memory(s, seed=seed, fetch_size=fetch_size):
+            print(f'| {s:5} | {stage:40} | {buffered_kb / 1024:12.1f} | {streamed_kb / 1024:12.1f} |')
+
+
+@click.command()
+@click.option('--scale', '-s', type=int, default=1, show_default=True,
+              help='Scale of the synthetic data to run the pipeline with')
+@click.option('--seed', type=int, default=synthetic_data.default_seed, show_default=True,
+              help='Random number generator seed')
+@click.option('--backend', '-b', type=click.Choice(('mariadb', 'mysql', 'sqlite')), multiple=True,
+              default=('mariadb', 'mysql'), show_default=True,
+              help='Backend to run the pipeline on, may be repeated')
+@click.option('--drop-tables', is_flag=True, default=False,
+              help='Drop the tables of the chw databases on the servers before loading them')
+@click.option('--results-dir', type=click.Path(file_okay=False), default=benchmarks.default_results_dir,
+              show_default=True, help='Directory to write the JSON results file to')
+def backends(scale, seed, backend, drop_tables, results_dir):
+    """
+    Compare the pipeline's stage times and results on the database backends
+
+    \b
+    The load, migrate and report pipeline is run on each backend (by default the
+    chw-mariadb and chw-mysql containers, which must be running) with the same
+    synthetic data, the chw database of each server is dropped and recreated
+    from the DDL files. The stage times are reported side by side, followed by
+    the statements which executed a different number of times or fetched a
+    different number of rows, and the tables w/ different row counts.
+    Exits with status 1 if a stage failed or there are differences.
+    """
+    results_path = benchmarks.compare_backends(scale, backend, seed=seed, results_dir=results_dir,
+                                               drop_tables=drop_tables)
+    print(results_path)
+    comparison = benchmarks.compare_backend_results(results_path)
+    names = comparison['backends']
+
+    print()
+    print(f'| {"Stage":40} | ' + ' | '.join(f'{name:>9}' for name in names) + ' |')
+    print(f'| {"":-<40} | ' + ' | '.join('--------:' for _ in names) + ' |')
+    failed = False
+    for stage, times in comparison['stages']:
+        failed = failed or 'error' in times.values()
+        finished = {name: secs for name, secs in times.items() if isinstance(secs, float)}
+        fastest = min(finished, key=finished.get) if len(finished) == len(names) else None
+        print(f'| {stage:40} | '
+              + ' | '.join('    error' if times[name] == 'error' else '        -' if times[name] is None
+                           else f'{times[name]:9.3f}' for name in names)
+              + ' |' + (f' {fastest}' if fastest is not None else ''))
+
+    for title, differences in (('Statements (executes, rows)', comparison['statements']),
+                               ('Table row counts', comparison['tables'])):
+        if not differences:
+            continue
+        failed = True
+        print()
+        print(f'{title} which differ:')
+        for key, by_backend in differences:
+            print(f'  {key}')
+            print('    ' + ', '.join(f'{name}: {value}' for name, value in by_backend.items()))
+
+    if failed:
+        sys.exit(1)
+
+
+@click.command()
+@click.option('--scale', '-s', type=int, multiple=True, default=(1, 10), show_default=True,
+              help='Scale(s) of the synthetic data to run the benchmark with, may be repeated')
+@click.option('--seed', type=int, default=synthetic_data.default_seed, show_default=True,
+              help='Random number generator seed')
+@click.option('--lines', 'line_count', type=int, default=100_000, show_default=True,
+              help='Number of random order lines to quote in one batch')
+@click.option('--baseline-lines', 'baseline_line_count', type=int, default=2_000, show_default=True,
+              help='Number of the lines to quote w/ a query per line')
+def quotes(scale, seed, line_count, baseline_line_count):
+    """
+    Compare the rate of batch price quotes to quoting w/ a query per line
+
+    \b
+    The pipeline is run through create-winepricing-from-legacy, then random
+    order lines of the priced wines are quoted from the NY price list.
+    """
+    print(f'| {"Scale":>5} | {"Wines":>6} | {"Load secs":>9} | {"Batch lines/sec":>15} |'
+          f' {"Per line lines/sec":>18} | {"Speedup":>7} |')
+    print('| ----: | -----: | --------: | --------------: | -----------------: | ------: |')
+    for s in scale:
+        result = benchmarks.measure_quotes(s, seed=seed, line_count=line_count,
+                                           baseline_line_count=baseline_line_count)
+        print(f'| {s:5} | {result["wines"]:6} | {result["load_secs"]:9.3f} |'
+              f' {result["batch_lines_per_sec"]:15,} | {result["baseline_lines_per_sec"]:18,} |'
+              f' {result["batch_lines_per_sec"] / max(result["baseline_lines_per_sec"], 1):7.1f} |')
+
+
+@click.command()
+@click.option('--threshold', type=float, default=0.10, show_default=True,
+              help='Fraction slower than the baseline a stage must be to be a regression')
+@click.argument('baseline', type=click.Path(exists=True, dir_okay=False))
+@click.argument('current', type=click.Path(exists=True, dir_okay=False))
+def compare(threshold, baseline, current):
+    """
+    Compare the CURRENT benchmark results to the BASELINE results
+
+    Exits with status 1 if any stage has regressed.
+    """
+    comparison = benchmarks.compare_results(baseline, current, threshold=threshold)
+    print(f'| {"Scale":>5} | {"Stage":40} | {"Baseline":>9} | {"Current":>9} | {"Ratio":>6} |')
+    print(f'| ----: | {"":-<40} | --------: | --------: | -----: |')
+    for scale, stage, base_secs, cur_secs, ratio, regressed in comparison:
+        print(f'| {scale:5} | {stage:40} | {base_secs:9.3f} | {cur_secs:9.3f} | {ratio:6.2f} |'
+              + (' REGRESSED' if regressed else ''))
+
+    if any(regressed for *_, regressed in comparison):
+        sys.exit(1)
+
+
+@click.group()
+def cli():
+    """Generate synthetic data and run benchmarks of the CHW database actions
+    """
+    # pylint: disable=unnecessary-pass
+    pass
+
+
+cli.add_command(generate)
+cli.add_command(run)
+cli.add_command(compare)
+cli.add_command(startup)
+cli.add_command(memory)
+cli.add_command(plans)
+cli.add_command(backends)
+cli.add_command(quotes)
+
+
+if __name__ == '__main__':
+    cli()
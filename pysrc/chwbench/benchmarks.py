@@ -0,0 +1,567 @@
+"""
+################################################################################
+  chwbench.benchmarks.py
+################################################################################
+
+This module runs the chw-action pipeline (load the legacy tables, migrate them
+to the new tables and write the report) against synthetic data in the embedded
+SQLite database, timing each action.
+
+The results of a run are saved as a JSON file so that runs can be compared to
+find performance regressions.
+
+The backend comparison runs the pipeline on each of the database servers
+(mariadb and mysql), reporting the stage times side by side and the statements
+and tables whose results differ.
+
+The quote benchmark prices random order lines w/ a batch quote of a PriceBook
+(see chwdata.price_quotes) and w/ a query per line, to compare their rates.
+
+The memory benchmark runs the pipeline w/ buffered results (as the mariadb
+connector's default cursors do) and w/ streamed results (see
+chw_db.stream_rows) to compare the peak RSS of each stage.
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+import functools
+import gc
+import json
+import multiprocessing
+import platform
+import random
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import nullcontext, redirect_stdout, redirect_stderr
+from datetime import datetime
+from pathlib import Path
+
+# Third party imports
+
+# Local application imports
+from chwdata import chw_db, profiling, query_plans, schema, sqlite_db
+from chwdata import customer_analytics, price_quotes, retail_orders, wines
+from . import synthetic_data
+
+
+_repo_dir = Path(__file__).resolve().parents[2]
+
+default_bench_dir = _repo_dir / 'data' / 'bench'
+default_results_dir = default_bench_dir / 'results'
+
+# The plan snapshot the query plans are compared to after the pipeline is run,
+# a statement whose plan now scans a table it didn't scan fails the run
+default_plan_baseline = Path(__file__).resolve().parent / 'plan_baseline.json'
+
+# The chw-action actions in the order they must be run, named by their cli command names
+pipeline_stages = (
+    ('load-legacy-wine-master-from-csv', wines.do_load_legacy_wine_master_from_csv),
+    ('setup-wine-lookup-tables',         wines.do_setup_lookup_table_records),
+    ('import-legacy-producers',          wines.do_create_producers_from_legacy),
+    ('create-wines-from-legacy',         wines.do_create_wines_from_legacy),
+    ('create-winepricing-from-legacy',   wines.do_create_winepricing_from_legacy),
+    ('create-winepurchases-from-legacy', wines.do_create_winepurchases_from_legacy),
+    ('load-legacy-email-orders-from-csv', retail_orders.do_load_legacy_email_orders_from_csv),
+    ('import-legacy-customers',
+     lambda: retail_orders.do_create_customers_from_legacy(user='Gillian')),
+    ('match-legacy-order-items',         retail_orders.do_match_legacy_order_items_to_wines),
+    ('create-orders-from-legacy',        retail_orders.do_create_orders_from_legacy),
+    ('import-legacy-addresses',          retail_orders.do_import_addresses_from_legacy),
+    ('write-top-customer-order-report',  retail_orders.do_write_top_customer_order_report),
+    ('compute-customer-summaries',       customer_analytics.do_compute_customer_summaries),
+)
+
+
+# chw-action command lines run by the startup benchmark, and the (slow) modules
+# (and their submodules) which they should not import. The database backends should
+# only be imported when connecting, and the chwdata modules only for an invoked command.
+startup_commands = (
+    (('--help',), ('chwdata', 'mariadb', 'sqlite3')),
+    (('import-legacy-customers', '--help'), ('mariadb', 'sqlite3', 'chwdata.sqlite_db')),
+)
+
+_re_importtime = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=_repo_dir).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _max_rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _reset_max_rss():
+    """
+    Reset the peak RSS of this process (only possible on Linux) so that the max RSS
+    after a stage is the stage's peak. Returns False if it couldn't be reset.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w', encoding='ascii') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def prepare_data(scale, seed, bench_dir=default_bench_dir):
+    """
+    Generate the synthetic csv files for the scale (if they haven't already been generated)
+    returning the directory containing them.
+    """
+    infile_dir = Path(bench_dir) / f'x{scale}-s{seed}' / 'infiles'
+    csv_files = (wines.Wines.LEGACY_WINE_CSV_FILENAME, retail_orders.RetailOrders.LEGACY_ORDERS_CSV_FILENAME)
+    if not all((infile_dir / csv_file).is_file() for csv_file in csv_files):
+        print(f'Generating synthetic data at scale {scale} (seed {seed})...', file=sys.stderr)
+        synthetic_data.generate(infile_dir, scale=scale, seed=seed)
+    return infile_dir
+
+
+def reset_server_database(*, drop_tables=False):
+    """
+    Start w/ an empty database on the server of the chw_db.default_backend, the
+    tables are created from the DDL files (see schema.apply_schema).
+    The existing tables are only dropped if drop_tables is True.
+    """
+    schema_apply = schema.SchemaApply()
+    try:
+        if schema_apply.get_tables() and not drop_tables:
+            raise RuntimeError(f'The {chw_db.default_backend} chw database has tables,'
+                               ' they are only dropped w/ drop_tables')
+        schema_apply.drop_tables()
+    finally:
+        schema_apply.close()
+    schema.apply_schema()
+
+
+def run_pipeline(scale, *, seed=synthetic_data.default_seed, bench_dir=default_bench_dir, stages=None,
+                 temp_indexes=False, backend='sqlite', drop_tables=False, query_stats=None):
+    """
+    Run the pipeline stages on a fresh SQLite database loaded w/ synthetic data of the given scale.
+    Returns the list of stage results.
+    The max_rss_kb of a stage is its peak RSS where the peak can be reset (Linux),
+    otherwise it is the peak RSS of the process so far.
+    The output of the actions is written to a bench.log file next to the database file.
+    When temp_indexes is True the indexes suggested for the statements of each stage
+    are created before it is run and dropped after (see query_plans.temporary_indexes),
+    the time to create them is part of the stage's time.
+    The csv files are loaded from this machine (w/ LOAD DATA LOCAL INFILE), when the
+    backend is a database server (mariadb or mysql) its chw database is reset (see
+    reset_server_database) and the output is written to a bench-<backend>.log file.
+    When query_stats (a profiling.QueryStats) is given the database calls of the stages
+    are recorded in it.
+    """
+    stages = stages if stages is not None else pipeline_stages
+    infile_dir = prepare_data(scale, seed, bench_dir)
+    run_dir = infile_dir.parent
+
+    chw_db.default_backend = backend
+    # the same LOAD DATA statements are run on every backend (the SQLite emulation reads local files)
+    chw_db.local_infile_dir = infile_dir
+    if backend == 'sqlite':
+        # Start with an empty database
+        for suffix in ('', '-wal', '-shm'):
+            (run_dir / f'{chw_db.default_db_name}.sqlite3{suffix}').unlink(missing_ok=True)
+
+        sqlite_db.default_sqlite_dir = run_dir
+        sqlite_db.default_infile_dir = infile_dir
+        log_path = run_dir / 'bench.log'
+    else:
+        reset_server_database(drop_tables=drop_tables)
+        log_path = run_dir / f'bench-{backend}.log'
+
+    if query_stats is not None:
+        chw_db.connection_wrapper = functools.partial(profiling.ProfiledConnection, stats=query_stats)
+
+    results = []
+    with open(log_path, 'w', encoding='utf-8') as log:
+        for name, action in stages:
+            gc.collect()
+            _reset_max_rss()
+            result = {'stage': name}
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            try:
+                with redirect_stdout(log), redirect_stderr(log), \
+                     query_plans.temporary_indexes((name,)) if temp_indexes else nullcontext():
+                    action()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                result['error'] = f'{type(e).__name__}: {e}'
+            result['wall_secs'] = round(time.perf_counter() - wall_start, 4)
+            result['cpu_secs'] = round(time.process_time() - cpu_start, 4)
+            result['max_rss_kb'] = _max_rss_kb()
+            results.append(result)
+            print(f'  x{scale:<4} {name:40} {result["wall_secs"]:9.3f} s'
+                  + (f'  FAILED {result["error"]}' if 'error' in result else ''), file=sys.stderr)
+            if 'error' in result:
+                # the later stages depend on this one
+                break
+
+    if query_stats is not None:
+        chw_db.connection_wrapper = None
+    return results
+
+
+def _run_pipeline_process(queue, scale, seed, bench_dir, stream_results, fetch_size):
+    """
+    Run the pipeline putting the stage results on the queue (the target of
+    the processes started by measure_memory)
+    """
+    # buffer the results of the default cursors as the mariadb connector does
+    sqlite_db.default_buffered = True
+    chw_db.stream_results = stream_results
+    if fetch_size is not None:
+        chw_db.default_fetch_size = fetch_size
+    queue.put(run_pipeline(scale, seed=seed, bench_dir=bench_dir))
+
+
+def measure_memory(scale, *, seed=synthetic_data.default_seed, bench_dir=default_bench_dir, fetch_size=None):
+    """
+    Run the pipeline at the given scale w/ buffered results and then w/ streamed
+    results (chw_db.stream_results), each in a new process so the runs don't share
+    a heap. Returns a list of (stage, buffered max_rss_kb, streamed max_rss_kb).
+    """
+    mp_context = multiprocessing.get_context('spawn')
+    runs = []
+    for stream_results in (False, True):
+        queue = mp_context.Queue()
+        process = mp_context.Process(target=_run_pipeline_process,
+                                     args=(queue, scale, seed, bench_dir, stream_results, fetch_size))
+        process.start()
+        runs.append(queue.get())
+        process.join()
+
+    return [(buffered['stage'], buffered['max_rss_kb'], streamed['max_rss_kb'])
+            for buffered, streamed in zip(*runs)]
+
+
+def measure_startup(args, slow_modules=(), *, repeat=10):
+    """
+    Run `python -X importtime main.py <args>` repeat times, returning the median wall
+    time of the runs, the cumulative import time of each top level module (of the
+    last run) sorted slowest first, and which of the slow_modules were imported.
+    """
+    main_py = Path(__file__).resolve().parents[1] / 'main.py'
+    wall_times = []
+    for _ in range(repeat):
+        wall_start = time.perf_counter()
+        proc = subprocess.run([sys.executable, '-X', 'importtime', str(main_py), *args],
+                              capture_output=True, text=True, check=False)
+        wall_times.append(time.perf_counter() - wall_start)
+
+    top_imports = []
+    imported = set()
+    for line in proc.stderr.splitlines():
+        m = _re_importtime.match(line)
+        if not m:
+            continue
+        imported.add(m.group(4))
+        if m.group(3) == '':
+            top_imports.append((m.group(4), int(m.group(2)) / 1_000_000))
+    top_imports.sort(key=lambda imp: imp[1], reverse=True)
+
+    return {'stage': 'startup: ' + ' '.join(args),
+            'wall_secs': round(statistics.median(wall_times), 4),
+            'import_secs': round(sum(secs for _, secs in top_imports), 4),
+            'slow_modules': sorted(name for name in imported
+                                   if any(name == slow or name.startswith(slow + '.')
+                                          for slow in slow_modules)),
+            'top_imports': [(name, round(secs, 4)) for name, secs in top_imports[:10]],
+           }
+
+
+def run_startup_benchmarks(*, repeat=10):
+    """
+    Measure the startup time of each of the startup_commands
+    """
+    results = []
+    for args, slow_modules in startup_commands:
+        result = measure_startup(args, slow_modules, repeat=repeat)
+        results.append(result)
+        print(f'  startup {" ".join(args):38} {result["wall_secs"]:9.3f} s'
+              + (f'  IMPORTS {", ".join(result["slow_modules"])}' if result['slow_modules'] else ''),
+              file=sys.stderr)
+    return results
+
+
+def check_plans(scale, plan_baseline):
+    """
+    Compare the plans of the registered statements in the database the pipeline
+    was just run on to the plan snapshot, returning the regressions as a list of
+    {'statement', 'full_scans'} (the tables the statement now scans) or {'statement',
+    'error'} (the statement can't be explained now) and the list of the names of
+    the statements which aren't in the plan snapshot
+    """
+    advisor = query_plans.QueryPlanAdvisor()
+    try:
+        comparison = query_plans.compare_plans(plan_baseline, advisor.get_plans())
+    finally:
+        advisor.close()
+
+    regressions = [{'statement': name, 'full_scans': details} if status == 'regressed'
+                   else {'statement': name, 'error': details[0]}
+                   for name, status, details in comparison if status in ('regressed', 'failed')]
+    unbaselined = [name for name, status, _ in comparison if status == 'unbaselined']
+    for regression in regressions:
+        print(f'  x{scale:<4} {regression["statement"]:40} PLAN REGRESSED'
+              + (f' now scans {", ".join(regression["full_scans"])}' if 'full_scans' in regression
+                 else f' now fails {regression["error"]}'), file=sys.stderr)
+    for name in unbaselined:
+        print(f'  x{scale:<4} {name:40} PLAN NOT IN BASELINE', file=sys.stderr)
+    return regressions, unbaselined
+
+
+def save_plan_baseline(scale, *, seed=synthetic_data.default_seed, bench_dir=default_bench_dir,
+                       plan_baseline=default_plan_baseline):
+    """
+    Run the pipeline at the given scale and save the plans of the registered
+    statements to the plan_baseline snapshot
+    """
+    stages = run_pipeline(scale, seed=seed, bench_dir=bench_dir)
+    if any('error' in stage for stage in stages):
+        raise RuntimeError('The pipeline failed, see the bench.log')
+    advisor = query_plans.QueryPlanAdvisor()
+    try:
+        query_plans.save_plans(plan_baseline, advisor.get_plans(), 'sqlite')
+    finally:
+        advisor.close()
+
+
+def run_benchmarks(scales, *, seed=synthetic_data.default_seed, bench_dir=default_bench_dir,
+                   results_dir=default_results_dir, plan_baseline=default_plan_baseline, temp_indexes=False):
+    """
+    Run the pipeline benchmark at each of the given scales and save the results
+    to a JSON file in results_dir, returning the path of the results file.
+    After each run the query plans are checked against the plan_baseline snapshot
+    (if it exists), the statements whose plans regressed are in the run's
+    plan_regressions and those which aren't in the snapshot in its plan_unbaselined.
+    """
+    started = datetime.now()
+    results = {'started': started.isoformat(timespec='seconds'),
+               'git_commit': _git_commit(),
+               'python': platform.python_version(),
+               'sqlite': sqlite_db.sqlite3.sqlite_version,
+               'backend': 'sqlite',
+               'seed': seed,
+               'temp_indexes': temp_indexes,
+               'startup': run_startup_benchmarks(),
+               'runs': []
+              }
+
+    for scale in scales:
+        run = {'scale': scale,
+               'stages': run_pipeline(scale, seed=seed, bench_dir=bench_dir, temp_indexes=temp_indexes)}
+        if plan_baseline is not None and Path(plan_baseline).is_file():
+            run['plan_regressions'], run['plan_unbaselined'] = check_plans(scale, plan_baseline)
+        results['runs'].append(run)
+
+    results_dir = Path(results_dir)
+    results_dir.mkdir(parents=True, exist_ok=True)
+    results_path = results_dir / f'bench-{started:%Y%m%d-%H%M%S}.json'
+    with open(results_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+        f.write('\n')
+
+    return results_path
+
+
+def get_table_row_counts():
+    """
+    Get the number of rows of each table of the chw_db.default_backend database
+    """
+    db = chw_db.CHW_DB()
+    try:
+        return {table: db.get_table_row_count(table) for table in db.get_tables()}
+    finally:
+        db.close()
+
+
+def compare_backends(scale, backends, *, seed=synthetic_data.default_seed, bench_dir=default_bench_dir,
+                     results_dir=default_results_dir, drop_tables=False):
+    """
+    Run the pipeline at the given scale on each of the backends, recording the
+    database calls of each statement and the row counts of the tables after the
+    pipeline, and save the results to a JSON file in results_dir, returning the
+    path of the results file (see compare_backend_results).
+    The chw databases of the servers are reset, see reset_server_database.
+    """
+    started = datetime.now()
+    results = {'started': started.isoformat(timespec='seconds'),
+               'git_commit': _git_commit(),
+               'python': platform.python_version(),
+               'scale': scale,
+               'seed': seed,
+               'backends': {}
+              }
+
+    try:
+        for backend in backends:
+            query_stats = profiling.QueryStats()
+            stages = run_pipeline(scale, seed=seed, bench_dir=bench_dir, backend=backend,
+                                  drop_tables=drop_tables, query_stats=query_stats)
+            statements = {key: {'executes': executes, 'rows': rows, 'secs': round(exec_secs + fetch_secs, 4)}
+                          for key, (executes, exec_secs, fetch_secs, rows) in query_stats.statements.items()}
+            results['backends'][backend] = {'stages': stages,
+                                            'statements': statements,
+                                            'table_rows': get_table_row_counts(),
+                                           }
+    finally:
+        chw_db.connection_wrapper = None
+        chw_db.local_infile_dir = None
+
+    results_dir = Path(results_dir)
+    results_dir.mkdir(parents=True, exist_ok=True)
+    results_path = results_dir / f'backends-{started:%Y%m%d-%H%M%S}.json'
+    with open(results_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+        f.write('\n')
+
+    return results_path
+
+
+def compare_backend_results(results_path):
+    """
+    Compare the backends of a compare_backends results file. Returns a dict w/
+    - backends:   the names of the backends in the order they were run
+    - stages:     a list of (stage, {backend: wall_secs or None if it wasn't run, or 'error'})
+    - statements: a list of (statement, {backend: (executes, rows) or None}) of the
+                  statements which weren't executed the same number of times or
+                  didn't fetch the same number of rows on all of the backends
+    - tables:     a list of (table, {backend: row count or None}) of the tables
+                  whose row counts differ
+    """
+    with open(results_path, encoding='utf-8') as f:
+        results = json.load(f)
+
+    runs = results['backends']
+    backends = list(runs)
+
+    stage_names = [name for name, _ in pipeline_stages]
+    stage_times = {backend: {stage['stage']: 'error' if 'error' in stage else stage['wall_secs']
+                             for stage in runs[backend]['stages']}
+                   for backend in backends}
+    stages = [(name, {backend: stage_times[backend].get(name) for backend in backends})
+              for name in stage_names]
+
+    statements = []
+    for key in sorted({key for run in runs.values() for key in run['statements']}):
+        by_backend = {backend: ((runs[backend]['statements'][key]['executes'],
+                                 runs[backend]['statements'][key]['rows'])
+                                if key in runs[backend]['statements'] else None)
+                      for backend in backends}
+        if len(set(by_backend.values())) > 1:
+            statements.append((key, by_backend))
+
+    tables = []
+    # table names are case sensitive on some servers
+    table_rows = {backend: {table.lower(): rows for table, rows in runs[backend]['table_rows'].items()}
+                  for backend in backends}
+    for table in sorted({table for rows in table_rows.values() for table in rows}):
+        by_backend = {backend: table_rows[backend].get(table) for backend in backends}
+        if len(set(by_backend.values())) > 1:
+            tables.append((table, by_backend))
+
+    return {'backends': backends, 'stages': stages, 'statements': statements, 'tables': tables}
+
+
+def measure_quotes(scale, *, seed=synthetic_data.default_seed, bench_dir=default_bench_dir,
+                   line_count=100_000, baseline_line_count=2_000, price_list='NY'):
+    """
+    Run the pipeline at the given scale through the create-winepricing-from-legacy
+    stage, then quote line_count random order lines (of the wines in WinePricing)
+    w/ one batch quote and baseline_line_count of them w/ a query per line.
+    Returns a dict of the line counts, secs and lines per second of each, and the
+    batch load time of the price book.
+    """
+    stage_names = [name for name, _ in pipeline_stages]
+    run_pipeline(scale, seed=seed, bench_dir=bench_dir,
+                 stages=pipeline_stages[:stage_names.index('create-winepricing-from-legacy') + 1])
+
+    quotes = price_quotes.PriceQuotes()
+    try:
+        t = time.perf_counter()
+        price_book = quotes.get_price_book()
+        load_secs = time.perf_counter() - t
+
+        rng = random.Random(seed)
+        wine_ids = price_book.wine_ids()
+        lines = [(rng.choice(wine_ids), rng.choice((1, 1, 1, 2, 3, 5, 10)), rng.choice((0, 0, 0, 6)))
+                 for _ in range(line_count)]
+        order_keys = [i // 3 for i in range(line_count)]
+
+        t = time.perf_counter()
+        batch_quote = price_book.quote(*zip(*lines), price_list, order_keys)
+        batch_secs = time.perf_counter() - t
+
+        t = time.perf_counter()
+        for wine_id, case_cnt, unit_cnt in lines[:baseline_line_count]:
+            quotes.quote_line(wine_id, case_cnt, unit_cnt, price_list)
+        baseline_secs = time.perf_counter() - t
+    finally:
+        quotes.close()
+
+    return {'scale': scale,
+            'wines': len(price_book),
+            'load_secs': round(load_secs, 4),
+            'batch_lines': len(batch_quote),
+            'batch_secs': round(batch_secs, 4),
+            'batch_lines_per_sec': round(len(batch_quote) / max(batch_secs, 1e-9)),
+            'baseline_lines': min(baseline_line_count, line_count),
+            'baseline_secs': round(baseline_secs, 4),
+            'baseline_lines_per_sec': round(min(baseline_line_count, line_count) / max(baseline_secs, 1e-9)),
+           }
+
+
+def compare_results(baseline_path, current_path, *, threshold=0.10, min_secs=0.05):
+    """
+    Compare the stage wall times of 2 benchmark result files.
+    Returns a list of (scale, stage, baseline_secs, current_secs, ratio, regressed) for the
+    stages in both results. A stage has regressed if it is more than threshold slower
+    (and took at least min_secs, so noise in tiny times isn't reported).
+    """
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(current_path, encoding='utf-8') as f:
+        current = json.load(f)
+
+    # the startup times are compared as stages of a scale 0 run
+    baseline['runs'].append({'scale': 0, 'stages': baseline.get('startup', [])})
+    current['runs'].append({'scale': 0, 'stages': current.get('startup', [])})
+
+    baseline_times = {(run['scale'], s['stage']): s['wall_secs']
+                      for run in baseline['runs'] for s in run['stages'] if 'error' not in s}
+    comparison = []
+    for run in current['runs']:
+        for stage in run['stages']:
+            key = (run['scale'], stage['stage'])
+            if key not in baseline_times or 'error' in stage:
+                continue
+            base_secs, cur_secs = baseline_times[key], stage['wall_secs']
+            ratio = cur_secs / base_secs if base_secs > 0 else float('inf')
+            regressed = cur_secs >= min_secs and ratio > 1 + threshold
+            comparison.append((run['scale'], stage['stage'], base_secs, cur_secs, ratio, regressed))
+
+    return comparison
+
+
+def _test():
+    pass
+
+
+if __name__ == '__main__':
+    _test()
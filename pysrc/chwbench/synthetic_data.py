@@ -0,0 +1,498 @@
+"""
+################################################################################
+  chwbench.synthetic_data.py
+################################################################################
+
+This module generates synthetic (but realistic) legacy FileMaker export files
+for benchmarking and testing the load, migration and report actions without
+using the real (encrypted) customer data.
+
+The files are written in the same transformed form as the real exports after
+they have been run through bin/transform-for-infile.awk, and with the same names
+that the load actions expect:
+
+- LegacyWineMaster  -> Wines.LEGACY_WINE_CSV_FILENAME
+- LegacyEmailOrders -> RetailOrders.LEGACY_ORDERS_CSV_FILENAME
+
+The data is generated from a seeded random number generator so the same seed and
+scale always produce the same files. A scale of 1 is about the size of our
+current data, 10 and 100 are used to look for scaling problems.
+
+The generated data includes the messy cases that the migration code handles:
+- multi-line text fields (newlines escaped as \\n by the transform)
+- 'NV' vintages in the wine master and non-year vintages in the orders
+- decade (e.g. 1950s) and blank YearEstablished values
+- multiple email addresses in Email1 and emails changing between orders
+- titles and suffixes, extra words and stray whitespace in FullName
+- empty FullName's, missing and short FirstDate's and empty Subtotal's
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+import random
+import re
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Third party imports
+
+# Local application imports
+from chwdata.chw_sql import CHW_SQL
+from chwdata.retail_orders import RetailOrders
+from chwdata.wines import Wines
+
+
+# Approximate sizes of our current data (scale 1)
+base_wine_count = 1500
+base_producer_count = 120
+base_customer_count = 4800
+base_order_count = 26500
+
+default_seed = 1218
+
+
+def load_data_fields(load_data_sql_fmt):
+    """
+    Get the csv field names, in order, from a CHW_SQL LOAD DATA format string
+    (user variable fields are returned without the leading '@')
+    """
+    m = re.search(r'IGNORE 1 LINES\s*\((.*?)\)\s*SET', load_data_sql_fmt, re.DOTALL)
+    return [f.strip().lstrip('@') for f in m[1].split(',') if f.strip() != '']
+
+
+def lookup_names(insert_lookup_sql, column=1):
+    """
+    Get the values of the given column of the rows in a CHW_SQL lookup table insert statement
+    """
+    names = []
+    for row in re.findall(r'\(([^()]*)\)', insert_lookup_sql):
+        values = re.findall(r"'((?:[^'\\]|\\.)*)'|(-?[\d.]+)", row)
+        if len(values) > column:
+            names.append(values[column][0].replace("\\'", "'"))
+    return names
+
+
+_given_names = ('James', 'Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda', 'William',
+                'Elizabeth', 'David', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica', 'Thomas', 'Sarah',
+                'Charles', 'Karen', 'Christopher', 'Nancy', 'Daniel', 'Lisa', 'Matthew', 'Margaret',
+                'Anthony', 'Betty', 'Mark', 'Sandra', 'Gillian', 'Angelo', 'Mary Ann', 'Jean-Luc',
+                'Anne Marie')
+_surnames = ('Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez',
+             'Martinez', 'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson', 'Thomas', 'Taylor', 'Moore',
+             'Jackson', 'Martin', 'Lee', 'Perez', "O'Brien", 'Thompson', 'White', 'Harris', 'Sanchez',
+             'Clark', 'Van Buren', 'De la Cruz', 'Lippert', 'Hurley', 'Manioudakis', 'Kinsey', 'Nguyen')
+_titles = ('Mr.', 'Mrs.', 'Ms.', 'Dr.', 'Mr', 'Dr')
+_suffixes = ('Jr.', 'Jr', 'II', 'III', 'MD')
+_initials = 'ABCDEFGHJKLMNPRSTW'
+_email_domains = ('gmail.com', 'yahoo.com', 'aol.com', 'verizon.net', 'comcast.net', 'hotmail.com',
+                  'upenn.edu', 'example.com')
+_street_names = ('Main', 'Oak', 'Maple', 'Cedar', 'Elm', 'Washington', 'Lake', 'Hill', 'Park', 'Walnut')
+_street_types = ('St', 'St.', 'Street', 'Ave', 'Avenue', 'Rd', 'Road', 'Blvd', 'Ln', 'Lane', 'Dr', 'Drive')
+_cities = (('New York', 'NY'), ('Brooklyn', 'NY'), ('Hoboken', 'NJ'), ('Princeton', 'NJ'), ('Boston', 'MA'),
+           ('Cambridge', 'MA'), ('Philadelphia', 'PA'), ('Greenwich', 'CT'), ('Houston', 'TX'),
+           ('Chicago', 'IL'), ('San Francisco', 'CA'), ('Washington', 'DC'))
+_retailers = ('Astor Wines', 'Chambers Street', 'Flatiron Wines', 'Crush', 'Sherry-Lehmann', 'Zachys',
+              'Moore Brothers', 'Arborway', 'Wine Library', 'Bottle King')
+_sources = ('Email', 'Web', 'Phone', 'Newsletter', 'Referral', '')
+_producer_words = ('Domaine', 'Château', 'Maison', 'Bodegas', 'Cantina', 'Weingut', 'Clos', 'Mas')
+_family_names = ('Boillot', 'Dupont', 'Martin', 'Bernard', 'Laurent', 'Moreau', 'Girard', 'Roux', 'Fournier',
+                 'Mercier', 'Blanc', 'Faure', 'Rousseau', 'Vincent', 'Muller', 'Lefevre', 'Chevalier',
+                 'Garnier', 'Perrin', 'Rossi', 'Bianchi', 'Ferrari', 'Lopez', 'Torres', 'Schmitt')
+_cuvee_words = ('Rouge', 'Blanc', 'Vieilles Vignes', 'Cuvée Prestige', 'Réserve', 'Les Clos', 'Tradition',
+                'Grand Vin', 'Brut', 'Rosé', 'Sélection', 'Cuvée Spéciale', 'Le Petit', 'Les Terrasses')
+_varietals = ('Pinot Noir', 'Chardonnay', 'Syrah', 'Grenache', 'Merlot', 'Cabernet Sauvignon',
+              'Sauvignon Blanc', 'Chenin Blanc', 'Gamay', 'Nebbiolo', 'Tempranillo', 'Albariño', 'Mourvèdre')
+_sentences = ('Bright red fruit with a long mineral finish.',
+              'Hand harvested from old vines on limestone soils.',
+              'Aged 18 months in French oak barrels, 30% new.',
+              'Organic farming since 1998, no herbicides or pesticides.',
+              'A classic expression of the appellation.',
+              'Notes of cherry, violet and black pepper.',
+              'The family has farmed these slopes for five generations.',
+              'Fermented with native yeasts in concrete tanks.')
+
+_case_units = (('750ml', 12, 60), ('750ml', 6, 15), ('1.5 Liter (Magnum)', 6, 5), ('375ml', 12, 8),
+               ('3 Liter', 4, 2), ('250ml', 24, 1))
+
+
+def _unique_initials(n):
+    """
+    Letters (at least 2) of the middle initials which are unique for each number n
+    """
+    letters = ''
+    while n > 0 or len(letters) < 2:
+        n, r = divmod(n, len(_initials))
+        letters = _initials[r] + letters
+    return letters
+
+
+class _Writer:
+    """
+    Write records in the transformed LibreOffice Calc csv form
+    (| delimited, text fields quoted, newlines in fields escaped as \\n)
+    """
+
+    def __init__(self, path, fields):
+        self.fields = fields
+        self.f = open(path, 'w', encoding='utf-8', newline='\n')  # pylint: disable=consider-using-with
+        self.f.write('|'.join(f'"{name}"' for name in fields) + '\n')
+
+    @staticmethod
+    def _format(value):
+        if value is None or value == '':
+            return ''
+        if isinstance(value, (int, float)):
+            return str(value)
+        if isinstance(value, (date, datetime)):
+            return value.isoformat(sep=' ') if isinstance(value, datetime) else value.isoformat()
+        value = str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '""')
+        return f'"{value}"'
+
+    def write(self, record):
+        self.f.write('|'.join(self._format(record.get(name)) for name in self.fields) + '\n')
+
+    def close(self):
+        self.f.close()
+
+
+class SyntheticData:
+    """
+    Generator for synthetic legacy wine master and email order csv files.
+    """
+
+    def __init__(self, *, scale=1, seed=default_seed):
+        self.scale = scale
+        self.seed = seed
+        self.rng = random.Random(f'{seed}-{scale}')
+        self.wines = []
+        self.customers = []
+
+        self.colors = lookup_names(CHW_SQL.insert_lookup_wine_colors_sql)[1:]
+        self.wine_types = lookup_names(CHW_SQL.insert_lookup_wine_types_sql)[1:]
+        self.countries = lookup_names(CHW_SQL.insert_lookup_wine_countries_sql)
+        self.regions = lookup_names(CHW_SQL.insert_lookup_wine_regions_sql)
+        self.subregions = lookup_names(CHW_SQL.insert_lookup_wine_subregions_sql)
+        self.appellations = lookup_names(CHW_SQL.insert_lookup_wine_appellations_sql)
+
+    def write_files(self, outdir):
+        """
+        Write the legacy wine master and email orders csv files to the given directory,
+        returning the paths of the files written.
+        """
+        outdir = Path(outdir)
+        outdir.mkdir(parents=True, exist_ok=True)
+        wine_path = outdir / Wines.LEGACY_WINE_CSV_FILENAME
+        orders_path = outdir / RetailOrders.LEGACY_ORDERS_CSV_FILENAME
+
+        self.write_wine_master(wine_path)
+        self.write_email_orders(orders_path)
+        return wine_path, orders_path
+
+    def _multiline_text(self, max_sentences=4):
+        rng = self.rng
+        lines = [' '.join(rng.sample(_sentences, rng.randint(1, 3)))
+                 for _ in range(rng.randint(1, max_sentences))]
+        return '\n'.join(lines)
+
+    def _price(self, low, high):
+        return round(self.rng.uniform(low, high), 2)
+
+    def _producers(self):
+        rng = self.rng
+        producers = []
+        names = set()
+        while len(producers) < base_producer_count * self.scale:
+            name = f'{rng.choice(_producer_words)} {rng.choice(_family_names)}'
+            if name in names:
+                name = f'{name} {len(producers)}'
+            names.add(name)
+            year = rng.random()
+            year_established = (str(rng.randint(1700, 2015)) if year < 0.6 else
+                                f'{rng.randint(180, 201)}0s' if year < 0.75 else
+                                '')
+            producers.append({'ProducerName': name,
+                              'ProducerCode': f'{name[:1]}{rng.choice(_family_names)[:2]}'.upper(),
+                              'YearEstablished': year_established,
+                              'ProducerDescription': self._multiline_text(),
+                              'Exporter': rng.choice(('Boillot Export', 'Vins de France', '', 'Direct')),
+                              'Country': rng.choice(self.countries)})
+        return producers
+
+    def write_wine_master(self, path):
+        """
+        Write the legacy wine master csv file, several vintages of several wines of each producer
+        """
+        rng = self.rng
+        writer = _Writer(path, load_data_fields(CHW_SQL._legacy_wine_master_load_data_sql_fmt))
+        producers = self._producers()
+        wine_id = 1000
+        case_unit_weights = [w for _, _, w in _case_units]
+
+        while wine_id - 1000 < base_wine_count * self.scale:
+            producer = rng.choice(producers)
+            cuvee = rng.choice(_cuvee_words)
+            color = rng.choice(self.colors)
+            wine_type = rng.choices(self.wine_types, weights=(85, 12, 3))[0]
+            bottle_size, bottles_per_case, _ = rng.choices(_case_units, weights=case_unit_weights)[0]
+            region = rng.choice(self.regions + [''])
+            first_vintage = rng.randint(2005, 2023)
+            vintages = (['NV'] if wine_type == 'Sparkling' and rng.random() < 0.7 else
+                        [str(v) for v in range(first_vintage, min(first_vintage + rng.randint(1, 6), 2025))])
+            base_fob = self._price(60, 600)
+
+            for vintage in vintages:
+                last_updated = datetime(2024, 1, 1) + timedelta(minutes=rng.randint(0, 60 * 24 * 700))
+                fob = round(base_fob * rng.uniform(0.9, 1.15), 2)
+                ny_wholesale = round(fob * 1.35, 2)
+                nj_wholesale = round(fob * 1.33, 2)
+                wine_name = f'{cuvee}' if rng.random() < 0.9 else None
+                full_name = f'{producer["ProducerName"]} {cuvee} {vintage}'
+                if bottle_size != '750ml':
+                    full_name += f' {bottle_size}'
+                purchased = rng.random() < 0.8
+
+                writer.write({
+                    'WineId': wine_id,
+                    'NYPPItemNo': f'NY{wine_id:06d}',
+                    'AccountingItemNo': f'{producer["ProducerCode"]}{wine_id % 100000:05d}',
+                    'WesternItemNo': f'W{wine_id}' if rng.random() < 0.5 else '',
+                    'COLA_TTB_ID': f'{rng.randint(10**13, 10**14 - 1)}' if rng.random() < 0.8 else '',
+                    'Color': color,
+                    'ProducerName': producer['ProducerName'],
+                    'FullName': full_name,
+                    'Vintage': vintage,
+                    'CertifiedOrganic': 'certified organic' if rng.random() < 0.2 else '',
+                    'SoldOut': '1' if rng.random() < 0.15 else '',
+                    'Country': producer['Country'],
+                    'Region': region,
+                    'Subregion': rng.choice(self.subregions) if rng.random() < 0.4 else '',
+                    'Appellation': rng.choice(self.appellations) if rng.random() < 0.9 else '',
+                    'Varietals': ', '.join(rng.sample(_varietals, rng.randint(1, 3))),
+                    'BottleSize': bottle_size,
+                    'BottlesPerCase': bottles_per_case,
+                    'ShelfTalkerText': self._multiline_text(2) if rng.random() < 0.3 else '',
+                    'PriceListNotes': 'Limited' if rng.random() < 0.1 else '',
+                    'TastingNotes': self._multiline_text(),
+                    'ProducerDescription': producer['ProducerDescription'],
+                    'StillSparklingFortified': wine_type,
+                    'PriceListSection': (f'{producer["Country"]} - {region}' if region
+                                         else producer['Country']),
+                    'FOBPrice': fob if rng.random() < 0.95 else '',
+                    'Excluded': '1' if rng.random() < 0.05 else '',
+                    'Vinification': self._multiline_text(3),
+                    'TerroirVineyardPractices': self._multiline_text(3),
+                    'PressParagraph': self._multiline_text(6) if rng.random() < 0.5 else '',
+                    'CREATED': (last_updated - timedelta(days=rng.randint(0, 900))).date()
+                               if rng.random() < 0.9 else '',
+                    'LASTUPDATED': last_updated,
+                    'YearEstablished': producer['YearEstablished'],
+                    'ABV': rng.choice((12, 12.5, 13, 13.5, 14, 14.5, '')),
+                    'BottleColor': rng.choice(('Green', 'Brown', 'Clear', '')),
+                    'UPC': f'{rng.randint(10**11, 10**12 - 1)}' if rng.random() < 0.7 else '',
+                    'ProducerCode': producer['ProducerCode'],
+                    'NY_MultiCaseQty1': 3, 'NY_MultiCasePrice1': round(ny_wholesale * 0.95, 2),
+                    'NY_MultiCaseQty2': 5, 'NY_MultiCasePrice2': round(ny_wholesale * 0.92, 2),
+                    'NY_MultiCaseQty3': 10 if rng.random() < 0.5 else '',
+                    'NY_MultiCasePrice3': round(ny_wholesale * 0.9, 2),
+                    'NJ_MultiCaseQty1': 3, 'NJ_MultiCasePrice1': round(nj_wholesale * 0.95, 2),
+                    'NJ_MultiCaseQty2': 5 if rng.random() < 0.7 else '',
+                    'NJ_MultiCasePrice2': round(nj_wholesale * 0.92, 2),
+                    'NY_Wholesale': ny_wholesale,
+                    'NJ_Wholesale': nj_wholesale,
+                    'FOB_ARB': round(fob * 0.9, 2) if rng.random() < 0.3 else '',
+                    'FOB_MA': round(fob * 1.05, 2) if rng.random() < 0.4 else '',
+                    'CaseUnitType': 'Bottle',
+                    'Exporter': producer['Exporter'],
+                    'LastPurchasePrice_PO': round(fob * 0.55, 2) if purchased else '',
+                    'LastPurchaseDate_PO': ((last_updated - timedelta(days=rng.randint(0, 200))).date()
+                                            if purchased else ''),
+                    'TariffDiscount': rng.choice(('', 0, 5, 10, 15)),
+                    'WineName': wine_name,
+                    'Available': '1' if rng.random() < 0.85 else '',
+                    'Active': '1' if rng.random() < 0.9 else '',
+                    'WineCode': f'{producer["ProducerCode"]}{rng.randint(10, 99)}',
+                    'PurchaseType': rng.choice(('PO', 'AE', '')),
+                    'LPP_Change': '1' if rng.random() < 0.05 else '',
+                    'FOB_Change': '1' if rng.random() < 0.05 else '',
+                    'PricingNeedsReview': '1' if rng.random() < 0.03 else '',
+                })
+                self.wines.append({'WineId': wine_id, 'FullName': full_name, 'WineName': wine_name or cuvee,
+                                   'ProducerName': producer['ProducerName'], 'Vintage': vintage,
+                                   'Price': round(ny_wholesale / bottles_per_case * 1.5, 2)})
+                wine_id += 1
+
+        writer.close()
+
+    def _customers(self):
+        rng = self.rng
+        customers = []
+        # Make sure the top customers report has customers to report on
+        top_emails = [e.strip() for e in CHW_SQL._top_customers_emails]
+        names = set()
+        for i in range(base_customer_count * self.scale):
+            # each unique fullname is a customer, so make the given name + surname unique
+            given_name, surname = rng.choice(_given_names), rng.choice(_surnames)
+            attempts = 0
+            while (given_name, surname) in names:
+                given_name = f'{given_name.split()[0]} {rng.choice(_initials)}.'
+                if (given_name, surname) in names:
+                    surname = f'{surname.split("-")[0]}-{rng.choice(_surnames)}'
+                attempts += 1
+                if attempts >= 10:
+                    # at large scales most of the random names are used, so use a (2 or more
+                    # letter) middle initial made from the customer number which is unique
+                    given_name = f'{given_name.split()[0]} {_unique_initials(i)}.'
+            names.add((given_name, surname))
+
+            name_kind = rng.random()
+            fullname = (f'{rng.choice(_titles)} {given_name} {surname}' if name_kind < 0.1 else
+                        f'{given_name} {surname} {rng.choice(_suffixes)}' if name_kind < 0.15 else
+                        f' {given_name} {surname}' if name_kind < 0.18 else
+                        f'{given_name}  {surname}\n' if name_kind < 0.19 else
+                        f'{given_name} {surname}')
+            local = f'{given_name[0]}{surname}{i}'.lower().replace(' ', '').replace("'", '')
+            email = top_emails[i] if i < len(top_emails) else f'{local}@{rng.choice(_email_domains)}'
+            city, state = rng.choice(_cities)
+            customers.append({'FullName': fullname,
+                              'LastName': surname,
+                              'Email': email,
+                              'AltEmail': f'{local}@work.example.com',
+                              'CompanyAptNo': (f'Apt {rng.randint(1, 40)}{rng.choice("ABCD")}'
+                                               if rng.random() < 0.3 else ''),
+                              'Street': f'{rng.randint(1, 9999)} {rng.choice(_street_names)} '
+                                        f'{rng.choice(_street_types)}',
+                              'City': city,
+                              'State': state,
+                              'Zip': (f'{rng.randint(1000, 99999):05d}'
+                                      + (f'-{rng.randint(0, 9999):04d}' if rng.random() < 0.2 else '')),
+                              'PhoneHome': self._phone() if rng.random() < 0.8 else '',
+                              'PhoneWork': self._phone() if rng.random() < 0.3 else '',
+                              'FaxNumber': self._phone() if rng.random() < 0.05 else '',
+                              'Retailer': rng.choice(_retailers),
+                              # A few customers order a lot, most order a few times
+                              'weight': min(rng.paretovariate(1.2), 100)})
+        return customers
+
+    def _phone(self):
+        rng = self.rng
+        area, exchange, number = rng.randint(201, 989), rng.randint(200, 999), rng.randint(0, 9999)
+        return rng.choice((f'({area}) {exchange}-{number:04d}',
+                           f'{area}-{exchange}-{number:04d}',
+                           f'{area}.{exchange}.{number:04d}',
+                           f'{area}{exchange}{number:04d}',
+                           f'1-{area}-{exchange}-{number:04d}',
+                           f'{area}-{exchange}-{number:04d} x{rng.randint(1, 999)}',
+                           f'{area} {exchange} {number:04d} (cell)'))
+
+    def _email1(self, customer):
+        rng = self.rng
+        kind = rng.random()
+        return (f'{customer["Email"]} {customer["AltEmail"]}' if kind < 0.05 else
+                f'{customer["Email"]}, {customer["AltEmail"]}' if kind < 0.07 else
+                f'{customer["Email"]} (home)' if kind < 0.09 else
+                customer['Email'])
+
+    def _order_item(self):
+        """
+        Return a free text item, its vintage and the quantity ordered
+        """
+        rng = self.rng
+        wine = rng.choice(self.wines)
+        kind = rng.random()
+        item = (wine['FullName'] if kind < 0.4 else
+                f'{wine["ProducerName"]} {wine["WineName"]}' if kind < 0.7 else
+                wine['WineName'] if kind < 0.85 else
+                f'{wine["ProducerName"].split()[-1]} {wine["WineName"]}'.lower())
+        vintage = wine['Vintage'] if rng.random() < 0.95 else rng.choice(('', 'NV', "'19", 'mixed'))
+        quantity = rng.choice(('1', '2', '3', '6', '12', '1 cs', '2 cases', '6 btls', '1 case'))
+        return item, vintage, quantity, wine['Price']
+
+    def write_email_orders(self, path):
+        """
+        Write the legacy email orders csv file, orders are distributed over the customers
+        with a long tailed distribution so a few customers have hundreds of orders.
+        """
+        rng = self.rng
+        if len(self.wines) == 0:
+            raise ValueError('The wine master must be generated before the email orders')
+
+        writer = _Writer(path, load_data_fields(CHW_SQL._legacy_email_orders_load_data_sql_fmt))
+        customers = self._customers()
+        weights = [c['weight'] for c in customers]
+        order_count = base_order_count * self.scale
+        # Every customer has at least one order
+        order_customers = customers + rng.choices(customers, weights=weights, k=order_count - len(customers))
+        start_date = date(2003, 1, 1)
+        days = (date(2026, 2, 19) - start_date).days
+
+        for order_id, customer in enumerate(order_customers, start=1):
+            order = {'EmailOrderId': order_id,
+                     'OrderNumber': f'{rng.randint(10000, 99999)}' if rng.random() < 0.9 else '',
+                     'FirstDate': start_date + timedelta(days=rng.randint(0, days)),
+                     'Email': customer['Email'],
+                     'Email1': self._email1(customer),
+                     'Source': rng.choice(_sources),
+                     'SubPaid': rng.choice(('', 'Paid', 'Sub')),
+                     'CCVisa': ('XXXX-XXXX-XXXX-' + f'{rng.randint(0, 9999):04d}' if rng.random() < 0.4
+                                else ''),
+                     'CCAmex': 'XXXX-XXXXXX-' + f'{rng.randint(0, 99999):05d}' if rng.random() < 0.2 else '',
+                     'CCMastercard': 'XXXX-XXXX-XXXX-' + f'{rng.randint(0, 9999):04d}'
+                                     if rng.random() < 0.3 else '',
+                     'CC_ID': '',
+                     'Retailer': customer['Retailer'] if rng.random() < 0.9 else rng.choice(_retailers),
+                     'CustDetails': self._multiline_text(2) if rng.random() < 0.2 else ''}
+            for field in ('FullName', 'LastName', 'CompanyAptNo', 'Street', 'City', 'State', 'Zip',
+                          'PhoneHome', 'PhoneWork', 'FaxNumber'):
+                order[field] = customer[field]
+
+            # the messy cases
+            if rng.random() < 0.014:
+                order['FullName'] = ''
+            if rng.random() < 0.01:
+                order['FirstDate'] = rng.choice(('', '1/2/03'))
+
+            subtotal = 0
+            item_fields = (('Quantity', 'DelItems', 'Vintage'),
+                           ('Quant2', 'DelItem2', 'Vintage2'),
+                           ('Quant3', 'DelItem3', 'Vintage3'),
+                           ('Quant4', 'DelItem4', 'Vintage4'),
+                           ('Quant5', 'DelItem5', 'Vintage5'))
+            for n, (quantity_field, item_field, vintage_field) in enumerate(item_fields):
+                if n > 0 and rng.random() < 0.55:
+                    break
+                item, vintage, quantity, price = self._order_item()
+                order[item_field], order[vintage_field], order[quantity_field] = item, vintage, quantity
+                subtotal += price * int(re.match(r'\d+', quantity)[0])
+
+            if rng.random() < 0.7:
+                order['Subtotal'] = round(subtotal, 2)
+                order['AdditionalCharges'] = rng.choice(('', 'Shipping $25', 'S&H 35.00', 'Delivery'))
+            else:
+                order['TotalRetailCharge'] = f'${subtotal:.2f} + shipping'
+
+            writer.write(order)
+
+        writer.close()
+
+
+def generate(outdir, *, scale=1, seed=default_seed):
+    """
+    Generate the synthetic legacy csv files at the given scale into outdir
+    """
+    return SyntheticData(scale=scale, seed=seed).write_files(outdir)
+
+
+def _test():
+    pass
+
+
+if __name__ == '__main__':
+    _test()
@@ -0,0 +1,66 @@
+"""
+################################################################################
+  chwcommands.change_feed.py
+################################################################################
+
+This module defines the chw-action (main.py) click commands for the change
+feed actions in chwdata.change_feed.
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+
+# Third party imports
+import click
+
+# Local application imports
+from chwdata.change_feed import ChangeFeed, default_batch_size, default_lag, do_read_change_feed, feed_tables
+
+
+@click.command()
+@click.option('--consumer', default='export', show_default=True,
+              help=f'Name of the downstream consumer whose watermark is read and advanced'
+                   f' (at most {ChangeFeed.MAX_CONSUMER_LEN} characters)')
+@click.option('--batch-size', type=click.IntRange(min=1), default=default_batch_size, show_default=True,
+              help='Max number of rows read per batch, the watermark is saved after each batch')
+@click.option('--max-batches', type=click.IntRange(min=1), default=None,
+              help='Max number of batches to read  [default: all the changes]')
+@click.option('--lag', 'lag_secs', type=click.IntRange(min=0), default=int(default_lag.total_seconds()),
+              show_default=True,
+              help='Seconds of the most recent changes not to read yet, longer than the longest transaction'
+                   ' writing the table (0 may skip rows still being committed)')
+@click.option('--peek', is_flag=True, default=False,
+              help="Read the changes w/o advancing the consumer's watermark")
+@click.option('--reset', is_flag=True, default=False,
+              help="Remove the consumer's watermark first, to read the table from the beginning")
+@click.option('--out', 'out_path', type=click.Path(dir_okay=False), default=None,
+              help='File to append the changed rows to  [default: stdout]')
+@click.argument('table', type=click.Choice(tuple(feed_tables)))
+def change_feed(consumer, batch_size, max_batches, lag_secs, peek, reset, out_path, table):
+    """
+    Write the rows of TABLE changed since the consumer last read it as JSON lines
+
+    \b
+    The rows are read in (LastModified, key) order from the consumer's watermark,
+    a batch at a time, e.g.
+      change-feed --consumer price-list Wines
+    The summary is written to stderr, so the rows can be piped to the consumer.
+    """
+    do_read_change_feed(table, consumer, batch_size=batch_size, max_batches=max_batches, lag_secs=lag_secs,
+                        peek=peek, reset=reset, out_path=out_path)
+
+
+def _test():
+    pass
+
+
+if __name__ == '__main__':
+    _test()
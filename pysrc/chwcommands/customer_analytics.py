@@ -0,0 +1,47 @@
+"""
+################################################################################
+  chwcommands.customer_analytics.py
+################################################################################
+
+This module defines the chw-action (main.py) click commands for the customer
+analytics actions in chwdata.customer_analytics.
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+
+# Third party imports
+import click
+
+# Local application imports
+from chwdata.customer_analytics import do_compute_customer_summaries
+
+
+@click.command()
+@click.option('--as-of', type=click.DateTime(formats=('%Y-%m-%d',)), default=None,
+              help='Date the recency is measured to (YYYY-MM-DD)  [default: today]')
+def compute_customer_summaries(as_of):
+    """
+    Compute the RFM and lifetime value of every customer (EmailCustomerSummaries table)
+
+    \b
+    Run after the orders are migrated. All of the summaries are replaced, and
+    the number of customers and their value in each RFM segment is reported.
+    """
+    do_compute_customer_summaries(as_of.date() if as_of is not None else None)
+
+
+def _test():
+    pass
+
+
+if __name__ == '__main__':
+    _test()
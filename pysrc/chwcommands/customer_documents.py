@@ -0,0 +1,78 @@
+"""
+################################################################################
+  chwcommands.customer_documents.py
+################################################################################
+
+This module defines the chw-action (main.py) click commands which build the
+customer documents (one JSON document per email customer w/ their orders) and
+look up a customer's document (see chwdata.customer_documents).
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+
+# Third party imports
+import click
+
+# Local application imports
+from chwdata.customer_documents import (do_build_customer_documents,
+                                        do_customer_document,
+                                        document_stores)
+
+
+_store_option = click.option('--store', type=click.Choice(tuple(document_stores)), default='sqlite',
+                             envvar='CHW_DOCUMENT_STORE', show_default=True,
+                             help='Document store, sqlite is a local file in data/documents/,'
+                                  ' mongo is the chw-mongo container')
+_location_option = click.option('--location', default=None,
+                                help='Path of the sqlite store file or uri of the mongo server'
+                                     '  [default: data/documents/customer_documents.sqlite3'
+                                     ' or mongodb://127.0.0.1:27017]')
+
+
+@click.command()
+@_store_option
+@_location_option
+@click.option('--rebuild', is_flag=True, default=False,
+              help='Rebuild all of the documents rather than only those of the changed customers')
+def build_customer_documents(store, location, rebuild):
+    """
+    Build the customer documents (each customer w/ their orders) in the document store
+
+    \b
+    Run after the orders are migrated. Only the documents of the customers
+    whose customer, order, order item or address rows have changed since the
+    last build are rebuilt, and the documents of deleted customers are removed.
+    The mongo store requires pymongo (pip install pymongo).
+    """
+    do_build_customer_documents(store=store, location=location, rebuild=rebuild)
+
+
+@click.command()
+@click.option('--id', 'customer_id', type=int, default=None, help='EmailCustomerId of the customer')
+@click.option('--email', default=None, help='Email of the customer(s)')
+@_store_option
+@_location_option
+def customer_document(customer_id, email, store, location):
+    """
+    Print the document of a customer w/ their orders from the document store
+    """
+    if (customer_id is None) == (email is None):
+        raise click.UsageError('Specify one of --id or --email')
+    do_customer_document(customer_id=customer_id, email=email, store=store, location=location)
+
+
+def _test():
+    pass
+
+
+if __name__ == '__main__':
+    _test()
@@ -0,0 +1,90 @@
+"""
+################################################################################
+  chwcommands.lazy_group.py
+################################################################################
+
+This module provides a click Group whose subcommands are imported only when
+they are invoked.
+
+Listing the commands (e.g. for --help) uses the short help given when the
+command was registered so that doesn't import the commands either.
+
+main.py's chw-action group is a LazyGroup, so the chwcommands modules, and the
+chwdata modules they import, are loaded only when one of their commands is
+invoked rather than just to start the cli.
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+import importlib
+
+# Third party imports
+import click
+
+# Local application imports
+
+
+class LazyGroup(click.Group):
+    """
+    A click Group w/ lazily loaded subcommands.
+
+    lazy_subcommands maps a command name to a tuple of the import path of the
+    click command ('package.module.command_object') and its short help, e.g.
+        {'import-legacy-customers': ('chwcommands.retail_orders.import_legacy_customers',
+                                     'Create email customers from the legacy orders table')}
+    """
+
+    def __init__(self, *args, lazy_subcommands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = lazy_subcommands or {}
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_subcommands))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_subcommands and cmd_name not in self.commands:
+            self.add_command(self._load_command(cmd_name), cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def format_commands(self, ctx, formatter):
+        """
+        Write the command names and short help w/o loading the lazy commands
+        """
+        rows = []
+        for cmd_name in self.list_commands(ctx):
+            if cmd_name in self.commands:
+                cmd = self.commands[cmd_name]
+                if cmd.hidden:
+                    continue
+                short_help = cmd.get_short_help_str(formatter.width)
+            else:
+                short_help = self.lazy_subcommands[cmd_name][1]
+            rows.append((cmd_name, short_help))
+
+        if rows:
+            with formatter.section('Commands'):
+                formatter.write_dl(rows)
+
+    def _load_command(self, cmd_name):
+        import_path = self.lazy_subcommands[cmd_name][0]
+        module_name, cmd_object_name = import_path.rsplit('.', 1)
+        cmd_object = getattr(importlib.import_module(module_name), cmd_object_name)
+        if not isinstance(cmd_object, click.Command):
+            raise ValueError(f'Lazy loading of {import_path} failed, it is not a click Command')
+        return cmd_object
+
+
+def _test():
+    pass
+
+
+if __name__ == '__main__':
+    _test()
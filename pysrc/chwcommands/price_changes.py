@@ -0,0 +1,54 @@
+"""
+################################################################################
+  chwcommands.price_changes.py
+################################################################################
+
+This module defines the chw-action (main.py) click commands for the price
+change actions in chwdata.price_changes.
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+
+# Third party imports
+import click
+
+# Local application imports
+from chwdata.price_changes import do_detect_price_changes
+
+
+@click.command()
+@click.option('--update-flags/--no-update-flags', default=True, show_default=True,
+              help='Set the LPP_Change, FOB_Change and PricingNeedsReview flags of the NEW_SUFFIX snapshot')
+@click.option('--top', type=int, default=50, show_default=True,
+              help='Number of changed wines to list')
+@click.argument('old_suffix')
+@click.argument('new_suffix')
+def detect_price_changes(update_flags, top, old_suffix, new_suffix):
+    """
+    Compare the prices and costs of 2 legacy wine master snapshots and set the change flags
+
+    \b
+    The snapshots are the LegacyWineMaster tables w/ the suffixes, e.g.
+      detect-price-changes _0729 _1218
+    The FOB, wholesale, multi-case and last purchase prices of every wine are
+    compared in one join of the 2 tables. The wines whose price change flags
+    differ from the changes are updated in the NEW_SUFFIX table.
+    """
+    do_detect_price_changes(old_suffix, new_suffix, update_flags=update_flags, top=top)
+
+
+def _test():
+    pass
+
+
+if __name__ == '__main__':
+    _test()
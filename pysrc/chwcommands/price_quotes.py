@@ -0,0 +1,58 @@
+"""
+################################################################################
+  chwcommands.price_quotes.py
+################################################################################
+
+This module defines the chw-action (main.py) click commands for the price
+quote actions in chwdata.price_quotes.
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+
+# Third party imports
+import click
+
+# Local application imports
+from chwdata.price_quotes import do_quote_orders, price_lists
+
+
+@click.command()
+@click.option('--price-list', type=click.Choice(price_lists), default='NY', show_default=True,
+              help='Price list to quote from, the NY and NJ lists have multi-case prices')
+@click.option('--lines', 'show_lines', is_flag=True, default=False,
+              help='Also list the quote of every order line')
+@click.option('--top', type=int, default=20, show_default=True,
+              help='Number of order totals to list')
+@click.option('--as-of', type=click.DateTime(formats=('%Y-%m-%d',)), default=None,
+              help=('Quote the prices as of this date (YYYY-MM-DD) from the price history'
+                    '  [default: current prices]'))
+@click.argument('csv_file', type=click.Path(exists=True, dir_okay=False), required=False)
+def quote_orders(price_list, show_lines, top, as_of, csv_file):
+    """
+    Quote the prices of order lines (from CSV_FILE or the migrated orders) from a price list
+
+    \b
+    CSV_FILE has the header: order,wine_id,cases,units (units is optional),
+    w/o it all of the lines of the migrated orders (Orders_Wines) are quoted.
+    All lines are priced from one load of WinePricing, lines of wines which
+    are sold out, unavailable or w/o a price are listed w/ a 0 total.
+    """
+    do_quote_orders(csv_file, price_list=price_list, show_lines=show_lines, top=top,
+                    as_of=as_of.date() if as_of is not None else None)
+
+
+def _test():
+    pass
+
+
+if __name__ == '__main__':
+    _test()
@@ -0,0 +1,61 @@
+"""
+################################################################################
+  chwcommands.query_plans.py
+################################################################################
+
+This module defines the chw-action (main.py) click command which checks the
+query plans of the statements run by the chw-action commands and suggests
+indexes for them (see chwdata.query_plans).
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+
+# Third party imports
+import click
+
+# Local application imports
+from chwdata.query_plans import do_query_plans, statement_stages
+
+
+@click.command()
+@click.option('--stage', 'stages', type=click.Choice(statement_stages), multiple=True,
+              help='Only check the statements run by this chw-action command, may be repeated')
+@click.option('--suggest', is_flag=True, default=False,
+              help='Suggest indexes for the statements which scan or sort a table w/o index support')
+@click.option('--create-indexes', 'create', is_flag=True, default=False,
+              help='Create the suggested indexes')
+@click.option('--analyze', is_flag=True, default=False,
+              help='Update the index statistics of the tables before reading the plans')
+@click.option('--save', type=click.Path(dir_okay=False), default=None,
+              help='Save the plans to this plan snapshot (JSON) file')
+@click.option('--baseline', type=click.Path(exists=True, dir_okay=False), default=None,
+              help='Compare the plans to this plan snapshot, exiting with status 1 if any now scan a table')
+def query_plans(stages, suggest, create, analyze, save, baseline):
+    """
+    Check the query plans of the chw-action statements and suggest indexes
+
+    \b
+    The plan of each of the statements the chw-action commands run is read
+    w/ EXPLAIN (EXPLAIN QUERY PLAN for sqlite) and the tables each scans
+    w/o an index are flagged. Run it against a loaded database. See also
+    the chw-action --temp-indexes option.
+    """
+    do_query_plans(stages=stages, suggest=suggest, create=create, analyze=analyze,
+                   save=save, baseline=baseline)
+
+
+def _test():
+    pass
+
+
+if __name__ == '__main__':
+    _test()
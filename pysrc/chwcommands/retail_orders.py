@@ -0,0 +1,152 @@
+"""
+################################################################################
+  chwcommands.retail_orders.py
+################################################################################
+
+This module defines the chw-action (main.py) click commands for the retail order and customer
+actions in chwdata.retail_orders.
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+
+# Third party imports
+import click
+
+# Local application imports
+from chwdata.retail_orders import (do_load_legacy_email_orders_from_csv,
+                                   do_create_customers_from_legacy,
+                                   do_match_legacy_order_items_to_wines,
+                                   do_create_orders_from_legacy,
+                                   do_import_addresses_from_legacy,
+                                   do_write_order_analytics,
+                                   do_write_top_customer_order_report)
+
+
+@click.command()
+def load_legacy_email_orders_from_csv():
+    """
+    Load the LegacyEmailOrders table from the csv file in the data/infile dir
+
+    \b
+    Note that currently the datadir, csvfile and table suffix are hardcoded
+    so if they have changed the supporting function must be updated.
+    """
+    do_load_legacy_email_orders_from_csv()
+
+
+@click.command()
+@click.option('--user', '-u', type=click.Choice(['Gillian', 'Mike']), default='Gillian',
+              required=False, help='User name for CreatedBy and LastModifiedBy fields')
+@click.option('--commit-every', type=click.IntRange(min=1), default=None,
+              help='Number of customers to create per transaction  [default: 500]')
+def import_legacy_customers(user, commit_every):
+    """
+    Create email customers from the legacy customer orders table
+
+    \b
+    options:
+    user    - user name for CreatedBy and LastModifiedBy fields. Default: Gillian
+
+    The customers are committed in batches and the customers which were already
+    created are skipped, so it resumes after a lost connection or when rerun.
+    """
+    do_create_customers_from_legacy(user=user, commit_every=commit_every)
+
+
+@click.command()
+def match_legacy_order_items():
+    """
+    Match the legacy email order items to wines (Wines_LegacyEmailOrders table)
+
+    \b
+    The wines must have already been created from the legacy wine master.
+    All of the existing matches are replaced, so this can be rerun whenever
+    the legacy orders or the wines are reloaded.
+    """
+    do_match_legacy_order_items_to_wines()
+
+
+@click.command()
+def create_orders_from_legacy():
+    """
+    Create Orders and Orders_Wines records from the legacy email orders
+
+    \b
+    The customers must have already been imported and the order items
+    matched to wines. Orders which were already created are skipped, so
+    this can be rerun after more legacy orders have been loaded.
+    """
+    do_create_orders_from_legacy()
+
+
+@click.command()
+def import_legacy_addresses():
+    """
+    Create the customer shipping Addresses from the legacy email orders
+
+    \b
+    The addresses are normalized and deduplicated, linked to their customers
+    (EmailCustomers_ShippingAddresses) and, if the orders have been created,
+    set as the orders' AddressId. The customers must have already been imported.
+    """
+    do_import_addresses_from_legacy()
+
+
+@click.command()
+def write_top_customer_order_report():
+    """
+    Write out the top customer order item report (to stdout)
+    """
+    do_write_top_customer_order_report()
+
+
+@click.command()
+@click.option('--group-by', 'key', type=click.Choice(('customer', 'retailer', 'state', 'year', 'month',
+                                                      'item', 'vintage')),
+              default='customer', show_default=True, help='The key to group the orders (or items) by')
+@click.option('--value', type=click.Choice(('orders', 'subtotal', 'items', 'bottles')), default=None,
+              help='The value to total for each group  [default: orders, items for item and vintage]')
+@click.option('--top', type=click.IntRange(min=1), default=10, show_default=True,
+              help='Number of groups to list')
+@click.option('--start', type=click.DateTime(formats=('%Y-%m-%d',)), default=None,
+              help='Only the orders on or after this date (YYYY-MM-DD)')
+@click.option('--end', type=click.DateTime(formats=('%Y-%m-%d',)), default=None,
+              help='Only the orders on or before this date (YYYY-MM-DD)')
+@click.option('--retailer', default=None, help='Only the orders of this retailer')
+@click.option('--state', default=None, help='Only the orders shipped to this state')
+@click.option('--item', default=None, help='Only the orders w/ this item')
+@click.option('--memory', 'show_memory', is_flag=True, default=False,
+              help='Compare the memory used by the order columns to tuple rows')
+def order_analytics(key, value, top, start, end, retailer, state, item, show_memory):
+    """
+    List the top customers, retailers, items, etc. of the legacy email orders
+
+    \b
+    The analytic columns of the legacy orders are loaded into compact in-memory
+    columns (dictionary encoded strings and typed arrays) which are filtered and
+    grouped w/o further database queries.
+    """
+    if value is None:
+        value = 'items' if key in ('item', 'vintage') else 'orders'
+    do_write_order_analytics(key, value=value, top=top,
+                             start=start.date() if start is not None else None,
+                             end=end.date() if end is not None else None,
+                             retailer=retailer, state=state.upper() if state is not None else None,
+                             item=item, show_memory=show_memory)
+
+
+def _test():
+    pass
+
+
+if __name__ == '__main__':
+    _test()
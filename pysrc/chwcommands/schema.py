@@ -0,0 +1,56 @@
+"""
+################################################################################
+  chwcommands.schema.py
+################################################################################
+
+This module defines the chw-action (main.py) click command which creates the
+schema of a new chw database in phases (see chwdata.schema).
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+
+# Third party imports
+import click
+
+# Local application imports
+from chwdata.schema import do_apply_schema, schema_phases
+
+
+@click.command()
+@click.option('--phase', 'phases', type=click.Choice(schema_phases), multiple=True,
+              help=f'Phase to apply, may be repeated  [default: {", ".join(schema_phases)}]')
+@click.option('--snapshot', default=None,
+              help='Load the data by restoring this snapshot after the tables are created')
+@click.option('--load-legacy-csv', is_flag=True, default=False,
+              help='Load the legacy wine master and email orders csv files after the tables are created')
+@click.option('--show-sql', is_flag=True, default=False,
+              help='Print the DDL statements of the phases instead of applying them')
+def apply_schema(phases, snapshot, load_legacy_csv, show_sql):
+    """
+    Create the chw schema in phases: tables, data load, indexes and foreign keys
+
+    \b
+    The tables are created from the DDL files w/o their secondary indexes and
+    foreign key constraints, the data is loaded (--snapshot, --load-legacy-csv),
+    and then the indexes and the constraints are created. The time each phase
+    takes is reported. The database must be empty.
+    """
+    do_apply_schema(phases=phases or schema_phases, snapshot=snapshot, load_legacy_csv=load_legacy_csv,
+                    show_sql=show_sql)
+
+
+def _test():
+    pass
+
+
+if __name__ == '__main__':
+    _test()
@@ -0,0 +1,162 @@
+"""
+################################################################################
+  chwcommands.session.py
+################################################################################
+
+This module defines the chw-action session command which runs a sequence of
+chw-action commands in one process.
+
+The commands are read one per line from a file or stdin (or interactively when
+stdin is a terminal), and all of the commands share the database connections
+(see chw_db.share_connections), so the interpreter startup, imports and the
+connect are paid once for the whole sequence. The time each command took is
+reported as it finishes, and a summary of them all at the end.
+
+e.g.
+    chw-action --backend=sqlite session <<EOF
+    load-legacy-wine-master-from-csv
+    setup-wine-lookup-tables
+    import-legacy-producers
+    # the order report is written to stdout
+    write-top-customer-order-report
+    EOF
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+import shlex
+import sys
+import time
+
+# Third party imports
+import click
+
+# Local application imports
+from chwdata import chw_db
+
+
+session_prompt = 'chw> '
+session_quit_commands = ('quit', 'exit')
+
+
+def _read_command_lines(infile, interactive):
+    """
+    Generate the command lines (w/o blank lines or # comments) from the input
+    """
+    while True:
+        if interactive:
+            try:
+                line = input(session_prompt)
+            except EOFError:
+                print()
+                return
+        else:
+            line = infile.readline()
+            if line == '':
+                return
+
+        line = line.strip()
+        if line == '' or line.startswith('#'):
+            continue
+        if line in session_quit_commands:
+            return
+        yield line
+
+
+def _run_command(cli, args, backend):
+    """
+    Run the chw-action cli w/ the given args in this process, returning an
+    error message if the command failed or None if it succeeded.
+    """
+    try:
+        # the session's backend is the default, it may be overridden by the command line
+        cli.main(['--backend', backend, *args], prog_name='chw-action', standalone_mode=False)
+    except click.ClickException as e:
+        e.show()
+        return e.format_message()
+    except click.Abort:
+        return 'Aborted'
+    except SystemExit as e:
+        if e.code in (None, 0):
+            return None
+        return f'exited with status {e.code}'
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        print(f'{type(e).__name__}: {e}', file=sys.stderr)
+        return f'{type(e).__name__}: {e}'
+    return None
+
+
+@click.command()
+@click.option('--stop-on-error/--continue-on-error', default=True, show_default=True,
+              help='Stop running commands after a command fails')
+@click.argument('command_file', type=click.File('r'), default='-')
+@click.pass_context
+def session(ctx, stop_on_error, command_file):
+    """
+    Run chw-action commands read from COMMAND_FILE (or stdin) in one process
+
+    \b
+    Each line is a chw-action command line (w/o the chw-action), e.g.
+        --profile import-legacy-customers --user Mike
+    blank lines and lines starting with # are skipped and quit or exit ends the
+    session. When stdin is a terminal the commands are prompted for.
+    The database connections are shared by all of the commands and the time
+    each command takes is reported.
+    """
+    root_ctx = ctx.find_root()
+    cli = root_ctx.command
+    backend = root_ctx.params['backend']
+    interactive = command_file is sys.stdin and sys.stdin.isatty()
+
+    chw_db.share_connections()
+    timings = []
+    session_start = time.perf_counter()
+    try:
+        for line in _read_command_lines(command_file, interactive):
+            try:
+                args = shlex.split(line)
+            except ValueError as e:
+                print(f'Invalid command line: {e}', file=sys.stderr)
+                continue
+            if args[0] == ctx.info_name:
+                print('A session can not be started from a session', file=sys.stderr)
+                continue
+
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            error = _run_command(cli, args, backend)
+            wall_secs, cpu_secs = time.perf_counter() - wall_start, time.process_time() - cpu_start
+            timings.append((line, wall_secs, cpu_secs, error))
+            print(f'[session] {line}: {wall_secs:.3f} secs ({cpu_secs:.3f} cpu secs)'
+                  + (f' FAILED {error}' if error else ''), file=sys.stderr)
+
+            if error:
+                chw_db.rollback_shared_connections()
+                if stop_on_error and not interactive:
+                    break
+    finally:
+        chw_db.close_shared_connections()
+
+    print(f'[session] {len(timings)} command(s) in {time.perf_counter() - session_start:.3f} secs',
+          file=sys.stderr)
+    for line, wall_secs, cpu_secs, error in timings:
+        print(f'    {wall_secs:9.3f} {cpu_secs:9.3f}  {line}' + ('  FAILED' if error else ''),
+              file=sys.stderr)
+
+    if any(error for *_, error in timings):
+        sys.exit(1)
+
+
+def _test():
+    pass
+
+
+if __name__ == '__main__':
+    _test()
@@ -0,0 +1,99 @@
+"""
+################################################################################
+  chwcommands.snapshots.py
+################################################################################
+
+This module defines the chw-action (main.py) click commands which export
+snapshots of the chw database for analytics (see chwdata.columnar_export), and
+which save and restore snapshots of the database (see chwdata.db_snapshots).
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+
+# Third party imports
+import click
+
+# Local application imports
+from chwdata.columnar_export import (do_export_snapshot,
+                                     export_formats,
+                                     export_compressions,
+                                     snapshot_tables)
+from chwdata.db_snapshots import do_create_snapshot, do_restore_snapshot
+
+
+@click.command()
+@click.option('--export-dir', type=click.Path(file_okay=False), default=None,
+              help='Directory to create the snapshot directory in  [default: data/export]')
+@click.option('--table', '-t', 'tables', multiple=True,
+              help=f'Table to export, may be repeated  [default: {", ".join(snapshot_tables)}]')
+@click.option('--format', 'fmt', type=click.Choice(tuple(export_formats)), default='parquet',
+              show_default=True, help='Columnar file format')
+@click.option('--compression', type=click.Choice(export_compressions), default='zstd',
+              show_default=True, help='Compression codec (use none to memory map arrow files)')
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=4, show_default=True,
+              help='Number of tables to export in parallel')
+def export_snapshot(export_dir, tables, fmt, compression, jobs):
+    """
+    Export the chw tables to columnar files for offline analytics
+
+    \b
+    Each table is written to a Parquet (or Arrow IPC) file in a new chw-<date>-<time>
+    directory w/ a manifest.json describing the tables. The tables are exported in
+    parallel, each streamed in batches so that no table is held in memory.
+    Requires pyarrow (pip install pyarrow).
+    """
+    do_export_snapshot(export_dir, tables=tables, fmt=fmt, compression=compression, jobs=jobs)
+
+
+@click.command()
+@click.argument('name', required=False)
+@click.option('--snapshot-dir', type=click.Path(file_okay=False), default=None,
+              help='Directory to save the snapshot in  [default: data/snapshots]')
+@click.option('--table', '-t', 'tables', multiple=True,
+              help='Table to save, may be repeated  [default: all of the tables]')
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=4, show_default=True,
+              help='Number of tables to save in parallel')
+def snapshot(name, snapshot_dir, tables, jobs):
+    """
+    Save a snapshot of the chw tables which can be restored w/ the restore command
+
+    \b
+    The snapshot is saved to a new NAME directory (default chw-<date>-<time>)
+    w/ an Arrow IPC file for each table. Requires pyarrow (pip install pyarrow).
+    """
+    do_create_snapshot(name, snapshot_dir=snapshot_dir, tables=tables, jobs=jobs)
+
+
+@click.command()
+@click.argument('snapshot_name')
+@click.option('--table', '-t', 'tables', multiple=True,
+              help='Table to restore, may be repeated  [default: all of the snapshot tables]')
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=4, show_default=True,
+              help='Number of tables to restore in parallel (sqlite restores 1 at a time)')
+def restore(snapshot_name, tables, jobs):
+    """
+    Replace the rows of the chw tables w/ the rows of a saved snapshot
+
+    \b
+    SNAPSHOT_NAME is the name of a snapshot in data/snapshots or the path of
+    a snapshot (or export-snapshot) directory. The indexes of each table are
+    rebuilt after its rows are loaded. Requires pyarrow (pip install pyarrow).
+    """
+    do_restore_snapshot(snapshot_name, tables=tables, jobs=jobs)
+
+
+def _test():
+    pass
+
+
+if __name__ == '__main__':
+    _test()
@@ -0,0 +1,169 @@
+"""
+################################################################################
+  chwcommands.wines.py
+################################################################################
+
+This module defines the chw-action (main.py) click commands for the wine
+actions in chwdata.wines.
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+
+# Third party imports
+import click
+
+# Local application imports
+from chwdata.wines import (do_load_legacy_wine_master_from_csv,
+                           do_setup_lookup_table_records,
+                           do_create_producers_from_legacy,
+                           do_create_wines_from_legacy,
+                           do_update_wine_families,
+                           do_write_family_wines,
+                           do_create_winepricing_from_legacy,
+                           do_create_winepurchases_from_legacy,
+                           do_update_price_history,
+                           do_write_wine_price_as_of)
+
+
+@click.command()
+def load_legacy_wine_master_from_csv():
+    """
+    Load the LegacyWineMaster table from the csv file in the data/infile dir
+
+    \b
+    Note that currently the datadir, csvfile and table suffix are hardcoded
+    so if they have changed the supporting function must be updated.
+    """
+    do_load_legacy_wine_master_from_csv()
+
+
+@click.command()
+def setup_wine_lookup_tables():
+    """
+    Insert the standard records into empty wine lookup tables
+
+    \b
+    - LookupWineColors
+    - LookupWineTypes
+    - LookupCaseUnits
+    - LookupWineCountries
+    - LookupWineRegions
+    - LookupWineSubregions
+    - LookupWineAppellations
+    """
+    do_setup_lookup_table_records()
+
+
+@click.command()
+@click.option('--commit-every', type=click.IntRange(min=1), default=None,
+              help='Number of producers to create per transaction  [default: 500]')
+def import_legacy_producers(commit_every):
+    """
+    Create producers from the legacy wine master table
+
+    The producers are committed in batches and the producers which were already
+    created are skipped, so it resumes after a lost connection or when rerun.
+    """
+    do_create_producers_from_legacy(commit_every=commit_every)
+
+
+@click.command()
+def create_wines_from_legacy():
+    """
+    Create records in the Wines table from the legacy wine master table
+
+    The producers must have already been imported, and the wine lookup
+    tables initialized. The wines are also grouped into wine families.
+    """
+    do_create_wines_from_legacy()
+
+
+@click.command()
+def update_wine_families():
+    """
+    Group the vintages and bottle sizes of each wine into wine families
+
+    \b
+    The families are created when the wines are created from the legacy
+    wine master, rerun this after the wines have changed. Only the new and
+    changed wines' families are written.
+    """
+    do_update_wine_families()
+
+
+@click.command()
+@click.argument('wine_id', type=int)
+def wine_family(wine_id):
+    """
+    List all the vintages and bottle sizes in the family of the wine WINE_ID
+    """
+    do_write_family_wines(wine_id)
+
+
+@click.command()
+def create_winepricing_from_legacy():
+    """
+    Create records in the WinePricing table from the legacy wine master table
+
+    \b
+    The snapshot's prices are also added to the WinePricingHistory.
+    """
+    do_create_winepricing_from_legacy()
+
+
+@click.command()
+def create_winepurchases_from_legacy():
+    """
+    Create records in the WinePurchases table from the legacy wine master table
+
+    \b
+    The snapshot's last purchases are also added to the WinePurchaseHistory.
+    """
+    do_create_winepurchases_from_legacy()
+
+
+@click.command()
+@click.option('--suffix', default=None,
+              help=('Suffix of the LegacyWineMaster snapshot table, e.g. _0729'
+                    '  [default: the migrated snapshot]'))
+@click.option('--effective-date', type=click.DateTime(formats=('%Y-%m-%d',)), default=None,
+              help=('Date the prices of the snapshot are valid from (YYYY-MM-DD)'
+                    '  [default: its last LastUpdated]'))
+def update_price_history(suffix, effective_date):
+    """
+    Add the prices and last purchases of a legacy wine master snapshot to the price history
+
+    \b
+    Only the wines whose prices or last purchase changed get a new version
+    in the WinePricingHistory and WinePurchaseHistory tables. Add the
+    snapshots in date order, older snapshots than a wine's latest version
+    are skipped.
+    """
+    do_update_price_history(suffix, effective_date.date() if effective_date is not None else None)
+
+
+@click.command()
+@click.argument('wine_id', type=int)
+@click.argument('as_of', type=click.DateTime(formats=('%Y-%m-%d',)))
+def wine_price_as_of(wine_id, as_of):
+    """
+    Print the prices and last purchase of the wine WINE_ID as of the date AS_OF (YYYY-MM-DD)
+    """
+    do_write_wine_price_as_of(wine_id, as_of.date())
+
+
+def _test():
+    pass
+
+
+if __name__ == '__main__':
+    _test()
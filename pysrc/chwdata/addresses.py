@@ -0,0 +1,173 @@
+"""
+################################################################################
+  chwdata.addresses.py
+################################################################################
+
+This module provides normalization of the freeform legacy order addresses so
+that the same address entered in different ways (e.g. "12 Main Street" and
+"12  MAIN ST.") is recognized as the same address.
+
+The AddressIndex holds the normalized addresses by a hash of their normalized
+form, so checking if an address has already been seen is a dictionary lookup.
+
+Python naming convention reminder note: single underscore prefix class names are
+for "private" internal use and should not be considered part of the public API.
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+import hashlib
+import re
+from collections import namedtuple
+
+# Third party imports
+
+# Local application imports
+
+
+# The columns of an Addresses record (w/o the AddressId)
+Address = namedtuple('Address', ['street', 'street2', 'city', 'state', 'postal_code'])
+
+# Standard (USPS) abbreviations of the words in street addresses
+street_abbreviations = {
+    'street': 'St', 'st': 'St', 'str': 'St',
+    'avenue': 'Ave', 'ave': 'Ave', 'av': 'Ave',
+    'road': 'Rd', 'rd': 'Rd',
+    'boulevard': 'Blvd', 'blvd': 'Blvd',
+    'drive': 'Dr', 'dr': 'Dr',
+    'lane': 'Ln', 'ln': 'Ln',
+    'place': 'Pl', 'pl': 'Pl',
+    'court': 'Ct', 'ct': 'Ct',
+    'terrace': 'Ter', 'ter': 'Ter',
+    'parkway': 'Pkwy', 'pkwy': 'Pkwy',
+    'highway': 'Hwy', 'hwy': 'Hwy',
+    'square': 'Sq', 'sq': 'Sq',
+    'circle': 'Cir', 'cir': 'Cir',
+    'apartment': 'Apt', 'apt': 'Apt',
+    'suite': 'Ste', 'ste': 'Ste',
+    'floor': 'Fl', 'fl': 'Fl',
+    'north': 'N', 'n': 'N',
+    'south': 'S', 's': 'S',
+    'east': 'E', 'e': 'E',
+    'west': 'W', 'w': 'W',
+}
+
+_re_whitespace = re.compile(r'\s+')
+_re_word = re.compile(r"[A-Za-z0-9'#-]+\.?|[^\sA-Za-z0-9]")
+_re_zip = re.compile(r'^(\d{4,5})(?:[\s-]*(\d{4}))?$')
+
+
+def _normalize_words(text, abbreviate):
+    """
+    Normalize the case and whitespace of the text, and optionally replace the
+    street words w/ their standard abbreviations
+    """
+    words = []
+    for word in _re_word.findall(_re_whitespace.sub(' ', text or '').strip()):
+        bare_word = word.rstrip('.').lower()
+        if abbreviate and bare_word in street_abbreviations:
+            words.append(street_abbreviations[bare_word])
+        elif word in (',', '.'):
+            continue
+        elif any(c.isdigit() for c in word):
+            words.append(word.upper())
+        else:
+            word = '-'.join(part.capitalize() for part in word.split('-'))
+            words.append(word.rstrip('.') if abbreviate else word)
+    return ' '.join(words)
+
+
+def normalize_postal_code(postal_code):
+    """
+    Normalize a US zip code to 5 digits or ZIP+4 (nnnnn-nnnn). The leading 0
+    lost by a spreadsheet is restored (e.g. 2134 -> 02134). Postal codes which
+    aren't zip codes just have their whitespace normalized.
+    """
+    postal_code = _re_whitespace.sub(' ', postal_code or '').strip()
+    m = _re_zip.match(postal_code)
+    if not m:
+        return postal_code.upper()
+    zip5 = m.group(1).zfill(5)
+    return f'{zip5}-{m.group(2)}' if m.group(2) else zip5
+
+
+def address_hash(address):
+    """
+    The hash of a normalized address, used to find duplicates.
+    Only the zip code's 1st 5 digits are used so that an address w/ and w/o
+    the ZIP+4 are the same address.
+    """
+    key = '|'.join((address.street, address.street2 or '', address.city, address.state,
+                    address.postal_code[:5])).lower()
+    return hashlib.blake2b(key.encode(), digest_size=16).digest()
+
+
+class AddressIndex:
+    """
+    Normalizes addresses and keeps the AddressId of each unique address by its hash
+
+    states is an iterable of (StatePostalAbbrev, StateFullName, StateStdAbbrev)
+    from the LookupUSStates table, used to normalize states to their postal abbreviation.
+    """
+
+    def __init__(self, states=()):
+        self._state_abbrevs = {}
+        for postal_abbrev, full_name, std_abbrev in states:
+            for name in (postal_abbrev, full_name, std_abbrev):
+                self._state_abbrevs[name.rstrip('.').lower()] = postal_abbrev
+        self._address_ids = {}
+        self._normalized = {}
+
+    def __len__(self):
+        return len(self._address_ids)
+
+    def normalize_state(self, state):
+        state = _re_whitespace.sub(' ', state or '').strip()
+        return self._state_abbrevs.get(state.rstrip('.').lower(), state.upper() if len(state) == 2 else state)
+
+    def normalize(self, street, street2, city, state, postal_code):
+        """
+        Normalize the address returning an Address, or None if there is no street.
+        The normalized addresses are cached as the same address is repeated on
+        all of a customer's orders.
+        """
+        raw = (street, street2, city, state, postal_code)
+        if raw not in self._normalized:
+            normalized_street = _normalize_words(street, abbreviate=True)
+            self._normalized[raw] = (None if normalized_street == '' else
+                                     Address(normalized_street,
+                                             _normalize_words(street2, abbreviate=True) or None,
+                                             _normalize_words(city, abbreviate=False),
+                                             self.normalize_state(state),
+                                             normalize_postal_code(postal_code)))
+        return self._normalized[raw]
+
+    def get(self, address):
+        """
+        Get the AddressId of the (normalized) address, None if it's not in the index
+        """
+        return self._address_ids.get(address_hash(address))
+
+    def add(self, address, address_id):
+        self._address_ids[address_hash(address)] = address_id
+
+
+def _test():
+    index = AddressIndex([('NY', 'New York', 'N.Y.'), ('MA', 'Massachusetts', 'Mass.')])
+    for raw in (('12  MAIN STREET', 'apt. 4b', 'new york', 'N.Y.', '1001'),
+                ('12 Main St.', 'Apt 4B', 'New York', 'ny', '01001-1234'),
+                ('350 Fifth avenue, suite 200', '', 'boston', 'Massachusetts', '02134 5678')):
+        address = index.normalize(*raw)
+        print(address, address_hash(address).hex())
+
+
+if __name__ == '__main__':
+    _test()
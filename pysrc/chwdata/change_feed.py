@@ -0,0 +1,233 @@
+"""
+################################################################################
+  chwdata.change_feed.py
+################################################################################
+
+This module provides a change feed of the tables w/ a LastModified column (Wines
+and EmailCustomers), so downstream consumers (e.g. an export, the LibreOffice
+Base front end or a price list generator) can read only the rows changed since
+they last read the table rather than re-reading the whole table.
+
+Each consumer has a watermark per table (the ChangeFeedWatermarks table), the
+(LastModified, key) of the last row it read. The changed rows are read in
+(LastModified, key) order, a bounded batch at a time, w/ a seek of the
+(LastModified, key) index past the watermark, so the order is stable and rows
+w/ the same LastModified aren't skipped or repeated. A consumer's watermark is
+saved after it has handled a batch, so a batch is read again if the consumer
+fails while handling it (at least once delivery).
+
+Every statement which inserts or updates a row of a feed table must set its
+LastModified to the time of the change (see change_timestamp), a row written
+w/ an older LastModified (e.g. a legacy date) would be behind the watermarks
+of the consumers which already read past it and never be fed to them.
+
+LastModified is the application's clock (to the second) when the row is
+written, not when its transaction commits, so a row can become visible after a
+consumer read past its LastModified (e.g. the import of the legacy customers
+commits every 500 rows). So the rows modified within the last `lag` aren't fed
+yet, and the lag must be longer than the longest transaction which writes a
+feed table (plus the clock skew of the writers). The default_lag of 5 minutes
+covers the chw-action migrations, a lag of 0 may skip rows and should only be
+used when nothing is writing the tables.
+
+Python naming convention reminder note: single underscore prefix class names are
+for "private" internal use and should not be considered part of the public API.
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+import json
+import sys
+import time
+from collections import namedtuple
+from contextlib import nullcontext
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+# Third party imports
+
+# Local application imports
+from .chw_db import CHW_DB
+from .chw_sql import CHW_SQL
+
+
+# The position of a consumer in the feed of a table, the LastModified and key of the last row read
+Watermark = namedtuple('Watermark', ['last_modified', 'key'])
+
+# The watermark of a consumer which hasn't read a table yet
+start_watermark = Watermark(datetime(1970, 1, 1), 0)
+
+# The tables w/ a change feed, their key column and the columns of their fed rows
+feed_tables = {
+    'Wines': ('WineId',
+              ('WineId', 'AccountingItemNo', 'COLA_TTB_ID', 'UPC', 'FullName', 'WineName', 'Vintage',
+               'WineColorId', 'WineTypeId', 'CertifiedOrganic', 'Varietals', 'ABV', 'WineCountryId',
+               'WineRegionId', 'WineSubregionId', 'WineAppellationId', 'ProducerId', 'UnitsPerCase',
+               'CaseUnitId', 'BottleColor', 'ShelfTalkerText', 'TastingNotes', 'Vinification',
+               'TerroirVineyardPractices', 'PressParagraph', 'Exporter',
+               'Created', 'CreatedBy', 'LastModified', 'LastModifiedBy')),
+    'EmailCustomers': ('EmailCustomerId',
+                       ('EmailCustomerId', 'Title', 'GivenName', 'Surname', 'Suffix', 'Email',
+                        'Created', 'CreatedBy', 'LastModified', 'LastModifiedBy')),
+}
+
+default_batch_size = 1000
+
+# Rows modified more recently than this aren't fed yet, it must be longer than the
+# longest transaction writing a feed table (see the module docstring)
+default_lag = timedelta(minutes=5)
+
+
+def change_timestamp():
+    """
+    The LastModified of a row changed now (DATETIME columns have no fractional seconds)
+    """
+    return datetime.now().replace(microsecond=0)
+
+
+def _to_datetime(value):
+    # DATETIME values are strings in SQLite when they're not read from a declared column
+    return value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+
+
+def _json_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+class ChangeFeed(CHW_DB):
+    """
+    An instance of ChangeFeed is created with the MariaDB
+    domain, port and db name of the chw database to
+    be worked on.
+
+    It reads the rows of the feed tables changed since a consumer's
+    watermark, and keeps the consumers' watermarks.
+    """
+
+    # Max length of ChangeFeedWatermarks Consumer
+    MAX_CONSUMER_LEN = 50
+
+    @staticmethod
+    def _check_table(table):
+        if table not in feed_tables:
+            raise ValueError(f'Table {table} has no change feed, expected one of {", ".join(feed_tables)}')
+
+    def get_watermark(self, consumer, table):
+        """
+        Get the consumer's Watermark for the table (start_watermark if it hasn't read it)
+        """
+        self._check_table(table)
+        with self._connection.cursor(prepared=True) as watermark_cursor:
+            watermark_cursor.execute(CHW_SQL.change_feed_watermark_sql, (consumer, table))
+            row = watermark_cursor.fetchone()
+        return Watermark(_to_datetime(row[0]), row[1]) if row is not None else start_watermark
+
+    def save_watermark(self, consumer, table, watermark):
+        if len(consumer) > self.MAX_CONSUMER_LEN:
+            raise ValueError(f'The consumer name is longer than {self.MAX_CONSUMER_LEN} characters')
+        with self._connection.cursor(prepared=True) as watermark_cursor:
+            watermark_cursor.execute(CHW_SQL.save_change_feed_watermark_sql,
+                                     (consumer, table, *watermark, change_timestamp()))
+        self._connection.commit()
+
+    def reset_watermark(self, consumer, table):
+        """
+        Remove the consumer's watermark for the table, so its next read starts from the beginning
+        """
+        self._check_table(table)
+        with self._connection.cursor(prepared=True) as watermark_cursor:
+            watermark_cursor.execute(CHW_SQL.delete_change_feed_watermark_sql, (consumer, table))
+        self._connection.commit()
+
+    def get_changes(self, table, watermark, *, batch_size=default_batch_size, until=None):
+        """
+        Get the next batch (at most batch_size rows, as dicts of column -> value) of the
+        rows of the table changed after the watermark (and not after until, default
+        default_lag ago), in (LastModified, key) order, and the watermark of the last
+        row of the batch.
+        """
+        self._check_table(table)
+        key, columns = feed_tables[table]
+        until = until if until is not None else change_timestamp() - default_lag
+        sql = CHW_SQL.get_changed_rows_sql({'table': table, 'key': key, 'columns': ', '.join(columns)})
+        last_modified, last_key = watermark
+        with self._connection.cursor(prepared=True) as changes_cursor:
+            changes_cursor.execute(sql, (last_modified, last_modified, last_key, until, batch_size))
+            rows = [dict(zip(columns, row)) for row in changes_cursor.fetchall()]
+        if rows:
+            watermark = Watermark(_to_datetime(rows[-1]['LastModified']), rows[-1][key])
+        return rows, watermark
+
+    def read_changes(self, consumer, table, *, batch_size=default_batch_size, max_batches=None,
+                     lag=default_lag, advance=True):
+        """
+        Generate the batches of the rows of the table changed since the consumer's
+        watermark, up to max_batches (default all). The rows modified in the last
+        lag aren't read, as they may be in transactions which haven't committed.
+        When advance is True the consumer's watermark is saved after each batch
+        has been handled (when the next batch is requested or the generator is
+        finished).
+        """
+        watermark = self.get_watermark(consumer, table)
+        until = change_timestamp() - lag
+        batch_cnt = 0
+        while max_batches is None or batch_cnt < max_batches:
+            rows, next_watermark = self.get_changes(table, watermark, batch_size=batch_size, until=until)
+            if not rows:
+                break
+            yield rows
+            batch_cnt += 1
+            watermark = next_watermark
+            if advance:
+                self.save_watermark(consumer, table, watermark)
+            if len(rows) < batch_size:
+                break
+
+
+# Public action functions to be called by the CLI
+
+def do_read_change_feed(table, consumer, *, batch_size=default_batch_size, max_batches=None,
+                        lag_secs=int(default_lag.total_seconds()), peek=False, reset=False, out_path=None):
+    change_feed = ChangeFeed()
+    if reset:
+        change_feed.reset_watermark(consumer, table)
+
+    t = time.perf_counter()
+    start = change_feed.get_watermark(consumer, table)
+    row_cnt = batch_cnt = 0
+    with open(out_path, 'a', encoding='utf-8') if out_path is not None else nullcontext(sys.stdout) as f:
+        for rows in change_feed.read_changes(consumer, table, batch_size=batch_size, max_batches=max_batches,
+                                             lag=timedelta(seconds=lag_secs), advance=not peek):
+            for row in rows:
+                f.write(json.dumps({column: _json_value(value) for column, value in row.items()}) + '\n')
+            f.flush()
+            row_cnt += len(rows)
+            batch_cnt += 1
+
+    exectime = time.perf_counter() - t
+    end = change_feed.get_watermark(consumer, table)
+    print(f'{table} changes for {consumer}: {row_cnt} rows in {batch_cnt} batches,'
+          f' watermark {start.last_modified} #{start.key} -> {end.last_modified} #{end.key}'
+          f'{" (peek, not advanced)" if peek else ""} ({exectime:.3f} secs)', file=sys.stderr)
+
+
+def _test():
+    print(start_watermark, change_timestamp())
+    for table, (key, columns) in feed_tables.items():
+        print(CHW_SQL.get_changed_rows_sql({'table': table, 'key': key, 'columns': ', '.join(columns)}))
+
+
+if __name__ == '__main__':
+    _test()
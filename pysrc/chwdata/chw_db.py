@@ -5,6 +5,26 @@
 
 This module provides the base class for connecting to the mariadb chw database.
 
+The database backend is pluggable, in addition to the mariadb server the MySQL
+server (see chwdata.mysql_db) or an embedded SQLite database (see
+chwdata.sqlite_db) may be used, the latter so that the actions can be run
+without a database container (for benchmarks and local testing).
+
+The backend's DB-API module (the mariadb or mysql connector or chwdata.sqlite_db)
+is only imported when a connection is made, so importing this module is cheap.
+
+Large results should be read w/ CHW_DB.stream_rows, which streams the rows from
+an unbuffered cursor in batches of fetch_size rows instead of the connector
+buffering the whole result in memory.
+
+Small results of the read-mostly tables which are queried repeatedly (e.g. the
+lookup tables) may be read w/ CHW_DB.cached_query, which caches them in the
+query_cache once it is enabled (see enable_query_cache and chwdata.query_cache).
+
+Long running migration actions are run w/ CHW_DB.run_resumable, which commits
+their work in transactions and retries transient errors on a new connection
+(see chwdata.transactions).
+
 Python naming convention reminder note: single underscore prefix class names are
 for "private" internal use and should not be considered part of the public API.
 
@@ -20,19 +40,52 @@ Copyright       (c) 2025-present Michael Jay Lippert
 
 # Standard library imports
 import sys
+import time
+from pathlib import Path
 
 # Third party imports
-import mariadb
 
 # Local application imports
+from .chw_sql import CHW_SQL
+from .query_cache import QueryCache
+from . import transactions
 
 
 default_domain = '127.0.0.1'
 default_port = 3306
+# The port of the chw-mysql container, so it can run alongside the chw-mariadb container
+default_mysql_port = 3307
 default_db_name = 'chw'
 default_db_user = 'chwuser'
 default_db_password = 'cynthiahurley'
 
+# The database backend is 'mariadb', 'mysql' or 'sqlite'
+default_backend = 'mariadb'
+backends = ('mariadb', 'mysql', 'sqlite')
+
+# When not None the local directory the csv files are loaded from (w/ LOAD DATA
+# LOCAL INFILE) instead of the directory mapped into the database container
+local_infile_dir = None
+
+# The number of rows fetched at a time by CHW_DB.stream_rows
+default_fetch_size = 1000
+
+# When False CHW_DB.stream_rows uses buffered cursors (the connector's default), so
+# the memory used w/ and w/o streaming can be compared (see chwbench.benchmarks)
+stream_results = True
+
+# When not None new connections are replaced by the result of calling this w/ the
+# connection, e.g. chwdata.profiling uses it to time the database calls
+connection_wrapper = None
+
+# When not None (see share_connections) the open connections keyed by the backend
+# and connection configuration, which are reused by new CHW_DB instances rather
+# than each instance connecting (and closing the connection when deleted).
+_shared_connections = None
+
+# When not None (see enable_query_cache) the QueryCache used by CHW_DB.cached_query
+query_cache = None
+
 
 class CHW_DB:
     """
@@ -40,38 +93,370 @@ class CHW_DB:
     and close the connection when deleted.
     The connection is in the instance variable `_connection`, and the connection
     configuration parameters used to create that connection are in `_db_config`.
+    The DB-API module of the backend (for catching its exceptions, e.g.
+    `self._dbapi.DataError`) is in `_dbapi`.
     These variables are intended for use by derived classes.
+
+    Large results should be iterated w/ stream_rows rather than a default cursor
+    which holds the whole result in memory, small results which are read repeatedly
+    may be read w/ cached_query.
+
+    While connections are shared (see share_connections) an instance uses the
+    open connection for its backend and configuration if there is one.
+
+    When the backend is 'mysql' the default port is default_mysql_port.
+    When the backend is 'sqlite' the db_name is used for the name of the SQLite
+    database file in the sqlite_db.default_sqlite_dir directory (or it may be
+    ':memory:'), the other connection parameters are ignored.
     """
 
+    # The DDL files to create a new SQLite database's schema from (None for the default)
+    _sqlite_ddl_files = None
+
     def __init__(self, *,
                  domain=None,
                  port=None,
                  db_name=None,
                  db_user=None,
-                 db_password=None):
+                 db_password=None,
+                 backend=None,
+                 shared=True):
         """
         Initialize the CHW_DB class, setting initial values for all instance variables
+
+        shared=False always opens a new connection even while connections are shared,
+        e.g. for an instance used by another thread.
         """
+        self._connection = None
+        self._stream_connection = None
+        self._backend = backend if backend is not None else default_backend
+        if port is None:
+            port = default_mysql_port if self._backend == 'mysql' else default_port
         self._db_config = {'host':     domain if domain is not None else default_domain,
-                           'port':     port if port is not None else default_port,
+                           'port':     port,
                            'user':     db_user if db_user is not None else default_db_user,
                            'password': db_password if db_password is not None else default_db_password,
                            'database': db_name if db_name is not None else default_db_name
                           }
-        try:
-            self._connection = mariadb.connect(**self._db_config)
-        except mariadb.Error as e:
-            print(f"An error occurred: {e}")
-            print('mariadb.onnect arguments:', self._db_config)
-            sys.exit(1)
+
+        self._shared = shared and _shared_connections is not None
+        self._connection_key = (self._backend, *sorted(self._db_config.items()))
+        if self._shared and self._connection_key in _shared_connections:
+            self._dbapi = self._import_dbapi()
+            connection = _shared_connections[self._connection_key]
+        else:
+            connection = self._connect()
+            if self._shared:
+                _shared_connections[self._connection_key] = connection
+
+        self._connection = self._wrap_connection(connection)
 
     def __del__(self):
         """
-        Close the connection to the database
+        Close the connection to the database (unless it is shared)
+        """
+        self.close()
+
+    def close(self):
+        """
+        Close the connection to the database (unless it is shared), an instance
+        used by another thread must be closed by that thread.
         """
-        if self._connection:
+        if self._stream_connection and self._stream_connection is not self._connection:
+            self._stream_connection.close()
+        self._stream_connection = None
+        if self._connection and not self._shared:
             self._connection.close()
             print("Connection closed.", file=sys.stderr)
+        self._connection = None
+
+    def stream_rows(self, sql, params=None, *, fetch_size=None):
+        """
+        Generate the rows of the query, fetching fetch_size (default_fetch_size)
+        rows at a time from an unbuffered cursor, so that only a batch of the rows
+        is in memory at once.
+
+        While an unbuffered mariadb result is being read no other statement can be
+        executed on its connection, so the mariadb rows are read on a 2nd connection
+        of this instance (which only sees committed changes) and the statements
+        executed while iterating the rows, e.g. inserts, use `_connection` as usual.
+        SQLite steps through the rows as they are fetched so its rows are read on
+        `_connection`.
+        """
+        for rows in self.stream_batches(sql, params, fetch_size=fetch_size):
+            yield from rows
+
+    def stream_batches(self, sql, params=None, *, fetch_size=None):
+        """
+        Generate the rows of the query in lists of up to fetch_size (default_fetch_size)
+        rows, see stream_rows.
+        """
+        fetch_size = fetch_size if fetch_size is not None else default_fetch_size
+        with self._get_stream_connection().cursor(buffered=not stream_results) as cursor:
+            cursor.execute(sql, params or ())
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    return
+                yield rows
+
+    def cached_query(self, sql, params=None):
+        """
+        Get the rows of the query as a list, from the query_cache when it is
+        enabled and the result is cached. The cached results are invalidated when
+        the tables they read are written and committed (or rolled back) through a
+        CHW_DB connection. The cache isn't used while the connection has uncommitted
+        writes, so rows which may be rolled back are never cached.
+        """
+        params = tuple(params or ())
+        use_cache = query_cache is not None and not getattr(self._connection, 'written_tables', None)
+        if use_cache:
+            rows = query_cache.get(sql, params)
+            if rows is not None:
+                return rows
+
+        with self._connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+
+        if use_cache:
+            query_cache.put(sql, params, rows)
+        return rows
+
+    def run_resumable(self, work, *, policy=None):
+        """
+        Run work(committer), a long running action which calls committer.unit_done()
+        after each of its units of work (committing every policy.commit_every units)
+        and committer.commit() when it is done, returning the result of work.
+
+        When work fails w/ a transient error (see is_transient_error) its uncommitted
+        changes are lost, and it is retried (up to policy.max_retries times w/ backoff)
+        on a new connection, so work must skip the units committed by earlier attempts.
+        """
+        policy = policy if policy is not None else transactions.default_policy
+        attempt = 0
+        committed = 0
+        committer = None
+        while True:
+            try:
+                if attempt > 0:
+                    self.reconnect()
+                committer = transactions.UnitCommitter(self._connection, policy.commit_every)
+                return work(committer)
+            except self._dbapi.Error as e:
+                if not self.is_transient_error(e) or attempt >= policy.max_retries:
+                    raise
+                attempt += 1
+                committed += committer.committed if committer is not None else 0
+                committer = None
+                backoff = policy.get_backoff(attempt)
+                print(f'{type(e).__name__}: {e}; {committed} units committed,'
+                      f' retry {attempt} of {policy.max_retries} in {backoff:.1f} secs', file=sys.stderr)
+                time.sleep(backoff)
+
+    def is_transient_error(self, e):
+        """
+        Is the database error one which may not happen again if the work is retried
+        on a new connection, e.g. the connection was lost or the database was locked
+        """
+        if self._backend == 'sqlite':
+            return isinstance(e, self._dbapi.OperationalError) and any(
+                msg in str(e) for msg in ('locked', 'busy', 'disk I/O error'))
+        return isinstance(e, (self._dbapi.OperationalError, self._dbapi.InterfaceError))
+
+    def reconnect(self):
+        """
+        Replace the connection (and stream connection) w/ a new connection, e.g. after
+        the connection was lost. The uncommitted changes are lost, and connection
+        errors are raised (rather than exiting) so the connect can be retried.
+        """
+        for connection in (self._stream_connection, self._connection):
+            if connection is not None:
+                try:
+                    connection.close()
+                except self._dbapi.Error:
+                    pass
+        self._stream_connection = None
+        self._connection = None
+
+        connection = self._connect(exit_on_error=False)
+        if self._shared:
+            _shared_connections[self._connection_key] = connection
+        self._connection = self._wrap_connection(connection)
+
+    def get_tables(self):
+        """
+        Get the names of the tables of the database
+        """
+        sql = CHW_SQL.sqlite_tables_sql if self._backend == 'sqlite' else CHW_SQL.tables_sql
+        with self._connection.cursor() as cursor:
+            cursor.execute(sql)
+            return [row[0] for row in cursor.fetchall()]
+
+    def get_table_columns(self, table):
+        """
+        Get the columns of the table as a list of (name, declared sql type) in column order
+        e.g. [('WineId', 'int(11)'), ('FOBPrice', 'decimal(8,2)'), ...]
+        """
+        sql = CHW_SQL.sqlite_table_columns_sql if self._backend == 'sqlite' else CHW_SQL.table_columns_sql
+        return [tuple(row) for row in self.cached_query(sql, (table,))]
+
+    def get_table_row_count(self, table):
+        """
+        Get the number of rows in the table
+        """
+        with self._connection.cursor() as cursor:
+            cursor.execute(CHW_SQL.get_count_table_rows_sql({'table': table}))
+            return cursor.fetchone()[0]
+
+    def get_load_data_params(self, datadir):
+        """
+        Get the datadir and local params of a LOAD DATA statement format string, the
+        csv files are read by the database server from its datadir unless the
+        local_infile_dir is set.
+        """
+        if local_infile_dir is None:
+            return {'datadir': datadir, 'local': ''}
+        return {'datadir': f'{Path(local_infile_dir).resolve()}/', 'local': 'LOCAL '}
+
+    def _get_stream_connection(self):
+        """
+        Get the connection to read unbuffered results on (see stream_rows)
+        """
+        if self._stream_connection is None:
+            if self._backend == 'sqlite':
+                self._stream_connection = self._connection
+            else:
+                # the connection has been made, so an error connecting again is raised
+                connection = self._connect(exit_on_error=False)
+                self._stream_connection = (connection_wrapper(connection) if connection_wrapper is not None
+                                           else connection)
+        return self._stream_connection
+
+    def _wrap_connection(self, connection):
+        """
+        Wrap a new connection w/ the connection_wrapper and the query_cache write tracking
+        """
+        wrapped = connection_wrapper(connection) if connection_wrapper is not None else connection
+        if query_cache is not None:
+            # the writes pending on a shared connection are tracked for all of its CHW_DB instances
+            wrapped = query_cache.track_writes(wrapped, connection)
+        return wrapped
+
+    def _import_dbapi(self):
+        """
+        Import and return the DB-API module for the backend
+        """
+        # the backend modules are imported when needed to keep the cli startup fast
+        # pylint: disable=import-outside-toplevel
+        if self._backend == 'sqlite':
+            from . import sqlite_db
+            return sqlite_db
+
+        if self._backend == 'mysql':
+            try:
+                # the mysql connector's exceptions are the DB-API ones, its connections
+                # are made through chwdata.mysql_db
+                import mysql.connector
+                return mysql.connector
+            except ImportError:
+                print('The mysql connector is not installed,'
+                      ' use another backend or pip install mysql-connector-python')
+                sys.exit(1)
+
+        try:
+            import mariadb
+            return mariadb
+        except ImportError:
+            print('The mariadb connector is not installed, use the sqlite backend or pip install mariadb')
+            sys.exit(1)
+
+    def _connect(self, exit_on_error=True):
+        """
+        Connect to the database setting `_dbapi` and returning the connection,
+        exiting if the connection fails unless exit_on_error is False
+        """
+        self._dbapi = self._import_dbapi()
+        if self._backend == 'sqlite':
+            return self._dbapi.connect(self._get_sqlite_database(), ddl_files=self._sqlite_ddl_files)
+
+        try:
+            if self._backend == 'mysql':
+                from . import mysql_db  # pylint: disable=import-outside-toplevel
+                return mysql_db.connect(**self._db_config, local_infile=local_infile_dir is not None)
+            return self._dbapi.connect(**self._db_config, local_infile=local_infile_dir is not None)
+        except self._dbapi.Error as e:
+            if not exit_on_error:
+                raise
+            print(f"An error occurred: {e}")
+            print(f'{self._backend}.connect arguments:', self._db_config)
+            sys.exit(1)
+
+    def _get_sqlite_database(self):
+        """
+        Get the SQLite database (file path) for the configured db_name
+        """
+        db_name = self._db_config['database']
+        if db_name == ':memory:':
+            return db_name
+        return self._dbapi.default_sqlite_dir / f'{db_name}.sqlite3'
+
+
+def share_connections():
+    """
+    Start sharing connections, until close_shared_connections is called the
+    CHW_DB instances w/ the same backend and configuration will use the same
+    connection, which is not closed when they are deleted.
+    """
+    global _shared_connections  # pylint: disable=global-statement
+    if _shared_connections is None:
+        _shared_connections = {}
+
+
+def rollback_shared_connections():
+    """
+    Rollback any uncommitted changes on the shared connections (e.g. after an action failed)
+    """
+    for connection in (_shared_connections or {}).values():
+        connection.rollback()
+        if query_cache is not None:
+            query_cache.end_transaction(connection)
+
+
+def close_shared_connections():
+    """
+    Close the shared connections and stop sharing connections
+    """
+    global _shared_connections  # pylint: disable=global-statement
+    if _shared_connections is None:
+        return
+
+    for connection in _shared_connections.values():
+        connection.close()
+    print(f'{len(_shared_connections)} shared connection(s) closed.', file=sys.stderr)
+    _shared_connections = None
+
+
+def enable_query_cache(**kwargs):
+    """
+    Start caching the results of CHW_DB.cached_query, the kwargs are the QueryCache
+    limits (max_entries, ttl_secs, max_bytes). Returns the query cache, which is
+    the existing one if the cache is already enabled.
+    Only the connections of CHW_DB instances created after the cache is enabled
+    invalidate the cached results when they commit writes.
+    """
+    global query_cache  # pylint: disable=global-statement
+    if query_cache is None:
+        query_cache = QueryCache(**kwargs)
+    return query_cache
+
+
+def disable_query_cache():
+    """
+    Stop caching query results, discarding the cached results
+    """
+    global query_cache  # pylint: disable=global-statement
+    query_cache = None
 
 
 def _test():
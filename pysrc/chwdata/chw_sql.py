@@ -36,10 +36,10 @@ class CHW_SQL:
     """
 
     # Format string to create a Sql Load Data statement to load the legacy email orders table
-    # where parameters datadir, csvfile, suffix must be supplied.
+    # where parameters datadir, csvfile, suffix (and optionally local) must be supplied.
     # used by get_legacy_wine_master_load_data method
     _legacy_email_orders_load_data_sql_fmt = """
-LOAD DATA INFILE '{datadir}{csvfile}'
+LOAD DATA {local}INFILE '{datadir}{csvfile}'
 REPLACE INTO TABLE LegacyEmailOrders{suffix}
 FIELDS TERMINATED BY '|' OPTIONALLY ENCLOSED BY '"'
 IGNORE 1 LINES
@@ -105,6 +105,14 @@ SELECT FullName, COUNT( FullName ) NumOrders
  ORDER BY FullName ASC
 """
 
+    # Select statement for the FullNames which have already been migrated to EmailCustomers
+    # used by create_customers_from_legacy to resume
+    migrated_fullnames_sql = """
+SELECT DISTINCT L.FullName
+  FROM chw.LegacyEmailOrders_0219 L
+  JOIN chw.EmailCustomers_LegacyEmailOrders ECLO ON ECLO.EmailOrderId = L.EmailOrderId
+"""
+
     # Select statement for Customer columns of ALL LegacyEmailOrders records with a matching FullName
     legacy_customer_info_columns = ('EmailOrderId',
                                     'FirstDate',
@@ -158,6 +166,595 @@ INSERT INTO chw.EmailCustomers_LegacyEmailOrders
  VALUES (?, ?, ?, ?, ?)
 """
 
+    # Insert statement to create EmailCustomerPhoneNumbers record
+    insert_customer_phone_number_sql = """
+INSERT INTO chw.EmailCustomerPhoneNumbers
+ ( EmailCustomerId
+ , N
+ , PhoneNumber
+ , Type
+ )
+ VALUES (?, ?, ?, ?)
+"""
+
+    # Select statement for the wine columns used to match the legacy order items to wines
+    wines_for_matching_sql = """
+SELECT W.WineId, W.FullName, W.WineName, W.Vintage, P.Name
+  FROM Wines W
+  JOIN Producers P ON P.ProducerId = W.ProducerId
+"""
+
+    # Select statement for the prices of the wines (see chwdata.price_quotes)
+    price_book_sql = """
+SELECT WP.WineId, WP.Available, WP.SoldOut, W.UnitsPerCase,
+       WP.FOBPrice, WP.FOB_MA, WP.FOB_ARB,
+       WP.NY_Wholesale, WP.NY_MultiCasePrice, WP.NY_MultiCaseQty,
+       WP.NJ_Wholesale, WP.NJ_MultiCasePrice, WP.NJ_MultiCaseQty
+  FROM WinePricing WP
+  JOIN Wines W ON W.WineId = WP.WineId
+"""
+
+    # Select statement for the wines and quantities of all the orders
+    order_lines_sql = """
+SELECT OrderId, WineId, QtyCases, QtyUnits
+  FROM Orders_Wines
+ ORDER BY OrderId
+"""
+
+    # Select statement for the price of a wine (a line at a time quote w/o a PriceBook)
+    wine_price_sql = """
+SELECT WP.Available, WP.SoldOut, W.UnitsPerCase,
+       WP.FOBPrice, WP.FOB_MA, WP.FOB_ARB,
+       WP.NY_Wholesale, WP.NY_MultiCasePrice, WP.NY_MultiCaseQty,
+       WP.NJ_Wholesale, WP.NJ_MultiCasePrice, WP.NJ_MultiCaseQty
+  FROM WinePricing WP
+  JOIN Wines W ON W.WineId = WP.WineId
+ WHERE WP.WineId = ?
+"""
+
+    # Select statements for the wine names and the existing wine families used to
+    # group the wines into families (see chwdata.wine_families)
+    wines_for_families_sql = """
+SELECT W.WineId, W.ProducerId, W.FullName, W.WineName, P.Name
+  FROM Wines W
+  JOIN Producers P ON P.ProducerId = W.ProducerId
+"""
+
+    wine_families_sql = """
+SELECT FamilyId, FamilyHash
+  FROM WineFamilies
+"""
+
+    wine_family_ids_sql = """
+SELECT WineId, FamilyId
+  FROM Wines_WineFamilies
+"""
+
+    # Select statement for the last FamilyId assigned
+    max_family_id_sql = """
+SELECT MAX(FamilyId)
+  FROM WineFamilies
+"""
+
+    # Insert statement to create WineFamilies record
+    insert_wine_family_sql = """
+INSERT INTO WineFamilies
+ ( FamilyId
+ , ProducerId
+ , Name
+ , FamilyHash
+ )
+ VALUES (?, ?, ?, ?)
+"""
+
+    # Insert, update and delete statements for the family of a wine
+    insert_wine_winefamily_sql = """
+INSERT INTO Wines_WineFamilies
+ ( WineId
+ , FamilyId
+ )
+ VALUES (?, ?)
+"""
+
+    update_wine_winefamily_sql = """
+UPDATE Wines_WineFamilies
+   SET FamilyId = ?
+ WHERE WineId = ?
+"""
+
+    delete_wine_winefamily_sql = """
+DELETE FROM Wines_WineFamilies
+ WHERE WineId = ?
+"""
+
+    # Delete the wine families which no longer have any wines
+    delete_unused_wine_families_sql = """
+DELETE FROM WineFamilies
+ WHERE NOT EXISTS (SELECT 1 FROM Wines_WineFamilies WWF WHERE WWF.FamilyId = WineFamilies.FamilyId)
+"""
+
+    # Select statement for all the wines (vintages and sizes) of the family of a wine
+    family_wines_sql = """
+SELECT W.WineId, W.Vintage, W.FullName
+  FROM Wines_WineFamilies WWF
+  JOIN Wines_WineFamilies FWF ON FWF.FamilyId = WWF.FamilyId
+  JOIN Wines W ON W.WineId = FWF.WineId
+ WHERE WWF.WineId = ?
+ ORDER BY W.Vintage, W.WineId
+"""
+
+    # Format string to select the items (and their vintages) of the legacy email orders
+    # where parameter suffix must be supplied.
+    # used by get_legacy_order_items_sql method
+    _legacy_order_items_sql_fmt = """
+SELECT EmailOrderId,
+       DelItems, Vintage,
+       DelItem2, Vintage2,
+       DelItem3, Vintage3,
+       DelItem4, Vintage4,
+       DelItem5, Vintage5
+  FROM LegacyEmailOrders{suffix}
+"""
+
+    # Format string to select the analytic columns of the legacy email orders
+    # where parameter suffix must be supplied.
+    # used by get_legacy_order_columns_sql method
+    _legacy_order_columns_sql_fmt = """
+SELECT EmailOrderId, FirstDate, Subtotal, FullName, Retailer, State,
+       DelItems, Vintage, Quantity,
+       DelItem2, Vintage2, Quant2,
+       DelItem3, Vintage3, Quant3,
+       DelItem4, Vintage4, Quant4,
+       DelItem5, Vintage5, Quant5
+  FROM LegacyEmailOrders{suffix}
+"""
+
+    # Delete all the legacy order item to wine matches (they are recreated by each match)
+    delete_wines_legacyorders_sql = """
+DELETE FROM Wines_LegacyEmailOrders
+"""
+
+    # Insert statement to create a Wines_LegacyEmailOrders record
+    insert_wine_legacyorder_sql = """
+INSERT INTO Wines_LegacyEmailOrders
+ ( EmailOrderId
+ , N
+ , WineId
+ , MatchScore
+ , NeedsReview
+ , ConversionNotes
+ )
+ VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+    # Format string to select the distinct retailers of the legacy email orders
+    # where parameter suffix must be supplied.
+    # used by get_legacy_retailers_sql method
+    _legacy_retailers_sql_fmt = """
+SELECT DISTINCT Retailer
+  FROM LegacyEmailOrders{suffix}
+"""
+
+    # Select statement for the RetailerId of all Retailers by name
+    retailers_sql = """
+SELECT Name, RetailerId
+  FROM Retailers
+"""
+
+    # Insert statement to create Retailers record
+    insert_retailer_sql = """
+INSERT INTO Retailers
+ ( Name
+ )
+ VALUES (?)
+"""
+
+    # Select statement for the range of legacy email order ids (for migrating them in chunks)
+    # where parameter suffix must be supplied.
+    # used by get_legacy_order_id_range_sql method
+    _legacy_order_id_range_sql_fmt = """
+SELECT MIN(EmailOrderId), MAX(EmailOrderId)
+  FROM LegacyEmailOrders{suffix}
+"""
+
+    # Select statement for the units per case of all Wines
+    wine_units_per_case_sql = """
+SELECT WineId, UnitsPerCase
+  FROM Wines
+"""
+
+    # Format string to select the order columns of a range of the legacy email orders
+    # which have an email customer and have not already been migrated to Orders
+    # where parameter suffix must be supplied.
+    # used by get_legacy_orders_to_migrate_sql method
+    _legacy_orders_to_migrate_sql_fmt = """
+SELECT L.EmailOrderId,
+       L.FirstDate,
+       L.OrderNumber,
+       ECLO.EmailCustomerId,
+       L.Retailer,
+       L.AdditionalCharges,
+       L.Quantity, L.Quant2, L.Quant3, L.Quant4, L.Quant5
+  FROM LegacyEmailOrders{suffix} L
+  JOIN EmailCustomers_LegacyEmailOrders ECLO ON ECLO.EmailOrderId = L.EmailOrderId
+ WHERE L.EmailOrderId BETWEEN ? AND ?
+   AND NOT EXISTS (SELECT 1 FROM Orders O WHERE O.OrderId = L.EmailOrderId)
+"""
+
+    # Select statement for the matched wines of a range of legacy email orders items
+    legacy_order_item_wines_sql = """
+SELECT EmailOrderId, N, WineId
+  FROM Wines_LegacyEmailOrders
+ WHERE EmailOrderId BETWEEN ? AND ?
+   AND WineId IS NOT NULL
+"""
+
+    # Insert statement to create Orders record
+    insert_order_sql = """
+INSERT INTO Orders
+ ( OrderId
+ , OrderDate
+ , AccountingOrderNo
+ , EmailCustomerId
+ , AddressId
+ , RetailerId
+ , AdditionalCharges
+ , Notes
+ )
+ VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+    # Insert statement to create Orders_Wines record
+    insert_order_wine_sql = """
+INSERT INTO Orders_Wines
+ ( OrderId
+ , WineId
+ , QtyCases
+ , QtyUnits
+ , CasePrice
+ , UnitPrice
+ )
+ VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+    # Select statement for the US states lookup values (to normalize address states)
+    lookup_us_states_sql = """
+SELECT StatePostalAbbrev, StateFullName, StateStdAbbrev
+  FROM LookupUSStates
+"""
+
+    # Select statement for all of the Addresses
+    addresses_sql = """
+SELECT AddressId, Street, Street2, City, State, PostalCode
+  FROM Addresses
+"""
+
+    # Select statement for the last AddressId assigned
+    max_address_id_sql = """
+SELECT MAX(AddressId)
+  FROM Addresses
+"""
+
+    # Select statement for all of the email customer shipping addresses
+    customer_shipping_addresses_sql = """
+SELECT EmailCustomerId, AddressId
+  FROM EmailCustomers_ShippingAddresses
+"""
+
+    # Format string to select the addresses of the legacy email orders w/ their customer
+    # and their migrated order if there is one.
+    # where parameter suffix must be supplied.
+    # used by get_legacy_order_addresses_sql method
+    _legacy_order_addresses_sql_fmt = """
+SELECT L.EmailOrderId,
+       ECLO.EmailCustomerId,
+       O.OrderId,
+       O.AddressId,
+       L.Street, L.CompanyAptNo, L.City, L.State, L.Zip
+  FROM LegacyEmailOrders{suffix} L
+  JOIN EmailCustomers_LegacyEmailOrders ECLO ON ECLO.EmailOrderId = L.EmailOrderId
+  LEFT JOIN Orders O ON O.OrderId = L.EmailOrderId
+ ORDER BY L.EmailOrderId
+"""
+
+    # Insert statement to create Addresses record
+    insert_address_sql = """
+INSERT INTO Addresses
+ ( AddressId
+ , Street
+ , Street2
+ , City
+ , State
+ , PostalCode
+ )
+ VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+    # Insert statement to create EmailCustomers_ShippingAddresses record
+    insert_customer_shipping_address_sql = """
+INSERT INTO EmailCustomers_ShippingAddresses
+ ( EmailCustomerId
+ , AddressId
+ )
+ VALUES (?, ?)
+"""
+
+    # Update statement to set the shipping address of an order
+    update_order_address_sql = """
+UPDATE Orders
+   SET AddressId = ?
+ WHERE OrderId = ?
+"""
+
+    # Select statements for the rows of the customer documents (see chwdata.customer_documents)
+    # of the customers in a range of EmailCustomerIds, ordered by customer
+    customer_documents_customers_sql = """
+SELECT EmailCustomerId, Title, GivenName, Surname, Suffix, Email, Created, LastModified
+  FROM EmailCustomers
+ WHERE EmailCustomerId BETWEEN ? AND ?
+ ORDER BY EmailCustomerId
+"""
+
+    customer_documents_phone_numbers_sql = """
+SELECT EmailCustomerId, N, PhoneNumber, Type
+  FROM EmailCustomerPhoneNumbers
+ WHERE EmailCustomerId BETWEEN ? AND ?
+ ORDER BY EmailCustomerId, N
+"""
+
+    customer_documents_addresses_sql = """
+SELECT ECSA.EmailCustomerId, A.AddressId, A.Street, A.Street2, A.City, A.State, A.PostalCode
+  FROM EmailCustomers_ShippingAddresses ECSA
+  JOIN Addresses A ON A.AddressId = ECSA.AddressId
+ WHERE ECSA.EmailCustomerId BETWEEN ? AND ?
+ ORDER BY ECSA.EmailCustomerId, A.AddressId
+"""
+
+    customer_documents_orders_sql = """
+SELECT O.EmailCustomerId, O.OrderId, O.OrderDate, O.AccountingOrderNo, R.Name,
+       O.AddressId, O.AdditionalCharges, O.Notes
+  FROM Orders O
+  JOIN Retailers R ON R.RetailerId = O.RetailerId
+ WHERE O.EmailCustomerId BETWEEN ? AND ?
+ ORDER BY O.EmailCustomerId, O.OrderDate, O.OrderId
+"""
+
+    customer_documents_order_wines_sql = """
+SELECT O.EmailCustomerId, OW.OrderId, OW.WineId, W.FullName, W.Vintage,
+       OW.QtyCases, OW.QtyUnits, OW.CasePrice, OW.UnitPrice
+  FROM Orders O
+  JOIN Orders_Wines OW ON OW.OrderId = O.OrderId
+  JOIN Wines W ON W.WineId = OW.WineId
+ WHERE O.EmailCustomerId BETWEEN ? AND ?
+ ORDER BY OW.OrderId, OW.WineId
+"""
+
+    # Select statements for the rows the customer document signatures (which tell if a
+    # customer's document needs to be rebuilt) are made from, all of the columns of the
+    # customer documents (see the customer_documents_*_sql) of all of the customers
+    customer_document_signatures_sql = """
+SELECT EmailCustomerId, Title, GivenName, Surname, Suffix, Email, Created, LastModified
+  FROM EmailCustomers
+"""
+
+    customer_phone_number_signatures_sql = """
+SELECT EmailCustomerId, N, PhoneNumber, Type
+  FROM EmailCustomerPhoneNumbers
+"""
+
+    customer_address_signatures_sql = """
+SELECT ECSA.EmailCustomerId, A.AddressId, A.Street, A.Street2, A.City, A.State, A.PostalCode
+  FROM EmailCustomers_ShippingAddresses ECSA
+  JOIN Addresses A ON A.AddressId = ECSA.AddressId
+"""
+
+    customer_order_signatures_sql = """
+SELECT O.EmailCustomerId, O.OrderId, O.OrderDate, O.AccountingOrderNo, R.Name,
+       O.AddressId, O.AdditionalCharges, O.Notes
+  FROM Orders O
+  JOIN Retailers R ON R.RetailerId = O.RetailerId
+"""
+
+    customer_order_wine_signatures_sql = """
+SELECT O.EmailCustomerId, OW.OrderId, OW.WineId, W.FullName, W.Vintage,
+       OW.QtyCases, OW.QtyUnits, OW.CasePrice, OW.UnitPrice
+  FROM Orders O
+  JOIN Orders_Wines OW ON OW.OrderId = O.OrderId
+  JOIN Wines W ON W.WineId = OW.WineId
+"""
+
+    # Format string to select the order dates and subtotal totals of each customer from
+    # their legacy email orders (see chwdata.customer_analytics)
+    # where parameter suffix must be supplied.
+    # used by get_customer_order_totals_sql method
+    _customer_order_totals_sql_fmt = """
+SELECT ECLO.EmailCustomerId,
+       MIN(L.FirstDate), MAX(L.FirstDate),
+       COUNT(*), COUNT(L.Subtotal), SUM(L.Subtotal)
+  FROM EmailCustomers_LegacyEmailOrders ECLO
+  JOIN LegacyEmailOrders{suffix} L ON L.EmailOrderId = ECLO.EmailOrderId
+ GROUP BY ECLO.EmailCustomerId
+"""
+
+    # Select statement for the bottles (units) of each producer's wines ordered by each customer
+    customer_producer_bottles_sql = """
+SELECT O.EmailCustomerId, W.ProducerId, P.Name,
+       SUM(OW.QtyCases * W.UnitsPerCase + OW.QtyUnits)
+  FROM Orders O
+  JOIN Orders_Wines OW ON OW.OrderId = O.OrderId
+  JOIN Wines W ON W.WineId = OW.WineId
+  JOIN Producers P ON P.ProducerId = W.ProducerId
+ GROUP BY O.EmailCustomerId, W.ProducerId, P.Name
+"""
+
+    # Delete all the customer summaries (they are recreated by each computation)
+    delete_customer_summaries_sql = """
+DELETE FROM EmailCustomerSummaries
+"""
+
+    # Insert statement to create an EmailCustomerSummaries record
+    insert_customer_summary_sql = """
+INSERT INTO EmailCustomerSummaries
+ ( EmailCustomerId
+ , FirstOrderDate
+ , LastOrderDate
+ , RecencyDays
+ , OrderCount
+ , LifetimeValue
+ , AvgOrderValue
+ , AnnualValue
+ , LifetimeBottles
+ , FavoriteProducerId
+ , FavoriteProducers
+ , RecencyScore
+ , FrequencyScore
+ , MonetaryScore
+ , Segment
+ , AsOfDate
+ )
+ VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+    # Select statement for the number of customers and their value in each RFM segment
+    customer_segments_sql = """
+SELECT Segment, COUNT(*), SUM(LifetimeValue), SUM(LifetimeBottles)
+  FROM EmailCustomerSummaries
+ GROUP BY Segment
+ ORDER BY SUM(LifetimeValue) DESC
+"""
+
+    # Select statement for the columns (name and type) of a table
+    table_columns_sql = """
+SELECT COLUMN_NAME, COLUMN_TYPE
+  FROM information_schema.COLUMNS
+ WHERE TABLE_SCHEMA = 'chw'
+   AND TABLE_NAME = ?
+ ORDER BY ORDINAL_POSITION
+"""
+
+    # Select statement for the columns (name and type) of a table in the SQLite database
+    sqlite_table_columns_sql = """
+SELECT name, type
+  FROM pragma_table_info(?)
+ ORDER BY cid
+"""
+
+    # Format string to select all of the rows of a table to export
+    # where parameters table and columns must be supplied.
+    # used by get_export_table_sql method
+    _export_table_sql_fmt = """
+SELECT {columns}
+  FROM {table}
+"""
+
+    # Select statement for the tables of the chw database
+    tables_sql = """
+SELECT TABLE_NAME
+  FROM information_schema.TABLES
+ WHERE TABLE_SCHEMA = 'chw'
+   AND TABLE_TYPE = 'BASE TABLE'
+ ORDER BY TABLE_NAME
+"""
+
+    # Select statement for the tables of the SQLite database
+    sqlite_tables_sql = """
+SELECT name
+  FROM sqlite_master
+ WHERE type = 'table'
+   AND name NOT LIKE 'sqlite_%'
+ ORDER BY name
+"""
+
+    # Select statement for the (name and create statement of the) indexes of a table
+    # in the SQLite database, w/o the indexes of PRIMARY KEY and UNIQUE constraints
+    sqlite_table_indexes_sql = """
+SELECT name, sql
+  FROM sqlite_master
+ WHERE type = 'index'
+   AND tbl_name = ?
+   AND sql IS NOT NULL
+"""
+
+    # Statements run on a connection before restoring tables from a snapshot,
+    # the rows are restored as they were so they aren't checked (as mysqldump does)
+    restore_session_sql = ('SET FOREIGN_KEY_CHECKS = 0',
+                           'SET UNIQUE_CHECKS = 0',
+                          )
+
+    # Format strings to restore a table from a snapshot
+    # where parameter table (and index, column, type, columns and values) must be supplied.
+    # used by the get_*_sql methods w/ the same name
+    _delete_table_rows_sql_fmt = 'DELETE FROM {table}'
+    _drop_index_sql_fmt = 'DROP INDEX {index}'
+    _add_column_sql_fmt = 'ALTER TABLE {table} ADD COLUMN {column} {type}'
+    _restore_table_rows_sql_fmt = 'INSERT INTO {table} ({columns}) VALUES ({values})'
+
+    # Select statement for the columns of the secondary indexes of a table (in index column order)
+    # which can be dropped while the table is restored from a snapshot, i.e. w/o the indexes
+    # whose first column is a foreign key column of the table or a column referenced by one
+    # (parameters table, table)
+    table_secondary_indexes_sql = """
+SELECT S.INDEX_NAME, S.NON_UNIQUE, S.INDEX_TYPE, S.COLUMN_NAME, S.SUB_PART
+  FROM information_schema.STATISTICS S
+ WHERE S.TABLE_SCHEMA = 'chw'
+   AND S.TABLE_NAME = ?
+   AND S.INDEX_NAME <> 'PRIMARY'
+   AND S.INDEX_NAME NOT IN (
+       SELECT FS.INDEX_NAME
+         FROM information_schema.STATISTICS FS
+         JOIN information_schema.KEY_COLUMN_USAGE KCU
+           ON (KCU.TABLE_SCHEMA = 'chw' AND KCU.TABLE_NAME = FS.TABLE_NAME
+               AND KCU.REFERENCED_TABLE_NAME IS NOT NULL AND KCU.COLUMN_NAME = FS.COLUMN_NAME)
+           OR (KCU.REFERENCED_TABLE_SCHEMA = 'chw' AND KCU.REFERENCED_TABLE_NAME = FS.TABLE_NAME
+               AND KCU.REFERENCED_COLUMN_NAME = FS.COLUMN_NAME)
+        WHERE FS.TABLE_SCHEMA = 'chw'
+          AND FS.TABLE_NAME = ?
+          AND FS.SEQ_IN_INDEX = 1
+       )
+ ORDER BY S.INDEX_NAME, S.SEQ_IN_INDEX
+"""
+
+    # Select statement for the columns of the indexes of a table (in index column order)
+    table_index_columns_sql = """
+SELECT INDEX_NAME, COLUMN_NAME
+  FROM information_schema.STATISTICS
+ WHERE TABLE_SCHEMA = 'chw'
+   AND TABLE_NAME = ?
+ ORDER BY INDEX_NAME, SEQ_IN_INDEX
+"""
+
+    # Select statement for the columns of the indexes of a table in the SQLite database
+    sqlite_table_index_columns_sql = """
+SELECT IL.name, II.name
+  FROM pragma_index_list(?) IL
+  JOIN pragma_index_info(IL.name) II
+ ORDER BY IL.name, II.seqno
+"""
+
+    # Select statement for the version of the SQLite database schema, reading it also
+    # reloads the connection's schema if another connection has changed it
+    sqlite_schema_version_sql = 'SELECT schema_version FROM pragma_schema_version'
+
+    # Format strings to get the query plan of a statement, to update the statistics the
+    # plans are based on, and to create and drop the indexes suggested for the plans
+    # where parameter statement (or table, index and columns) must be supplied.
+    # used by the get_*_sql methods w/ the same name
+    _explain_sql_fmt = 'EXPLAIN {statement}'
+    _sqlite_explain_sql_fmt = 'EXPLAIN QUERY PLAN /* schema {schema_version} */ {statement}'
+    _analyze_table_sql_fmt = 'ANALYZE TABLE {table}'
+    _sqlite_analyze_table_sql_fmt = 'ANALYZE {table}'
+    _create_index_sql_fmt = 'CREATE {kind}INDEX {index} ON {table} ({columns})'
+    _drop_table_index_sql_fmt = 'DROP INDEX {index} ON {table}'
+
+    # Statement run before dropping all of the tables so they can be dropped in any order
+    disable_foreign_key_checks_sql = 'SET FOREIGN_KEY_CHECKS = 0'
+
+    # Format strings to count the rows of a table and to drop a table
+    # where parameter table must be supplied.
+    # used by the get_*_sql methods w/ the same name
+    _count_table_rows_sql_fmt = 'SELECT COUNT(*) FROM {table}'
+    _drop_table_sql_fmt = 'DROP TABLE {table}'
+
     # List is only used in the following example sql statement with multiple joins
     _orders_of_top_customers_columns = ('EC.EmailCustomerId,',
                                         'EC.GivenName',
@@ -257,7 +854,7 @@ SELECT EC.EmailCustomerId
  JOIN EmailCustomers AS EC ON EC_LEO.EmailCustomerId = EC.EmailCustomerId
  WHERE EC.Email IN ('""" + "', '".join(_top_customers_emails) + """')
  OR (EC.GivenName = 'Alexander' AND EC.Surname = 'Kinsey')
- ORDER BY Email ASC, OrderDate ASC
+ ORDER BY EC.Email ASC, OrderDate ASC
 """
 )
 
@@ -572,10 +1169,10 @@ VALUES ('AL', 'Alabama', 'Ala.'),
 """
 
     # Format string to create a Sql Load Data statement to load the legacy wine master table
-    # where parameters datadir, csvfile, suffix must be supplied.
+    # where parameters datadir, csvfile, suffix (and optionally local) must be supplied.
     # used by get_legacy_wine_master_load_data method
     _legacy_wine_master_load_data_sql_fmt = """
-LOAD DATA INFILE '{datadir}{csvfile}'
+LOAD DATA {local}INFILE '{datadir}{csvfile}'
 REPLACE INTO TABLE LegacyWineMaster{suffix}
 FIELDS TERMINATED BY '|' OPTIONALLY ENCLOSED BY '"'
 IGNORE 1 LINES
@@ -746,6 +1343,15 @@ SELECT WineId
  ORDER BY ProducerName ASC, LastUpdated DESC
 """
 
+    # Format string to select the ProducerNames which have already been migrated to Producers
+    # where parameter suffix must be supplied.
+    # used by get_migrated_producer_names_sql method
+    _migrated_producer_names_sql_fmt = """
+SELECT DISTINCT LWM.ProducerName
+  FROM chw.LegacyWineMaster{suffix} LWM
+  JOIN chw.Producers_LegacyWineMaster PLWM ON PLWM.WineId = LWM.WineId
+"""
+
     # Insert statement to create Producer record
     insert_producer_sql = """
 INSERT INTO chw.Producers
@@ -770,6 +1376,9 @@ INSERT INTO chw.Producers_LegacyWineMaster
     # Format string to create insert statement to create Wines records
     # from LegacyWineMaster records
     # where parameter suffix must be supplied.
+    # The statement's parameter is the LastModified of the wines (the time of the
+    # migration, not the legacy LastUpdated, so the change feed has the new rows)
+    # The wines already migrated are skipped, so a rerun or resume only inserts the new wines.
     # used by get_insert_wines_from_legacy method
     _insert_wines_from_legacy_sql_fmt = """
 INSERT INTO Wines
@@ -834,7 +1443,7 @@ SELECT
     LWM.Exporter,
     if(LWM.DateCreated IS NULL, LWM.LastUpdated, LWM.DateCreated),
     'Legacy',
-    LWM.LastUpdated,
+    ?,
     'Legacy'
 FROM LegacyWineMaster{suffix} LWM
 INNER JOIN LookupWineTypes LkupWT
@@ -853,11 +1462,13 @@ LEFT JOIN LookupWineAppellations LkupWA
   ON LWM.Appellation = LkupWA.AppellationName
 LEFT JOIN Producers WP
   ON LWM.ProducerName = WP.Name
+WHERE NOT EXISTS (SELECT 1 FROM Wines W WHERE W.WineId = LWM.WineId)
 """
 
     # Format string to create insert statement to create WinePricing records
     # from LegacyWineMaster records
     # where parameter suffix must be supplied.
+    # The wines already priced are skipped, so a rerun or resume only inserts the new wines.
     # used by get_insert_winepricing_from_legacy method
     _insert_winepricing_from_legacy_sql_fmt = """
 INSERT INTO WinePricing
@@ -897,11 +1508,13 @@ SELECT
     LWM.NJ_MultiCaseQty,
     LWM.PriceNotes
 FROM LegacyWineMaster{suffix} LWM
+WHERE NOT EXISTS (SELECT 1 FROM WinePricing WPr WHERE WPr.WineId = LWM.WineId)
 """
 
     # Format string to create insert statement to create WinePurchases records
     # from LegacyWineMaster records
     # where parameter suffix must be supplied.
+    # The purchases already migrated are skipped, so a rerun or resume only inserts the new purchases.
     # used by get_insert_winepurchases_from_legacy method
     # NOTE: Currently handle and convert integer discount percentages to fractional values
     _insert_winepurchases_from_legacy_sql_fmt = """
@@ -919,6 +1532,245 @@ SELECT
     if(LWM.TariffDiscount >= 1, LWM.TariffDiscount / 100, LWM.TariffDiscount)
 FROM LegacyWineMaster{suffix} LWM
 WHERE LWM.LastPurchaseDate IS NOT NULL
+  AND NOT EXISTS (SELECT 1 FROM WinePurchases WPu
+                  WHERE WPu.WineId = LWM.WineId AND WPu.PurchaseDate = LWM.LastPurchaseDate)
+"""
+
+    # The LegacyWineMaster price and cost columns compared by the snapshot price diff, by kind of change
+    _snapshot_fob_columns = ('FOBPrice', 'FOB_MA', 'FOB_ARB')
+    _snapshot_wholesale_columns = ('NY_Wholesale', 'NJ_Wholesale')
+    _snapshot_multi_case_columns = tuple(f'{state}_MultiCase{value}{i}'
+                                         for state in ('NY', 'NJ') for i in (1, 2, 3)
+                                         for value in ('Price', 'Qty'))
+    _snapshot_lpp_columns = ('LastPurchasePrice_PO', 'LastPurchasePrice_AE')
+
+    # Null safe "column changed" expression of each of the compared columns (<=> isn't in SQLite)
+    _snapshot_changed_sql = {column: f'COALESCE(O.{column} <> N.{column},'
+                                     f' O.{column} IS NOT NULL OR N.{column} IS NOT NULL)'
+                             for column in (_snapshot_fob_columns + _snapshot_wholesale_columns
+                                            + _snapshot_multi_case_columns + _snapshot_lpp_columns)}
+
+    # Format string to select the price and cost changes of every wine of the new snapshot
+    # from the old snapshot (w/ its current change flags) in one join of the snapshots
+    # where parameters old_suffix and new_suffix must be supplied.
+    # used by get_snapshot_price_diff_sql method
+    _snapshot_price_diff_sql_fmt = ("""
+SELECT N.WineId
+     , N.FullName
+     , O.WineId IS NULL AS Added
+     , (""" + '\n        OR '.join(map(_snapshot_changed_sql.get, _snapshot_fob_columns)) + """) AS FOBChanged
+     , (""" + '\n        OR '.join(map(_snapshot_changed_sql.get, _snapshot_wholesale_columns))
+        + """) AS WholesaleChanged
+     , (""" + '\n        OR '.join(map(_snapshot_changed_sql.get, _snapshot_multi_case_columns))
+        + """) AS MultiCaseChanged
+     , (""" + '\n        OR '.join(map(_snapshot_changed_sql.get, _snapshot_lpp_columns)) + """) AS LPPChanged
+     , O.FOBPrice
+     , N.FOBPrice
+     , O.NY_Wholesale
+     , N.NY_Wholesale
+     , O.LastPurchasePrice_PO
+     , N.LastPurchasePrice_PO
+     , N.LPP_Change
+     , N.FOB_Change
+     , N.PricingNeedsReview
+  FROM LegacyWineMaster{new_suffix} N
+  LEFT JOIN LegacyWineMaster{old_suffix} O ON O.WineId = N.WineId
+ ORDER BY N.WineId
+""")
+
+    # Format string to select the wines of the old snapshot which aren't in the new snapshot
+    # where parameters old_suffix and new_suffix must be supplied.
+    # used by get_snapshot_removed_wines_sql method
+    _snapshot_removed_wines_sql_fmt = """
+SELECT O.WineId
+     , O.FullName
+  FROM LegacyWineMaster{old_suffix} O
+  LEFT JOIN LegacyWineMaster{new_suffix} N ON N.WineId = O.WineId
+ WHERE N.WineId IS NULL
+ ORDER BY O.WineId
+"""
+
+    # Format string to set the price change flags of a wine of a snapshot
+    # where parameter suffix must be supplied.
+    # used by get_update_price_change_flags_sql method
+    _update_price_change_flags_sql_fmt = """
+UPDATE LegacyWineMaster{suffix}
+   SET LPP_Change = ?
+     , FOB_Change = ?
+     , PricingNeedsReview = ?
+ WHERE WineId = ?
+"""
+
+    # Format string to select the date of a legacy wine master snapshot (when it was last updated)
+    # where parameter suffix must be supplied.
+    # used by get_snapshot_date_sql method
+    _snapshot_date_sql_fmt = """
+SELECT MAX(LastUpdated)
+  FROM LegacyWineMaster{suffix}
+"""
+
+    # Format string to select the WinePricingHistory columns of the wines of a snapshot
+    # (the same values create_winepricing_from_legacy inserts in WinePricing)
+    # where parameter suffix must be supplied.
+    # used by get_snapshot_pricing_sql method
+    _snapshot_pricing_sql_fmt = """
+SELECT LWM.WineId
+     , if(LWM.Excluded != '', FALSE, TRUE)
+     , if(LWM.SoldOut != '', TRUE, FALSE)
+     , LWM.FOBPrice
+     , LWM.FOB_MA
+     , LWM.FOB_ARB
+     , LWM.NY_Wholesale
+     , LWM.NY_MultiCasePrice
+     , LWM.NY_MultiCaseQty
+     , LWM.NJ_Wholesale
+     , LWM.NJ_MultiCasePrice
+     , LWM.NJ_MultiCaseQty
+  FROM LegacyWineMaster{suffix} LWM
+"""
+
+    # Format string to select the last purchase of the wines of a snapshot
+    # (WinePurchaseHistory ValidFrom, PurchasePrice and TariffDiscount)
+    # where parameter suffix must be supplied.
+    # used by get_snapshot_purchases_sql method
+    _snapshot_purchases_sql_fmt = """
+SELECT LWM.WineId
+     , LWM.LastPurchaseDate_PO
+     , LWM.LastPurchasePrice_PO
+     , if(LWM.TariffDiscount >= 1, LWM.TariffDiscount / 100, LWM.TariffDiscount)
+  FROM LegacyWineMaster{suffix} LWM
+ WHERE LWM.LastPurchaseDate_PO IS NOT NULL
+   AND LWM.LastPurchasePrice_PO IS NOT NULL
+"""
+
+    # Select statements for the latest version (current or closed) of each wine in the history tables
+    latest_pricing_history_sql = """
+SELECT H.WineId, H.ValidFrom, H.ValidTo, H.RowHash
+  FROM WinePricingHistory H
+  JOIN (SELECT WineId, MAX(ValidFrom) AS ValidFrom
+          FROM WinePricingHistory
+         GROUP BY WineId) L ON L.WineId = H.WineId AND L.ValidFrom = H.ValidFrom
+"""
+
+    latest_purchase_history_sql = """
+SELECT H.WineId, H.ValidFrom, H.ValidTo, H.RowHash
+  FROM WinePurchaseHistory H
+  JOIN (SELECT WineId, MAX(ValidFrom) AS ValidFrom
+          FROM WinePurchaseHistory
+         GROUP BY WineId) L ON L.WineId = H.WineId AND L.ValidFrom = H.ValidFrom
+"""
+
+    # Insert and update statements to add, close and replace versions in the history tables
+    insert_pricing_history_sql = """
+INSERT INTO WinePricingHistory
+    (WineId, ValidFrom, ValidTo, Available, SoldOut, FOBPrice, FOB_MA, FOB_ARB,
+     NY_Wholesale, NY_MultiCasePrice, NY_MultiCaseQty, NJ_Wholesale, NJ_MultiCasePrice, NJ_MultiCaseQty,
+     RowHash)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+    close_pricing_history_sql = """
+UPDATE WinePricingHistory
+   SET ValidTo = ?
+ WHERE WineId = ? AND ValidFrom = ?
+"""
+
+    replace_pricing_history_sql = """
+UPDATE WinePricingHistory
+   SET Available = ?, SoldOut = ?, FOBPrice = ?, FOB_MA = ?, FOB_ARB = ?,
+       NY_Wholesale = ?, NY_MultiCasePrice = ?, NY_MultiCaseQty = ?,
+       NJ_Wholesale = ?, NJ_MultiCasePrice = ?, NJ_MultiCaseQty = ?,
+       RowHash = ?
+ WHERE WineId = ? AND ValidFrom = ?
+"""
+
+    insert_purchase_history_sql = """
+INSERT INTO WinePurchaseHistory
+    (WineId, ValidFrom, ValidTo, PurchasePrice, TariffDiscount, RowHash)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+    close_purchase_history_sql = """
+UPDATE WinePurchaseHistory
+   SET ValidTo = ?
+ WHERE WineId = ? AND ValidFrom = ?
+"""
+
+    replace_purchase_history_sql = """
+UPDATE WinePurchaseHistory
+   SET PurchasePrice = ?, TariffDiscount = ?, RowHash = ?
+ WHERE WineId = ? AND ValidFrom = ?
+"""
+
+    # Select statements for the version of a wine's prices and last purchase as of a date
+    # (parameters WineId, date, date), the last version starting on or before the date
+    # is found w/ one seek of the (WineId, ValidFrom) primary key
+    price_as_of_sql = """
+SELECT ValidFrom, ValidTo, Available, SoldOut, FOBPrice, FOB_MA, FOB_ARB,
+       NY_Wholesale, NY_MultiCasePrice, NY_MultiCaseQty, NJ_Wholesale, NJ_MultiCasePrice, NJ_MultiCaseQty
+  FROM WinePricingHistory
+ WHERE WineId = ? AND ValidFrom <= ? AND ValidTo > ?
+ ORDER BY ValidFrom DESC
+ LIMIT 1
+"""
+
+    purchase_as_of_sql = """
+SELECT ValidFrom, ValidTo, PurchasePrice, TariffDiscount
+  FROM WinePurchaseHistory
+ WHERE WineId = ? AND ValidFrom <= ? AND ValidTo > ?
+ ORDER BY ValidFrom DESC
+ LIMIT 1
+"""
+
+    # Select statement for the price book (see price_book_sql) of the prices as of a date
+    # (parameters date, date)
+    price_book_as_of_sql = """
+SELECT PH.WineId, PH.Available, PH.SoldOut, W.UnitsPerCase,
+       PH.FOBPrice, PH.FOB_MA, PH.FOB_ARB,
+       PH.NY_Wholesale, PH.NY_MultiCasePrice, PH.NY_MultiCaseQty,
+       PH.NJ_Wholesale, PH.NJ_MultiCasePrice, PH.NJ_MultiCaseQty
+  FROM WinePricingHistory PH
+  JOIN Wines W ON W.WineId = PH.WineId
+ WHERE PH.ValidFrom <= ? AND PH.ValidTo > ?
+"""
+
+    # Select statement for a consumer's change feed watermark of a table
+    # (parameters Consumer, TableName)
+    change_feed_watermark_sql = """
+SELECT LastModified, LastKey
+  FROM ChangeFeedWatermarks
+ WHERE Consumer = ? AND TableName = ?
+"""
+
+    # Replace statement to save a consumer's change feed watermark of a table
+    # (parameters Consumer, TableName, LastModified, LastKey, Updated)
+    save_change_feed_watermark_sql = """
+REPLACE INTO ChangeFeedWatermarks
+ (Consumer, TableName, LastModified, LastKey, Updated)
+ VALUES (?, ?, ?, ?, ?)
+"""
+
+    delete_change_feed_watermark_sql = """
+DELETE FROM ChangeFeedWatermarks
+ WHERE Consumer = ? AND TableName = ?
+"""
+
+    # Format string to create select statement for the next batch of the rows of a table
+    # changed after a change feed watermark, in (LastModified, key) order
+    # where parameters table, key and columns must be supplied.
+    # The statement's parameters are the watermark's LastModified (twice) and key,
+    # the latest LastModified to read and the batch size. The first LastModified
+    # condition is the seek of the (LastModified, key) index, the second skips the
+    # rows at the watermark's LastModified up to its key.
+    # used by get_changed_rows_sql method
+    _changed_rows_sql_fmt = """
+SELECT {columns}
+  FROM {table}
+ WHERE LastModified >= ?
+   AND (LastModified > ? OR {key} > ?)
+   AND LastModified <= ?
+ ORDER BY LastModified, {key}
+ LIMIT ?
 """
 
     @classmethod
@@ -928,9 +1780,226 @@ WHERE LWM.LastPurchaseDate IS NOT NULL
         records into the LegacyEmailOrders table with the given suffix.
 
         params is a dictionary with suffix, csvfile and datadir keys to be inserted
+        into the sql format string being returned, and an optional local key ('LOCAL '
+        to load a local file).
+        """
+        return cls._legacy_email_orders_load_data_sql_fmt.format(**{'local': '', **params})
+
+    @classmethod
+    def get_legacy_order_items_sql(cls, params):
+        """
+        Returns the sql statement to select the items of the legacy email orders
+        from the LegacyEmailOrders table with the given suffix.
+
+        params is a dictionary with a suffix key to be inserted
+        into the sql format string being returned.
+        """
+        return cls._legacy_order_items_sql_fmt.format(**params)
+
+    @classmethod
+    def get_legacy_order_columns_sql(cls, params):
+        """
+        Returns the sql statement to select the analytic columns (date, subtotal,
+        customer, retailer, state and items) of the legacy email orders
+        from the LegacyEmailOrders table with the given suffix.
+
+        params is a dictionary with a suffix key to be inserted
+        into the sql format string being returned.
+        """
+        return cls._legacy_order_columns_sql_fmt.format(**params)
+
+    @classmethod
+    def get_legacy_retailers_sql(cls, params):
+        """
+        Returns the sql statement to select the distinct retailers
+        from the LegacyEmailOrders table with the given suffix.
+
+        params is a dictionary with a suffix key to be inserted
+        into the sql format string being returned.
+        """
+        return cls._legacy_retailers_sql_fmt.format(**params)
+
+    @classmethod
+    def get_legacy_order_id_range_sql(cls, params):
+        """
+        Returns the sql statement to select the minimum and maximum EmailOrderId
+        from the LegacyEmailOrders table with the given suffix.
+
+        params is a dictionary with a suffix key to be inserted
+        into the sql format string being returned.
+        """
+        return cls._legacy_order_id_range_sql_fmt.format(**params)
+
+    @classmethod
+    def get_legacy_orders_to_migrate_sql(cls, params):
+        """
+        Returns the sql statement to select the order columns of the not yet migrated
+        orders in a range of EmailOrderIds from the LegacyEmailOrders table with the given suffix.
+
+        params is a dictionary with a suffix key to be inserted
+        into the sql format string being returned.
+        """
+        return cls._legacy_orders_to_migrate_sql_fmt.format(**params)
+
+    @classmethod
+    def get_customer_order_totals_sql(cls, params):
+        """
+        Returns the sql statement to select the first and last order dates, the number
+        of orders and the sum of the subtotals of each customer's legacy email orders
+        from the LegacyEmailOrders table with the given suffix.
+
+        params is a dictionary with a suffix key to be inserted
+        into the sql format string being returned.
+        """
+        return cls._customer_order_totals_sql_fmt.format(**params)
+
+    @classmethod
+    def get_export_table_sql(cls, params):
+        """
+        Returns the sql statement to select all of the rows of a table.
+
+        params is a dictionary with table and columns (comma separated) keys
+        to be inserted into the sql format string being returned.
+        """
+        return cls._export_table_sql_fmt.format(**params)
+
+    @classmethod
+    def get_delete_table_rows_sql(cls, params):
+        """
+        Returns the sql statement to delete all of the rows of a table.
+
+        params is a dictionary with a table key to be inserted
+        into the sql format string being returned.
+        """
+        return cls._delete_table_rows_sql_fmt.format(**params)
+
+    @classmethod
+    def get_drop_index_sql(cls, params):
+        """
+        Returns the sql statement to drop an index (of a SQLite table).
+
+        params is a dictionary with an index key to be inserted
+        into the sql format string being returned.
+        """
+        return cls._drop_index_sql_fmt.format(**params)
+
+    @classmethod
+    def get_add_column_sql(cls, params):
+        """
+        Returns the sql statement to add a column to a table.
+
+        params is a dictionary with table, column and type keys to be inserted
+        into the sql format string being returned.
+        """
+        return cls._add_column_sql_fmt.format(**params)
+
+    @classmethod
+    def get_restore_table_rows_sql(cls, params):
+        """
+        Returns the sql statement to insert the rows of a table from a snapshot.
+
+        params is a dictionary with table, columns (comma separated) and values
+        (comma separated placeholders) keys to be inserted into the sql format
+        string being returned.
+        """
+        return cls._restore_table_rows_sql_fmt.format(**params)
+
+    @classmethod
+    def get_explain_sql(cls, params):
+        """
+        Returns the sql statement to get the query plan of a statement.
+
+        params is a dictionary with a statement key to be inserted
+        into the sql format string being returned.
+        """
+        return cls._explain_sql_fmt.format(**params)
+
+    @classmethod
+    def get_sqlite_explain_sql(cls, params):
+        """
+        Returns the sql statement to get the query plan of a statement
+        in the SQLite database.
+        SQLite doesn't check that the schema of a prepared EXPLAIN statement is
+        current, and sqlite3 caches the prepared statements, so the statement
+        includes the schema version.
+
+        params is a dictionary with statement and schema_version keys to be inserted
         into the sql format string being returned.
         """
-        return cls._legacy_email_orders_load_data_sql_fmt.format(**params)
+        return cls._sqlite_explain_sql_fmt.format(**params)
+
+    @classmethod
+    def get_analyze_table_sql(cls, params):
+        """
+        Returns the sql statement to update the index statistics of a table.
+
+        params is a dictionary with a table key to be inserted
+        into the sql format string being returned.
+        """
+        return cls._analyze_table_sql_fmt.format(**params)
+
+    @classmethod
+    def get_sqlite_analyze_table_sql(cls, params):
+        """
+        Returns the sql statement to update the index statistics of a table
+        in the SQLite database.
+
+        params is a dictionary with a table key to be inserted
+        into the sql format string being returned.
+        """
+        return cls._sqlite_analyze_table_sql_fmt.format(**params)
+
+    @classmethod
+    def get_create_index_sql(cls, params):
+        """
+        Returns the sql statement to create an index of a table.
+
+        params is a dictionary with index, table and columns (comma separated)
+        keys to be inserted into the sql format string being returned, and an
+        optional kind key ('UNIQUE ' or 'FULLTEXT ').
+        """
+        return cls._create_index_sql_fmt.format(**{'kind': '', **params})
+
+    @classmethod
+    def get_drop_table_index_sql(cls, params):
+        """
+        Returns the sql statement to drop an index of a (mariadb) table.
+
+        params is a dictionary with index and table keys to be inserted
+        into the sql format string being returned.
+        """
+        return cls._drop_table_index_sql_fmt.format(**params)
+
+    @classmethod
+    def get_count_table_rows_sql(cls, params):
+        """
+        Returns the sql statement to count the rows of a table.
+
+        params is a dictionary with a table key to be inserted
+        into the sql format string being returned.
+        """
+        return cls._count_table_rows_sql_fmt.format(**params)
+
+    @classmethod
+    def get_drop_table_sql(cls, params):
+        """
+        Returns the sql statement to drop a table.
+
+        params is a dictionary with a table key to be inserted
+        into the sql format string being returned.
+        """
+        return cls._drop_table_sql_fmt.format(**params)
+
+    @classmethod
+    def get_legacy_order_addresses_sql(cls, params):
+        """
+        Returns the sql statement to select the addresses of the orders
+        from the LegacyEmailOrders table with the given suffix.
+
+        params is a dictionary with a suffix key to be inserted
+        into the sql format string being returned.
+        """
+        return cls._legacy_order_addresses_sql_fmt.format(**params)
 
     @classmethod
     def get_legacy_wine_master_load_data(cls, params):
@@ -939,9 +2008,10 @@ WHERE LWM.LastPurchaseDate IS NOT NULL
         records into the LegacyWineMaster table with the given suffix.
 
         params is a dictionary with suffix, csvfile and datadir keys to be inserted
-        into the sql format string being returned.
+        into the sql format string being returned, and an optional local key ('LOCAL '
+        to load a local file).
         """
-        return cls._legacy_wine_master_load_data_sql_fmt.format(**params)
+        return cls._legacy_wine_master_load_data_sql_fmt.format(**{'local': '', **params})
 
     @classmethod
     def get_legacy_wines_by_producer_sql(cls, params):
@@ -954,6 +2024,18 @@ WHERE LWM.LastPurchaseDate IS NOT NULL
         """
         return cls._legacy_wines_by_producer_sql_fmt.format(**params)
 
+    @classmethod
+    def get_migrated_producer_names_sql(cls, params):
+        """
+        Returns the sql statement to select the ProducerNames of
+        the LegacyWineMaster table with the given suffix which have
+        already been migrated to Producers.
+
+        params is a dictionary with a suffix key to be inserted
+        into the sql format string being returned.
+        """
+        return cls._migrated_producer_names_sql_fmt.format(**params)
+
     @classmethod
     def get_insert_wines_from_legacy_sql(cls, params):
         """
@@ -986,3 +2068,80 @@ WHERE LWM.LastPurchaseDate IS NOT NULL
         into the sql format string being returned.
         """
         return cls._insert_winepurchases_from_legacy_sql_fmt.format(**params)
+
+    @classmethod
+    def get_snapshot_price_diff_sql(cls, params):
+        """
+        Returns the sql statement to select the price and cost changes of the wines
+        of the LegacyWineMaster table with the new suffix from the one with the old suffix.
+
+        params is a dictionary with old_suffix and new_suffix keys to be inserted
+        into the sql format string being returned.
+        """
+        return cls._snapshot_price_diff_sql_fmt.format(**params)
+
+    @classmethod
+    def get_snapshot_removed_wines_sql(cls, params):
+        """
+        Returns the sql statement to select the wines of the LegacyWineMaster table
+        with the old suffix which aren't in the one with the new suffix.
+
+        params is a dictionary with old_suffix and new_suffix keys to be inserted
+        into the sql format string being returned.
+        """
+        return cls._snapshot_removed_wines_sql_fmt.format(**params)
+
+    @classmethod
+    def get_update_price_change_flags_sql(cls, params):
+        """
+        Returns the sql statement to set the price change flags of a wine of
+        the LegacyWineMaster table with the given suffix.
+
+        params is a dictionary with a suffix key to be inserted
+        into the sql format string being returned.
+        """
+        return cls._update_price_change_flags_sql_fmt.format(**params)
+
+    @classmethod
+    def get_snapshot_date_sql(cls, params):
+        """
+        Returns the sql statement to select the date the LegacyWineMaster table
+        with the given suffix was last updated.
+
+        params is a dictionary with a suffix key to be inserted
+        into the sql format string being returned.
+        """
+        return cls._snapshot_date_sql_fmt.format(**params)
+
+    @classmethod
+    def get_snapshot_pricing_sql(cls, params):
+        """
+        Returns the sql statement to select the WinePricingHistory values of the wines
+        of the LegacyWineMaster table with the given suffix.
+
+        params is a dictionary with a suffix key to be inserted
+        into the sql format string being returned.
+        """
+        return cls._snapshot_pricing_sql_fmt.format(**params)
+
+    @classmethod
+    def get_snapshot_purchases_sql(cls, params):
+        """
+        Returns the sql statement to select the last purchase of the wines
+        of the LegacyWineMaster table with the given suffix.
+
+        params is a dictionary with a suffix key to be inserted
+        into the sql format string being returned.
+        """
+        return cls._snapshot_purchases_sql_fmt.format(**params)
+
+    @classmethod
+    def get_changed_rows_sql(cls, params):
+        """
+        Returns the sql statement to select the next batch of the rows of a table
+        changed after a change feed watermark.
+
+        params is a dictionary with table, key and columns keys to be inserted
+        into the sql format string being returned.
+        """
+        return cls._changed_rows_sql_fmt.format(**params)
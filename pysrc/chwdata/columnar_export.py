@@ -0,0 +1,257 @@
+"""
+################################################################################
+  chwdata.columnar_export.py
+################################################################################
+
+This module exports a snapshot of the chw database tables to columnar files
+(Parquet or Arrow IPC) for offline analytics, so that questions such as the wines
+ordered per customer can be answered w/ pyarrow, pandas, duckdb, etc. without
+querying the production database.
+
+Each table is exported by its own worker thread (w/ its own connection), and its
+rows are streamed in batches of fetch_size rows (see CHW_DB.stream_batches) so
+that a table is never held in memory. The columns' arrow types are determined
+from the tables' declared sql types. A manifest.json file listing the tables,
+their columns and row counts is written w/ the table files.
+
+pyarrow is an optional dependency, it is only needed (and imported) to export.
+
+Python naming convention reminder note: single underscore prefix class names are
+for "private" internal use and should not be considered part of the public API.
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+import json
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+# Third party imports
+
+# Local application imports
+from .chw_db import CHW_DB
+from .chw_sql import CHW_SQL
+from .retail_orders import RetailOrders
+
+
+default_export_dir = Path(__file__).resolve().parents[2] / 'data' / 'export'
+
+# The tables exported by default
+snapshot_tables = ('Producers',
+                   'Wines',
+                   'WinePricing',
+                   'WinePurchases',
+                   'EmailCustomers',
+                   'Orders',
+                   'Orders_Wines',
+                   f'LegacyEmailOrders{RetailOrders.LEGACY_ORDERS_TABLE_SUFFIX}',
+                   'EmailCustomers_LegacyEmailOrders',
+                   'Wines_LegacyEmailOrders',
+                  )
+
+# The columnar file formats and their file extension
+export_formats = {'parquet': '.parquet', 'arrow': '.arrow'}
+# The compression codecs (none is needed to memory map arrow files w/o copying)
+export_compressions = ('zstd', 'lz4', 'none')
+
+# The number of rows in each batch (and parquet row group) of an exported table
+default_export_fetch_size = 50_000
+
+_re_sql_type = re.compile(r'^\s*(\w+)(?:\s*\(\s*(\d+)(?:\s*,\s*(\d+))?\s*\))?')
+
+
+def import_pyarrow():
+    """
+    Import and return the pyarrow module (w/ its parquet and ipc submodules loaded)
+    """
+    # pyarrow is optional and slow to import so it is only imported when exporting
+    # pylint: disable=import-outside-toplevel
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        print('pyarrow is not installed, pip install pyarrow to export snapshots')
+        sys.exit(1)
+
+
+def arrow_type(pa, sql_type):
+    """
+    Get the pyarrow type of the values of a column w/ the given (declared) sql type
+    e.g. 'DECIMAL(8,2)' -> decimal128(8, 2), 'VARCHAR(50)' -> string
+    """
+    m = _re_sql_type.match(sql_type or '')
+    name = m.group(1).lower() if m else ''
+    if name in ('bool', 'boolean') or (name == 'tinyint' and m.group(2) == '1'):
+        return pa.bool_()
+    if name in ('tinyint', 'smallint', 'mediumint', 'int', 'integer', 'year'):
+        return pa.int32()
+    if name == 'bigint':
+        return pa.int64()
+    if name in ('decimal', 'numeric'):
+        return pa.decimal128(int(m.group(2) or 10), int(m.group(3) or 0))
+    if name in ('float', 'double', 'real'):
+        return pa.float64()
+    if name == 'date':
+        return pa.date32()
+    if name in ('datetime', 'timestamp'):
+        return pa.timestamp('us')
+    if name in ('blob', 'binary', 'varbinary'):
+        return pa.binary()
+    return pa.string()
+
+
+def _to_bool(values):
+    """
+    Convert the values of a BOOLEAN column (which are returned as ints) to bools
+    """
+    return [None if value is None else bool(value) for value in values]
+
+
+def _to_str(values):
+    """
+    Convert the values of a column w/o a declared type (which SQLite stores as they
+    were inserted, e.g. the columns added by the LOAD DATA emulation) to strings
+    """
+    return [value if value is None or isinstance(value, str) else str(value) for value in values]
+
+
+def _get_converter(pa, sql_type):
+    """
+    Get the function to convert the values of a column w/ the given (declared) sql
+    type to values of its arrow type, or None if they don't need to be converted
+    """
+    if not sql_type:
+        return _to_str
+    return _to_bool if arrow_type(pa, sql_type) == pa.bool_() else None
+
+
+class ColumnarExport(CHW_DB):
+    """
+    Exports chw tables to columnar files. Each instance has its own connection
+    (it doesn't use a shared connection) so that tables can be exported by
+    instances in different threads.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(shared=False, **kwargs)
+
+    def export_table(self, table, path, *, fmt='parquet', compression='zstd',
+                     fetch_size=default_export_fetch_size):
+        """
+        Export the rows of the table to a columnar file at path
+        returning the table's columns as (name, sql type) and the number of rows
+        """
+        pa = import_pyarrow()
+        columns = self.get_table_columns(table)
+        schema = pa.schema([(name, arrow_type(pa, sql_type)) for name, sql_type in columns])
+        converters = [_get_converter(pa, sql_type) for _, sql_type in columns]
+        codec = None if compression == 'none' else compression
+
+        if fmt == 'parquet':
+            writer = pa.parquet.ParquetWriter(path, schema, compression=codec or 'none')
+        else:
+            writer = pa.ipc.new_file(path, schema, options=pa.ipc.IpcWriteOptions(compression=codec))
+
+        row_cnt = 0
+        with writer:
+            sql = CHW_SQL.get_export_table_sql({'table': table,
+                                                'columns': ', '.join(name for name, _ in columns)})
+            for rows in self.stream_batches(sql, fetch_size=fetch_size):
+                arrays = [pa.array(convert(values) if convert is not None else values, type=field.type)
+                          for values, field, convert in zip(zip(*rows), schema, converters)]
+                writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+                row_cnt += len(rows)
+
+        return columns, row_cnt
+
+
+def _export_table(table, path, fmt, compression, fetch_size):
+    """
+    Export a table using a new ColumnarExport (run by the export worker threads)
+    """
+    t = time.perf_counter()
+    columnar_export = ColumnarExport()
+    try:
+        columns, row_cnt = columnar_export.export_table(table, path, fmt=fmt, compression=compression,
+                                                        fetch_size=fetch_size)
+    finally:
+        columnar_export.close()
+    return {'table': table,
+            'file': path.name,
+            'rows': row_cnt,
+            'columns': [{'name': name, 'type': sql_type} for name, sql_type in columns],
+            'secs': round(time.perf_counter() - t, 3),
+           }
+
+
+def export_tables(snapshot_dir, tables, *, fmt='parquet', compression='zstd', jobs=4,
+                  fetch_size=default_export_fetch_size):
+    """
+    Export the tables to files in the (existing) snapshot_dir, exporting up to jobs
+    tables at a time in parallel, and write the manifest.json of the exported tables.
+    Returns the manifest.
+    """
+    started = datetime.now()
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(_export_table, table, snapshot_dir / f'{table}{export_formats[fmt]}',
+                                   fmt, compression, fetch_size)
+                   for table in tables]
+        exported = [future.result() for future in futures]
+
+    manifest = {'created': started.isoformat(timespec='seconds'),
+                'format': fmt,
+                'compression': compression,
+                'tables': exported,
+               }
+    with open(snapshot_dir / 'manifest.json', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+        f.write('\n')
+
+    return manifest
+
+
+def export_snapshot(export_dir=None, *, tables=snapshot_tables, fmt='parquet', compression='zstd',
+                    jobs=4, fetch_size=default_export_fetch_size):
+    """
+    Export the tables to a new snapshot directory (named chw-<date>-<time>) in
+    export_dir, exporting up to jobs tables at a time in parallel.
+    Returns the path of the snapshot directory and the manifest of the snapshot.
+    """
+    import_pyarrow()
+    export_dir = Path(export_dir if export_dir is not None else default_export_dir)
+    snapshot_dir = export_dir / f'chw-{datetime.now():%Y%m%d-%H%M%S}'
+    snapshot_dir.mkdir(parents=True)
+
+    manifest = export_tables(snapshot_dir, tables, fmt=fmt, compression=compression, jobs=jobs,
+                             fetch_size=fetch_size)
+    return snapshot_dir, manifest
+
+
+def do_export_snapshot(export_dir=None, *, tables=None, fmt='parquet', compression='zstd', jobs=4):
+    t = time.perf_counter()
+    snapshot_dir, manifest = export_snapshot(export_dir, tables=tables or snapshot_tables, fmt=fmt,
+                                             compression=compression, jobs=jobs)
+    for table in manifest['tables']:
+        print(f'{table["table"]:40} {table["rows"]:10} rows ({table["secs"]:.3f} secs)')
+    print(f'Snapshot exported to {snapshot_dir} ({time.perf_counter() - t:.3f} secs)')
+
+
+def _test():
+    pass
+
+
+if __name__ == '__main__':
+    _test()
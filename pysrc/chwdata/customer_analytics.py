@@ -0,0 +1,266 @@
+"""
+################################################################################
+  chwdata.customer_analytics.py
+################################################################################
+
+This module computes the recency, frequency and monetary value (RFM), lifetime
+value, lifetime bottles and favorite producers of every email customer, and
+writes them to the EmailCustomerSummaries table so reports can rank and segment
+customers w/ a join instead of a hand maintained list of top customers.
+
+The database aggregates the orders of each customer in one grouped pass over
+the legacy orders (dates and subtotals) and one over the migrated order wines
+(bottles by producer). The per customer values are then held in typed arrays
+(the array module) and scored for all customers at once: each score is the
+quintile (1-5) of the customer's value found by a binary search of the sorted
+values, so customers w/ equal values get equal scores.
+
+Python naming convention reminder note: single underscore prefix class names are
+for "private" internal use and should not be considered part of the public API.
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+import bisect
+import functools
+import heapq
+import operator
+import sys
+import time
+from array import array
+from datetime import date
+
+# Third party imports
+
+# Local application imports
+from .chw_db import CHW_DB
+from .chw_sql import CHW_SQL
+from .retail_orders import RetailOrders
+
+
+# The number of RFM scores (quintiles)
+score_count = 5
+
+# The number of producers listed in FavoriteProducers
+favorite_producer_count = 3
+
+# The date of the orders w/o a date (as when the customers are created from the legacy orders)
+_no_order_date = date(1970, 1, 1)
+
+# The RFM segment of the recency and frequency scores, the first whose ranges
+# contain the scores: (segment, min recency, max recency, min frequency, max frequency)
+rfm_segments = (('Champions',       4, 5, 4, 5),
+                ('Loyal',           3, 5, 3, 5),
+                ('New',             5, 5, 1, 1),
+                ('Promising',       4, 5, 1, 2),
+                ('Needs Attention', 3, 3, 1, 2),
+                ('At Risk',         1, 2, 3, 5),
+                ('Hibernating',     1, 2, 1, 2),
+               )
+
+_segment_of_scores = {(r, f): next(segment for segment, min_r, max_r, min_f, max_f in rfm_segments
+                                   if min_r <= r <= max_r and min_f <= f <= max_f)
+                      for r in range(1, score_count + 1) for f in range(1, score_count + 1)}
+
+
+def _date_ordinal(value):
+    """
+    Get the ordinal of a date column value, the aggregates of a DATE column are
+    strings in SQLite (they have no declared type) and NULL is _no_order_date
+    """
+    if value is None:
+        return _no_order_date.toordinal()
+    if isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    return value.toordinal()
+
+
+def quintile_scores(values):
+    """
+    Get the score (1-5, see score_count) of each of the values as an array, the score
+    is the quintile of the number of values less than the value, so the largest
+    values score 5 and equal values get the same score.
+    """
+    n = len(values)
+    if n == 0:
+        return array('b')
+    rank = functools.partial(bisect.bisect_left, sorted(values))
+    return array('b', map((1).__add__, map((n).__rfloordiv__, map(score_count.__mul__, map(rank, values)))))
+
+
+class CustomerSummaries:
+    """
+    The summary values of the customers (one row per customer) as typed arrays,
+    the dates are proleptic Gregorian ordinals (see date.toordinal).
+    """
+
+    def __init__(self, as_of):
+        self.as_of = as_of
+        self.customer_id = array('i')
+        self.first_order = array('i')
+        self.last_order = array('i')
+        self.order_count = array('i')
+        self.subtotal_count = array('i')
+        self.lifetime_value = array('d')
+        self.lifetime_bottles = array('i')
+        self.favorite_producer_id = []
+        self.favorite_producers = []
+
+        self.recency_days = array('i')
+        self.recency_score = array('b')
+        self.frequency_score = array('b')
+        self.monetary_score = array('b')
+        self.segment = []
+
+    def __len__(self):
+        return len(self.customer_id)
+
+    def score(self):
+        """
+        Compute the recency (days since the last order) and the RFM scores and
+        segment of all of the customers
+        """
+        self.recency_days = array('i', map(self.as_of.toordinal().__sub__, self.last_order))
+        # the fewer days since the last order the better
+        self.recency_score = quintile_scores(array('i', map(operator.neg, self.recency_days)))
+        self.frequency_score = quintile_scores(self.order_count)
+        self.monetary_score = quintile_scores(self.lifetime_value)
+        self.segment = list(map(_segment_of_scores.__getitem__,
+                                zip(self.recency_score, self.frequency_score)))
+
+    def get_rows(self):
+        """
+        Generate the EmailCustomerSummaries rows of the customers
+        """
+        no_date = _no_order_date.toordinal()
+        as_of = self.as_of.toordinal()
+        for i in range(len(self)):
+            first_order, last_order = self.first_order[i], self.last_order[i]
+            dated = last_order != no_date
+            lifetime_value = self.lifetime_value[i]
+            years = max((as_of - first_order) / 365.25, 1.0) if dated else 1.0
+            yield (self.customer_id[i],
+                   date.fromordinal(first_order) if dated else None,
+                   date.fromordinal(last_order) if dated else None,
+                   self.recency_days[i] if dated else None,
+                   self.order_count[i],
+                   round(lifetime_value, 2),
+                   round(lifetime_value / self.subtotal_count[i], 2) if self.subtotal_count[i] else 0,
+                   round(lifetime_value / years, 2),
+                   self.lifetime_bottles[i],
+                   self.favorite_producer_id[i],
+                   self.favorite_producers[i],
+                   self.recency_score[i],
+                   self.frequency_score[i],
+                   self.monetary_score[i],
+                   self.segment[i],
+                   self.as_of)
+
+
+class CustomerAnalytics(CHW_DB):
+    """
+    An instance of CustomerAnalytics is created with the MariaDB
+    domain, port and db name of the chw database to
+    be worked on.
+
+    It computes the EmailCustomerSummaries of the email customers
+    from their orders.
+    """
+
+    # Max length of EmailCustomerSummaries FavoriteProducers
+    MAX_FAVORITE_PRODUCERS_LEN = 250
+
+    def get_summaries(self, as_of=None):
+        """
+        Get the CustomerSummaries of the customers w/ legacy orders as of the given
+        date (default today), scored (see CustomerSummaries.score).
+        The customers must have been created, and the bottles and favorite producers
+        are those of the order items which were matched to wines and migrated
+        (see RetailOrders.create_orders_from_legacy).
+        """
+        summaries = CustomerSummaries(as_of if as_of is not None else date.today())
+        sql = CHW_SQL.get_customer_order_totals_sql({'suffix': RetailOrders.LEGACY_ORDERS_TABLE_SUFFIX})
+        for (customer_id, first_order, last_order, order_count, subtotal_count,
+             subtotal_sum) in self.stream_rows(sql):
+            summaries.customer_id.append(customer_id)
+            summaries.first_order.append(_date_ordinal(first_order))
+            summaries.last_order.append(_date_ordinal(last_order))
+            summaries.order_count.append(order_count)
+            summaries.subtotal_count.append(subtotal_count)
+            summaries.lifetime_value.append(float(subtotal_sum or 0))
+
+        producer_bottles = {}
+        producer_bottles_rows = self.stream_rows(CHW_SQL.customer_producer_bottles_sql)
+        for customer_id, producer_id, name, bottles in producer_bottles_rows:
+            producer_bottles.setdefault(customer_id, []).append((int(bottles or 0), producer_id, name))
+
+        for customer_id in summaries.customer_id:
+            bottles = producer_bottles.get(customer_id, ())
+            favorites = heapq.nlargest(favorite_producer_count, bottles)
+            summaries.lifetime_bottles.append(sum(map(operator.itemgetter(0), bottles)))
+            summaries.favorite_producer_id.append(favorites[0][1] if favorites else None)
+            summaries.favorite_producers.append(
+                ', '.join(name for _, _, name in favorites)[:self.MAX_FAVORITE_PRODUCERS_LEN]
+                if favorites else None)
+
+        summaries.score()
+        return summaries
+
+    def write_summaries(self, summaries, batch_size=5000):
+        """
+        Replace the EmailCustomerSummaries records w/ the summaries
+        """
+        with self._connection.cursor(prepared=True) as insert_summary_cursor:
+            insert_summary_cursor.execute(CHW_SQL.delete_customer_summaries_sql)
+            batch = []
+            for row in summaries.get_rows():
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    insert_summary_cursor.executemany(CHW_SQL.insert_customer_summary_sql, batch)
+                    batch = []
+            if batch:
+                insert_summary_cursor.executemany(CHW_SQL.insert_customer_summary_sql, batch)
+
+        self._connection.commit()
+
+    def write_segment_report(self):
+        """
+        Write the number of customers, their lifetime value and bottles in each RFM segment to stdout
+        """
+        f = sys.stdout
+        f.write(f'| {"Segment":16} | {"Customers":>9} | {"Lifetime Value":>16} | {"Bottles":>10} |\n')
+        f.write(f'| :{"-" * 15} | {"-" * 8}: | {"-" * 15}: | {"-" * 9}: |\n')
+        for segment, customers, value, bottles in self.stream_rows(CHW_SQL.customer_segments_sql):
+            f.write(f'| {segment:16} | {customers:9,} | {float(value or 0):16,.2f}'
+                    f' | {int(bottles or 0):10,} |\n')
+
+
+# Public action functions to be called by the CLI
+
+def do_compute_customer_summaries(as_of=None):
+    t = time.perf_counter()
+    customer_analytics = CustomerAnalytics()
+    summaries = customer_analytics.get_summaries(as_of)
+    scoretime = time.perf_counter() - t
+    customer_analytics.write_summaries(summaries)
+    exectime = time.perf_counter() - t
+    print(f'Customer summaries: {len(summaries)} as of {summaries.as_of}'
+          f' (computed {scoretime:.3f} secs, total {exectime:.3f} secs)\n')
+    customer_analytics.write_segment_report()
+
+
+def _test():
+    print(quintile_scores(array('d', [10, 0, 5, 5, 100, 3, 3, 3, 7, 1])))
+    print(_segment_of_scores)
+
+
+if __name__ == '__main__':
+    _test()
@@ -0,0 +1,429 @@
+"""
+################################################################################
+  chwdata.customer_documents.py
+################################################################################
+
+This module maintains a denormalized document projection of the email customers,
+one JSON document per EmailCustomer w/ their phone numbers, shipping addresses
+and orders (w/ their line items) embedded, so that looking up what a customer
+has ordered is a single key read instead of joining the customer, order and wine
+tables.
+
+The documents are kept in a document store:
+- sqlite: an embedded store, a SQLite file of JSON documents keyed by customer
+          (the default, which needs no server)
+- mongo:  the chw-mongo container (requires pymongo, pip install pymongo)
+
+The documents are built in bulk after the orders are migrated, and updated
+incrementally: a signature of each customer's rows (a hash of every column of
+the customer, phone number, address, order and order item rows their document
+is made from, including the retailer names and wine names) is stored w/ their
+document, and only the documents of the customers whose signature has changed
+are rebuilt (the documents of deleted customers are removed). Each row is
+hashed on its own and a customer's row hashes are summed, so the signatures are
+read in one pass over each table w/o sorting the rows by customer.
+
+Python naming convention reminder note: single underscore prefix class names are
+for "private" internal use and should not be considered part of the public API.
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+import hashlib
+import json
+import sqlite3
+import sys
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+
+# Third party imports
+
+# Local application imports
+from .chw_db import CHW_DB
+from .chw_sql import CHW_SQL
+
+
+default_document_dir = Path(__file__).resolve().parents[2] / 'data' / 'documents'
+
+# The mongodb of the chw-mongo container
+default_mongo_uri = 'mongodb://127.0.0.1:27017'
+default_mongo_db_name = 'chw'
+
+# The name of the customer documents table (sqlite) or collection (mongo)
+customer_documents_name = 'customer_documents'
+
+# The most EmailCustomerIds spanned by the range of customers whose rows are read at once
+customers_per_chunk = 1000
+
+
+def import_pymongo():
+    """
+    Import and return the pymongo module, exiting w/ a message if it isn't installed
+    """
+    try:
+        import pymongo  # pylint: disable=import-outside-toplevel
+        return pymongo
+    except ImportError:
+        print('The mongo document store requires pymongo,'
+              ' use the sqlite document store or pip install pymongo')
+        sys.exit(1)
+
+
+# The statements of the rows hashed into the document signatures, the customers first
+_signature_sqls = (CHW_SQL.customer_document_signatures_sql,
+                   CHW_SQL.customer_phone_number_signatures_sql,
+                   CHW_SQL.customer_address_signatures_sql,
+                   CHW_SQL.customer_order_signatures_sql,
+                   CHW_SQL.customer_order_wine_signatures_sql)
+
+# The signatures are the sums of the 128 bit row hashes, mod 2**128
+_signature_mask = (1 << 128) - 1
+
+
+def _row_hash(source, values):
+    """
+    The hash (as an int) of a row of the _signature_sqls statement source w/o its EmailCustomerId
+    """
+    key = json.dumps([source, *map(_json_value, values)])
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=16).digest(), 'big')
+
+
+def _json_value(value):
+    """
+    Convert a column value to a JSON value, dates are ISO format strings and
+    decimals are strings so that prices are exact
+    """
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _id_chunks(ids, span):
+    """
+    Split the sorted ids into lists whose first and last ids are less than span apart
+    """
+    chunk = []
+    for id_ in ids:
+        if chunk and id_ - chunk[0] >= span:
+            yield chunk
+            chunk = []
+        chunk.append(id_)
+    if chunk:
+        yield chunk
+
+
+class SQLiteDocumentStore:
+    """
+    An embedded document store, the documents are JSON text keyed by their id in
+    a SQLite database file. Documents may also be looked up by their (lowercase) email.
+    """
+
+    _create_sql = f"""
+CREATE TABLE IF NOT EXISTS {customer_documents_name}
+ ( Id INTEGER PRIMARY KEY
+ , Email TEXT
+ , Signature TEXT NOT NULL
+ , Document TEXT NOT NULL
+ )
+"""
+    _create_email_index_sql = (f'CREATE INDEX IF NOT EXISTS {customer_documents_name}_email_idx'
+                               f' ON {customer_documents_name} (Email)')
+    _get_sql = f'SELECT Document FROM {customer_documents_name} WHERE Id = ?'
+    _get_by_email_sql = f'SELECT Document FROM {customer_documents_name} WHERE Email = ? ORDER BY Id'
+    _signatures_sql = f'SELECT Id, Signature FROM {customer_documents_name}'
+    _put_sql = (f'INSERT OR REPLACE INTO {customer_documents_name} (Id, Email, Signature, Document)'
+                ' VALUES (?, ?, ?, ?)')
+    _delete_sql = f'DELETE FROM {customer_documents_name} WHERE Id = ?'
+    _clear_sql = f'DELETE FROM {customer_documents_name}'
+    _count_sql = f'SELECT COUNT(*) FROM {customer_documents_name}'
+
+    def __init__(self, path=None):
+        self.path = (Path(path) if path is not None
+                     else default_document_dir / f'{customer_documents_name}.sqlite3')
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path)
+        self._db.execute('PRAGMA journal_mode = WAL')
+        self._db.execute(self._create_sql)
+        self._db.execute(self._create_email_index_sql)
+        self._db.commit()
+
+    def get(self, doc_id):
+        row = self._db.execute(self._get_sql, (doc_id,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def get_by_email(self, email):
+        rows = self._db.execute(self._get_by_email_sql, (email.strip().lower(),))
+        return [json.loads(row[0]) for row in rows]
+
+    def get_signatures(self):
+        return dict(self._db.execute(self._signatures_sql))
+
+    def put_many(self, documents):
+        """
+        Insert or replace the (id, email, signature, document) documents
+        """
+        self._db.executemany(self._put_sql, ((doc_id, email.strip().lower(), signature, json.dumps(document))
+                                             for doc_id, email, signature, document in documents))
+        self._db.commit()
+
+    def delete_many(self, doc_ids):
+        self._db.executemany(self._delete_sql, ((doc_id,) for doc_id in doc_ids))
+        self._db.commit()
+
+    def clear(self):
+        self._db.execute(self._clear_sql)
+        self._db.commit()
+
+    def count(self):
+        return self._db.execute(self._count_sql).fetchone()[0]
+
+    def close(self):
+        self._db.close()
+
+
+class MongoDocumentStore:
+    """
+    A document store in a mongodb collection, each document is stored as
+    {_id, email, signature, document}. Requires pymongo.
+    """
+
+    def __init__(self, uri=None):
+        pymongo = import_pymongo()
+        self._pymongo = pymongo
+        self._client = pymongo.MongoClient(uri if uri is not None else default_mongo_uri)
+        self._collection = self._client[default_mongo_db_name][customer_documents_name]
+        self._collection.create_index('email')
+
+    def get(self, doc_id):
+        record = self._collection.find_one({'_id': doc_id}, {'document': 1})
+        return record['document'] if record is not None else None
+
+    def get_by_email(self, email):
+        return [record['document'] for record in
+                self._collection.find({'email': email.strip().lower()}, {'document': 1}).sort('_id')]
+
+    def get_signatures(self):
+        return {record['_id']: record['signature'] for record in self._collection.find({}, {'signature': 1})}
+
+    def put_many(self, documents):
+        """
+        Insert or replace the (id, email, signature, document) documents
+        """
+        requests = [self._pymongo.ReplaceOne({'_id': doc_id},
+                                             {'email': email.strip().lower(),
+                                              'signature': signature,
+                                              'document': document},
+                                             upsert=True)
+                    for doc_id, email, signature, document in documents]
+        if requests:
+            self._collection.bulk_write(requests, ordered=False)
+
+    def delete_many(self, doc_ids):
+        self._collection.delete_many({'_id': {'$in': list(doc_ids)}})
+
+    def clear(self):
+        self._collection.delete_many({})
+
+    def count(self):
+        return self._collection.count_documents({})
+
+    def close(self):
+        self._client.close()
+
+
+# The document stores by name
+document_stores = {'sqlite': SQLiteDocumentStore,
+                   'mongo': MongoDocumentStore,
+                  }
+
+
+def open_document_store(store='sqlite', location=None):
+    """
+    Open the named document store, location is the path of the sqlite store's file
+    or the uri of the mongo server (None for the default)
+    """
+    return document_stores[store](location)
+
+
+class CustomerDocuments(CHW_DB):
+    """
+    Builds the customer documents from the EmailCustomers, their phone numbers,
+    shipping addresses and orders, e.g.
+    {
+      "EmailCustomerId": 1, "Title": null, "GivenName": "Jo", "Surname": "Smith", "Suffix": null,
+      "Email": "jo@example.com", "Created": "...", "LastModified": "...",
+      "PhoneNumbers": [{"N": 1, "PhoneNumber": "...", "Type": "home"}],
+      "ShippingAddresses": [{"AddressId": 5, "Street": "...", "Street2": null, "City": "...", ...}],
+      "Orders": [{"OrderId": 7, "OrderDate": "2019-02-01", "AccountingOrderNo": "...",
+                  "Retailer": "...", "AddressId": 5, "AdditionalCharges": null, "Notes": null,
+                  "Items": [{"WineId": 3, "FullName": "...", "Vintage": 2015, "QtyCases": 1,
+                             "QtyUnits": 0, "CasePrice": "240.00", "UnitPrice": "20.00"}]}]
+    }
+    """
+
+    def get_signatures(self):
+        """
+        Get the signature of every customer's rows by EmailCustomerId, a customer's
+        document must be rebuilt when their signature changes
+        """
+        sums = {}
+        for source, sql in enumerate(_signature_sqls):
+            for customer_id, *values in self.stream_rows(sql):
+                if source == 0:
+                    sums[customer_id] = 0
+                elif customer_id not in sums:
+                    continue
+                sums[customer_id] = (sums[customer_id] + _row_hash(source, values)) & _signature_mask
+        return {customer_id: f'{signature:032x}' for customer_id, signature in sums.items()}
+
+    def get_documents(self, customer_ids):
+        """
+        Generate the (id, email, document) of the customers w/ the given sorted ids
+        """
+        for chunk in _id_chunks(customer_ids, customers_per_chunk):
+            yield from self._get_chunk_documents(chunk)
+
+    def _get_chunk_documents(self, customer_ids):
+        """
+        Generate the (id, email, document) of the customers, whose ids are in
+        a range of less than customers_per_chunk ids
+        """
+        wanted = set(customer_ids)
+        id_range = (customer_ids[0], customer_ids[-1])
+
+        def rows(sql):
+            with self._connection.cursor() as cursor:
+                cursor.execute(sql, id_range)
+                return [row for row in cursor.fetchall() if row[0] in wanted]
+
+        documents = {}
+        for (customer_id, title, given_name, surname, suffix, email, created, last_modified
+             ) in rows(CHW_SQL.customer_documents_customers_sql):
+            documents[customer_id] = {'EmailCustomerId': customer_id,
+                                      'Title': title,
+                                      'GivenName': given_name,
+                                      'Surname': surname,
+                                      'Suffix': suffix,
+                                      'Email': email,
+                                      'Created': _json_value(created),
+                                      'LastModified': _json_value(last_modified),
+                                      'PhoneNumbers': [],
+                                      'ShippingAddresses': [],
+                                      'Orders': [],
+                                     }
+
+        for customer_id, n, phone_number, phone_type in rows(CHW_SQL.customer_documents_phone_numbers_sql):
+            documents[customer_id]['PhoneNumbers'].append({'N': n,
+                                                           'PhoneNumber': phone_number,
+                                                           'Type': phone_type})
+
+        for customer_id, *address in rows(CHW_SQL.customer_documents_addresses_sql):
+            documents[customer_id]['ShippingAddresses'].append(
+                dict(zip(('AddressId', 'Street', 'Street2', 'City', 'State', 'PostalCode'), address)))
+
+        orders = {}
+        for (customer_id, order_id, order_date, accounting_order_no, retailer, address_id,
+             additional_charges, notes) in rows(CHW_SQL.customer_documents_orders_sql):
+            orders[order_id] = {'OrderId': order_id,
+                                'OrderDate': _json_value(order_date),
+                                'AccountingOrderNo': accounting_order_no,
+                                'Retailer': retailer,
+                                'AddressId': address_id,
+                                'AdditionalCharges': additional_charges,
+                                'Notes': notes,
+                                'Items': [],
+                               }
+            documents[customer_id]['Orders'].append(orders[order_id])
+
+        for (_, order_id, wine_id, full_name, vintage, qty_cases, qty_units, case_price, unit_price
+             ) in rows(CHW_SQL.customer_documents_order_wines_sql):
+            orders[order_id]['Items'].append({'WineId': wine_id,
+                                              'FullName': full_name,
+                                              'Vintage': vintage,
+                                              'QtyCases': qty_cases,
+                                              'QtyUnits': qty_units,
+                                              'CasePrice': _json_value(case_price),
+                                              'UnitPrice': _json_value(unit_price),
+                                             })
+
+        for customer_id, document in documents.items():
+            yield customer_id, document['Email'], document
+
+    def update_store(self, store, *, rebuild=False):
+        """
+        Build the documents of the customers whose signature has changed (or all of
+        them if rebuild is True) and put them in the document store, and remove the
+        documents of the customers which no longer exist.
+        Returns the number of documents built, removed and unchanged.
+        """
+        if rebuild:
+            store.clear()
+        signatures = self.get_signatures()
+        stored_signatures = store.get_signatures()
+
+        changed_ids = sorted(customer_id for customer_id, signature in signatures.items()
+                             if stored_signatures.get(customer_id) != signature)
+        removed_ids = sorted(stored_signatures.keys() - signatures.keys())
+
+        built = 0
+        for chunk in _id_chunks(changed_ids, customers_per_chunk):
+            store.put_many((customer_id, email, signatures[customer_id], document)
+                           for customer_id, email, document in self._get_chunk_documents(chunk))
+            built += len(chunk)
+        store.delete_many(removed_ids)
+
+        return built, len(removed_ids), len(signatures) - len(changed_ids)
+
+
+def do_build_customer_documents(*, store='sqlite', location=None, rebuild=False):
+    t = time.perf_counter()
+    customer_documents = CustomerDocuments()
+    document_store = open_document_store(store, location)
+    try:
+        built, removed, unchanged = customer_documents.update_store(document_store, rebuild=rebuild)
+        total = document_store.count()
+    finally:
+        document_store.close()
+    print(f'Customer documents: {built} built, {removed} removed, {unchanged} unchanged,'
+          f' {total} in the {store} store ({time.perf_counter() - t:.3f} secs)')
+
+
+def do_customer_document(*, customer_id=None, email=None, store='sqlite', location=None):
+    document_store = open_document_store(store, location)
+    try:
+        t = time.perf_counter()
+        documents = ([document_store.get(customer_id)] if customer_id is not None
+                     else document_store.get_by_email(email))
+        documents = [document for document in documents if document is not None]
+        secs = time.perf_counter() - t
+    finally:
+        document_store.close()
+
+    if not documents:
+        print(f'No customer document for {customer_id if customer_id is not None else email}'
+              ' (has build-customer-documents been run?)')
+        sys.exit(1)
+
+    for document in documents:
+        print(json.dumps(document, indent=2))
+    print(f'{len(documents)} document(s) read ({secs * 1000:.3f} ms)', file=sys.stderr)
+
+
+def _test():
+    print(list(_id_chunks([1, 2, 5, 1001, 1002, 2500], 1000)))
+
+
+if __name__ == '__main__':
+    _test()
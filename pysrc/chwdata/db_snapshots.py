@@ -0,0 +1,297 @@
+"""
+################################################################################
+  chwdata.db_snapshots.py
+################################################################################
+
+This module saves snapshots of the chw database tables and restores the
+database from them, so that a benchmark or test can start from a known state
+(e.g. after all of the migrations) without rerunning the csv loads and the
+migrations.
+
+A snapshot is a directory of Arrow IPC files, one per table, w/ a manifest.json,
+written by the columnar export (see chwdata.columnar_export) so the tables are
+dumped in parallel and streamed. A restore replaces the rows of each table w/
+the rows of its file. While a table is restored its secondary indexes are
+deferred: they are dropped and recreated after the rows are inserted (w/ mariadb
+the foreign key and unique checks are also turned off). ALTER TABLE ... DISABLE
+KEYS isn't used as InnoDB ignores it. The mariadb indexes which a foreign key
+needs (those whose first column is a foreign key column of the table or a
+column referenced by one) can't be dropped, so they are still maintained
+during the load. The exports of export-snapshot (Parquet or Arrow) may be
+restored too.
+
+pyarrow is an optional dependency, it is only needed (and imported) to save or
+restore a snapshot.
+
+Python naming convention reminder note: single underscore prefix class names are
+for "private" internal use and should not be considered part of the public API.
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+# Third party imports
+
+# Local application imports
+from . import chw_db
+from .chw_db import CHW_DB
+from .chw_sql import CHW_SQL
+from .columnar_export import import_pyarrow, export_tables
+
+
+default_snapshot_dir = Path(__file__).resolve().parents[2] / 'data' / 'snapshots'
+
+# lz4 is the fastest of the arrow ipc compression codecs to write and read
+snapshot_compression = 'lz4'
+
+
+def _read_batches(pa, path, fmt):
+    """
+    Generate the record batches of a snapshot table file
+    """
+    if fmt == 'parquet':
+        yield from pa.parquet.ParquetFile(path).iter_batches()
+        return
+
+    with pa.memory_map(str(path)) as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i)
+
+
+class SnapshotRestore(CHW_DB):
+    """
+    Restores chw tables from snapshot files. Each instance has its own connection
+    (it doesn't use a shared connection) so that tables can be restored by
+    instances in different threads.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(shared=False, **kwargs)
+        if self._backend != 'sqlite':
+            with self._connection.cursor() as cursor:
+                for sql in CHW_SQL.restore_session_sql:
+                    cursor.execute(sql)
+
+    def restore_table(self, table, path, columns, *, fmt='arrow'):
+        """
+        Replace the rows of the table w/ the rows of the snapshot file at path
+        whose columns are the given (name, sql type) columns, returning the number
+        of rows restored.
+
+        The secondary indexes of the table are dropped while it is loaded and are
+        always rebuilt. If the load (or rebuilding an index) fails, the load is rolled
+        back and the indexes which don't exist are rebuilt over the table's rows.
+        """
+        pa = import_pyarrow()
+        params = {'table': table,
+                  'columns': ', '.join(name for name, _ in columns),
+                  'values': ', '.join('?' * len(columns)),
+                 }
+        row_cnt = 0
+        with self._connection.cursor() as cursor:
+            self._add_missing_columns(cursor, table, columns)
+            create_index_stmts = self._defer_indexes(cursor, table)
+            try:
+                cursor.execute(CHW_SQL.get_delete_table_rows_sql(params))
+                for batch in _read_batches(pa, path, fmt):
+                    rows = list(zip(*(column.to_pylist() for column in batch.columns)))
+                    if rows:
+                        cursor.executemany(CHW_SQL.get_restore_table_rows_sql(params), rows)
+                    row_cnt += len(rows)
+                self._restore_indexes(cursor, table, create_index_stmts)
+            except BaseException:
+                # the dropped indexes were committed (mariadb commits when an index is
+                # dropped or created) so they are rebuilt after the rollback
+                self._connection.rollback()
+                self._restore_indexes(cursor, table, create_index_stmts)
+                self._connection.commit()
+                raise
+
+        self._connection.commit()
+        return row_cnt
+
+    def _add_missing_columns(self, cursor, table, columns):
+        """
+        Add the columns of the snapshot which the SQLite table doesn't have, i.e.
+        the columns added by the LOAD DATA emulation when the snapshot was saved
+        """
+        table_columns = {name.lower() for name, _ in self.get_table_columns(table)}
+        missing_columns = [(name, sql_type) for name, sql_type in columns
+                           if name.lower() not in table_columns]
+        if missing_columns and self._backend != 'sqlite':
+            raise ValueError(f'Table {table} has no columns {", ".join(name for name, _ in missing_columns)}')
+
+        for name, sql_type in missing_columns:
+            cursor.execute(CHW_SQL.get_add_column_sql({'table': table, 'column': name, 'type': sql_type}))
+
+    def _defer_indexes(self, cursor, table):
+        """
+        Stop maintaining the secondary indexes of the table while it is loaded by
+        dropping them, returning the statements to create the indexes which were dropped
+        by index name
+        """
+        if self._backend != 'sqlite':
+            cursor.execute(CHW_SQL.table_secondary_indexes_sql, (table, table))
+            indexes = {}
+            for name, non_unique, index_type, column, sub_part in cursor.fetchall():
+                kind = 'FULLTEXT ' if index_type == 'FULLTEXT' else '' if non_unique else 'UNIQUE '
+                kind, columns = indexes.setdefault(name, (kind, []))
+                columns.append(column if sub_part is None else f'{column}({sub_part})')
+            for name in indexes:
+                cursor.execute(CHW_SQL.get_drop_table_index_sql({'table': table, 'index': name}))
+            return {name: CHW_SQL.get_create_index_sql({'kind': kind, 'index': name, 'table': table,
+                                                        'columns': ', '.join(columns)})
+                    for name, (kind, columns) in indexes.items()}
+
+        cursor.execute(CHW_SQL.sqlite_table_indexes_sql, (table,))
+        indexes = dict(cursor.fetchall())
+        for name in indexes:
+            cursor.execute(CHW_SQL.get_drop_index_sql({'index': name}))
+        return indexes
+
+    def _restore_indexes(self, cursor, table, create_index_stmts):
+        """
+        Rebuild the indexes of the table which were dropped (see _defer_indexes) and
+        don't exist. Every index is created even if creating one fails (e.g. a UNIQUE
+        index over duplicate rows), then the first error is raised.
+        """
+        if self._backend != 'sqlite':
+            cursor.execute(CHW_SQL.table_secondary_indexes_sql, (table, table))
+        else:
+            cursor.execute(CHW_SQL.sqlite_table_indexes_sql, (table,))
+        existing_indexes = {row[0] for row in cursor.fetchall()}
+
+        error = None
+        for name, sql in create_index_stmts.items():
+            if name in existing_indexes:
+                continue
+            try:
+                cursor.execute(sql)
+            except self._dbapi.Error as e:
+                error = error if error is not None else e
+        if error is not None:
+            raise error
+
+
+def _restore_table(table_manifest, snapshot_dir, fmt):
+    """
+    Restore a table using a new SnapshotRestore (run by the restore worker threads)
+    """
+    t = time.perf_counter()
+    snapshot_restore = SnapshotRestore()
+    try:
+        row_cnt = snapshot_restore.restore_table(table_manifest['table'],
+                                                 snapshot_dir / table_manifest['file'],
+                                                 [(column['name'], column['type'])
+                                                  for column in table_manifest['columns']],
+                                                 fmt=fmt)
+    finally:
+        snapshot_restore.close()
+    return {'table': table_manifest['table'],
+            'rows': row_cnt,
+            'secs': round(time.perf_counter() - t, 3),
+           }
+
+
+def get_snapshot_path(snapshot):
+    """
+    Get the path of a snapshot given its path or its name in the default_snapshot_dir
+    """
+    path = Path(snapshot)
+    return path if path.is_dir() or len(path.parts) > 1 else default_snapshot_dir / snapshot
+
+
+def create_snapshot(name=None, *, snapshot_dir=None, tables=None, jobs=4):
+    """
+    Save the tables (default all of them) to a new snapshot directory named name
+    (default chw-<date>-<time>) in snapshot_dir, saving up to jobs tables at a
+    time in parallel.
+    Returns the path of the snapshot directory and the manifest of the snapshot.
+    """
+    import_pyarrow()
+    name = name if name is not None else f'chw-{datetime.now():%Y%m%d-%H%M%S}'
+    path = Path(snapshot_dir if snapshot_dir is not None else default_snapshot_dir) / name
+    path.mkdir(parents=True)
+
+    if not tables:
+        tables = CHW_DB().get_tables()
+
+    manifest = export_tables(path, tables, fmt='arrow', compression=snapshot_compression, jobs=jobs)
+    return path, manifest
+
+
+def restore_snapshot(snapshot, *, tables=None, jobs=4):
+    """
+    Restore the tables (default all of them) of the snapshot (a path or the name
+    of a snapshot in the default_snapshot_dir), restoring up to jobs tables at a
+    time in parallel.
+    Returns the list of the restored tables' row counts and times.
+    """
+    import_pyarrow()
+    path = get_snapshot_path(snapshot)
+    with open(path / 'manifest.json', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    table_manifests = [table_manifest for table_manifest in manifest['tables']
+                       if not tables or table_manifest['table'] in tables]
+    unknown_tables = set(tables or ()) - {table_manifest['table'] for table_manifest in table_manifests}
+    if unknown_tables:
+        raise ValueError(f'Tables not in snapshot {path}: {", ".join(sorted(unknown_tables))}')
+
+    # SQLite allows only one writer at a time
+    if chw_db.default_backend == 'sqlite':
+        jobs = 1
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(_restore_table, table_manifest, path, manifest['format'])
+                   for table_manifest in table_manifests]
+        return [future.result() for future in futures]
+
+
+def do_create_snapshot(name=None, *, snapshot_dir=None, tables=None, jobs=4):
+    t = time.perf_counter()
+    try:
+        path, manifest = create_snapshot(name, snapshot_dir=snapshot_dir, tables=tables, jobs=jobs)
+    except FileExistsError as e:
+        print(f'The snapshot {e.filename} already exists')
+        sys.exit(1)
+
+    for table in manifest['tables']:
+        print(f'{table["table"]:40} {table["rows"]:10} rows ({table["secs"]:.3f} secs)')
+    print(f'Snapshot saved to {path} ({time.perf_counter() - t:.3f} secs)')
+
+
+def do_restore_snapshot(snapshot, *, tables=None, jobs=4):
+    t = time.perf_counter()
+    try:
+        restored = restore_snapshot(snapshot, tables=tables, jobs=jobs)
+    except (FileNotFoundError, ValueError) as e:
+        print(e)
+        sys.exit(1)
+
+    for table in restored:
+        print(f'{table["table"]:40} {table["rows"]:10} rows ({table["secs"]:.3f} secs)')
+    print(f'Snapshot {snapshot} restored ({time.perf_counter() - t:.3f} secs)')
+
+
+def _test():
+    pass
+
+
+if __name__ == '__main__':
+    _test()
@@ -0,0 +1,189 @@
+"""
+################################################################################
+  chwdata.mysql_db.py
+################################################################################
+
+This module adapts the MySQL connector (mysql-connector-python) to the subset of
+the mariadb connector's connection and cursor API used by the chwdata classes,
+so the actions can be run unchanged against the chw-mysql container.
+
+- The ? placeholders of the CHW_SQL statements are translated to the mysql
+  connector's %s placeholders
+- Cursors are buffered by default as the mariadb connector's are
+- prepared=True is accepted but a client side cursor is used, its executemany
+  of an INSERT sends the rows as multi-row inserts (as the mariadb connector's
+  bulk executemany sends them in a batch) rather than a round trip per row
+- cursor.warnings and connection.show_warnings() are provided
+- The MariaDB-isms of the MySQL DDL files are translated by translate_ddl
+  (MySQL requires a DEFAULT which references another column to be an expression
+  in parentheses)
+
+The mysql connector is only imported when connecting, so this module can be
+imported (e.g. for translate_ddl) when the connector isn't installed.
+
+Python naming convention reminder note: single underscore prefix class names are
+for "private" internal use and should not be considered part of the public API.
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+import re
+from functools import lru_cache
+
+# Third party imports
+
+# Local application imports
+from .sqlite_db import split_top_level
+
+
+# A quoted string or identifier, or a ? placeholder (which is only replaced outside of quotes)
+_re_placeholder = re.compile(r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`[^`]*`)|\?""", re.DOTALL)
+
+# A column DEFAULT which is another column (any other word, so not a literal, NULL or a function)
+_re_default_column = re.compile(
+    r'\bDEFAULT\s+(?!NULL\b|TRUE\b|FALSE\b|CURRENT_TIMESTAMP\b)([A-Za-z_]\w*)\b(?!\s*\()', re.IGNORECASE)
+
+
+@lru_cache(maxsize=512)
+def translate_sql(sql):
+    """
+    Translate the ? placeholders of the sql to %s placeholders
+    """
+    return _re_placeholder.sub(lambda m: m[1] if m[1] is not None else '%s', sql)
+
+
+def translate_ddl(ddl):
+    """
+    Translate the MySQL DDL (as written by SQL Power Architect and run on mariadb)
+    to a list of MySQL statements which will create the same tables and indexes.
+
+    - DEFAULT values which reference another column are put in parentheses
+    """
+    statements = []
+    for stmt in split_top_level(ddl, ';'):
+        stmt = stmt.strip()
+        if stmt == '':
+            continue
+        if re.match(r'CREATE\s+TABLE\b', stmt, re.IGNORECASE):
+            stmt = _re_default_column.sub(r'DEFAULT (\1)', stmt)
+        statements.append(stmt)
+    return statements
+
+
+class MySQLCursor:
+    """
+    Wraps a mysql connector cursor to provide the subset of the mariadb cursor API used by chwdata.
+    """
+
+    def __init__(self, connection, *, buffered=None, **_kwargs):
+        # other cursor options such as prepared=True only matter to the mariadb connector
+        self.connection = connection
+        self._cursor = connection._mysql.cursor(buffered=buffered if buffered is not None else True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def warnings(self):
+        return self._cursor.warning_count
+
+    def execute(self, sql, params=()):
+        if params:
+            self._cursor.execute(translate_sql(sql), tuple(params))
+        else:
+            self._cursor.execute(sql)
+
+    def executemany(self, sql, seq_of_params):
+        self._cursor.executemany(translate_sql(sql), [tuple(params) for params in seq_of_params])
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size=None):
+        return self._cursor.fetchmany(size) if size is not None else self._cursor.fetchmany()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def close(self):
+        self._cursor.close()
+
+
+class MySQLConnection:
+    """
+    Wraps a mysql connector connection to provide the subset of the mariadb connection
+    API used by chwdata.
+    """
+
+    def __init__(self, mysql_connection):
+        self._mysql = mysql_connection
+
+    def cursor(self, **kwargs):
+        return MySQLCursor(self, **kwargs)
+
+    def commit(self):
+        self._mysql.commit()
+
+    def rollback(self):
+        self._mysql.rollback()
+
+    def close(self):
+        self._mysql.close()
+
+    def show_warnings(self):
+        """
+        Return the (level, code, message) warnings from the last statement executed
+        """
+        with self._mysql.cursor(buffered=True) as cursor:
+            cursor.execute('SHOW WARNINGS')
+            return [tuple(row) for row in cursor.fetchall()]
+
+
+def connect(*, local_infile=False, **kwargs):
+    """
+    Connect to the MySQL server, the kwargs are the mariadb.connect arguments
+    (host, port, user, password and database).
+    When local_infile is True LOAD DATA LOCAL INFILE statements may read local files.
+    """
+    # imported when connecting so that translate_ddl doesn't need the connector
+    import mysql.connector  # pylint: disable=import-outside-toplevel
+    return MySQLConnection(mysql.connector.connect(**kwargs,
+                                                   autocommit=False,
+                                                   consume_results=True,
+                                                   allow_local_infile=local_infile))
+
+
+def _test():
+    ddl = 'CREATE TABLE Wine (FOBPrice DECIMAL(8,2), FOB_ARB DECIMAL(8,2) DEFAULT FOBPrice, Size INT)'
+    print(translate_ddl(ddl))
+    print(translate_sql("SELECT '?' FROM Wine WHERE WineId = ? AND Name LIKE 'a%'"))
+
+
+if __name__ == '__main__':
+    _test()
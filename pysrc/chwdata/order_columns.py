@@ -0,0 +1,307 @@
+"""
+################################################################################
+  chwdata.order_columns.py
+################################################################################
+
+This module provides a compact in-memory columnar store of the analytic columns
+of the legacy email orders (see RetailOrders.load_order_columns), for ad-hoc
+analytics w/o database round trips and w/o holding the wide order rows (w/ their
+TEXT columns) as python tuples.
+
+- The ids, dates (as proleptic Gregorian ordinals), subtotals and item vintages
+  and quantities are typed arrays (the array module)
+- The repeated strings (customer FullName, Retailer, State and item name) are
+  dictionary encoded, an array of codes into a list of the distinct values
+- The order items (the 5 item columns of a legacy order) are a 2nd set of
+  columns w/ the row index of their order
+
+The filter, group_by and top_n helpers work on whole columns w/ map,
+itertools.compress and collections.Counter so the per row work is done in C
+rather than in a python loop.
+
+Python naming convention reminder note: single underscore prefix class names are
+for "private" internal use and should not be considered part of the public API.
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+import functools
+import heapq
+import itertools
+import math
+import operator
+import sys
+from array import array
+from collections import Counter
+from datetime import date
+
+# Third party imports
+
+# Local application imports
+
+
+# The order date of orders w/o a date, and the vintage of items w/o a vintage
+NO_DATE = 0
+NO_VINTAGE = 0
+
+# The keys the orders (or their items) can be grouped by, and the values which can be aggregated
+group_keys = ('customer', 'retailer', 'state', 'year', 'month', 'item', 'vintage')
+aggregate_values = ('orders', 'subtotal', 'items', 'bottles')
+
+
+class DictionaryColumn:
+    """
+    A dictionary encoded string column, the value of row i is values[codes[i]]
+    """
+
+    def __init__(self):
+        self.codes = array('I')
+        self.values = []
+        self._value_codes = {}
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, i):
+        return self.values[self.codes[i]]
+
+    def append(self, value):
+        code = self._value_codes.get(value)
+        if code is None:
+            code = self._value_codes[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def code_of(self, value):
+        """
+        Get the code of the value, None if no row has the value
+        """
+        return self._value_codes.get(value)
+
+    def nbytes(self):
+        """
+        Get the approximate number of bytes used by the column
+        """
+        return (self.codes.itemsize * len(self.codes)
+                + sys.getsizeof(self.values) + sys.getsizeof(self._value_codes)
+                + sum(sys.getsizeof(value) for value in self.values))
+
+
+class OrderColumns:
+    """
+    The analytic columns of orders and of their items.
+
+    Order columns (one row per order):
+      order_id, order_date (ordinal or NO_DATE), subtotal (float, nan if unknown),
+      customer, retailer, state (DictionaryColumns)
+    Item columns (one row per order item):
+      item_order (the order's row), item (DictionaryColumn), vintage (or NO_VINTAGE),
+      cases, units
+    """
+
+    def __init__(self, units_per_case=12):
+        self.units_per_case = units_per_case
+        self.order_id = array('i')
+        self.order_date = array('i')
+        self.subtotal = array('d')
+        self.customer = DictionaryColumn()
+        self.retailer = DictionaryColumn()
+        self.state = DictionaryColumn()
+
+        self.item_order = array('I')
+        self.item = DictionaryColumn()
+        self.vintage = array('h')
+        self.cases = array('H')
+        self.units = array('H')
+
+    def __len__(self):
+        return len(self.order_id)
+
+    @property
+    def item_count(self):
+        return len(self.item_order)
+
+    def append_order(self, order_id, order_date, subtotal, customer, retailer, state):
+        """
+        Append an order returning its row
+        """
+        self.order_id.append(order_id)
+        self.order_date.append(order_date.toordinal() if order_date is not None else NO_DATE)
+        self.subtotal.append(float(subtotal) if subtotal is not None else math.nan)
+        self.customer.append(customer)
+        self.retailer.append(retailer)
+        self.state.append(state)
+        return len(self.order_id) - 1
+
+    def append_item(self, order_row, item, vintage, cases, units):
+        self.item_order.append(order_row)
+        self.item.append(item)
+        self.vintage.append(vintage if vintage is not None else NO_VINTAGE)
+        self.cases.append(cases)
+        self.units.append(units)
+
+    def nbytes(self):
+        """
+        Get the approximate number of bytes used by the columns
+        """
+        arrays = (self.order_id, self.order_date, self.subtotal,
+                  self.item_order, self.vintage, self.cases, self.units)
+        return (sum(a.itemsize * len(a) for a in arrays)
+                + sum(column.nbytes() for column in (self.customer, self.retailer, self.state, self.item)))
+
+    def filter(self, *, start=None, end=None, customer=None, retailer=None, state=None, item=None):
+        """
+        Get the rows of the orders w/ an order date between start and end (inclusive dates),
+        and w/ the given customer, retailer, state and (an item w/ the) item name, as an array.
+        The orders w/o a date are only included when neither start nor end is given.
+        """
+        n = len(self)
+        masks = []
+        if start is not None or end is not None:
+            # NO_DATE is less than every date's ordinal
+            first = start.toordinal() if start is not None else NO_DATE + 1
+            masks.append(map(first.__le__, self.order_date))
+        if end is not None:
+            masks.append(map(end.toordinal().__ge__, self.order_date))
+        for column, value in ((self.customer, customer), (self.retailer, retailer), (self.state, state)):
+            if value is not None:
+                code = column.code_of(value)
+                if code is None:
+                    return array('I')
+                masks.append(map(code.__eq__, column.codes))
+        if item is not None:
+            code = self.item.code_of(item)
+            if code is None:
+                return array('I')
+            has_item = bytearray(n)
+            for order_row in itertools.compress(self.item_order, map(code.__eq__, self.item.codes)):
+                has_item[order_row] = 1
+            masks.append(has_item)
+
+        if not masks:
+            return array('I', range(n))
+        mask = masks[0] if len(masks) == 1 else map(all, zip(*masks))
+        return array('I', itertools.compress(range(n), mask))
+
+    def _item_rows(self, rows):
+        """
+        Get the item rows of the order rows (all of the items if rows is None)
+        """
+        if rows is None:
+            return None
+        in_rows = bytearray(len(self))
+        for row in rows:
+            in_rows[row] = 1
+        return array('I', itertools.compress(range(self.item_count),
+                                             map(in_rows.__getitem__, self.item_order)))
+
+    def _keys(self, key):
+        """
+        Get the (codes, decode) of the key, codes is a sequence of a code for each
+        order (or item) row and decode gets the key value of a code.
+        """
+        if key in ('customer', 'retailer', 'state', 'item'):
+            column = getattr(self, key)
+            return column.codes, column.values.__getitem__
+        if key == 'year':
+            return map(_ordinal_year, self.order_date), None
+        if key == 'month':
+            return map(_ordinal_month, self.order_date), None
+        if key == 'vintage':
+            return self.vintage, None
+        raise ValueError(f'Unknown group key {key}, expected one of {", ".join(group_keys)}')
+
+    def group_by(self, key, rows=None, *, value='orders'):
+        """
+        Aggregate the value of the orders (the rows, default all of them) grouped
+        by the key (one of group_keys), returning a dict of key value -> aggregate.
+        The values (aggregate_values) are the number of orders, the sum of their
+        subtotals (w/o the unknown subtotals), the number of items and the number
+        of bottles (cases * units_per_case + units) ordered.
+        The item and vintage keys group the items of the orders, so their value
+        can only be items or bottles.
+        """
+        item_key = key in ('item', 'vintage')
+        if value not in aggregate_values:
+            raise ValueError(f'Unknown value {value}, expected one of {", ".join(aggregate_values)}')
+        if item_key and value not in ('items', 'bottles'):
+            raise ValueError(f'The {key} groups can only be aggregated by items or bottles')
+
+        codes, decode = self._keys(key)
+        codes = list(codes) if not isinstance(codes, (array, list)) else codes
+
+        if value in ('orders', 'subtotal'):
+            selected = rows
+            if value == 'orders':
+                totals = Counter(codes if selected is None else map(codes.__getitem__, selected))
+            else:
+                totals = Counter()
+                pairs = (zip(codes, self.subtotal) if selected is None
+                         else zip(map(codes.__getitem__, selected), map(self.subtotal.__getitem__, selected)))
+                for code, subtotal in pairs:
+                    if not math.isnan(subtotal):
+                        totals[code] += subtotal
+        else:
+            item_rows = self._item_rows(rows)
+            if not item_key:
+                # the key of each item is its order's key
+                codes = list(map(codes.__getitem__, self.item_order))
+            if value == 'items':
+                totals = Counter(codes if item_rows is None else map(codes.__getitem__, item_rows))
+            else:
+                bottles = list(map(operator.add, map(self.units_per_case.__mul__, self.cases), self.units))
+                totals = Counter()
+                pairs = (zip(codes, bottles) if item_rows is None
+                         else zip(map(codes.__getitem__, item_rows), map(bottles.__getitem__, item_rows)))
+                for code, bottle_cnt in pairs:
+                    totals[code] += bottle_cnt
+
+        return {(decode(code) if decode is not None else code): total for code, total in totals.items()}
+
+    def top_n(self, key, n=10, rows=None, *, value='orders'):
+        """
+        Get the n key values w/ the largest aggregate value (see group_by) as a list
+        of (key value, aggregate) largest first
+        """
+        return heapq.nlargest(n, self.group_by(key, rows, value=value).items(), key=operator.itemgetter(1))
+
+
+# there are only a few thousand distinct order dates
+@functools.lru_cache(maxsize=None)
+def _ordinal_year(ordinal):
+    return date.fromordinal(ordinal).year if ordinal != NO_DATE else None
+
+
+@functools.lru_cache(maxsize=None)
+def _ordinal_month(ordinal):
+    return f'{date.fromordinal(ordinal):%Y-%m}' if ordinal != NO_DATE else None
+
+
+def rows_nbytes(rows):
+    """
+    Get the approximate number of bytes used by a list of tuple rows (the list,
+    the tuples and their values, shared values are counted for each use)
+    """
+    return sys.getsizeof(rows) + sum(sys.getsizeof(row) + sum(map(sys.getsizeof, row)) for row in rows)
+
+
+def _test():
+    columns = OrderColumns()
+    row = columns.append_order(1, date(2019, 2, 1), 120, 'Smith, Jo', 'Wine Library', 'NY')
+    columns.append_item(row, 'Cantina Bernard Tradition', 2015, 1, 6)
+    row = columns.append_order(2, None, None, 'Doe, Al', 'Unknown', 'CA')
+    columns.append_item(row, 'Cantina Bernard Tradition', 2016, 0, 3)
+    print(columns.filter(start=date(2019, 1, 1)), columns.top_n('item', value='bottles'),
+          columns.group_by('year'), columns.nbytes())
+
+
+if __name__ == '__main__':
+    _test()
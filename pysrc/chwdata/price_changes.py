@@ -0,0 +1,203 @@
+"""
+################################################################################
+  chwdata.price_changes.py
+################################################################################
+
+This module finds the price and cost changes of the wines between 2 snapshots
+of the legacy wine master (LegacyWineMaster_{suffix} tables, e.g. _0729 and
+_1218) and sets the LPP_Change, FOB_Change and PricingNeedsReview flags of the
+newer snapshot from them, rather than having them maintained by hand.
+
+The snapshots are compared by WineId in one join of the 2 tables (see
+CHW_SQL.get_snapshot_price_diff_sql) which selects which kinds of prices
+(FOB, wholesale, multi-case and last purchase price) changed for every wine, so
+the diff is a single pass over the catalog no matter its size. Only the wines
+whose flags differ from the computed ones are updated.
+
+The flags of a wine of the new snapshot are set to:
+- LPP_Change: its last purchase (PO or AE) price changed
+- FOB_Change: one of its FOB prices changed
+- PricingNeedsReview: it is new, or its cost or its wholesale or multi-case
+  prices changed w/o its FOB price changing
+
+Python naming convention reminder note: single underscore prefix class names are
+for "private" internal use and should not be considered part of the public API.
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+import sys
+import time
+from collections import namedtuple
+
+# Third party imports
+
+# Local application imports
+from .chw_db import CHW_DB
+from .chw_sql import CHW_SQL
+
+
+# The changes of a wine between the snapshots (the snapshot_price_diff_sql row w/o the current flags)
+PriceChange = namedtuple('PriceChange', ['wine_id', 'full_name', 'added',
+                                         'fob', 'wholesale', 'multi_case', 'lpp',
+                                         'old_fob_price', 'new_fob_price',
+                                         'old_ny_wholesale', 'new_ny_wholesale',
+                                         'old_lpp', 'new_lpp'])
+
+# The kinds of changes (PriceChange fields) and their names in the report
+change_kinds = (('fob', 'FOB'), ('wholesale', 'wholesale'), ('multi_case', 'multi-case'), ('lpp', 'LPP'))
+
+
+def get_price_change_flags(change):
+    """
+    Get the (LPP_Change, FOB_Change, PricingNeedsReview) flags of the wine w/ the PriceChange
+    """
+    if change.added:
+        return False, False, True
+    return (change.lpp, change.fob,
+            not change.fob and (change.lpp or change.wholesale or change.multi_case))
+
+
+class PriceChangeReport:
+    """
+    The changes between 2 snapshots: the PriceChange of each new or changed wine,
+    the (WineId, FullName) of the removed wines, the number of wines compared
+    and of the wines whose flags were updated.
+    """
+
+    def __init__(self, old_suffix, new_suffix):
+        self.old_suffix = old_suffix
+        self.new_suffix = new_suffix
+        self.wine_cnt = 0
+        self.changes = []
+        self.removed = []
+        self.flags_updated = 0
+
+    def count(self, kind):
+        """
+        Get the number of existing wines w/ the kind (a change_kinds field) of change
+        """
+        return sum(1 for change in self.changes if not change.added and getattr(change, kind))
+
+    @property
+    def added_cnt(self):
+        return sum(1 for change in self.changes if change.added)
+
+
+class PriceChanges(CHW_DB):
+    """
+    An instance of PriceChanges is created with the MariaDB
+    domain, port and db name of the chw database to
+    be worked on.
+
+    It compares the prices of 2 legacy wine master snapshots
+    and sets the price change flags of the newer one.
+    """
+
+    def check_snapshot(self, suffix):
+        """
+        Raise a ValueError if there is no LegacyWineMaster table w/ the suffix
+        """
+        table = f'LegacyWineMaster{suffix}'
+        if table not in self.get_tables():
+            raise ValueError(f'There is no {table} snapshot table')
+
+    def diff_snapshots(self, old_suffix, new_suffix, *, update_flags=True, batch_size=5000):
+        """
+        Compare the prices and costs of the wines of the new snapshot to those in the
+        old snapshot returning a PriceChangeReport. When update_flags is True the
+        price change flags of the wines of the new snapshot are set from the changes.
+        """
+        for suffix in (old_suffix, new_suffix):
+            self.check_snapshot(suffix)
+        suffixes = {'old_suffix': old_suffix, 'new_suffix': new_suffix}
+        report = PriceChangeReport(old_suffix, new_suffix)
+
+        flag_updates = []
+        for *values, lpp_change, fob_change, needs_review in self.stream_rows(
+                CHW_SQL.get_snapshot_price_diff_sql(suffixes)):
+            report.wine_cnt += 1
+            change = PriceChange(*values[:2], *map(bool, values[2:7]), *values[7:])
+            if change.added or change.fob or change.wholesale or change.multi_case or change.lpp:
+                report.changes.append(change)
+            flags = get_price_change_flags(change)
+            if flags != (bool(lpp_change), bool(fob_change), bool(needs_review)):
+                flag_updates.append((*flags, change.wine_id))
+
+        report.removed = list(self.stream_rows(CHW_SQL.get_snapshot_removed_wines_sql(suffixes)))
+
+        if update_flags and flag_updates:
+            # the updates are written after the diff's rows are read, a streamed result
+            # must be read before another statement is run on the connection
+            update_flags_sql = CHW_SQL.get_update_price_change_flags_sql({'suffix': new_suffix})
+            with self._connection.cursor(prepared=True) as update_flags_cursor:
+                for i in range(0, len(flag_updates), batch_size):
+                    update_flags_cursor.executemany(update_flags_sql, flag_updates[i:i + batch_size])
+            self._connection.commit()
+            report.flags_updated = len(flag_updates)
+
+        return report
+
+
+def write_price_change_report(report, *, top=50, f=sys.stdout):
+    """
+    Write the summary of the changes and the first top changed wines of the report
+    """
+    f.write(f'LegacyWineMaster{report.new_suffix} vs LegacyWineMaster{report.old_suffix}:'
+            f' {report.wine_cnt} wines, {report.added_cnt} added, {len(report.removed)} removed, '
+            + ', '.join(f'{report.count(kind)} {name} changed' for kind, name in change_kinds)
+            + f', flags of {report.flags_updated} wines updated\n\n')
+
+    def price(value):
+        return f'{float(value):.2f}' if value is not None else '-'
+
+    f.write(f'| {"WineId":>7} | {"Wine":50} | {"Changes":30} | {"FOB":>17} | {"NY Wholesale":>17} |'
+            f' {"LPP (PO)":>17} | Review |\n')
+    f.write(f'| {"-" * 6}: | :{"-" * 49} | :{"-" * 29} | {"-" * 16}: | {"-" * 16}: | {"-" * 16}: |'
+            f' :----: |\n')
+    for change in report.changes[:top]:
+        changes = ('added' if change.added else
+                   ', '.join(name for kind, name in change_kinds if getattr(change, kind)))
+        needs_review = get_price_change_flags(change)[2]
+        f.write(f'| {change.wine_id:7} | {(change.full_name or "")[:50]:50} | {changes:30} |'
+                f' {price(change.old_fob_price) + " > " + price(change.new_fob_price):>17} |'
+                f' {price(change.old_ny_wholesale) + " > " + price(change.new_ny_wholesale):>17} |'
+                f' {price(change.old_lpp) + " > " + price(change.new_lpp):>17} |'
+                f' {"yes" if needs_review else "":6} |\n')
+    if len(report.changes) > top:
+        f.write(f'({len(report.changes) - top} more changed wines)\n')
+
+    if report.removed:
+        f.write(f'\nRemoved wines: {", ".join(str(wine_id) for wine_id, _ in report.removed)}\n')
+
+
+# Public action functions to be called by the CLI
+
+def do_detect_price_changes(old_suffix, new_suffix, *, update_flags=True, top=50):
+    t = time.perf_counter()
+    price_changes = PriceChanges()
+    report = price_changes.diff_snapshots(old_suffix, new_suffix, update_flags=update_flags)
+    exectime = time.perf_counter() - t
+    write_price_change_report(report, top=top)
+    print(f'\nCompared the snapshots ({exectime:.3f} secs)')
+
+
+def _test():
+    changes = (PriceChange(1, 'Added', True, True, True, False, True, None, 100, None, 135, None, 50),
+               PriceChange(2, 'Cost only', False, False, False, False, True, 100, 100, 135, 135, 50, 55),
+               PriceChange(3, 'Cost and FOB', False, True, True, False, True, 100, 110, 135, 148.5, 50, 55),
+               PriceChange(4, 'Wholesale only', False, False, True, False, False, 100, 100, 135, 140, 50, 50))
+    for change in changes:
+        print(change.full_name, get_price_change_flags(change))
+
+
+if __name__ == '__main__':
+    _test()
@@ -0,0 +1,176 @@
+"""
+################################################################################
+  chwdata.price_history.py
+################################################################################
+
+This module keeps effective dated versions of the wines' prices and purchases
+(the WinePricingHistory and WinePurchaseHistory tables) which are added to from
+each legacy wine master snapshot that is loaded, rather than being overwritten.
+
+Each version of a wine has a ValidFrom and ValidTo date (ValidTo is exclusive
+and END_OF_TIME for the current version) and a hash of its values. A snapshot's
+row is compared to the current version of the wine by its hash (row_hash), so
+only the wines whose values changed get a new version:
+- a wine w/o a version, or whose versions were closed before the snapshot
+  (it wasn't in a later snapshot), gets one
+- a changed wine's current version is closed at the new version's ValidFrom
+  and the new version is added
+- a changed wine whose current version starts on the same date (a snapshot
+  reloaded w/ corrections) has its current version replaced
+- a version older than the wine's latest version (a snapshot loaded out of
+  order) is skipped
+
+The versions are keyed (and indexed) by (WineId, ValidFrom), so the version of
+a wine as of a date is a single index seek for the last ValidFrom <= the date.
+
+Python naming convention reminder note: single underscore prefix class names are
+for "private" internal use and should not be considered part of the public API.
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+import hashlib
+from datetime import date, datetime
+from decimal import Decimal
+
+# Third party imports
+
+# Local application imports
+
+
+# The ValidTo of the current version
+END_OF_TIME = date(9999, 12, 31)
+
+
+def to_date(value):
+    """
+    Get the date of a DATE or DATETIME column value, they are strings in SQLite
+    when they have no declared type (e.g. aggregates)
+    """
+    if value is None or isinstance(value, date) and not isinstance(value, datetime):
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    return date.fromisoformat(str(value)[:10])
+
+
+def _hash_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (int, float, Decimal)):
+        # the same amount hashes the same whether it's a Decimal, float or int (e.g. 76.2, 76.20)
+        return format(Decimal(str(value)).normalize(), 'f')
+    return str(value)
+
+
+def row_hash(values):
+    """
+    The hash (as hex) of the values of a version
+    """
+    key = '|'.join(map(_hash_value, values))
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+class VersionChanges:
+    """
+    Collects the changes to a history table from the rows of a snapshot, given
+    the latest version (current or closed) of each wine as a dict of
+    WineId -> (ValidFrom, ValidTo, RowHash). The changes are lists of the
+    parameters of the history table's statements:
+    - inserts:  (WineId, ValidFrom, ValidTo, *values, RowHash)
+    - closes:   (ValidTo, WineId, ValidFrom)
+    - replaces: (*values, RowHash, WineId, ValidFrom)
+    """
+
+    def __init__(self, latest):
+        self._latest = latest
+        self.inserts = []
+        self.closes = []
+        self.replaces = []
+        self.added_cnt = 0
+        self.changed_cnt = 0
+        self.unchanged_cnt = 0
+        self.skipped_cnt = 0
+        self.closed_cnt = 0
+
+    def __len__(self):
+        return len(self.inserts) + len(self.closes) + len(self.replaces)
+
+    def clear(self):
+        for batch in (self.inserts, self.closes, self.replaces):
+            batch.clear()
+
+    def add(self, wine_id, valid_from, values, hash_):
+        """
+        Add the version of the wine from a snapshot
+        """
+        latest = self._latest.pop(wine_id, None)
+        if latest is None:
+            self.inserts.append((wine_id, valid_from, END_OF_TIME, *values, hash_))
+            self.added_cnt += 1
+            return
+
+        latest_from, latest_to, latest_hash = latest
+        latest_from, latest_to = to_date(latest_from), to_date(latest_to)
+        if latest_to != END_OF_TIME:
+            # the wine's versions were closed (it wasn't in a later snapshot)
+            if valid_from >= latest_to:
+                self.inserts.append((wine_id, valid_from, END_OF_TIME, *values, hash_))
+                self.added_cnt += 1
+            else:
+                self.skipped_cnt += 1
+        elif latest_hash == hash_:
+            self.unchanged_cnt += 1
+        elif valid_from > latest_from:
+            self.closes.append((valid_from, wine_id, latest_from))
+            self.inserts.append((wine_id, valid_from, END_OF_TIME, *values, hash_))
+            self.changed_cnt += 1
+        elif valid_from == latest_from:
+            self.replaces.append((*values, hash_, wine_id, valid_from))
+            self.changed_cnt += 1
+        else:
+            self.skipped_cnt += 1
+
+    def close_missing(self, valid_to):
+        """
+        Close the current versions of the wines which weren't in the snapshot
+        (the versions starting after valid_to are left as is)
+        """
+        for wine_id, (latest_from, latest_to, _) in self._latest.items():
+            latest_from = to_date(latest_from)
+            if to_date(latest_to) == END_OF_TIME and valid_to > latest_from:
+                self.closes.append((valid_to, wine_id, latest_from))
+                self.closed_cnt += 1
+        self._latest = {}
+
+    def summary(self):
+        return (f'{self.added_cnt} added, {self.changed_cnt} changed, {self.unchanged_cnt} unchanged,'
+                f' {self.closed_cnt} closed, {self.skipped_cnt} older than the latest version skipped')
+
+
+def _test():
+    changes = VersionChanges({1: (date(2025, 1, 1), END_OF_TIME, row_hash((100, 135))),
+                              2: ('2025-01-01', '9999-12-31', row_hash((50, 67.5))),
+                              3: (date(2025, 6, 1), END_OF_TIME, row_hash((80, 108))),
+                              4: (date(2025, 1, 1), END_OF_TIME, row_hash((10, 13))),
+                              6: (date(2024, 1, 1), date(2025, 1, 1), row_hash((30, 40)))})
+    snapshot_date = date(2025, 3, 1)
+    for wine_id, values in ((1, (Decimal('100.00'), Decimal('135.00'))), (2, (55, 74.25)), (3, (81, 109)),
+                            (5, (20, 27)), (6, (30, 40))):
+        changes.add(wine_id, snapshot_date, values, row_hash(values))
+    changes.close_missing(snapshot_date)
+    print(changes.summary())
+    print('inserts', changes.inserts)
+    print('closes', changes.closes)
+
+
+if __name__ == '__main__':
+    _test()
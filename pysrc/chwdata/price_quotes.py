@@ -0,0 +1,343 @@
+"""
+################################################################################
+  chwdata.price_quotes.py
+################################################################################
+
+This module quotes the prices of orders (lines of a wine and a number of cases
+and units) from the WinePricing table, for many orders at a time.
+
+The WinePricing rows are loaded once into a PriceBook, which holds each price
+column as a typed array (the array module) w/ a dictionary index of the row of
+each WineId. A batch of order lines is quoted w/o a query per wine: the rows of
+all the lines are looked up at once, and the prices, multi-case breaks and
+line totals are computed over the whole batch.
+
+The price lists (price_lists) are the state wholesale prices for retailers
+(NY, NJ), which get the state's multi-case price when a line has at least the
+state's multi-case quantity of cases, and the FOB prices for distributors
+(FOB, FOB_MA and FOB_ARB, the last 2 are the FOBPrice when not set). The prices
+are case prices, units (bottles) are priced at the case price / UnitsPerCase.
+
+Lines of wines which aren't available or are sold out, which have no price on
+the price list or which aren't in WinePricing are not priced, their status
+(line_statuses) says why.
+
+Python naming convention reminder note: single underscore prefix class names are
+for "private" internal use and should not be considered part of the public API.
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+import csv
+import itertools
+import math
+import sys
+import time
+from array import array
+from collections import Counter
+
+# Third party imports
+
+# Local application imports
+from .chw_db import CHW_DB
+from .chw_sql import CHW_SQL
+
+
+# The price lists a quote can be made from
+price_lists = ('NY', 'NJ', 'FOB', 'FOB_MA', 'FOB_ARB')
+
+# The status of a quoted line (the index of its name in line_statuses)
+QUOTED, UNAVAILABLE, SOLD_OUT, NO_PRICE, UNKNOWN_WINE = range(5)
+line_statuses = ('quoted', 'unavailable', 'sold out', 'no price', 'unknown wine')
+
+# The columns of a price_book_sql row (after the WineId)
+_price_columns = ('Available', 'SoldOut', 'UnitsPerCase',
+                  'FOBPrice', 'FOB_MA', 'FOB_ARB',
+                  'NY_Wholesale', 'NY_MultiCasePrice', 'NY_MultiCaseQty',
+                  'NJ_Wholesale', 'NJ_MultiCasePrice', 'NJ_MultiCaseQty')
+
+# The case price, multi-case price and multi-case quantity columns of each price list
+_price_list_columns = {'NY':      ('NY_Wholesale', 'NY_MultiCasePrice', 'NY_MultiCaseQty'),
+                       'NJ':      ('NJ_Wholesale', 'NJ_MultiCasePrice', 'NJ_MultiCaseQty'),
+                       'FOB':     ('FOBPrice', None, None),
+                       'FOB_MA':  ('FOB_MA', None, None),
+                       'FOB_ARB': ('FOB_ARB', None, None),
+                      }
+
+# The max cases or units of an order line (the quantities are unsigned short arrays)
+MAX_LINE_QUANTITY = 2 ** (8 * array('H').itemsize) - 1
+
+# Units per case of a wine which isn't known
+_default_units_per_case = 12
+
+
+def _price(value):
+    return float(value) if value is not None else math.nan
+
+
+class PriceBook:
+    """
+    The prices of the wines by price list, the price columns are arrays w/ a row
+    per wine (and a last row w/o prices for unknown wines).
+    """
+
+    def __init__(self, rows):
+        """
+        rows is an iterable of the price_book_sql rows (WineId followed by _price_columns)
+        """
+        self._row_of = {}
+        self.available = bytearray()
+        self.sold_out = bytearray()
+        self.units_per_case = array('H')
+        prices = {column: array('d') for column in _price_columns[3:] if not column.endswith('Qty')}
+        quantities = {column: array('H') for column in _price_columns[3:] if column.endswith('Qty')}
+
+        for wine_id, available, sold_out, units_per_case, *price_values in itertools.chain(
+                rows, ((None, 0, 0, _default_units_per_case) + (None,) * 9,)):
+            if wine_id is not None:
+                self._row_of[wine_id] = len(self.available)
+            self.available.append(1 if available else 0)
+            self.sold_out.append(1 if sold_out else 0)
+            self.units_per_case.append(units_per_case or _default_units_per_case)
+            for column, value in zip(_price_columns[3:], price_values):
+                if column in quantities:
+                    quantities[column].append(value or 0)
+                else:
+                    prices[column].append(_price(value))
+
+        # the FOB_MA and FOB_ARB prices default to the FOBPrice
+        for column in ('FOB_MA', 'FOB_ARB'):
+            prices[column] = array('d', (price if not math.isnan(price) else fob
+                                         for price, fob in zip(prices[column], prices['FOBPrice'])))
+
+        self._unknown_row = len(self.available) - 1
+        self._prices = prices
+        self._quantities = quantities
+
+    def __len__(self):
+        return self._unknown_row
+
+    def __contains__(self, wine_id):
+        return wine_id in self._row_of
+
+    def wine_ids(self):
+        return list(self._row_of)
+
+    def rows_of(self, wine_ids):
+        """
+        Get the rows of the wines as an array, the row of unknown wines has no prices
+        """
+        return array('I', map(self._row_of.get, wine_ids, itertools.repeat(self._unknown_row)))
+
+    def quote(self, wine_ids, cases, units, price_list='NY', order_keys=None):
+        """
+        Quote the lines (the sequences wine_ids, cases and units of the same length)
+        from the price_list, returning a BatchQuote. When the order_keys (of the
+        lines) are given the order totals are also computed.
+        """
+        if price_list not in _price_list_columns:
+            raise ValueError(f'Unknown price list {price_list}, expected one of {", ".join(price_lists)}')
+        case_column, break_column, qty_column = _price_list_columns[price_list]
+
+        rows = self.rows_of(wine_ids)
+        case_prices = array('d', map(self._prices[case_column].__getitem__, rows))
+        if break_column is not None:
+            break_prices = map(self._prices[break_column].__getitem__, rows)
+            break_qtys = map(self._quantities[qty_column].__getitem__, rows)
+            # the multi-case price applies from the break quantity of cases up (when it has one)
+            case_prices = array('d', (break_price
+                                      if 0 < break_qty <= case_cnt and not math.isnan(break_price)
+                                      else case_price
+                                      for case_price, break_price, break_qty, case_cnt
+                                      in zip(case_prices, break_prices, break_qtys, cases)))
+
+        unknown_row = self._unknown_row
+        statuses = bytes(UNKNOWN_WINE if row == unknown_row else
+                         UNAVAILABLE if not available else
+                         SOLD_OUT if sold_out else
+                         NO_PRICE if math.isnan(case_price) else
+                         QUOTED
+                         for row, available, sold_out, case_price
+                         in zip(rows, map(self.available.__getitem__, rows),
+                                map(self.sold_out.__getitem__, rows), case_prices))
+        line_totals = array('d', (case_cnt * case_price + unit_cnt * case_price / units_per_case
+                                  if status == QUOTED else 0.0
+                                  for case_cnt, unit_cnt, case_price, units_per_case, status
+                                  in zip(cases, units, case_prices,
+                                         map(self.units_per_case.__getitem__, rows), statuses)))
+
+        return BatchQuote(price_list, case_prices, line_totals, statuses, order_keys)
+
+
+class BatchQuote:
+    """
+    The quote of a batch of order lines: the case price (nan if there is none),
+    line total (0 if not quoted) and status of each line, and the order totals
+    (a dict of order key -> total, when the lines' order keys were given).
+    Totals are floats, round them to cents for display.
+    """
+
+    def __init__(self, price_list, case_prices, line_totals, statuses, order_keys=None):
+        self.price_list = price_list
+        self.case_prices = case_prices
+        self.line_totals = line_totals
+        self.statuses = statuses
+        self.order_totals = None
+        if order_keys is not None:
+            self.order_totals = Counter()
+            for order_key, line_total in zip(order_keys, line_totals):
+                self.order_totals[order_key] += line_total
+
+    def __len__(self):
+        return len(self.line_totals)
+
+    @property
+    def total(self):
+        return math.fsum(self.line_totals)
+
+    def status_counts(self):
+        """
+        Get the number of lines of each status as a dict of status name -> count
+        """
+        return {line_statuses[status]: count for status, count in sorted(Counter(self.statuses).items())}
+
+
+class PriceQuotes(CHW_DB):
+    """
+    An instance of PriceQuotes is created with the MariaDB
+    domain, port and db name of the chw database to
+    be worked on.
+
+    It loads the PriceBook of the wines, and quotes orders.
+    """
+
+    def get_price_book(self, as_of=None):
+        """
+        Get the PriceBook of the current prices (WinePricing), or of the prices as of
+        the date from the WinePricingHistory
+        """
+        if as_of is not None:
+            return PriceBook(self.stream_rows(CHW_SQL.price_book_as_of_sql, (as_of, as_of)))
+        return PriceBook(self.stream_rows(CHW_SQL.price_book_sql))
+
+    def get_order_lines(self):
+        """
+        Get the (order keys, wine ids, cases, units) of the lines of all the orders (Orders_Wines)
+        """
+        order_ids, wine_ids, cases, units = array('i'), array('i'), array('H'), array('H')
+        for order_id, wine_id, case_cnt, unit_cnt in self.stream_rows(CHW_SQL.order_lines_sql):
+            order_ids.append(order_id)
+            wine_ids.append(wine_id)
+            cases.append(case_cnt)
+            units.append(unit_cnt)
+        return order_ids, wine_ids, cases, units
+
+    def quote_line(self, wine_id, case_cnt, unit_cnt, price_list='NY'):
+        """
+        Quote a single line w/ a query for the wine's prices (what a batch quote
+        avoids), returning the (case price, line total, status)
+        """
+        with self._connection.cursor(prepared=True) as wine_price_cursor:
+            wine_price_cursor.execute(CHW_SQL.wine_price_sql, (wine_id,))
+            row = wine_price_cursor.fetchone()
+        price_book = PriceBook([(wine_id, *row)] if row is not None else [])
+        quote = price_book.quote((wine_id,), (case_cnt,), (unit_cnt,), price_list)
+        return quote.case_prices[0], quote.line_totals[0], quote.statuses[0]
+
+
+def read_order_lines_csv(csv_path):
+    """
+    Read the order lines from a csv file w/ the header: order, wine_id, cases, units
+    (units is optional), returning (order keys, wine ids, cases, units).
+    A ValueError (w/ the line number) is raised for a line whose wine_id isn't an
+    integer, or whose cases or units aren't integers from 0 to MAX_LINE_QUANTITY.
+    """
+    order_keys, wine_ids, cases, units = [], array('i'), array('H'), array('H')
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        missing_columns = {'order', 'wine_id', 'cases'} - set(reader.fieldnames or ())
+        if missing_columns:
+            raise ValueError(f'{csv_path}: the header has no {", ".join(sorted(missing_columns))} column(s)')
+
+        for row in reader:
+            try:
+                # the arrays raise OverflowError for the values they can't hold
+                wine_ids.append(int(row['wine_id']))
+                cases.append(int(row['cases'] or 0))
+                units.append(int(row.get('units') or 0))
+            except (TypeError, ValueError, OverflowError):
+                raise ValueError(f'{csv_path} line {reader.line_num}: the wine_id must be an integer, and the'
+                                 f' cases and units integers from 0 to {MAX_LINE_QUANTITY}: {row}') from None
+            order_keys.append(row['order'])
+    return order_keys, wine_ids, cases, units
+
+
+# Public action functions to be called by the CLI
+
+def do_quote_orders(csv_path=None, *, price_list='NY', show_lines=False, top=20, as_of=None):
+    price_quotes = PriceQuotes()
+    t = time.perf_counter()
+    price_book = price_quotes.get_price_book(as_of)
+    loadtime = time.perf_counter() - t
+
+    if csv_path is not None:
+        try:
+            order_keys, wine_ids, cases, units = read_order_lines_csv(csv_path)
+        except ValueError as e:
+            print(e)
+            sys.exit(1)
+    else:
+        order_keys, wine_ids, cases, units = price_quotes.get_order_lines()
+
+    t = time.perf_counter()
+    quote = price_book.quote(wine_ids, cases, units, price_list, order_keys)
+    quotetime = time.perf_counter() - t
+
+    f = sys.stdout
+    f.write(f'Price book: {len(price_book)} wines{f" as of {as_of}" if as_of is not None else ""}'
+            f' ({loadtime:.3f} secs)\n')
+    f.write(f'Quoted {len(quote)} lines of {len(quote.order_totals)} orders from the {price_list} prices'
+            f' ({quotetime:.3f} secs, {len(quote) / max(quotetime, 1e-9):,.0f} lines/sec)\n')
+    f.write('Lines: ' + ', '.join(f'{count} {status}' for status, count in quote.status_counts().items())
+            + '\n')
+    f.write(f'Total: {quote.total:,.2f}\n\n')
+
+    if show_lines:
+        f.write(f'| {"Order":>10} | {"WineId":>7} | {"Cases":>5} | {"Units":>5} | {"Case Price":>10} |'
+                f' {"Line Total":>12} | {"Status":12} |\n')
+        f.write(f'| {"-" * 9}: | {"-" * 6}: | ----: | ----: | {"-" * 9}: | {"-" * 11}: | :{"-" * 11} |\n')
+        for order_key, wine_id, case_cnt, unit_cnt, case_price, line_total, status in zip(
+                order_keys, wine_ids, cases, units, quote.case_prices, quote.line_totals, quote.statuses):
+            f.write(f'| {order_key!s:>10} | {wine_id:7} | {case_cnt:5} | {unit_cnt:5} | {case_price:10.2f} |'
+                    f' {line_total:12,.2f} | {line_statuses[status]:12} |\n')
+        f.write('\n')
+
+    f.write(f'| {"Order":>10} | {"Total":>12} |\n')
+    f.write(f'| {"-" * 9}: | {"-" * 11}: |\n')
+    for order_key, total in list(quote.order_totals.items())[:top]:
+        f.write(f'| {order_key!s:>10} | {total:12,.2f} |\n')
+    if len(quote.order_totals) > top:
+        f.write(f'({len(quote.order_totals) - top} more orders)\n')
+
+
+def _test():
+    price_book = PriceBook([(1, 1, 0, 12, 100, None, 90, 135, 128, 3, 133, None, None),
+                            (2, 1, 1, 6, 50, None, None, 67.5, None, None, 66.5, None, None),
+                            (3, 0, 0, 12, 80, None, None, 108, None, None, None, None, None)])
+    for price_list in price_lists:
+        quote = price_book.quote((1, 1, 2, 3, 4), (1, 3, 1, 1, 1), (6, 0, 0, 0, 0), price_list,
+                                 ('A', 'A', 'B', 'B', 'C'))
+        print(price_list, list(quote.case_prices), list(quote.line_totals), quote.status_counts(),
+              dict(quote.order_totals))
+
+
+if __name__ == '__main__':
+    _test()
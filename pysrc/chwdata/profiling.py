@@ -0,0 +1,263 @@
+"""
+################################################################################
+  chwdata.profiling.py
+################################################################################
+
+This module provides profiling of the chw database actions.
+
+A ProfileSession runs cProfile (and optionally tracemalloc) around an action and
+times all of the database calls (execute, fetch, commit) made through CHW_DB
+connections opened while it is active (using chw_db.connection_wrapper), so that
+the time spent waiting on the database can be separated from the time spent in
+python.
+
+When the session is stopped it writes a .pstats file (for use with pstats or
+snakeviz) and a text summary of the top functions, database statements and
+(optionally) memory allocations.
+
+Python naming convention reminder note: single underscore prefix class names are
+for "private" internal use and should not be considered part of the public API.
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+import cProfile
+import functools
+import io
+import pstats
+import re
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+# Third party imports
+
+# Local application imports
+from . import chw_db
+
+
+default_profile_dir = Path(__file__).resolve().parents[2] / 'data' / 'profile'
+
+
+class QueryStats:
+    """
+    Accumulates the time spent in database calls, in total and by statement
+    """
+
+    def __init__(self):
+        self.total_secs = 0.0
+        self.calls = 0
+        # statement key -> [execute count, execute secs, fetch secs, rows fetched]
+        self.statements = {}
+
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def statement_key(sql):
+        return re.sub(r'\s+', ' ', sql).strip()[:100]
+
+    def record(self, key, secs, *, executes=0, rows=0, fetch=False):
+        self.total_secs += secs
+        self.calls += 1
+        stmt_stats = self.statements.setdefault(key, [0, 0.0, 0.0, 0])
+        stmt_stats[0] += executes
+        stmt_stats[2 if fetch else 1] += secs
+        stmt_stats[3] += rows
+
+
+class ProfiledCursor:
+    """
+    Wraps a database cursor timing the execute and fetch calls
+    """
+
+    def __init__(self, cursor, connection, stats):
+        self._cursor = cursor
+        self._profiled_connection = connection
+        self._stats = stats
+        self._key = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._cursor.close()
+
+    @property
+    def connection(self):
+        return self._profiled_connection
+
+    def execute(self, sql, *args, **kwargs):
+        self._key = QueryStats.statement_key(sql)
+        t = time.perf_counter()
+        try:
+            return self._cursor.execute(sql, *args, **kwargs)
+        finally:
+            self._stats.record(self._key, time.perf_counter() - t, executes=1)
+
+    def executemany(self, sql, seq_of_params):
+        self._key = QueryStats.statement_key(sql)
+        seq_of_params = list(seq_of_params)
+        t = time.perf_counter()
+        try:
+            return self._cursor.executemany(sql, seq_of_params)
+        finally:
+            self._stats.record(self._key, time.perf_counter() - t, executes=len(seq_of_params))
+
+    def _fetch(self, method, *args):
+        t = time.perf_counter()
+        rows = method(*args)
+        row_cnt = (0 if rows is None else 1) if method == self._cursor.fetchone else len(rows)
+        self._stats.record(self._key, time.perf_counter() - t, rows=row_cnt, fetch=True)
+        return rows
+
+    def fetchone(self):
+        return self._fetch(self._cursor.fetchone)
+
+    def fetchmany(self, *args):
+        return self._fetch(self._cursor.fetchmany, *args)
+
+    def fetchall(self):
+        return self._fetch(self._cursor.fetchall)
+
+    def __iter__(self):
+        rows = iter(self._cursor)
+        while True:
+            t = time.perf_counter()
+            try:
+                row = next(rows)
+            except StopIteration:
+                self._stats.record(self._key, time.perf_counter() - t, fetch=True)
+                return
+            self._stats.record(self._key, time.perf_counter() - t, rows=1, fetch=True)
+            yield row
+
+
+class ProfiledConnection:
+    """
+    Wraps a database connection so that its cursors and commits are timed
+    """
+
+    def __init__(self, connection, stats):
+        self._connection = connection
+        self._stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def cursor(self, *args, **kwargs):
+        return ProfiledCursor(self._connection.cursor(*args, **kwargs), self, self._stats)
+
+    def commit(self):
+        t = time.perf_counter()
+        try:
+            return self._connection.commit()
+        finally:
+            self._stats.record('COMMIT', time.perf_counter() - t, executes=1)
+
+
+class ProfileSession:
+    """
+    Profile the python code (cProfile), database calls and optionally memory
+    allocations (tracemalloc) between a call to start and stop.
+    """
+
+    def __init__(self, name, *, profile_dir=None, top_n=30, trace_memory=False):
+        self.name = name
+        self.profile_dir = Path(profile_dir) if profile_dir is not None else default_profile_dir
+        self.top_n = top_n
+        self.trace_memory = trace_memory
+        self.profiler = cProfile.Profile()
+        self.query_stats = QueryStats()
+        self.wall_secs = 0.0
+        self._start = None
+
+    def start(self):
+        chw_db.connection_wrapper = functools.partial(ProfiledConnection, stats=self.query_stats)
+        if self.trace_memory:
+            tracemalloc.start()
+        self._start = time.perf_counter()
+        self.profiler.enable()
+
+    def stop(self):
+        """
+        Stop profiling and write the .pstats and summary .txt files,
+        returning the paths of the files written.
+        """
+        self.profiler.disable()
+        self.wall_secs = time.perf_counter() - self._start
+        chw_db.connection_wrapper = None
+
+        memory_summary = self._get_memory_summary() if self.trace_memory else None
+        if self.trace_memory:
+            tracemalloc.stop()
+
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        base_path = self.profile_dir / f'{self.name}-{datetime.now():%Y%m%d-%H%M%S}'
+        pstats_path = base_path.with_suffix('.pstats')
+        summary_path = base_path.with_suffix('.txt')
+        self.profiler.dump_stats(pstats_path)
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            f.write(self.get_summary(memory_summary))
+
+        return pstats_path, summary_path
+
+    def _get_memory_summary(self):
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [f'Traced memory: current {current / 1024:,.0f} KiB, peak {peak / 1024:,.0f} KiB',
+                 '',
+                 f'Top {self.top_n} allocation sites (by size):']
+        for stat in snapshot.statistics('lineno')[:self.top_n]:
+            lines.append(f'  {stat.size / 1024:10,.1f} KiB {stat.count:8} blocks  {stat.traceback[0]}')
+        return '\n'.join(lines)
+
+    def get_summary(self, memory_summary=None):
+        """
+        Get the text summary of the profile
+        """
+        stats = self.query_stats
+        db_secs = stats.total_secs
+        python_secs = max(self.wall_secs - db_secs, 0.0)
+
+        lines = [f'Profile of {self.name}',
+                 '',
+                 f'Wall time:     {self.wall_secs:10.3f} secs',
+                 f'Database time: {db_secs:10.3f} secs'
+                 f' ({100 * db_secs / self.wall_secs if self.wall_secs else 0:.1f}%, {stats.calls} calls)',
+                 f'Python time:   {python_secs:10.3f} secs',
+                 '',
+                 f'Top {self.top_n} database statements (by total time):',
+                 f'  {"total s":>9} {"exec s":>9} {"fetch s":>9} {"execs":>8} {"rows":>9}  statement']
+        by_time = sorted(stats.statements.items(), key=lambda kv: kv[1][1] + kv[1][2], reverse=True)
+        for key, (executes, exec_secs, fetch_secs, rows) in by_time[:self.top_n]:
+            lines.append(f'  {exec_secs + fetch_secs:9.3f} {exec_secs:9.3f} {fetch_secs:9.3f}'
+                         f' {executes:8} {rows:9}  {key}')
+
+        for sort_key in ('tottime', 'cumulative'):
+            out = io.StringIO()
+            pstats.Stats(self.profiler, stream=out).sort_stats(sort_key).print_stats(self.top_n)
+            lines += ['', f'Top {self.top_n} functions by {sort_key}:', out.getvalue()]
+
+        if memory_summary is not None:
+            lines += ['', memory_summary]
+
+        return '\n'.join(lines) + '\n'
+
+
+def _test():
+    pass
+
+
+if __name__ == '__main__':
+    _test()
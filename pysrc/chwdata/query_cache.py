@@ -0,0 +1,326 @@
+"""
+################################################################################
+  chwdata.query_cache.py
+################################################################################
+
+This module provides an opt-in cache of query results for the read-mostly
+tables (the Lookup tables, Producers, Wines, WinePricing...) which only change
+when a migration action runs.
+
+The QueryCache holds the rows of a query keyed by its sql statement and
+parameters. Entries are evicted least recently used first when there are more
+than max_entries or their estimated size is more than max_bytes, and they
+expire ttl_secs after they were cached.
+
+The connections of the CHW_DB instances are wrapped (see track_writes) while
+the cache is enabled so that the tables written by INSERT, UPDATE, DELETE and
+LOAD DATA statements are recorded, and the cached results of queries of those
+tables are invalidated when the writes are committed or rolled back. The results
+of queries on a connection w/ uncommitted writes are neither read from nor put
+in the cache, as they may have rows which are rolled back. Writes made by other
+processes are not seen, the ttl limits how stale their cached results can be.
+
+A QueryCache is shared by the threads of a process (e.g. the ThreadPoolExecutor
+workers of columnar_export and db_snapshots), so its operations hold its lock.
+
+Python naming convention reminder note: single underscore prefix class names are
+for "private" internal use and should not be considered part of the public API.
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+import functools
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# Third party imports
+
+# Local application imports
+
+
+# A cached result, the rows are a tuple so they can't be changed by the callers
+_CacheEntry = namedtuple('_CacheEntry', ['rows', 'tables', 'size', 'expires'])
+
+# Tables read by a query
+_re_read_table = re.compile(r'\b(?:FROM|JOIN)\s+(?:`?\w+`?\.)?`?(\w+)', re.IGNORECASE)
+# Table written by a statement
+_re_write_table = re.compile(r'^\s*(?:INSERT(?:\s+IGNORE)?\s+INTO|REPLACE\s+INTO|UPDATE|DELETE\s+FROM'
+                             r'|TRUNCATE(?:\s+TABLE)?|LOAD\s+DATA\s.*?\bINTO\s+TABLE)'
+                             r'\s+(?:`?\w+`?\.)?`?(\w+)',
+                             re.IGNORECASE | re.DOTALL)
+# Statements which may change any table (e.g. DROP TABLE)
+_re_ddl = re.compile(r'^\s*(?:CREATE|DROP|ALTER|RENAME)\b', re.IGNORECASE)
+
+# Marks a statement which invalidates all of the cached results
+ALL_TABLES = '*'
+
+
+@functools.lru_cache(maxsize=512)
+def read_tables(sql):
+    """
+    The (lowercase) names of the tables read by the query
+    """
+    return frozenset(name.lower() for name in _re_read_table.findall(sql))
+
+
+@functools.lru_cache(maxsize=512)
+def written_tables(sql):
+    """
+    The (lowercase) names of the tables written by the statement, ALL_TABLES
+    for DDL statements, and none for a query
+    """
+    if _re_ddl.match(sql):
+        return frozenset((ALL_TABLES,))
+    m = _re_write_table.match(sql)
+    return frozenset((m.group(1).lower(),)) if m else frozenset()
+
+
+def _estimate_size(rows):
+    """
+    Estimate the memory used by the rows (the values shared by rows are counted for each row)
+    """
+    return sys.getsizeof(rows) + sum(sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+                                     for row in rows)
+
+
+class QueryCache:
+    """
+    A LRU cache of query results w/ a ttl and a cap on the memory used.
+    The hits, misses, evictions and invalidations are counted.
+    It is thread safe, each operation holds the cache's lock.
+    """
+
+    def __init__(self, *, max_entries=256, ttl_secs=300.0, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.ttl_secs = ttl_secs
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        # the tables written by the uncommitted statements of each database connection (by id)
+        self._pending_writes = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, sql, params=()):
+        """
+        Get the cached rows of the query w/ the given parameters as a list,
+        None if they aren't cached (or have expired)
+        """
+        key = (sql, tuple(params))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires < time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return list(entry.rows)
+
+    def put(self, sql, params, rows):
+        """
+        Cache the rows of the query w/ the given parameters, evicting the least
+        recently used entries as needed. Results larger than max_bytes aren't cached.
+        """
+        key = (sql, tuple(params))
+        rows = tuple(rows)
+        size = _estimate_size(rows)
+        entry = _CacheEntry(rows, read_tables(sql), size, time.monotonic() + self.ttl_secs)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+
+            self._entries[key] = entry
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, tables):
+        """
+        Remove the cached results of the queries which read any of the (lowercase)
+        tables, or all of them if tables contains ALL_TABLES
+        """
+        with self._lock:
+            stale = [key for key, entry in self._entries.items()
+                     if ALL_TABLES in tables or not entry.tables.isdisjoint(tables)]
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def record_writes(self, db_connection, tables):
+        """
+        Record that the (lowercase) tables were written on the database connection
+        and not committed yet
+        """
+        if tables:
+            with self._lock:
+                self._pending_writes.setdefault(id(db_connection), set()).update(tables)
+
+    def pending_writes(self, db_connection):
+        """
+        The tables written on the database connection which haven't been committed
+        or rolled back
+        """
+        with self._lock:
+            return frozenset(self._pending_writes.get(id(db_connection), ()))
+
+    def end_transaction(self, db_connection):
+        """
+        Invalidate the tables written on the database connection when its
+        transaction is committed or rolled back
+        """
+        with self._lock:
+            tables = self._pending_writes.pop(id(db_connection), None)
+        if tables:
+            self.invalidate(tables)
+
+    def _remove(self, key):
+        # the caller holds the lock
+        self.bytes -= self._entries.pop(key).size
+
+    def stats(self):
+        """
+        The cache counters as a dict
+        """
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self.bytes, 'hits': self.hits,
+                    'misses': self.misses, 'evictions': self.evictions, 'invalidations': self.invalidations}
+
+    def get_summary(self):
+        stats = self.stats()
+        lookups = stats['hits'] + stats['misses']
+        return (f'Query cache: {stats["hits"]} hits, {stats["misses"]} misses'
+                f' ({100 * stats["hits"] / lookups if lookups else 0:.1f}% hit rate),'
+                f' {stats["evictions"]} evicted, {stats["invalidations"]} invalidated,'
+                f' {stats["entries"]} entries ({stats["bytes"] / 1024:,.0f} KiB)')
+
+    def track_writes(self, connection, db_connection=None):
+        """
+        Wrap the connection so that the tables it writes are invalidated when committed
+        or rolled back. db_connection is the database connection wrapped by connection
+        (default connection), its pending writes are shared by all of its wrappers.
+        """
+        return _WriteTrackingConnection(connection, self, db_connection)
+
+
+class _WriteTrackingCursor:
+    """
+    Wraps a database cursor recording the tables written by its statements
+    """
+
+    def __init__(self, cursor, connection):
+        self._cursor = cursor
+        self._tracking_connection = connection
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._cursor.close()
+
+    @property
+    def connection(self):
+        return self._tracking_connection
+
+    def execute(self, sql, *args, **kwargs):
+        self._tracking_connection.record_writes(written_tables(sql))
+        return self._cursor.execute(sql, *args, **kwargs)
+
+    def executemany(self, sql, seq_of_params):
+        self._tracking_connection.record_writes(written_tables(sql))
+        return self._cursor.executemany(sql, seq_of_params)
+
+
+class _WriteTrackingConnection:
+    """
+    Wraps a database connection invalidating the cached results of the tables
+    written by its cursors when they are committed or rolled back
+    """
+
+    def __init__(self, connection, cache, db_connection=None):
+        self._connection = connection
+        self._cache = cache
+        self._db_connection = db_connection if db_connection is not None else connection
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    @property
+    def written_tables(self):
+        """
+        The tables written on the connection which haven't been committed or rolled back
+        """
+        return self._cache.pending_writes(self._db_connection)
+
+    def record_writes(self, tables):
+        self._cache.record_writes(self._db_connection, tables)
+
+    def cursor(self, *args, **kwargs):
+        return _WriteTrackingCursor(self._connection.cursor(*args, **kwargs), self)
+
+    def commit(self):
+        result = self._connection.commit()
+        self._cache.end_transaction(self._db_connection)
+        return result
+
+    def rollback(self):
+        try:
+            return self._connection.rollback()
+        finally:
+            self._cache.end_transaction(self._db_connection)
+
+    def close(self):
+        # the uncommitted writes are rolled back when the connection is closed
+        try:
+            return self._connection.close()
+        finally:
+            self._cache.end_transaction(self._db_connection)
+
+
+def _test():
+    cache = QueryCache(max_entries=2)
+    cache.put('SELECT * FROM chw.Wines W JOIN Producers P ON P.ProducerId = W.ProducerId', (), [(1, 'a')])
+    cache.put('SELECT * FROM LookupUSStates', (), [('MA', 'Massachusetts', 'Mass.')])
+    insert_producer_sql = 'INSERT INTO chw.Producers (Name) VALUES (?)'
+    print(cache.get('SELECT * FROM LookupUSStates'), written_tables(insert_producer_sql))
+    cache.invalidate(written_tables(insert_producer_sql))
+    print(cache.get_summary())
+
+
+if __name__ == '__main__':
+    _test()
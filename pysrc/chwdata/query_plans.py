@@ -0,0 +1,688 @@
+"""
+################################################################################
+  chwdata.query_plans.py
+################################################################################
+
+This module checks the query plans of the statements run by the chw-action
+commands (the registered_statements) against a loaded database, to find the
+statements which scan a whole table, or sort their rows, w/o the support of an
+index, and it suggests (covering) indexes for them.
+
+The plan of a statement is read w/ EXPLAIN (EXPLAIN QUERY PLAN for SQLite) and
+reduced to its PlanSteps, the table of each step and how it is accessed:
+- scan:       every row of the table is read
+- index-scan: every entry of one of the table's indexes is read
+- search:     the rows are looked up by an index (or the primary key)
+- auto-index: SQLite builds a temporary index each time the statement is run
+- sort:       the rows are sorted (SQLite temp b-tree, mariadb filesort)
+
+An index is suggested for a table which a statement scans (or sorts) while
+filtering, joining or ordering it by some of its columns. Its key is the columns
+compared to constants, then the join columns (unless the table is the outer
+table of the join), then the ORDER BY columns, then a range compared column.
+The other columns the statement reads from the table are added, when there are
+few enough, so the index covers the statement. The columns are found w/ regular
+expressions, not by parsing the sql, so review the suggestions before adding
+them to the DDL.
+
+The suggested indexes of the statements of a chw-action command can be created
+just for the time the command runs (see temporary_indexes).
+
+The plans can be saved to a JSON plan snapshot, and compare_plans finds the
+statements whose plans now scan a table which they didn't scan in the snapshot,
+and the statements which aren't in the snapshot (so a newly registered
+statement fails the check until the snapshot is updated). The benchmark run
+fails on these (see chwbench.benchmarks).
+
+Python naming convention reminder note: single underscore prefix class names are
+for "private" internal use and should not be considered part of the public API.
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+import json
+import re
+import sys
+import zlib
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import date, datetime
+from pathlib import Path
+
+# Third party imports
+
+# Local application imports
+from . import chw_db
+from .chw_db import CHW_DB
+from .change_feed import feed_tables
+from .chw_sql import CHW_SQL
+from .retail_orders import RetailOrders
+from .wines import Wines
+
+
+# A statement whose plan is checked, w/ the chw-action command (stage) which runs it
+# and sample values for its parameters (mariadb plans a NULL comparison as impossible)
+RegisteredStatement = namedtuple('RegisteredStatement', ['name', 'stage', 'sql', 'params'])
+
+_wines_suffix = {'suffix': Wines.LEGACY_WINE_TABLE_SUFFIX}
+_orders_suffix = {'suffix': RetailOrders.LEGACY_ORDERS_TABLE_SUFFIX}
+# a date to look up the prices as of
+_as_of_date = date(2025, 1, 1)
+# a time of a change to a change feed table, and a change feed watermark
+_change_time = datetime(2025, 1, 1, 12, 0)
+_change_feed_params = (_change_time, _change_time, 1, _change_time, 1000)
+# an older legacy wine master snapshot (in the wine only DDL) compared to the current one
+_snapshot_suffixes = {'old_suffix': '_0729', 'new_suffix': Wines.LEGACY_WINE_TABLE_SUFFIX}
+
+# The statements run by the chw-action commands which read tables, in pipeline order
+registered_statements = (
+    RegisteredStatement('legacy_wines_by_producer', 'import-legacy-producers',
+                        CHW_SQL.get_legacy_wines_by_producer_sql(_wines_suffix), ()),
+    RegisteredStatement('migrated_producer_names', 'import-legacy-producers',
+                        CHW_SQL.get_migrated_producer_names_sql(_wines_suffix), ()),
+    RegisteredStatement('insert_wines_from_legacy', 'create-wines-from-legacy',
+                        CHW_SQL.get_insert_wines_from_legacy_sql(_wines_suffix), (_change_time,)),
+    RegisteredStatement('wines_for_families', 'create-wines-from-legacy',
+                        CHW_SQL.wines_for_families_sql, ()),
+    RegisteredStatement('wine_families', 'create-wines-from-legacy',
+                        CHW_SQL.wine_families_sql, ()),
+    RegisteredStatement('wine_family_ids', 'create-wines-from-legacy',
+                        CHW_SQL.wine_family_ids_sql, ()),
+    RegisteredStatement('delete_unused_wine_families', 'create-wines-from-legacy',
+                        CHW_SQL.delete_unused_wine_families_sql, ()),
+    RegisteredStatement('family_wines', 'wine-family',
+                        CHW_SQL.family_wines_sql, (1,)),
+    RegisteredStatement('insert_winepricing_from_legacy', 'create-winepricing-from-legacy',
+                        CHW_SQL.get_insert_winepricing_from_legacy_sql(_wines_suffix), ()),
+    RegisteredStatement('insert_winepurchases_from_legacy', 'create-winepurchases-from-legacy',
+                        CHW_SQL.get_insert_winepurchases_from_legacy_sql(_wines_suffix), ()),
+    RegisteredStatement('snapshot_pricing', 'create-winepricing-from-legacy',
+                        CHW_SQL.get_snapshot_pricing_sql(_wines_suffix), ()),
+    RegisteredStatement('latest_pricing_history', 'create-winepricing-from-legacy',
+                        CHW_SQL.latest_pricing_history_sql, ()),
+    RegisteredStatement('snapshot_purchases', 'create-winepurchases-from-legacy',
+                        CHW_SQL.get_snapshot_purchases_sql(_wines_suffix), ()),
+    RegisteredStatement('latest_purchase_history', 'create-winepurchases-from-legacy',
+                        CHW_SQL.latest_purchase_history_sql, ()),
+    RegisteredStatement('price_as_of', 'wine-price-as-of',
+                        CHW_SQL.price_as_of_sql, (1, _as_of_date, _as_of_date)),
+    RegisteredStatement('purchase_as_of', 'wine-price-as-of',
+                        CHW_SQL.purchase_as_of_sql, (1, _as_of_date, _as_of_date)),
+    RegisteredStatement('snapshot_price_diff', 'detect-price-changes',
+                        CHW_SQL.get_snapshot_price_diff_sql(_snapshot_suffixes), ()),
+    RegisteredStatement('snapshot_removed_wines', 'detect-price-changes',
+                        CHW_SQL.get_snapshot_removed_wines_sql(_snapshot_suffixes), ()),
+    RegisteredStatement('migrated_fullnames', 'import-legacy-customers',
+                        CHW_SQL.migrated_fullnames_sql, ()),
+    RegisteredStatement('unique_fullname', 'import-legacy-customers',
+                        CHW_SQL.unique_fullname_sql, ()),
+    RegisteredStatement('legacy_customer_info', 'import-legacy-customers',
+                        CHW_SQL.legacy_customer_info_sql, ('Smith, John',)),
+    RegisteredStatement('wines_for_matching', 'match-legacy-order-items',
+                        CHW_SQL.wines_for_matching_sql, ()),
+    RegisteredStatement('legacy_order_items', 'match-legacy-order-items',
+                        CHW_SQL.get_legacy_order_items_sql(_orders_suffix), ()),
+    RegisteredStatement('legacy_order_columns', 'order-analytics',
+                        CHW_SQL.get_legacy_order_columns_sql(_orders_suffix), ()),
+    RegisteredStatement('legacy_retailers', 'create-orders-from-legacy',
+                        CHW_SQL.get_legacy_retailers_sql(_orders_suffix), ()),
+    RegisteredStatement('retailers', 'create-orders-from-legacy',
+                        CHW_SQL.retailers_sql, ()),
+    RegisteredStatement('wine_units_per_case', 'create-orders-from-legacy',
+                        CHW_SQL.wine_units_per_case_sql, ()),
+    RegisteredStatement('legacy_order_id_range', 'create-orders-from-legacy',
+                        CHW_SQL.get_legacy_order_id_range_sql(_orders_suffix), ()),
+    RegisteredStatement('legacy_orders_to_migrate', 'create-orders-from-legacy',
+                        CHW_SQL.get_legacy_orders_to_migrate_sql(_orders_suffix), (1, 1000)),
+    RegisteredStatement('legacy_order_item_wines', 'create-orders-from-legacy',
+                        CHW_SQL.legacy_order_item_wines_sql, (1, 1000)),
+    RegisteredStatement('lookup_us_states', 'import-legacy-addresses',
+                        CHW_SQL.lookup_us_states_sql, ()),
+    RegisteredStatement('addresses', 'import-legacy-addresses',
+                        CHW_SQL.addresses_sql, ()),
+    RegisteredStatement('max_address_id', 'import-legacy-addresses',
+                        CHW_SQL.max_address_id_sql, ()),
+    RegisteredStatement('customer_shipping_addresses', 'import-legacy-addresses',
+                        CHW_SQL.customer_shipping_addresses_sql, ()),
+    RegisteredStatement('legacy_order_addresses', 'import-legacy-addresses',
+                        CHW_SQL.get_legacy_order_addresses_sql(_orders_suffix), ()),
+    RegisteredStatement('orders_of_top_customers', 'write-top-customer-order-report',
+                        CHW_SQL.orders_of_top_customers_sql, ()),
+    RegisteredStatement('price_book', 'quote-orders',
+                        CHW_SQL.price_book_sql, ()),
+    RegisteredStatement('price_book_as_of', 'quote-orders',
+                        CHW_SQL.price_book_as_of_sql, (_as_of_date, _as_of_date)),
+    RegisteredStatement('order_lines', 'quote-orders',
+                        CHW_SQL.order_lines_sql, ()),
+    RegisteredStatement('customer_order_totals', 'compute-customer-summaries',
+                        CHW_SQL.get_customer_order_totals_sql(_orders_suffix), ()),
+    RegisteredStatement('customer_producer_bottles', 'compute-customer-summaries',
+                        CHW_SQL.customer_producer_bottles_sql, ()),
+    RegisteredStatement('customer_document_signatures', 'build-customer-documents',
+                        CHW_SQL.customer_document_signatures_sql, ()),
+    RegisteredStatement('customer_phone_number_signatures', 'build-customer-documents',
+                        CHW_SQL.customer_phone_number_signatures_sql, ()),
+    RegisteredStatement('customer_address_signatures', 'build-customer-documents',
+                        CHW_SQL.customer_address_signatures_sql, ()),
+    RegisteredStatement('customer_order_signatures', 'build-customer-documents',
+                        CHW_SQL.customer_order_signatures_sql, ()),
+    RegisteredStatement('customer_order_wine_signatures', 'build-customer-documents',
+                        CHW_SQL.customer_order_wine_signatures_sql, ()),
+    RegisteredStatement('customer_documents_customers', 'build-customer-documents',
+                        CHW_SQL.customer_documents_customers_sql, (1, 1000)),
+    RegisteredStatement('customer_documents_phone_numbers', 'build-customer-documents',
+                        CHW_SQL.customer_documents_phone_numbers_sql, (1, 1000)),
+    RegisteredStatement('customer_documents_addresses', 'build-customer-documents',
+                        CHW_SQL.customer_documents_addresses_sql, (1, 1000)),
+    RegisteredStatement('customer_documents_orders', 'build-customer-documents',
+                        CHW_SQL.customer_documents_orders_sql, (1, 1000)),
+    RegisteredStatement('customer_documents_order_wines', 'build-customer-documents',
+                        CHW_SQL.customer_documents_order_wines_sql, (1, 1000)),
+    RegisteredStatement('change_feed_watermark', 'change-feed',
+                        CHW_SQL.change_feed_watermark_sql, ('consumer', 'Wines')),
+    *(RegisteredStatement(f'changed_{table.lower()}', 'change-feed',
+                          CHW_SQL.get_changed_rows_sql({'table': table, 'key': key,
+                                                        'columns': ', '.join(columns)}),
+                          _change_feed_params)
+      for table, (key, columns) in feed_tables.items()),
+)
+
+# The stages (chw-action commands) which run the registered statements
+statement_stages = tuple(dict.fromkeys(stmt.stage for stmt in registered_statements))
+
+# A step of a query plan, table is None for a sort of the (joined) rows
+PlanStep = namedtuple('PlanStep', ['table', 'access', 'index', 'detail'])
+
+# An index suggested for the statements, its columns may have a DESC suffix
+IndexSuggestion = namedtuple('IndexSuggestion', ['table', 'columns', 'statements'])
+
+# The maximum number of columns of a suggested covering index
+max_index_columns = 6
+
+# The prefix of the names of the suggested indexes
+index_name_prefix = 'advisor_'
+
+_mysql_max_identifier_len = 64
+
+_re_table_ref = re.compile(r'\b(?:FROM|JOIN)\s+(?:`?\w+`?\.)?`?(\w+)`?(?:\s+(?:AS\s+)?(\w+))?', re.IGNORECASE)
+_re_comparison = re.compile(r'(?:\b(\w+)\.)?\b(\w+)\s*(=|<=|>=|<(?!>)|>|\bBETWEEN\b|\bIN\b|\bLIKE\b)'
+                            r'\s*(?:(\w+)\.(\w+)\b)?', re.IGNORECASE)
+_re_order_by = re.compile(r'\b(?:ORDER|GROUP)\s+BY\s+(.+?)(?=\bLIMIT\b|\bHAVING\b|\bORDER\b|\)|;|$)',
+                          re.IGNORECASE | re.DOTALL)
+_re_order_column = re.compile(r'^\s*(?:(\w+)\.)?(\w+)(?:\s+(ASC|DESC))?\s*$', re.IGNORECASE)
+_re_column_ref = re.compile(r'\b(?:(\w+)\.)?(\w+)\b')
+_re_first_from = re.compile(r'\bFROM\b', re.IGNORECASE)
+_re_sqlite_step = re.compile(r'^(SCAN|SEARCH) (?:TABLE )?(\w+)(?: USING (.*))?$')
+_re_sqlite_index = re.compile(r'\bINDEX (\w+)')
+_re_unindexed_type = re.compile(r'TEXT|BLOB', re.IGNORECASE)
+
+# Words which follow a table name in a FROM or JOIN clause which aren't its alias
+_sql_keywords = frozenset(('on', 'where', 'join', 'left', 'right', 'inner', 'outer', 'cross', 'natural',
+                           'straight_join', 'order', 'group', 'having', 'limit', 'union', 'using', 'set'))
+
+
+def _parse_sqlite_step(detail):
+    """
+    Get the PlanStep of a row of the EXPLAIN QUERY PLAN of a SQLite statement,
+    None for the rows which don't access a table or sort (e.g. CO-ROUTINE)
+    """
+    if detail.startswith('USE TEMP B-TREE'):
+        return PlanStep(None, 'sort', None, detail)
+    m = _re_sqlite_step.match(detail)
+    if m is None or m[2] == 'CONSTANT':
+        return None
+
+    using = m[3] or ''
+    index = _re_sqlite_index.search(using)
+    if 'AUTOMATIC' in using:
+        access = 'auto-index'
+    elif m[1] == 'SEARCH':
+        access = 'search'
+    else:
+        access = 'index-scan' if using else 'scan'
+    return PlanStep(m[2], access, index[1] if index else None, detail)
+
+
+def _parse_mariadb_row(row):
+    """
+    Get the PlanSteps of a row (a dict of its lowercase column names) of the
+    EXPLAIN of a mariadb statement
+    """
+    steps = []
+    access_type = (row['type'] or '').lower()
+    extra = row.get('extra') or ''
+    if row['table'] is not None:
+        access = {'all': 'scan', 'index': 'index-scan'}.get(access_type, 'search')
+        steps.append(PlanStep(row['table'], access, row['key'],
+                              f'{row["select_type"]} {row["table"]} type={access_type} key={row["key"]}'
+                              f' rows={row["rows"]} {extra}'.strip()))
+    if 'Using filesort' in extra or 'Using temporary' in extra:
+        steps.append(PlanStep(None, 'sort', None, extra))
+    return steps
+
+
+def get_index_name(table, columns):
+    """
+    Get the name of the suggested index of the table w/ the given columns
+    """
+    name = f'{index_name_prefix}{table}_{"_".join(column.split()[0] for column in columns)}_idx'.lower()
+    if len(name) > _mysql_max_identifier_len:
+        # keep the truncated names of different column lists distinct
+        name = f'{name[:_mysql_max_identifier_len - 13]}_{zlib.crc32(name.encode()):08x}_idx'
+    return name
+
+
+def get_create_index_sql(suggestion):
+    """
+    Get the statement to create the suggested index
+    """
+    return CHW_SQL.get_create_index_sql({'index': get_index_name(suggestion.table, suggestion.columns),
+                                         'table': suggestion.table,
+                                         'columns': ', '.join(suggestion.columns)})
+
+
+class _StatementColumns:
+    """
+    The tables of a statement (by their aliases) and the columns of those tables
+    which the statement filters, joins, orders by and reads.
+    """
+
+    def __init__(self, sql, table_names, get_columns):
+        """
+        table_names maps the lowercase table names to the table names, and
+        get_columns(table) gets a dict of a table's lowercase column names
+        to (column name, sql type).
+        """
+        self.aliases = {}
+        for table, alias in _re_table_ref.findall(sql):
+            if table.lower() not in table_names:
+                continue
+            table = table_names[table.lower()]
+            self.aliases[table.lower()] = table
+            if alias and alias.lower() not in _sql_keywords:
+                self.aliases[alias.lower()] = table
+        self._get_columns = get_columns
+
+        self.filter_columns = []
+        self.range_columns = []
+        self.join_columns = []
+        # the rows (and not just their statements' selects) are only read after the first FROM
+        m = _re_first_from.search(sql)
+        for qualifier, column, operator, other_qualifier, other_column in _re_comparison.findall(
+                sql[m.start() if m else 0:]):
+            resolved = self.resolve(qualifier, column)
+            if resolved is None:
+                continue
+            if other_qualifier:
+                other_resolved = self.resolve(other_qualifier, other_column)
+                if operator == '=' and other_resolved is not None:
+                    self.join_columns.extend((resolved, other_resolved))
+            elif operator.upper() in ('=', 'IN'):
+                self.filter_columns.append(resolved)
+            else:
+                self.range_columns.append(resolved)
+
+        self.order_columns = []
+        for m in _re_order_by.finditer(sql):
+            for item in m[1].split(','):
+                column_m = _re_order_column.match(item)
+                resolved = self.resolve(column_m[1], column_m[2]) if column_m else None
+                # a sort by an expression or a select alias can't be done by an index
+                if resolved is None:
+                    self.order_columns = []
+                    break
+                table, column = resolved
+                descending = (column_m[3] or '').upper() == 'DESC'
+                self.order_columns.append((table, column + ' DESC' if descending else column))
+
+        self.read_columns = []
+        for qualifier, column in _re_column_ref.findall(sql):
+            resolved = self.resolve(qualifier, column)
+            if resolved is not None and resolved not in self.read_columns:
+                self.read_columns.append(resolved)
+
+    def resolve(self, qualifier, column):
+        """
+        Get the (table, column name) of a column reference of the statement, None
+        if it isn't a column of one of its tables (or is ambiguous)
+        """
+        if qualifier:
+            tables = [self.aliases[qualifier.lower()]] if qualifier.lower() in self.aliases else []
+        else:
+            tables = sorted(set(self.aliases.values()))
+        matches = [(table, self._get_columns(table)[column.lower()][0])
+                   for table in tables if column.lower() in self._get_columns(table)]
+        return matches[0] if len(matches) == 1 else None
+
+    def table_of(self, name):
+        """
+        Get the table of a table name or alias of a plan step, None if it isn't one of the tables
+        """
+        return self.aliases.get(name.lower()) if name is not None else None
+
+    def get_index_key(self, table, *, outer_table=False):
+        """
+        Get the columns of the key of an index of the table which supports the
+        statement's filters, joins and order
+        """
+        columns = [column for t, column in self.filter_columns if t == table]
+        if not outer_table:
+            columns += [column for t, column in self.join_columns if t == table]
+        # an index can only give the order when all of the ORDER BY columns are the table's
+        if self.order_columns and all(t == table for t, _ in self.order_columns):
+            columns += [column for _, column in self.order_columns]
+        columns += [column for t, column in self.range_columns[:1] if t == table]
+
+        key = []
+        for column in columns:
+            if column.split()[0].lower() not in (c.split()[0].lower() for c in key):
+                key.append(column)
+        return key
+
+
+class QueryPlanAdvisor(CHW_DB):
+    """
+    Reads the query plans of the registered statements and suggests indexes
+    for the statements whose plans scan tables w/o the support of an index.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._table_names = {table.lower(): table for table in self.get_tables()}
+        self._columns = {}
+
+    def get_columns(self, table):
+        """
+        Get a dict of the table's lowercase column names to (column name, sql type)
+        """
+        if table not in self._columns:
+            self._columns[table] = {name.lower(): (name, sql_type)
+                                    for name, sql_type in self.get_table_columns(table)}
+        return self._columns[table]
+
+    def get_index_columns(self, table):
+        """
+        Get the lowercase column names of each of the indexes of the table
+        """
+        sql = (CHW_SQL.sqlite_table_index_columns_sql if self._backend == 'sqlite'
+               else CHW_SQL.table_index_columns_sql)
+        indexes = {}
+        with self._connection.cursor() as cursor:
+            cursor.execute(sql, (table,))
+            for index, column in cursor.fetchall():
+                indexes.setdefault(index, []).append(column.lower())
+        return list(indexes.values())
+
+    def analyze_tables(self):
+        """
+        Update the statistics of the tables' indexes, which the query planner uses
+        """
+        get_analyze_sql = (CHW_SQL.get_sqlite_analyze_table_sql if self._backend == 'sqlite'
+                           else CHW_SQL.get_analyze_table_sql)
+        with self._connection.cursor() as cursor:
+            for table in self._table_names.values():
+                cursor.execute(get_analyze_sql({'table': table}))
+                if self._backend != 'sqlite':
+                    cursor.fetchall()
+        self._connection.commit()
+
+    def explain(self, sql, params=()):
+        """
+        Get the query plan of the statement as a list of PlanSteps w/ the tables
+        as they are named in the statement (i.e. their aliases)
+        """
+        with self._connection.cursor() as cursor:
+            if self._backend == 'sqlite':
+                cursor.execute(CHW_SQL.sqlite_schema_version_sql)
+                explain_params = {'statement': sql, 'schema_version': cursor.fetchone()[0]}
+                cursor.execute(CHW_SQL.get_sqlite_explain_sql(explain_params), params)
+                return [step for step in (_parse_sqlite_step(row[3]) for row in cursor.fetchall())
+                        if step is not None]
+
+            cursor.execute(CHW_SQL.get_explain_sql({'statement': sql}), params)
+            columns = [d[0].lower() for d in cursor.description]
+            return [step for row in cursor.fetchall() for step in _parse_mariadb_row(dict(zip(columns, row)))]
+
+    def get_plan(self, stmt):
+        """
+        Get the plan of a registered statement as a dict w/ its stage, its steps
+        (w/ the tables resolved from their aliases) and the tables it scans, or
+        w/ the error if it couldn't be explained (e.g. its tables aren't loaded)
+        """
+        plan = {'stage': stmt.stage}
+        try:
+            steps = self.explain(stmt.sql, stmt.params)
+        except self._dbapi.Error as e:
+            self._connection.rollback()
+            plan['error'] = f'{type(e).__name__}: {e}'
+            return plan
+
+        columns = self._get_statement_columns(stmt)
+        plan['steps'] = [step._replace(table=columns.table_of(step.table) or step.table) for step in steps]
+        plan['full_scans'] = sorted({step.table for step in plan['steps']
+                                     if step.access == 'scan' and step.table.lower() in self._table_names})
+        return plan
+
+    def get_plans(self, stages=None):
+        """
+        Get the plans of the registered statements (of the given stages) keyed by statement name
+        """
+        return {stmt.name: self.get_plan(stmt) for stmt in registered_statements
+                if not stages or stmt.stage in stages}
+
+    def suggest_indexes(self, plans=None, stages=None):
+        """
+        Get the IndexSuggestions for the plans (default the plans of the registered
+        statements of the given stages) which scan or sort a table w/o an index
+        which supports the statement
+        """
+        if plans is None:
+            plans = self.get_plans(stages)
+        statements = {stmt.name: stmt for stmt in registered_statements}
+
+        suggestions = {}
+        for name, plan in plans.items():
+            if 'error' in plan:
+                continue
+            columns = self._get_statement_columns(statements[name])
+            table_steps = [step for step in plan['steps'] if step.table is not None]
+            outer_table = table_steps[0].table if table_steps else None
+
+            tables = [step.table for step in table_steps
+                      if step.access in ('scan', 'auto-index') and step.table.lower() in self._table_names]
+            if any(step.access == 'sort' for step in plan['steps']) and columns.order_columns:
+                tables.append(columns.order_columns[0][0])
+
+            for table in dict.fromkeys(tables):
+                key = columns.get_index_key(table, outer_table=table == outer_table)
+                if not key or self._has_index(table, key):
+                    continue
+                index_columns = self._add_covering_columns(table, key, columns)
+                suggestion = suggestions.setdefault((table, tuple(index_columns)),
+                                                    IndexSuggestion(table, tuple(index_columns), []))
+                suggestion.statements.append(name)
+
+        return list(suggestions.values())
+
+    def create_indexes(self, suggestions):
+        """
+        Create the suggested indexes, returning the create statements executed
+        """
+        create_stmts = [get_create_index_sql(suggestion) for suggestion in suggestions]
+        with self._connection.cursor() as cursor:
+            for sql in create_stmts:
+                cursor.execute(sql)
+        self._connection.commit()
+        return create_stmts
+
+    def drop_indexes(self, suggestions):
+        """
+        Drop the suggested indexes (created by create_indexes)
+        """
+        with self._connection.cursor() as cursor:
+            for s in suggestions:
+                params = {'index': get_index_name(s.table, s.columns), 'table': s.table}
+                cursor.execute(CHW_SQL.get_drop_index_sql(params) if self._backend == 'sqlite'
+                               else CHW_SQL.get_drop_table_index_sql(params))
+        self._connection.commit()
+
+    def _get_statement_columns(self, stmt):
+        return _StatementColumns(stmt.sql, self._table_names, self.get_columns)
+
+    def _has_index(self, table, key):
+        """
+        Does the table have an index whose leading columns are the key columns
+        """
+        key_columns = [column.split()[0].lower() for column in key]
+        return any(index[:len(key_columns)] == key_columns for index in self.get_index_columns(table))
+
+    def _add_covering_columns(self, table, key, columns):
+        """
+        Add the other columns of the table which the statement reads to the key,
+        unless that makes too large an index (text columns can't be in a mariadb
+        index w/o a prefix length so they are never added)
+        """
+        key_columns = {column.split()[0].lower() for column in key}
+        table_columns = self.get_columns(table)
+        other_columns = [column for t, column in columns.read_columns
+                         if t == table and column.lower() not in key_columns
+                         and not _re_unindexed_type.search(table_columns[column.lower()][1] or '')]
+        if len(key) + len(other_columns) > max_index_columns:
+            return key
+        return key + other_columns
+
+
+@contextmanager
+def temporary_indexes(stages=None):
+    """
+    Create the suggested indexes of the registered statements of the stages
+    (chw-action commands) for the duration of the context, yielding the suggestions
+    """
+    advisor = QueryPlanAdvisor()
+    suggestions = advisor.suggest_indexes(stages=stages)
+    advisor.create_indexes(suggestions)
+    try:
+        yield suggestions
+    finally:
+        advisor.drop_indexes(suggestions)
+        advisor.close()
+
+
+def plans_to_json(plans, backend):
+    """
+    Get the plan snapshot (a json serializable dict) of the plans
+    """
+    return {'captured': datetime.now().isoformat(timespec='seconds'),
+            'backend': backend,
+            'statements': {name: ({'stage': plan['stage'], 'error': plan['error']} if 'error' in plan else
+                                  {'stage': plan['stage'],
+                                   'full_scans': plan['full_scans'],
+                                   'steps': [[step.table, step.access, step.index] for step in plan['steps']],
+                                  })
+                           for name, plan in plans.items()},
+           }
+
+
+def save_plans(path, plans, backend):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(plans_to_json(plans, backend), f, indent=2)
+        f.write('\n')
+
+
+def compare_plans(baseline_path, plans):
+    """
+    Compare the plans to the plan snapshot at baseline_path.
+    Returns a list of (statement name, status, details) for the statements, the status
+    is 'regressed' when the statement now scans the tables (the details), 'failed' when
+    the statement can't be explained but it could in the snapshot (the details are
+    the error), 'unbaselined' when the statement isn't in the snapshot (its plan isn't
+    checked, so the snapshot must be updated), otherwise 'changed' or 'unchanged'
+    (w/ no details). A statement which couldn't be explained in the snapshot isn't
+    compared.
+    """
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)['statements']
+
+    comparison = []
+    for name, plan in plans.items():
+        if name not in baseline:
+            comparison.append((name, 'unbaselined', []))
+            continue
+        if 'error' in baseline[name]:
+            continue
+        if 'error' in plan:
+            comparison.append((name, 'failed', [plan['error']]))
+            continue
+        new_scans = sorted(set(plan['full_scans']) - set(baseline[name]['full_scans']))
+        steps = [[step.table, step.access, step.index] for step in plan['steps']]
+        if new_scans:
+            comparison.append((name, 'regressed', new_scans))
+        else:
+            comparison.append((name, 'changed' if steps != baseline[name]['steps'] else 'unchanged', []))
+    return comparison
+
+
+def do_query_plans(*, stages=None, suggest=False, create=False, analyze=False, save=None, baseline=None):
+    advisor = QueryPlanAdvisor()
+    if analyze:
+        advisor.analyze_tables()
+
+    plans = advisor.get_plans(stages)
+    for name, plan in plans.items():
+        if 'error' in plan:
+            print(f'{name} ({plan["stage"]}): {plan["error"]}')
+            continue
+        print(f'{name} ({plan["stage"]})' + (f'  FULL SCAN {", ".join(plan["full_scans"])}'
+                                             if plan['full_scans'] else ''))
+        for step in plan['steps']:
+            print(f'    {step.access:10} {step.table or "":32} {step.detail}')
+
+    if suggest or create:
+        suggestions = advisor.suggest_indexes(plans)
+        if create:
+            advisor.create_indexes(suggestions)
+        print(f'\n-- {len(suggestions)} suggested indexes' + (' (created)' if create else ''))
+        for suggestion in suggestions:
+            print(f'-- for {", ".join(suggestion.statements)}\n{get_create_index_sql(suggestion)};')
+
+    if save is not None:
+        save_plans(save, plans, chw_db.default_backend)
+        print(f'\nPlans saved to {save}')
+
+    if baseline is not None:
+        comparison = compare_plans(baseline, plans)
+        regressions = [(name, tables) for name, status, tables in comparison if status == 'regressed']
+        failures = [(name, details[0]) for name, status, details in comparison if status == 'failed']
+        unbaselined = [name for name, status, _ in comparison if status == 'unbaselined']
+        changed = [name for name, status, _ in comparison if status == 'changed']
+        print(f'\nCompared to {baseline}: {len(regressions) + len(failures)} regressed,'
+              f' {len(unbaselined)} not in the baseline, {len(changed)} changed')
+        for name, tables in regressions:
+            print(f'  REGRESSED {name}: now scans {", ".join(tables)}')
+        for name, error in failures:
+            print(f'  REGRESSED {name}: now fails {error}')
+        for name in unbaselined:
+            print(f'  NOT IN BASELINE {name}: update the baseline to check its plan')
+        for name in changed:
+            print(f'  changed   {name}')
+        if regressions or failures or unbaselined:
+            sys.exit(1)
+
+
+def _test():
+    for stmt in registered_statements:
+        print(stmt.name, stmt.stage, stmt.sql.count('?') == len(stmt.params))
+
+
+if __name__ == '__main__':
+    _test()
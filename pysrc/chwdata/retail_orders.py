@@ -24,17 +24,41 @@ import sys
 import time
 import logging
 import pprint
+import re
 from datetime import timedelta, date
 
 # Third party imports
 
 # Local application imports
-from .chw_db import CHW_DB, mariadb
+from .chw_db import CHW_DB
+from .change_feed import change_timestamp
+from .addresses import Address, AddressIndex
 from .chw_sql import CHW_SQL
+from .order_columns import OrderColumns, rows_nbytes
+from .transactions import TransactionPolicy
+from .wine_matcher import WineMatcher
 
 
 default_update_user = 'Gillian'
 
+# A number of cases or units (bottles) in a legacy order quantity, e.g. "2 cases", "6 btls", "1 cs", "12"
+_re_quantity_term = re.compile(r'(\d+)\s*(?:(cases?|cs|bottles?|btls?|bts?)\.?)?', re.IGNORECASE)
+# A whole legacy order quantity, its terms optionally separated by "+", ",", "&" or "and", e.g. "1 cs + 6"
+# (a fraction or decimal, e.g. "1/2 case", "1.5 cases", or a word, e.g. "half case", doesn't match)
+_re_quantity = re.compile(r'\s*(?:(?:\+|,|&|and\b)?\s*\d+\s*(?:(?:cases?|cs|bottles?|btls?|bts?)\.?)?\s*)+',
+                          re.IGNORECASE)
+# A bottle size in a legacy order quantity, w/ the number of bottles of that size when
+# given, e.g. "3x750ml" (3 bottles), "2 cases 375ml"
+_re_quantity_bottle_size = re.compile(r'\b(?:(\d+)\s*[x*]\s*)?\d+(?:\.\d+)?\s*'
+                                      r'(?:ml|cl|l|ltrs?|liters?|litres?)\b',
+                                      re.IGNORECASE)
+
+# The parts of a legacy phone number, e.g. "1-404-474-5405", "(467) 397-0472 x12", "353 349 6102 (cell)"
+_re_phone_extension = re.compile(r'\s*(?:x|ext\.?|extension)\s*(\d+)\s*$', re.IGNORECASE)
+_re_phone_type = re.compile(r'\s*[(\[]?\b(cell|mobile|home|work|office|fax)\b[)\]]?\s*', re.IGNORECASE)
+_re_non_digit = re.compile(r'\D')
+_re_whitespace = re.compile(r'\s+')
+
 
 class RetailOrders(CHW_DB):
     """
@@ -51,6 +75,19 @@ class RetailOrders(CHW_DB):
     - Email customers and their orders
     """
 
+    # Constants used to configure the Retail Orders SQL statements
+    DB_CNTR_DATADIR = '/tmp/data/infiles/'
+    LEGACY_ORDERS_CSV_FILENAME = 'EmailWineOrders_02-19-xform.csv'
+    LEGACY_ORDERS_TABLE_SUFFIX = '_0219'
+    # The retailer of legacy orders which don't have one
+    UNKNOWN_RETAILER_NAME = 'Unknown'
+    # Units per case of a wine which isn't known (when converting bottles to cases)
+    DEFAULT_UNITS_PER_CASE = 12
+    # The legacy order phone number columns and the EmailCustomerPhoneNumbers Type of their numbers
+    LEGACY_PHONE_COLUMN_TYPES = (('PhoneHome', 'home'), ('PhoneWork', 'work'), ('FaxNumber', 'fax'))
+    # Max length of EmailCustomerPhoneNumbers PhoneNumber
+    MAX_PHONE_NUMBER_LEN = 25
+
     def __init__(self, **kwargs):
         """
         Initialize the RetailOrders class, setting initial values for all instance variables
@@ -60,6 +97,8 @@ class RetailOrders(CHW_DB):
         """
         super().__init__(**kwargs)
         self.logger = logging.getLogger('CynthiaHurleyDB.RetailOrders')
+        # Cache of the Retailers RetailerId by casefolded Name (see get_retailer_ids)
+        self._retailer_ids = None
 
     def load_legacy_table_from_csv(self):
         """
@@ -72,12 +111,10 @@ class RetailOrders(CHW_DB):
         Query OK, 26538 rows affected, 83 warnings (0.296 sec)
         Records: 26538  Deleted: 0  Skipped: 0  Warnings: 83
         """
-        DB_CNTR_DATADIR = '/tmp/data/infiles/'
-        CSV_FILENAME = 'EmailWineOrders_02-19-xform.csv'
-        LEGACY_TABLE_SUFFIX = '_0219'
-        sql = CHW_SQL.get_legacy_email_orders_load_data({'suffix':  LEGACY_TABLE_SUFFIX,
-                                                         'csvfile': CSV_FILENAME,
-                                                         'datadir': DB_CNTR_DATADIR})
+        load_data_params = self.get_load_data_params(RetailOrders.DB_CNTR_DATADIR)
+        sql = CHW_SQL.get_legacy_email_orders_load_data({'suffix':  RetailOrders.LEGACY_ORDERS_TABLE_SUFFIX,
+                                                         'csvfile': RetailOrders.LEGACY_ORDERS_CSV_FILENAME,
+                                                         **load_data_params})
 
         with (self._connection.cursor() as legacy_email_orders_load_data):
             t = time.process_time()
@@ -89,7 +126,7 @@ class RetailOrders(CHW_DB):
 
         self._connection.commit()
 
-    def create_customers_from_legacy(self, update_user=default_update_user):
+    def create_customers_from_legacy(self, update_user=default_update_user, batch_size=5000, policy=None):
         """
         Create retail customers from LegacyEmailOrders
         - Find all unique FullName's which are not empty.
@@ -111,79 +148,430 @@ class RetailOrders(CHW_DB):
         - INSERT EmailCustomer record (get the assigned EmailCustomerId (HOW? cursor.lastrowid))
         - INSERT an EmailCustomers_LegacyEmailOrders record for EVERY LegacyEmailOrders record which
           has that unique FullName.
+        - INSERT an EmailCustomerPhoneNumbers record for each unique phone number (PhoneHome,
+          PhoneWork and FaxNumber) in all of the customer's orders (see normalize_phone_number).
+          They are collected while reading the customer's orders and inserted in batches of
+          batch_size.
+
+        The customers are committed every policy.commit_every customers, and the FullNames
+        which have already been migrated are skipped, so after a transient error this resumes
+        on a new connection where it left off (see CHW_DB.run_resumable), and it can be rerun.
+        """
+        def create_customers(committer):
+            migrated_fullnames = {row[0] for row in self.stream_rows(CHW_SQL.migrated_fullnames_sql)}
+
+            with (self._connection.cursor(prepared=True) as legacy_customer_info_cursor,
+                  self._connection.cursor(prepared=True) as insert_email_customer_cursor,
+                  self._connection.cursor(prepared=True) as insert_customer_legacyorder_cursor,
+                  self._connection.cursor(prepared=True) as insert_customer_phone_number_cursor):
+
+                # print(CHW_SQL.unique_fullname_sql, file=sys.stdout)
+                # print(CHW_SQL.legacy_customer_info_sql, file=sys.stdout)
+                # print(CHW_SQL.insert_email_customer_sql, file=sys.stdout)
+                # print(CHW_SQL.insert_customer_legacyorder_sql, file=sys.stdout)
+
+                customer_count = 0
+                needs_review = 0
+                phone_number_count = 0
+                customer_phone_numbers = []
+
+                def insert_phone_numbers():
+                    nonlocal customer_phone_numbers, phone_number_count
+                    if customer_phone_numbers:
+                        insert_customer_phone_number_cursor.executemany(
+                            CHW_SQL.insert_customer_phone_number_sql, customer_phone_numbers)
+                        phone_number_count += len(customer_phone_numbers)
+                        customer_phone_numbers = []
+
+                # the batched phone numbers of the customers must be inserted w/ them
+                committer.flush = insert_phone_numbers
+                for fullname_row in self.stream_rows(CHW_SQL.unique_fullname_sql):
+                    if fullname_row[0] in migrated_fullnames:
+                        continue
+
+                    # Parse name into title, given_name, surname, suffix, manual_review_needed
+                    parsed_name = self.parse_fullname(fullname_row[0])
+
+                    # Get Legacy order records for fullname
+                    legacy_customer_info_cursor.execute(CHW_SQL.legacy_customer_info_sql, (fullname_row[0],))
+
+                    # TODO: for now we'll just use the FirstDate and Email1 from the 1st legacy order
+                    #       as the values for the new email customer record
+                    customer_info = self._get_customer_info_from_legacy_orders(legacy_customer_info_cursor)
+
+                    # Insert new Email Customer record
+                    email = None if len(customer_info['email']) == 0 else customer_info['email'][0]
+                    first_order_date = customer_info['first_order_date']
+                    if first_order_date is None:
+                        first_order_date = date(1970, 1, 1)
+                    new_email_customer = (parsed_name['title'],
+                                          parsed_name['given_name'],
+                                          parsed_name['surname'],
+                                          parsed_name['suffix'],
+                                          email,
+                                          first_order_date,
+                                          update_user,
+                                          change_timestamp(),
+                                          update_user
+                                         )
+
+                    # print(new_email_customer, file=sys.stdout)
+                    insert_email_customer_cursor.execute(CHW_SQL.insert_email_customer_sql,
+                                                         new_email_customer)
+                    customer_id = insert_email_customer_cursor.lastrowid
+                    name_needs_review = parsed_name['manual_review_needed']
+                    email_needs_review = customer_info['email_needs_review']
+                    conversion_notes = ('Email was changed in order ids: '
+                                        + ', '.join([str(id)
+                                                     for id in customer_info['email_changed_orderids']])
+                                        if len(customer_info['email_changed_orderids']) > 0 else None)
+                    for order_id in customer_info['order_ids']:
+                        customer_legacyorder = (customer_id,
+                                                order_id,
+                                                name_needs_review,
+                                                email_needs_review,
+                                                conversion_notes
+                                               )
+                        # print(customer_legacyorder, file=sys.stdout)
+                        insert_customer_legacyorder_cursor.execute(CHW_SQL.insert_customer_legacyorder_sql,
+                                                                   customer_legacyorder)
+
+                    for n, (phone_number, phone_type) in enumerate(customer_info['phone_numbers'], start=1):
+                        customer_phone_numbers.append((customer_id, n, phone_number, phone_type))
+                    if len(customer_phone_numbers) >= batch_size:
+                        insert_phone_numbers()
+
+                    # f = sys.stdout
+                    # f.write(f'  {"":4} < {b[0]:4}: {b[1]:4}\n')
+                    # print(new_email_customer, file=sys.stdout)
+                    # print('!!' if parsed_name['manual_review_needed'] else '--',
+                    #       fullname_row[0], '-->',
+                    #       'T:"' + parsed_name['title'] + '"' if parsed_name['title'] is not None else '',
+                    #       'F:"' + parsed_name['given_name'] + '"',
+                    #       'L:"' + parsed_name['surname'] + '"',
+                    #       'S:"' + parsed_name['suffix'] + '"' if parsed_name['suffix'] is not None else '',
+                    #       'E:', customer_info['email'],
+                    #       file=sys.stdout)
+
+                    customer_count += 1
+                    needs_review += 1 if parsed_name['manual_review_needed'] else 0
+                    committer.unit_done()
+
+                committer.commit()
+                print('Total customers:', customer_count, 'Needs review:', needs_review,
+                      'Phone numbers:', phone_number_count, 'Already migrated:', len(migrated_fullnames))
+
+        self.run_resumable(create_customers, policy=policy)
+
+    def match_legacy_order_items_to_wines(self, batch_size=5000):
+        """
+        Match the free text items (DelItems, DelItem2 ... DelItem5 and their vintages)
+        of the LegacyEmailOrders to Wines, replacing all of the Wines_LegacyEmailOrders records.
+
+        The Wines and Producers must have already been created. Each item gets a
+        Wines_LegacyEmailOrders record w/ the best matching WineId (NULL if there
+        was no match), the match score and whether the match needs review.
+        """
+        t = time.process_time()
+        matcher = WineMatcher(self.cached_query(CHW_SQL.wines_for_matching_sql))
+        indextime = time.process_time() - t
+
+        sql = CHW_SQL.get_legacy_order_items_sql({'suffix': RetailOrders.LEGACY_ORDERS_TABLE_SUFFIX})
+        item_cnt = matched_cnt = needs_review = 0
+        with self._connection.cursor(prepared=True) as insert_wine_legacyorder_cursor:
+            insert_wine_legacyorder_cursor.execute(CHW_SQL.delete_wines_legacyorders_sql)
+
+            wine_legacyorders = []
+            for order_row in self.stream_rows(sql):
+                order_id = order_row[0]
+                for n in range(1, 6):
+                    item, vintage = order_row[2 * n - 1], order_row[2 * n]
+                    if item is None or item.strip() == '':
+                        continue
+
+                    match = matcher.match(item, vintage)
+                    wine_legacyorders.append((order_id, n, match.wine_id, round(match.score, 3),
+                                              match.needs_review, match.notes))
+                    item_cnt += 1
+                    matched_cnt += 1 if match.wine_id is not None else 0
+                    needs_review += 1 if match.needs_review else 0
+
+                if len(wine_legacyorders) >= batch_size:
+                    insert_wine_legacyorder_cursor.executemany(CHW_SQL.insert_wine_legacyorder_sql,
+                                                               wine_legacyorders)
+                    wine_legacyorders = []
+
+            if wine_legacyorders:
+                insert_wine_legacyorder_cursor.executemany(CHW_SQL.insert_wine_legacyorder_sql,
+                                                           wine_legacyorders)
+
+        self._connection.commit()
+        exectime = time.process_time() - t
+        print(f'Indexed {matcher.wine_count} wines ({indextime:.3f} secs)')
+        print(f'Order items: {item_cnt} Matched: {matched_cnt} Needs review: {needs_review}'
+              f' ({exectime:.3f} secs)')
+
+    def get_retailer_ids(self):
         """
-        with (self._connection.cursor() as unique_fullname_cursor,
-              self._connection.cursor(prepared=True) as legacy_customer_info_cursor,
-              self._connection.cursor(prepared=True) as insert_email_customer_cursor,
-              self._connection.cursor(prepared=True) as insert_customer_legacyorder_cursor):
-
-            # print(CHW_SQL.unique_fullname_sql, file=sys.stdout)
-            # print(CHW_SQL.legacy_customer_info_sql, file=sys.stdout)
-            # print(CHW_SQL.insert_email_customer_sql, file=sys.stdout)
-            # print(CHW_SQL.insert_customer_legacyorder_sql, file=sys.stdout)
-
-            customer_count = 0
-            needs_review = 0
-            unique_fullname_cursor.execute(CHW_SQL.unique_fullname_sql)
-            for fullname_row in unique_fullname_cursor:
-                # Parse name into title, given_name, surname, suffix, manual_review_needed
-                parsed_name = self.parse_fullname(fullname_row[0])
-
-                # Get Legacy order records for fullname
-                legacy_customer_info_cursor.execute(CHW_SQL.legacy_customer_info_sql, (fullname_row[0],))
-
-                # TODO: for now we'll just use the FirstDate and Email1 from the 1st legacy order
-                #       as the values for the new email customer record
-                customer_info = self._get_customer_info_from_legacy_orders(legacy_customer_info_cursor)
-
-                # Insert new Email Customer record
-                new_email_customer = (parsed_name['title'],
-                                      parsed_name['given_name'],
-                                      parsed_name['surname'],
-                                      parsed_name['suffix'],
-                                      None if len(customer_info['email']) == 0 else customer_info['email'][0],
-                                      customer_info['first_order_date'] if customer_info['first_order_date'] is not None else date(1970, 1, 1),
-                                      update_user,
-                                      customer_info['last_order_date'] if customer_info['last_order_date'] is not None else date(1970, 1, 1),
-                                      update_user
-                                     )
-
-                # print(new_email_customer, file=sys.stdout)
-                insert_email_customer_cursor.execute(CHW_SQL.insert_email_customer_sql, new_email_customer)
-                customer_id = insert_email_customer_cursor.lastrowid
-                name_needs_review = parsed_name['manual_review_needed']
-                email_needs_review = customer_info['email_needs_review']
-                conversion_notes = ('Email was changed in order ids: '
-                                    + ', '.join([str(id) for id in customer_info['email_changed_orderids']])
-                                    if len(customer_info['email_changed_orderids']) > 0 else None)
-                for order_id in customer_info['order_ids']:
-                    customer_legacyorder = (customer_id,
-                                            order_id,
-                                            name_needs_review,
-                                            email_needs_review,
-                                            conversion_notes
-                                           )
-                    # print(customer_legacyorder, file=sys.stdout)
-                    insert_customer_legacyorder_cursor.execute(CHW_SQL.insert_customer_legacyorder_sql,
-                                                               customer_legacyorder)
-
-                # f = sys.stdout
-                # f.write(f'  {"":4} < {b[0]:4}: {b[1]:4}\n')
-                # print(new_email_customer, file=sys.stdout)
-                # print('!!' if parsed_name['manual_review_needed'] else '--',
-                #       fullname_row[0], '-->',
-                #       'T:"' + parsed_name['title'] + '"' if parsed_name['title'] is not None else '',
-                #       'F:"' + parsed_name['given_name'] + '"',
-                #       'L:"' + parsed_name['surname'] + '"',
-                #       'S:"' + parsed_name['suffix'] + '"' if parsed_name['suffix'] is not None else '',
-                #       'E:', customer_info['email'],
-                #       file=sys.stdout)
-
-                customer_count += 1
-                needs_review += 1 if parsed_name['manual_review_needed'] else 0
-
-            print('Total customers:', customer_count, 'Needs review:', needs_review)
+        Get the dictionary of RetailerId by casefolded retailer name, creating the
+        Retailers records for any retailers of the legacy orders which don't exist yet.
+        The Retailers Name unique index ignores case, so the names which only differ
+        in case (e.g. "WINE LIBRARY" and "Wine Library") are the same retailer, the
+        first name (in sorted order) is the one created.
+        The dictionary is cached so the Retailers are only read once.
+        """
+        if self._retailer_ids is not None:
+            return self._retailer_ids
+
+        sql = CHW_SQL.get_legacy_retailers_sql({'suffix': RetailOrders.LEGACY_ORDERS_TABLE_SUFFIX})
+        with (self._connection.cursor() as retailers_cursor,
+              self._connection.cursor(prepared=True) as insert_retailer_cursor):
+            retailer_ids = {name.casefold(): retailer_id
+                            for name, retailer_id in self.cached_query(CHW_SQL.retailers_sql)}
+
+            retailers_cursor.execute(sql)
+            legacy_retailers = {self.get_retailer_name(row[0]) for row in retailers_cursor.fetchall()}
+            for name in sorted(legacy_retailers):
+                if name.casefold() not in retailer_ids:
+                    insert_retailer_cursor.execute(CHW_SQL.insert_retailer_sql, (name,))
+                    retailer_ids[name.casefold()] = insert_retailer_cursor.lastrowid
+
         self._connection.commit()
+        self._retailer_ids = retailer_ids
+        return retailer_ids
+
+    def create_orders_from_legacy(self, chunk_size=5000):
+        """
+        Create Orders and Orders_Wines records from the LegacyEmailOrders
+        - The OrderId is the legacy EmailOrderId (as WineId is the legacy WineId)
+        - OrderDate is the FirstDate, AccountingOrderNo is the OrderNumber
+        - EmailCustomerId is the customer created from the order (EmailCustomers_LegacyEmailOrders)
+          orders w/o a customer (no FullName) are not migrated
+        - RetailerId is the Retailer's, Retailers are created as needed (see get_retailer_ids)
+        - AddressId is left NULL (the addresses are imported separately)
+        - An Orders_Wines record is created for each order item matched to a wine (by
+          match_legacy_order_items_to_wines) w/ the quantity parsed into cases and units.
+          The legacy orders have no item prices so CasePrice and UnitPrice are 0.
+
+        The customers must have been created and the order items matched to wines.
+        The orders are migrated in chunks of chunk_size EmailOrderIds, each committed
+        when done, and orders which were already migrated are skipped, so this can be
+        rerun (e.g. after it was interrupted or more legacy orders were loaded).
+        """
+        t = time.process_time()
+        suffix = {'suffix': RetailOrders.LEGACY_ORDERS_TABLE_SUFFIX}
+        retailer_ids = self.get_retailer_ids()
+        order_cnt = order_wine_cnt = 0
+
+        with (self._connection.cursor() as legacy_orders_cursor,
+              self._connection.cursor(prepared=True) as insert_order_cursor,
+              self._connection.cursor(prepared=True) as insert_order_wine_cursor):
+            wine_units_per_case = dict(self.cached_query(CHW_SQL.wine_units_per_case_sql))
+
+            legacy_orders_cursor.execute(CHW_SQL.get_legacy_order_id_range_sql(suffix))
+            min_order_id, max_order_id = legacy_orders_cursor.fetchone()
+            if min_order_id is None:
+                max_order_id = min_order_id = 0
+
+            legacy_orders_sql = CHW_SQL.get_legacy_orders_to_migrate_sql(suffix)
+            for chunk_start in range(min_order_id, max_order_id + 1, chunk_size):
+                chunk_range = (chunk_start, chunk_start + chunk_size - 1)
+
+                legacy_orders_cursor.execute(CHW_SQL.legacy_order_item_wines_sql, chunk_range)
+                item_wines = {(order_id, n): wine_id
+                              for order_id, n, wine_id in legacy_orders_cursor.fetchall()}
+
+                legacy_orders_cursor.execute(legacy_orders_sql, chunk_range)
+                orders = []
+                order_wines = {}
+                for (order_id, order_date, order_number, customer_id, retailer,
+                     additional_charges, *quantities) in legacy_orders_cursor.fetchall():
+                    orders.append((order_id,
+                                   order_date if order_date is not None else date(1970, 1, 1),
+                                   order_number or '',
+                                   customer_id,
+                                   None,
+                                   retailer_ids[self.get_retailer_name(retailer).casefold()],
+                                   additional_charges or None,
+                                   None
+                                  ))
+
+                    for n, quantity in enumerate(quantities, start=1):
+                        wine_id = item_wines.get((order_id, n))
+                        if wine_id is None:
+                            continue
+                        cases, units = self.parse_quantity(quantity)
+                        # the same wine may be more than one item of an order
+                        prev_cases, prev_units = order_wines.get((order_id, wine_id), (0, 0))
+                        order_wines[(order_id, wine_id)] = (prev_cases + cases, prev_units + units)
+
+                order_wine_rows = []
+                for (order_id, wine_id), (cases, units) in order_wines.items():
+                    units_per_case = wine_units_per_case.get(wine_id) or RetailOrders.DEFAULT_UNITS_PER_CASE
+                    extra_cases, units = divmod(units, units_per_case)
+                    order_wine_rows.append((order_id, wine_id, cases + extra_cases, units, 0, 0))
+
+                if orders:
+                    insert_order_cursor.executemany(CHW_SQL.insert_order_sql, orders)
+                if order_wine_rows:
+                    insert_order_wine_cursor.executemany(CHW_SQL.insert_order_wine_sql, order_wine_rows)
+                self._connection.commit()
+
+                order_cnt += len(orders)
+                order_wine_cnt += len(order_wine_rows)
+
+        exectime = time.process_time() - t
+        print(f'Orders created: {order_cnt} Order wines created: {order_wine_cnt} ({exectime:.3f} secs)')
+
+    def import_addresses_from_legacy(self, batch_size=5000):
+        """
+        Create Addresses from the legacy orders' addresses, and link them to their
+        customers (EmailCustomers_ShippingAddresses) and orders (Orders.AddressId)
+        - The address (Street, CompanyAptNo as Street2, City, State, Zip) is normalized:
+          case, whitespace, street words abbreviated (Street -> St), state to its postal
+          abbreviation and the zip code to 5 digits or ZIP+4 (see chwdata.addresses)
+        - Addresses are deduplicated by the hash of their normalized form, so all the
+          orders to the same address get a single Addresses record
+        - Orders w/o a street aren't given an address
+
+        The customers must have been created, and if the orders have been created
+        their AddressId is set. The existing addresses and links are read first and
+        only the new ones are created, so this can be rerun.
+        """
+        t = time.process_time()
+        sql = CHW_SQL.get_legacy_order_addresses_sql({'suffix': RetailOrders.LEGACY_ORDERS_TABLE_SUFFIX})
+        address_cnt = link_cnt = order_cnt = 0
+
+        with (self._connection.cursor() as legacy_addresses_cursor,
+              self._connection.cursor(prepared=True) as insert_address_cursor,
+              self._connection.cursor(prepared=True) as insert_customer_address_cursor,
+              self._connection.cursor(prepared=True) as update_order_address_cursor):
+            address_index = AddressIndex(self.cached_query(CHW_SQL.lookup_us_states_sql))
+
+            legacy_addresses_cursor.execute(CHW_SQL.addresses_sql)
+            for address_id, *address in legacy_addresses_cursor.fetchall():
+                address_index.add(Address(*address), address_id)
+            legacy_addresses_cursor.execute(CHW_SQL.max_address_id_sql)
+            last_address_id = legacy_addresses_cursor.fetchone()[0] or 0
+
+            legacy_addresses_cursor.execute(CHW_SQL.customer_shipping_addresses_sql)
+            customer_addresses = set(legacy_addresses_cursor.fetchall())
+
+            new_addresses = []
+            new_customer_addresses = []
+            order_addresses = []
+
+            def write_batches():
+                # the addresses must be inserted before the rows referencing them
+                insert_address_cursor.executemany(CHW_SQL.insert_address_sql, new_addresses)
+                insert_customer_address_cursor.executemany(CHW_SQL.insert_customer_shipping_address_sql,
+                                                           new_customer_addresses)
+                update_order_address_cursor.executemany(CHW_SQL.update_order_address_sql, order_addresses)
+                for batch in (new_addresses, new_customer_addresses, order_addresses):
+                    batch.clear()
+
+            for _, customer_id, order_id, order_address_id, *legacy_address in self.stream_rows(sql):
+                address = address_index.normalize(*legacy_address)
+                if address is None:
+                    continue
+
+                address_id = address_index.get(address)
+                if address_id is None:
+                    last_address_id += 1
+                    address_id = last_address_id
+                    address_index.add(address, address_id)
+                    new_addresses.append((address_id, *address))
+                    address_cnt += 1
+
+                if (customer_id, address_id) not in customer_addresses:
+                    customer_addresses.add((customer_id, address_id))
+                    new_customer_addresses.append((customer_id, address_id))
+                    link_cnt += 1
+
+                if order_id is not None and order_address_id != address_id:
+                    order_addresses.append((address_id, order_id))
+                    order_cnt += 1
+
+                if len(order_addresses) + len(new_customer_addresses) >= batch_size:
+                    write_batches()
+
+            write_batches()
+
+        self._connection.commit()
+        exectime = time.process_time() - t
+        print(f'Addresses created: {address_cnt} Customer addresses: {link_cnt}'
+              f' Order addresses set: {order_cnt} ({exectime:.3f} secs)')
+
+    def load_order_columns(self):
+        """
+        Load the analytic columns of the legacy email orders into an OrderColumns
+        (see chwdata.order_columns) for ad-hoc analytics w/o database round trips.
+        - The customer is the order's FullName (whitespace normalized), the retailer
+          is its Retailers name (see get_retailer_name) and the state is upper cased
+        - Each non-empty item (DelItems, DelItem2 ... DelItem5) is an item row w/ its
+          whitespace normalized name, its vintage and its quantity parsed into cases
+          and units (see parse_quantity)
+
+        The rows are streamed, so only the columns are held in memory.
+        """
+        sql = CHW_SQL.get_legacy_order_columns_sql({'suffix': RetailOrders.LEGACY_ORDERS_TABLE_SUFFIX})
+        columns = OrderColumns(units_per_case=RetailOrders.DEFAULT_UNITS_PER_CASE)
+        max_quantity = 0xFFFF
+        for order_id, order_date, subtotal, fullname, retailer, state, *items in self.stream_rows(sql):
+            order_row = columns.append_order(order_id, order_date, subtotal,
+                                             ' '.join((fullname or '').split()),
+                                             self.get_retailer_name(retailer),
+                                             (state or '').strip().upper())
+            for n in range(0, len(items), 3):
+                item, vintage, quantity = items[n:n + 3]
+                item = ' '.join((item or '').split())
+                if item == '':
+                    continue
+                cases, units = self.parse_quantity(quantity)
+                columns.append_item(order_row, item, vintage,
+                                    min(cases, max_quantity), min(units, max_quantity))
+
+        return columns
+
+    def write_order_analytics(self, key, *, value='orders', top=10, start=None, end=None, retailer=None,
+                              state=None, item=None, show_memory=False):
+        """
+        Write the top values of the key (see OrderColumns.top_n) of the legacy orders
+        w/ the given order date range, retailer, state and item to stdout.
+        With show_memory the memory used by the order columns is compared to the
+        memory used by the same columns as a list of tuple rows.
+        """
+        f = sys.stdout
+
+        t = time.perf_counter()
+        columns = self.load_order_columns()
+        loadtime = time.perf_counter() - t
+
+        t = time.perf_counter()
+        rows = None
+        if (start, end, retailer, state, item) != (None,) * 5:
+            rows = columns.filter(start=start, end=end, retailer=retailer, state=state, item=item)
+        top_values = columns.top_n(key, top, rows, value=value)
+        querytime = time.perf_counter() - t
+
+        f.write(f'Loaded {len(columns)} orders w/ {columns.item_count} items ({loadtime:.3f} secs)\n')
+        if show_memory:
+            tuple_rows = [(columns.order_id[row], columns.order_date[row], columns.subtotal[row],
+                           columns.customer[row], columns.retailer[row], columns.state[row])
+                          for row in range(len(columns))]
+            tuple_rows += [(columns.item_order[row], columns.item[row], columns.vintage[row],
+                            columns.cases[row], columns.units[row])
+                           for row in range(columns.item_count)]
+            column_bytes, tuple_bytes = columns.nbytes(), rows_nbytes(tuple_rows)
+            f.write(f'Memory: columns {column_bytes:,} bytes, tuple rows {tuple_bytes:,} bytes'
+                    f' ({column_bytes / max(len(columns), 1):.1f} vs {tuple_bytes / max(len(columns), 1):.1f}'
+                    f' bytes per order)\n')
+
+        f.write(f'\nTop {top} {key} by {value} of {len(rows) if rows is not None else len(columns)} orders'
+                f' ({querytime:.3f} secs)\n\n')
+        for key_value, total in top_values:
+            total = f'{total:12,.2f}' if isinstance(total, float) else f'{total:12,}'
+            f.write(f'{total}  {key_value}\n')
 
     def write_top_customer_order_report(self):
         """
@@ -221,37 +609,34 @@ class RetailOrders(CHW_DB):
         customer_item_report_new_order = '| {5} / {6:>5} | {7:56} | {8!s:>7} | {9:8} |\n'
         customer_item_report_add_item  = '|                    | {7:56} | {8!s:>7} | {9:8} |\n'
 
-        with self._connection.cursor() as top_customer_order_items_cursor:
-            top_customer_order_items_cursor.execute(CHW_SQL.orders_of_top_customers_sql)
-
-            # Write out Report header
-            f.write('# Items Ordered by Customer\n\n')
+        # Write out Report header
+        f.write('# Items Ordered by Customer\n\n')
 
-            prev_customer_id = cur_customer_id = None
-            prev_order_id = cur_order_id = None
-            for customer_order_row in top_customer_order_items_cursor:
-                # Check for customer change
-                if customer_order_row[EmailCustomerId] != prev_customer_id:
-                    # Write out header info for changed customer
-                    f.write(customer_item_report_header.format(*customer_order_row))
+        prev_customer_id = cur_customer_id = None
+        prev_order_id = cur_order_id = None
+        for customer_order_row in self.stream_rows(CHW_SQL.orders_of_top_customers_sql):
+            # Check for customer change
+            if customer_order_row[EmailCustomerId] != prev_customer_id:
+                # Write out header info for changed customer
+                f.write(customer_item_report_header.format(*customer_order_row))
 
-                    # save current customer id as previous
-                    prev_customer_id = customer_order_row[EmailCustomerId]
+                # save current customer id as previous
+                prev_customer_id = customer_order_row[EmailCustomerId]
 
-                # Check for order change
-                order_fmt = customer_item_report_add_item
-                if customer_order_row[EmailOrderId] != prev_order_id:
-                    # switch the order fmt to include the order info column
-                    order_fmt = customer_item_report_new_order
+            # Check for order change
+            order_fmt = customer_item_report_add_item
+            if customer_order_row[EmailOrderId] != prev_order_id:
+                # switch the order fmt to include the order info column
+                order_fmt = customer_item_report_new_order
 
-                    # save current order id as previous
-                    prev_order_id = customer_order_row[EmailOrderId]
+                # save current order id as previous
+                prev_order_id = customer_order_row[EmailOrderId]
 
-                # write the item ordered
-                f.write(order_fmt.format(*customer_order_row))
+            # write the item ordered
+            f.write(order_fmt.format(*customer_order_row))
 
-            # Write a final blank line to end the final item table in the markdown report
-            f.write('\n')
+        # Write a final blank line to end the final item table in the markdown report
+        f.write('\n')
 
     @classmethod
     def _get_customer_info_from_legacy_orders(cls, legacy_customer_info_cursor):
@@ -268,8 +653,11 @@ class RetailOrders(CHW_DB):
                          'email_needs_review':     False,
                          'email_changed_orderids': [],
                          'first_order_date':       date(1970, 1, 1),
-                         'last_order_date':        date(1970, 1, 1)
+                         'last_order_date':        date(1970, 1, 1),
+                         'phone_numbers':          []
                         }
+        # the customer's unique phone numbers in the order they were first seen
+        phone_numbers = {}
 
         # TODO: for now we'll just use the FirstDate and Email1 from the 1st legacy order
         #       as the values for the new email customer record
@@ -283,12 +671,14 @@ class RetailOrders(CHW_DB):
         # NOTE: I think FirstDate is the order date
         customer_info['first_order_date'] = customer_info_row[column_names.index('FirstDate')]
         customer_info['last_order_date'] = customer_info['first_order_date']
+        cls._add_phone_numbers(phone_numbers, customer_info_row, column_names)
 
         prevEmail1 = curEmail1
 
         for customer_info_row in legacy_customer_info_cursor:
             customer_info['order_ids'] += [customer_info_row[column_names.index('EmailOrderId')]]
             customer_info['last_order_date'] = customer_info_row[column_names.index('FirstDate')]
+            cls._add_phone_numbers(phone_numbers, customer_info_row, column_names)
 
             curEmail1 = customer_info_row[column_names.index('Email1')]
             if curEmail1 != prevEmail1:
@@ -299,9 +689,93 @@ class RetailOrders(CHW_DB):
 
         customer_info['email'] = RetailOrders.get_email_addresses(prevEmail1)
         customer_info['email_needs_review'] = len(customer_info['email']) > 1
+        customer_info['phone_numbers'] = list(phone_numbers.items())
 
         return customer_info
 
+    @classmethod
+    def _add_phone_numbers(cls, phone_numbers, customer_info_row, column_names):
+        """
+        Add the normalized phone numbers of the legacy order row to the phone_numbers
+        dict of phone number to type, a number already in the dict keeps its type.
+        """
+        for column_name, phone_type in cls.LEGACY_PHONE_COLUMN_TYPES:
+            phone = cls.normalize_phone_number(customer_info_row[column_names.index(column_name)], phone_type)
+            if phone is not None and phone[0] not in phone_numbers:
+                phone_numbers[phone[0]] = phone[1]
+
+    @staticmethod
+    def get_retailer_name(legacy_retailer):
+        """
+        Get the Retailers name for the Retailer of a legacy order
+        """
+        name = ' '.join((legacy_retailer or '').split())
+        return name if name != '' else RetailOrders.UNKNOWN_RETAILER_NAME
+
+    @staticmethod
+    def parse_quantity(quantity):
+        """
+        Parse the freeform quantity of a legacy order item into the number of cases
+        and units (bottles) returned as a tuple, e.g.
+          "2 cases" -> (2, 0), "6 btls" -> (0, 6), "1 cs + 6" -> (1, 6), "12" -> (0, 12),
+          "3x750ml" -> (0, 3), "1 case 375ml" -> (1, 0)
+        Quantities which can't be parsed, e.g. a fraction ("1/2 case"), a decimal
+        ("1.5 cases") or words ("half case"), are (0, 0) and are logged.
+        """
+        if (quantity or '').strip() == '':
+            return 0, 0
+        counts = _re_quantity_bottle_size.sub(lambda m: f' {m.group(1)} btls ' if m.group(1) else ' ',
+                                              quantity)
+        if not _re_quantity.fullmatch(counts):
+            logging.getLogger('CynthiaHurleyDB.RetailOrders').warning(
+                'Legacy order quantity %r could not be parsed, using 0 cases and 0 units', quantity.strip())
+            return 0, 0
+
+        cases = units = 0
+        for number, unit in _re_quantity_term.findall(counts):
+            if unit.lower().startswith('c'):
+                cases += int(number)
+            else:
+                units += int(number)
+        return cases, units
+
+    @staticmethod
+    def normalize_phone_number(phone, phone_type):
+        """
+        Normalize the freeform legacy phone number returning a tuple of the number and its
+        type, or None if there is no number. The type is the given type unless the number
+        is annotated w/ one, e.g.
+          "1-404-474-5405" -> ("(404) 474-5405", phone_type)
+          "574-543-8514 x610" -> ("(574) 543-8514 x610", phone_type)
+          "353 349 6102 (cell)" -> ("(353) 349-6102", "cell")
+        Numbers which aren't 7 or 10 digit US numbers are kept w/ their whitespace normalized.
+        """
+        phone = _re_whitespace.sub(' ', phone or '').strip()
+        m = _re_phone_type.search(phone)
+        if m:
+            phone_type = m.group(1).lower()
+            phone = (phone[:m.start()] + ' ' + phone[m.end():]).strip()
+
+        extension = ''
+        m = _re_phone_extension.search(phone)
+        if m:
+            extension = f' x{m.group(1)}'
+            phone = phone[:m.start()]
+
+        digits = _re_non_digit.sub('', phone)
+        if len(digits) == 11 and digits[0] == '1':
+            digits = digits[1:]
+        if len(digits) == 10:
+            phone = f'({digits[:3]}) {digits[3:6]}-{digits[6:]}{extension}'
+        elif len(digits) == 7:
+            phone = f'{digits[:3]}-{digits[3:]}{extension}'
+        elif len(digits) == 0:
+            return None
+        else:
+            phone += extension
+
+        return phone[:RetailOrders.MAX_PHONE_NUMBER_LEN], phone_type
+
     @staticmethod
     def parse_fullname(fullname):
         """
@@ -403,9 +877,30 @@ def do_load_legacy_email_orders_from_csv():
     retailOrders.load_legacy_table_from_csv()
 
 
-def do_create_customers_from_legacy(user):
+def do_create_customers_from_legacy(user, commit_every=None):
+    retailOrders = RetailOrders()
+    policy = TransactionPolicy(commit_every=commit_every) if commit_every is not None else None
+    retailOrders.create_customers_from_legacy(policy=policy)
+
+
+def do_match_legacy_order_items_to_wines():
+    retailOrders = RetailOrders()
+    retailOrders.match_legacy_order_items_to_wines()
+
+
+def do_create_orders_from_legacy():
+    retailOrders = RetailOrders()
+    retailOrders.create_orders_from_legacy()
+
+
+def do_import_addresses_from_legacy():
+    retailOrders = RetailOrders()
+    retailOrders.import_addresses_from_legacy()
+
+
+def do_write_order_analytics(key, **kwargs):
     retailOrders = RetailOrders()
-    retailOrders.create_customers_from_legacy()
+    retailOrders.write_order_analytics(key, **kwargs)
 
 
 def do_write_top_customer_order_report():
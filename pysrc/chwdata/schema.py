@@ -0,0 +1,230 @@
+"""
+################################################################################
+  chwdata.schema.py
+################################################################################
+
+This module creates the chw schema from the MySQL DDL files in phases, so that
+a new database can be bulk loaded before its indexes and foreign keys are
+created, which is much faster than loading into fully constrained tables.
+
+The DDL statements are parsed into the phases:
+- tables:      CREATE TABLE (w/ the primary key) and the ALTER TABLE statements
+               which set the table and column comments
+- indexes:     CREATE [UNIQUE] INDEX
+- constraints: ALTER TABLE ... ADD CONSTRAINT ... FOREIGN KEY
+and apply_schema creates the tables, runs the data load (e.g. restoring a
+snapshot, see chwdata.db_snapshots), then creates the indexes and constraints,
+timing each phase.
+
+As when the SQLite database is created by chwdata.sqlite_db, a table (and its
+indexes and constraints) is only created by the first DDL file which defines it,
+the statements are translated to SQLite, and SQLite tables have no foreign keys
+(they can't be added to an existing table) so the constraints phase is empty.
+For MySQL the few MariaDB-isms of the DDL are translated (see chwdata.mysql_db).
+
+Python naming convention reminder note: single underscore prefix class names are
+for "private" internal use and should not be considered part of the public API.
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+import re
+import sys
+import time
+from collections import namedtuple
+from pathlib import Path
+
+# Third party imports
+
+# Local application imports
+from .chw_db import CHW_DB
+from .chw_sql import CHW_SQL
+from . import mysql_db
+from .sqlite_db import default_ddl_files, split_top_level, translate_ddl
+
+
+# The phases of creating the schema, the data is loaded between the tables and indexes
+schema_phases = ('tables', 'indexes', 'constraints')
+
+# A DDL statement, the phase it is applied in and the table it applies to
+SchemaStatement = namedtuple('SchemaStatement', ['phase', 'table', 'sql'])
+
+_re_create_table = re.compile(r'CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?`?(\w+)', re.IGNORECASE)
+_re_create_index = re.compile(r'CREATE\s+(?:UNIQUE\s+)?INDEX\s+`?\w+`?\s+ON\s+`?(\w+)', re.IGNORECASE)
+_re_alter_table = re.compile(r'ALTER\s+TABLE\s+`?(\w+)', re.IGNORECASE)
+_re_foreign_key = re.compile(r'\bADD\s+CONSTRAINT\s+`?\w+`?\s+FOREIGN\s+KEY\b', re.IGNORECASE)
+
+
+def parse_ddl(ddl):
+    """
+    Parse the DDL into a list of SchemaStatements in the order of the DDL
+    """
+    statements = []
+    # split_top_level doesn't split on the ;s in quoted comments
+    for sql in split_top_level(ddl, ';'):
+        sql = sql.strip()
+        if sql == '':
+            continue
+
+        create_table = _re_create_table.match(sql)
+        create_index = _re_create_index.match(sql)
+        alter_table = _re_alter_table.match(sql)
+        if create_table:
+            statements.append(SchemaStatement('tables', create_table[1], sql))
+        elif create_index:
+            statements.append(SchemaStatement('indexes', create_index[1], sql))
+        elif alter_table:
+            phase = 'constraints' if _re_foreign_key.search(sql) else 'tables'
+            statements.append(SchemaStatement(phase, alter_table[1], sql))
+        else:
+            statements.append(SchemaStatement('tables', None, sql))
+
+    return statements
+
+
+def load_schema(ddl_files=default_ddl_files):
+    """
+    Parse the DDL files into a list of SchemaStatements, a table's statements are
+    only taken from the first file which creates it.
+    """
+    statements = []
+    created_tables = set()
+    for ddl_file in ddl_files:
+        file_statements = parse_ddl(Path(ddl_file).read_text(encoding='utf-8'))
+        file_tables = {stmt.table.lower() for stmt in file_statements if _re_create_table.match(stmt.sql)}
+        statements.extend(stmt for stmt in file_statements
+                          if stmt.table is None or stmt.table.lower() not in created_tables)
+        created_tables |= file_tables
+    return statements
+
+
+class SchemaApply(CHW_DB):
+    """
+    Creates the schema of a new (empty) chw database in phases.
+    A new SQLite database is not given the default schema when it is connected to.
+    """
+
+    _sqlite_ddl_files = ()
+
+    def apply_phase(self, statements, phase):
+        """
+        Execute the statements of the phase, returning the number of statements executed
+        """
+        stmt_cnt = 0
+        with self._connection.cursor() as cursor:
+            for stmt in statements:
+                if stmt.phase != phase:
+                    continue
+                # the ALTER TABLE statements (comments and foreign keys) are dropped for SQLite
+                for sql in self._translate_ddl(stmt.sql):
+                    cursor.execute(sql)
+                    stmt_cnt += 1
+        self._connection.commit()
+        return stmt_cnt
+
+    def drop_tables(self):
+        """
+        Drop all of the tables of the database, returning the number of tables dropped
+        """
+        tables = self.get_tables()
+        with self._connection.cursor() as cursor:
+            if self._backend != 'sqlite':
+                cursor.execute(CHW_SQL.disable_foreign_key_checks_sql)
+            for table in tables:
+                cursor.execute(CHW_SQL.get_drop_table_sql({'table': table}))
+        self._connection.commit()
+        return len(tables)
+
+    def _translate_ddl(self, sql):
+        """
+        Translate a DDL statement to the list of statements for the backend
+        """
+        if self._backend == 'sqlite':
+            return translate_ddl(sql)
+        if self._backend == 'mysql':
+            return mysql_db.translate_ddl(sql)
+        return [sql]
+
+
+def apply_schema(*, load=None, phases=schema_phases, ddl_files=default_ddl_files):
+    """
+    Create the schema from the DDL files in phases, calling load() (if given) to
+    load the data after the tables are created and before the indexes and
+    constraints are created.
+    Returns a list of the phases run w/ the number of statements and their time.
+    """
+    statements = load_schema(ddl_files)
+    schema_apply = SchemaApply()
+
+    applied = []
+    for phase in schema_phases:
+        if phase in phases:
+            t = time.perf_counter()
+            stmt_cnt = schema_apply.apply_phase(statements, phase)
+            applied.append({'phase': phase, 'statements': stmt_cnt,
+                            'secs': round(time.perf_counter() - t, 3)})
+        if phase == 'tables' and load is not None:
+            t = time.perf_counter()
+            load()
+            applied.append({'phase': 'load', 'statements': None, 'secs': round(time.perf_counter() - t, 3)})
+
+    return applied
+
+
+def format_schema(ddl_files=default_ddl_files, phases=schema_phases):
+    """
+    Get the DDL statements of the phases as a sql script
+    """
+    statements = load_schema(ddl_files)
+    lines = []
+    for phase in schema_phases:
+        if phase not in phases:
+            continue
+        lines.append(f'-- Phase: {phase}\n')
+        lines.extend(f'{stmt.sql};\n' for stmt in statements if stmt.phase == phase)
+    return '\n'.join(lines)
+
+
+def do_apply_schema(*, phases=schema_phases, snapshot=None, load_legacy_csv=False, show_sql=False):
+    # pylint: disable=import-outside-toplevel
+    if show_sql:
+        print(format_schema(phases=phases))
+        return
+
+    def load():
+        if snapshot is not None:
+            from .db_snapshots import do_restore_snapshot
+            do_restore_snapshot(snapshot)
+        if load_legacy_csv:
+            from .retail_orders import do_load_legacy_email_orders_from_csv
+            from .wines import do_load_legacy_wine_master_from_csv
+            do_load_legacy_wine_master_from_csv()
+            do_load_legacy_email_orders_from_csv()
+
+    if 'tables' in phases and SchemaApply().get_tables():
+        print('The database already has tables, the schema can only be applied to a new database')
+        sys.exit(1)
+
+    t = time.perf_counter()
+    applied = apply_schema(load=load if snapshot is not None or load_legacy_csv else None, phases=phases)
+    for phase in applied:
+        statements = f'{phase["statements"]:5} statements' if phase['statements'] is not None else ' ' * 16
+        print(f'Phase {phase["phase"]:12} {statements} ({phase["secs"]:.3f} secs)')
+    print(f'Schema applied ({time.perf_counter() - t:.3f} secs)')
+
+
+def _test():
+    for phase in schema_phases:
+        print(phase, sum(1 for stmt in load_schema() if stmt.phase == phase))
+
+
+if __name__ == '__main__':
+    _test()
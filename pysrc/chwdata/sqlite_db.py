@@ -0,0 +1,509 @@
+"""
+################################################################################
+  chwdata.sqlite_db.py
+################################################################################
+
+This module provides an embedded SQLite stand-in for the mariadb chw database.
+
+It implements just enough of the mariadb connector's connection and cursor API
+for the chwdata classes to run unchanged against a local SQLite file, so the
+load, migration and report actions can be run (and timed) without a mariadb
+container.
+
+- The MariaDB flavored sql in CHW_SQL is translated to SQLite sql
+  (if() -> iif(), INSERT IGNORE, schema name prefixes, backslash quote escapes...)
+- LOAD DATA INFILE statements are emulated by reading the delimited file with
+  the python csv module and evaluating the SET expressions in SQLite
+- The database schema is created from the MySQL DDL file the first time an
+  empty database is opened
+
+Python naming convention reminder note: single underscore prefix class names are
+for "private" internal use and should not be considered part of the public API.
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+import csv
+import itertools
+import re
+import sqlite3
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from pathlib import Path
+
+# The DB-API exceptions are re-exported so that this module can be used in place of
+# the mariadb module when catching database errors.
+# pylint: disable=unused-import,redefined-builtin
+from sqlite3 import (Error, Warning, InterfaceError, DatabaseError, DataError,
+                     OperationalError, IntegrityError, InternalError,
+                     ProgrammingError, NotSupportedError)
+
+# Third party imports
+
+# Local application imports
+
+
+_repo_dir = Path(__file__).resolve().parents[2]
+
+# The full schema DDL is missing some tables the code uses (e.g. LookupUSStates) which are
+# in the newer wine only DDL, tables are created from the first DDL file that defines them.
+default_ddl_files = (_repo_dir / 'CHW_WineDB-MySQL-DDL.sql',
+                     _repo_dir / 'CHW_Wine-only-MySQL-DDL.sql')
+default_sqlite_dir = _repo_dir / 'data' / 'sqlite'
+# This is the local directory bound to /tmp/data/infiles/ in the chw-mariadb container
+default_infile_dir = _repo_dir / 'data' / 'infiles'
+# When True cursors buffer their whole result like the mariadb connector's default cursors
+default_buffered = False
+
+# Warning codes (same as mariadb's) for the LOAD DATA emulation
+_WARN_TOO_FEW_FIELDS = 1261
+_WARN_TOO_MANY_FIELDS = 1262
+_WARN_COLUMN_ADDED = 1060
+
+
+def _adapt_date(value):
+    return value.isoformat()
+
+
+def _adapt_datetime(value):
+    return value.isoformat(sep=' ')
+
+
+def _convert_date(value):
+    value = value.decode()
+    try:
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        return value
+
+
+def _convert_datetime(value):
+    value = value.decode()
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return value
+
+
+def _convert_decimal(value):
+    return Decimal(value.decode())
+
+
+sqlite3.register_adapter(date, _adapt_date)
+sqlite3.register_adapter(datetime, _adapt_datetime)
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_converter('DATE', _convert_date)
+sqlite3.register_converter('DATETIME', _convert_datetime)
+sqlite3.register_converter('DECIMAL', _convert_decimal)
+
+
+def _regexp(pattern, value):
+    """
+    Implementation of the sql REGEXP operator (SQLite calls regexp(pattern, value))
+    """
+    if pattern is None or value is None:
+        return None
+    return re.search(pattern, str(value)) is not None
+
+
+def split_top_level(text, sep=','):
+    """
+    Split the text on the separator character when it is not inside
+    parentheses or a quoted string.
+    """
+    parts = []
+    depth = 0
+    quote = None
+    start = 0
+    i = 0
+    while i < len(text):
+        c = text[i]
+        if quote is not None:
+            if c == '\\':
+                i += 1
+            elif c == quote:
+                quote = None
+        elif c in ('"', "'", '`'):
+            quote = c
+        elif c == '(':
+            depth += 1
+        elif c == ')':
+            depth -= 1
+        elif c == sep and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+        i += 1
+    parts.append(text[start:])
+    return parts
+
+
+_re_schema_prefix = re.compile(r'\bchw\.', re.IGNORECASE)
+_re_insert_ignore = re.compile(r'\bINSERT\s+IGNORE\b', re.IGNORECASE)
+_re_if_func = re.compile(r'\bif\s*\(', re.IGNORECASE)
+_re_backslash_quote = re.compile(r"\\'")
+_re_paren_select_before_union = re.compile(r'\(\s*(SELECT\b[^()]*?)\s*\)(?=\s*UNION\b)', re.IGNORECASE)
+_re_paren_select_after_union = re.compile(r'(\bUNION(?:\s+ALL)?\s*)\(\s*(SELECT\b[^()]*?)\s*\)',
+                                          re.IGNORECASE)
+
+
+@lru_cache(maxsize=256)
+def translate_sql(sql):
+    """
+    Translate a MariaDB sql statement as used in CHW_SQL to the SQLite dialect.
+    """
+    sql = _re_schema_prefix.sub('', sql)
+    sql = _re_insert_ignore.sub('INSERT OR IGNORE', sql)
+    sql = _re_if_func.sub('iif(', sql)
+    sql = _re_backslash_quote.sub("''", sql)
+    # SQLite doesn't allow the selects of a compound select to be parenthesized
+    sql = _re_paren_select_before_union.sub(r'\1', sql)
+    sql = _re_paren_select_after_union.sub(r'\1\2', sql)
+    return sql
+
+
+_re_auto_increment = re.compile(r'\s+AUTO_INCREMENT\b', re.IGNORECASE)
+_re_default_column = re.compile(r'\s+DEFAULT\s+(?!NULL\b|TRUE\b|FALSE\b|CURRENT_)[A-Za-z_]\w*', re.IGNORECASE)
+_re_primary_key = re.compile(r'^\s*PRIMARY\s+KEY\s*\((?P<columns>[^)]*)\)\s*$', re.IGNORECASE)
+_re_text_type = re.compile(r'^\s*\w+\s+(VARCHAR|CHAR|TEXT)\b', re.IGNORECASE)
+_re_ddl_table_name = re.compile(r'\s*CREATE\s+(?:TABLE\s+(?P<table>\w+)'
+                                r'|(?:UNIQUE\s+)?INDEX\s+\w+\s+ON\s+(?P<index_table>\w+))',
+                                re.IGNORECASE)
+
+
+def translate_ddl(ddl):
+    """
+    Translate the MySQL DDL (as written by SQL Power Architect) to a list of
+    SQLite statements which will create the same tables and indexes.
+
+    - ALTER TABLE statements (column comments and foreign key constraints) are dropped
+    - AUTO_INCREMENT single column primary keys become INTEGER PRIMARY KEY AUTOINCREMENT
+    - DEFAULT values which reference another column are dropped
+    - character columns use case insensitive comparisons like mariadb's default collation
+    """
+    statements = []
+    for stmt in split_top_level(ddl, ';'):
+        stmt = stmt.strip()
+        if stmt == '' or re.match(r'ALTER\s+TABLE\b', stmt, re.IGNORECASE):
+            continue
+
+        if not re.match(r'CREATE\s+TABLE\b', stmt, re.IGNORECASE):
+            statements.append(translate_sql(stmt))
+            continue
+
+        head, body = stmt[:stmt.index('(')], stmt[stmt.index('(') + 1:stmt.rindex(')')]
+        column_defs = [d.strip() for d in split_top_level(body)]
+        primary_key = None
+        for column_def in column_defs:
+            m = _re_primary_key.match(column_def)
+            if m:
+                primary_key = [c.strip() for c in m['columns'].split(',')]
+
+        sqlite_defs = []
+        rowid_primary_key = False
+        for column_def in column_defs:
+            column_name = column_def.split()[0]
+            if _re_auto_increment.search(column_def) and primary_key == [column_name]:
+                sqlite_defs.append(f'{column_name} INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL')
+                rowid_primary_key = True
+                continue
+            if _re_primary_key.match(column_def):
+                sqlite_defs.append(column_def)
+                continue
+            column_def = _re_auto_increment.sub('', column_def)
+            column_def = _re_default_column.sub('', column_def)
+            if _re_text_type.match(column_def):
+                column_def += ' COLLATE NOCASE'
+            sqlite_defs.append(column_def)
+
+        if rowid_primary_key:
+            sqlite_defs = [d for d in sqlite_defs if not _re_primary_key.match(d)]
+
+        statements.append(head + '(\n    ' + ',\n    '.join(sqlite_defs) + '\n)')
+
+    return statements
+
+
+_re_load_data = re.compile(r"""
+    ^\s*LOAD\s+DATA\s+(?:LOCAL\s+)?INFILE\s+'(?P<infile>[^']+)'\s+
+    (?:(?P<duplicates>REPLACE|IGNORE)\s+)?INTO\s+TABLE\s+(?P<table>[\w.]+)\s+
+    (?:FIELDS\s+TERMINATED\s+BY\s+'(?P<terminator>[^']*)'\s*
+       (?:(?:OPTIONALLY\s+)?ENCLOSED\s+BY\s+'(?P<enclosure>[^']*)'\s*)?)?
+    (?:IGNORE\s+(?P<ignore_lines>\d+)\s+LINES\s*)?
+    \((?P<columns>[^)]*)\)\s*
+    (?:SET\s+(?P<assignments>.*?))?\s*;?\s*$
+""", re.IGNORECASE | re.VERBOSE | re.DOTALL)
+
+_load_data_escapes = {'0': '\0', 'b': '\b', 'n': '\n', 'r': '\r', 't': '\t', 'Z': '\x1a'}
+_re_load_data_escape = re.compile(r'\\(.)', re.DOTALL)
+_re_user_variable = re.compile(r'@(\w+)')
+
+
+def _unescape_field(value):
+    """
+    Apply the LOAD DATA default 'ESCAPED BY' processing to a field value
+    """
+    if '\\' not in value:
+        return value
+    if value == '\\N':
+        return None
+    return _re_load_data_escape.sub(lambda m: _load_data_escapes.get(m[1], m[1]), value)
+
+
+class _LoadData:
+    """
+    The parsed parts of a LOAD DATA INFILE statement needed to emulate it.
+    """
+
+    def __init__(self, m):
+        self.infile = m['infile']
+        self.table = _re_schema_prefix.sub('', m['table'])
+        self.duplicates = (m['duplicates'] or '').upper()
+        self.terminator = m['terminator'] if m['terminator'] is not None else '\t'
+        self.enclosure = m['enclosure'] or None
+        self.ignore_lines = int(m['ignore_lines'] or 0)
+
+        # Each input field is either loaded directly into a column or into a user variable
+        self.fields = [f.strip() for f in m['columns'].split(',') if f.strip() != '']
+
+        self.assignments = []
+        if m['assignments'] is not None:
+            for assignment in split_top_level(m['assignments']):
+                column, expr = assignment.split('=', 1)
+                expr = _re_user_variable.sub(r':v_\1', expr.strip())
+                self.assignments.append((column.strip(), translate_sql(expr)))
+
+    @property
+    def target_columns(self):
+        return [f for f in self.fields if not f.startswith('@')] + [c for c, _ in self.assignments]
+
+    def get_insert_sql(self):
+        verb = {'REPLACE': 'INSERT OR REPLACE', 'IGNORE': 'INSERT OR IGNORE'}.get(self.duplicates, 'INSERT')
+        values = ([f':c_{f}' for f in self.fields if not f.startswith('@')]
+                  + [expr for _, expr in self.assignments])
+        return (f'{verb} INTO {self.table} ({", ".join(self.target_columns)})'
+                f' VALUES ({", ".join(values)})')
+
+    def get_param_names(self):
+        return [f'v_{f[1:]}' if f.startswith('@') else f'c_{f}' for f in self.fields]
+
+
+class SQLiteCursor:
+    """
+    Wraps a sqlite3 cursor to provide the subset of the mariadb cursor API used by chwdata.
+
+    sqlite3 steps through a query's rows as they are fetched, when buffered is True
+    (default default_buffered) all of the rows are fetched by execute, as the mariadb
+    connector does by default, so the memory used by buffered results can be measured.
+    """
+
+    def __init__(self, connection, *, buffered=None, **_kwargs):
+        # other cursor options such as prepared=True only matter to the mariadb connector
+        self.connection = connection
+        self._cursor = connection._sqlite.cursor()
+        self._buffered = buffered if buffered is not None else default_buffered
+        self._rows = None
+        self._rowcount = -1
+        self._lastrowid = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __iter__(self):
+        return iter(self._rows if self._rows is not None else self._cursor)
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def rowcount(self):
+        return self._rowcount
+
+    @property
+    def lastrowid(self):
+        return self._lastrowid
+
+    @property
+    def warnings(self):
+        return len(self.connection._warnings)
+
+    def execute(self, sql, params=()):
+        self.connection._warnings = []
+        self._rows = None
+        m = _re_load_data.match(sql)
+        if m is not None:
+            self._rowcount = self.connection._load_data(_LoadData(m), self._cursor)
+            self._lastrowid = None
+            return
+
+        self._cursor.execute(translate_sql(sql), params or ())
+        self._rowcount = self._cursor.rowcount
+        self._lastrowid = self._cursor.lastrowid
+        if self._buffered and self._cursor.description:
+            self._rows = iter(self._cursor.fetchall())
+
+    def executemany(self, sql, seq_of_params):
+        self.connection._warnings = []
+        self._rows = None
+        self._cursor.executemany(translate_sql(sql), seq_of_params)
+        self._rowcount = self._cursor.rowcount
+        self._lastrowid = self._cursor.lastrowid
+
+    def fetchone(self):
+        if self._rows is not None:
+            return next(self._rows, None)
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size=None):
+        size = size if size is not None else self._cursor.arraysize
+        if self._rows is not None:
+            return list(itertools.islice(self._rows, size))
+        return self._cursor.fetchmany(size)
+
+    def fetchall(self):
+        if self._rows is not None:
+            return list(self._rows)
+        return self._cursor.fetchall()
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """
+    Wraps a sqlite3 connection to provide the subset of the mariadb connection API
+    used by chwdata.
+    """
+
+    def __init__(self, database, *, infile_dir=None, ddl_files=None):
+        if database != ':memory:':
+            Path(database).parent.mkdir(parents=True, exist_ok=True)
+        self.database = str(database)
+        self.infile_dir = Path(infile_dir) if infile_dir is not None else default_infile_dir
+        self._sqlite = sqlite3.connect(self.database, detect_types=sqlite3.PARSE_DECLTYPES)
+        self._sqlite.create_function('regexp', 2, _regexp, deterministic=True)
+        self._sqlite.execute('PRAGMA journal_mode = WAL')
+        self._sqlite.execute('PRAGMA synchronous = NORMAL')
+        self._warnings = []
+
+        if self._sqlite.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table'").fetchone()[0] == 0:
+            self.create_schema(ddl_files if ddl_files is not None else default_ddl_files)
+
+    def create_schema(self, ddl_files):
+        """
+        Create the chw tables and indexes from the given MySQL DDL files.
+        A table (and its indexes) is only created by the first file which defines it.
+        """
+        for ddl_file in ddl_files:
+            existing_tables = {row[0].lower() for row in
+                               self._sqlite.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            ddl = Path(ddl_file).read_text(encoding='utf-8')
+            for stmt in translate_ddl(ddl):
+                m = _re_ddl_table_name.match(stmt)
+                if m is not None and (m['table'] or m['index_table']).lower() in existing_tables:
+                    continue
+                self._sqlite.execute(stmt)
+        self._sqlite.commit()
+
+    def cursor(self, **kwargs):
+        return SQLiteCursor(self, **kwargs)
+
+    def commit(self):
+        self._sqlite.commit()
+
+    def rollback(self):
+        self._sqlite.rollback()
+
+    def close(self):
+        self._sqlite.close()
+
+    def show_warnings(self):
+        """
+        Return the (level, code, message) warnings from the last statement executed
+        """
+        return list(self._warnings)
+
+    def _resolve_infile(self, infile):
+        """
+        The infile path is the one the mariadb server sees; if it doesn't exist locally
+        look for the same file name in the local infile directory.
+        """
+        path = Path(infile)
+        if path.is_file():
+            return path
+        return self.infile_dir / path.name
+
+    def _table_columns(self, table):
+        return {row[1].lower() for row in self._sqlite.execute(f'PRAGMA table_info({table})')}
+
+    def _load_data(self, load_data, cursor):
+        """
+        Emulate a LOAD DATA INFILE statement returning the number of rows loaded.
+        """
+        # The legacy tables in the DDL lag the exported FileMaker columns, so add any
+        # loaded columns the table doesn't have yet (as mariadb has had them added)
+        existing_columns = self._table_columns(load_data.table)
+        for column in load_data.target_columns:
+            if column.lower() not in existing_columns:
+                cursor.execute(f'ALTER TABLE {load_data.table} ADD COLUMN {column}')
+                self._warnings.append(('Note', _WARN_COLUMN_ADDED,
+                                       f"Column '{column}' added to table '{load_data.table}'"))
+
+        param_names = load_data.get_param_names()
+        field_cnt = len(param_names)
+        warnings = self._warnings
+
+        def rows(reader):
+            for line_no, fields in enumerate(reader, start=1):
+                if line_no <= load_data.ignore_lines:
+                    continue
+                if len(fields) < field_cnt:
+                    warnings.append(('Warning', _WARN_TOO_FEW_FIELDS,
+                                     f"Row {line_no - load_data.ignore_lines}"
+                                     " doesn't contain data for all columns"))
+                    fields = fields + [None] * (field_cnt - len(fields))
+                elif len(fields) > field_cnt:
+                    warnings.append(('Warning', _WARN_TOO_MANY_FIELDS,
+                                     f'Row {line_no - load_data.ignore_lines} was truncated; '
+                                     'it contained more data than there were input columns'))
+                yield {name: _unescape_field(value) if value is not None else None
+                       for name, value in zip(param_names, fields)}
+
+        changes_before = self._sqlite.total_changes
+        with open(self._resolve_infile(load_data.infile), newline='', encoding='utf-8') as f:
+            if load_data.enclosure is not None:
+                reader = csv.reader(f, delimiter=load_data.terminator, quotechar=load_data.enclosure,
+                                    doublequote=True, strict=False)
+            else:
+                reader = csv.reader(f, delimiter=load_data.terminator, quoting=csv.QUOTE_NONE)
+            cursor.executemany(load_data.get_insert_sql(), rows(reader))
+
+        return self._sqlite.total_changes - changes_before
+
+
+def connect(database, *, infile_dir=None, ddl_files=None):
+    """
+    Open (creating if needed) the SQLite chw database file, the database may be
+    ':memory:' for a throw away database.
+    """
+    return SQLiteConnection(database, infile_dir=infile_dir, ddl_files=ddl_files)
+
+
+def _test():
+    pass
+
+
+if __name__ == '__main__':
+    _test()
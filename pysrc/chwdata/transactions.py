@@ -0,0 +1,105 @@
+"""
+################################################################################
+  chwdata.transactions.py
+################################################################################
+
+This module provides the transaction policy of the long running migration
+actions (see CHW_DB.run_resumable).
+
+Rather than committing once at the end, an action commits its work every
+commit_every units (e.g. a producer w/ all of its legacy wine links), so if
+the connection is lost (e.g. the mariadb container restarted) only the work
+since the last commit is lost. Transient errors are retried up to max_retries
+times, w/ an exponential backoff, on a new connection, and the action skips
+the units which were committed by the earlier attempts.
+
+Python naming convention reminder note: single underscore prefix class names are
+for "private" internal use and should not be considered part of the public API.
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+import random
+
+# Third party imports
+
+# Local application imports
+
+
+class TransactionPolicy:
+    """
+    How often a resumable action commits, and how its transient errors are retried
+    - commit_every: the number of units of work per transaction
+    - max_retries: the number of times the action is retried after a transient error
+    - backoff_secs: the delay before the 1st retry, doubled for each retry (w/ jitter)
+      up to max_backoff_secs
+    """
+
+    def __init__(self, *, commit_every=500, max_retries=5, backoff_secs=1.0, max_backoff_secs=30.0):
+        self.commit_every = commit_every
+        self.max_retries = max_retries
+        self.backoff_secs = backoff_secs
+        self.max_backoff_secs = max_backoff_secs
+
+    def get_backoff(self, attempt):
+        """
+        Get the number of seconds to wait before the given retry (1 is the 1st retry)
+        """
+        backoff = min(self.max_backoff_secs, self.backoff_secs * 2 ** (attempt - 1))
+        # jitter so that processes which failed together don't retry together
+        return backoff * random.uniform(0.5, 1.0)
+
+
+# The policy of the resumable actions which aren't given one
+default_policy = TransactionPolicy()
+
+
+class UnitCommitter:
+    """
+    Commits the connection after every commit_every units of work are done.
+
+    flush is called (if given) before committing, to write the rows an action
+    has batched (e.g. for executemany) for the units which are done.
+    """
+
+    def __init__(self, connection, commit_every, flush=None):
+        self._connection = connection
+        self.commit_every = commit_every
+        self.flush = flush
+        self.pending = 0
+        self.committed = 0
+
+    def unit_done(self):
+        """
+        Record that a unit of work is done, committing if commit_every are pending
+        """
+        self.pending += 1
+        if self.pending >= self.commit_every:
+            self.commit()
+
+    def commit(self):
+        """
+        Commit the units of work which are done
+        """
+        if self.flush is not None:
+            self.flush()
+        self._connection.commit()
+        self.committed += self.pending
+        self.pending = 0
+
+
+def _test():
+    policy = TransactionPolicy()
+    print([round(policy.get_backoff(attempt), 3) for attempt in range(1, policy.max_retries + 1)])
+
+
+if __name__ == '__main__':
+    _test()
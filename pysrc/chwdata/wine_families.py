@@ -0,0 +1,123 @@
+"""
+################################################################################
+  chwdata.wine_families.py
+################################################################################
+
+This module groups the vintages (and bottle sizes) of the same wine into wine
+families, so that e.g. all of the vintages of a cuvée a customer bought can be
+found by the family's id rather than by LIKE scans of the wine names.
+
+A wine's family name is its WineName (or its FullName w/o the producer name when
+it has no WineName) w/ the vintage, NV and bottle size (e.g. "375ml", "1.5 Liter
+(Magnum)") removed. The wines of a producer w/ the same normalized family name
+(lowercase, w/o accents and punctuation) are the same family.
+
+The WineFamilyIndex holds the FamilyId of each family by a hash of its producer
+and normalized name, so finding a wine's family is a dictionary lookup.
+
+Python naming convention reminder note: single underscore prefix class names are
+for "private" internal use and should not be considered part of the public API.
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+import hashlib
+import re
+
+# Third party imports
+
+# Local application imports
+from .wine_matcher import normalize_text
+
+
+# Max length of WineFamilies Name
+MAX_FAMILY_NAME_LEN = 150
+
+_re_vintage = re.compile(r'\b(?:19|20)\d\d\b|\bNV\b', re.IGNORECASE)
+_re_bottle_size = re.compile(r'\b\d+(?:[.,]\d+)?\s*(?:ml|cl|l|ltr|liters?|litres?)\b'
+                             r'|\b(?:double\s+)?magnum\b|\bjeroboam\b|\bhalf[\s-]+bottle\b',
+                             re.IGNORECASE)
+_re_empty_brackets = re.compile(r'\(\s*\)|\[\s*\]')
+_re_whitespace = re.compile(r'\s+')
+_edge_punctuation = ' -,.;:/()[]'
+
+
+def strip_family_name(name):
+    """
+    Remove the vintage, NV and bottle size from the wine name, e.g.
+      "Blanc 2020 1.5 Liter (Magnum)" -> "Blanc", "Vieilles Vignes 2012 375ml" -> "Vieilles Vignes"
+    """
+    name = _re_bottle_size.sub(' ', name or '')
+    name = _re_vintage.sub(' ', name)
+    name = _re_empty_brackets.sub(' ', name)
+    return _re_whitespace.sub(' ', name).strip(_edge_punctuation)
+
+
+def get_family_name(full_name, wine_name, producer_name):
+    """
+    Get the family name of a wine, its stripped WineName or if it has none its
+    stripped FullName w/o the producer name it starts with.
+    """
+    if (wine_name or '').strip() != '':
+        return strip_family_name(wine_name)
+
+    words = (full_name or '').split()
+    producer_word_cnt = len((producer_name or '').split())
+    producer_words = ' '.join(words[:producer_word_cnt])
+    if producer_word_cnt and normalize_text(producer_words) == normalize_text(producer_name):
+        words = words[producer_word_cnt:]
+    return strip_family_name(' '.join(words))
+
+
+def family_hash(producer_id, family_name):
+    """
+    The hash of a wine family (as hex), the families of a producer are the same if
+    their normalized names are the same.
+    """
+    key = f'{producer_id}|{normalize_text(family_name)}'
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+class WineFamilyIndex:
+    """
+    Keeps the FamilyId of each wine family by its hash (see family_hash)
+    """
+
+    def __init__(self):
+        self._family_ids = {}
+
+    def __len__(self):
+        return len(self._family_ids)
+
+    def get(self, hash_):
+        """
+        Get the FamilyId of the family w/ the hash, None if it's not in the index
+        """
+        return self._family_ids.get(hash_)
+
+    def add(self, hash_, family_id):
+        self._family_ids[hash_] = family_id
+
+
+def _test():
+    for full_name, wine_name, producer_name in (('Domaine Ferrari 952 Blanc 2020 1.5 Liter (Magnum)', 'Blanc',
+                                                 'Domaine Ferrari 952'),
+                                                ('Domaine Ferrari 952 Blanc 2021 1.5 Liter (Magnum)', None,
+                                                 'Domaine Ferrari 952'),
+                                                ('Bodegas Bernard Cuvée Spéciale NV', '', 'Bodegas Bernard'),
+                                                ('Bodegas Bernard Cuvee Speciale, 2016 375ml', None,
+                                                 'Bodegas Bernard')):
+        name = get_family_name(full_name, wine_name, producer_name)
+        print(f'{full_name!r} -> {name!r}', family_hash(1, name))
+
+
+if __name__ == '__main__':
+    _test()
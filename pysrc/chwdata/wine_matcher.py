@@ -0,0 +1,265 @@
+"""
+################################################################################
+  chwdata.wine_matcher.py
+################################################################################
+
+This module provides matching of the free text items of the legacy email orders
+(e.g. "Mas Boillot Vieilles Vignes", "muller sélection") to the Wines records.
+
+The WineMatcher builds an inverted index from the words of each wine's FullName,
+WineName and producer name to the wines containing them, and a trigram index of
+the indexed words so that misspelled or abbreviated words can still be matched.
+Only the wines found in the index for an item's rarest words are scored, so
+matching an item doesn't compare it to every wine (or even to every wine named
+"Chateau ...").
+
+A candidate's score is the harmonic mean of how much of the item's text and how
+much of the wine's text matched, where each word is weighted by how rare it is
+(its inverse document frequency), so matching a producer's name counts for more
+than matching "Rouge". The wine's vintage must match the item's vintage (when
+there is one) for the match to be considered certain.
+
+Python naming convention reminder note: single underscore prefix class names are
+for "private" internal use and should not be considered part of the public API.
+
+=============== ================================================================
+Created on      October 19, 2026
+--------------- ----------------------------------------------------------------
+author(s)       Michael Jay Lippert
+--------------- ----------------------------------------------------------------
+Copyright       (c) 2025-present Michael Jay Lippert
+                MIT License (see https://opensource.org/licenses/MIT)
+=============== ================================================================
+"""
+
+# Standard library imports
+import heapq
+import math
+import re
+import unicodedata
+from collections import defaultdict, namedtuple
+
+# Third party imports
+
+# Local application imports
+
+
+# A match of an order item to a wine, wine_id is None if there was no match
+WineMatch = namedtuple('WineMatch', ['wine_id', 'score', 'needs_review', 'notes'])
+
+_re_non_word = re.compile(r'[^a-z0-9]+')
+_re_vintage = re.compile(r'^(19|20)\d\d$')
+
+
+def normalize_text(text):
+    """
+    Lowercase, remove accents and replace punctuation w/ spaces
+    e.g. "Château Laurent Cuvée Spéciale" -> "chateau laurent cuvee speciale"
+    """
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return _re_non_word.sub(' ', text.lower()).strip()
+
+
+def split_words(text):
+    """
+    Split the text into its normalized words and a vintage (a 4 digit year) if
+    the text contains one (the vintage is not included in the words)
+    """
+    words = []
+    vintage = None
+    for word in normalize_text(text).split():
+        if _re_vintage.match(word):
+            vintage = int(word)
+        else:
+            words.append(word)
+    return words, vintage
+
+
+def trigrams(word):
+    """
+    The set of 3 character substrings of the word padded w/ a space at each end
+    """
+    padded = f' {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class WineMatcher:
+    """
+    An index of the wines for matching order item text to them.
+
+    The candidates for an item are the wines w/ its rarest words, the wines w/ its
+    more common words are only candidates if the word is in at most
+    max_candidate_postings wines (or no rarer word matched any wine).
+
+    Matches w/ a score below min_score are not matched (the wine id is None),
+    matches w/ a score below review_score, w/ a different vintage or which are
+    nearly as good a match to another wine need review.
+    """
+
+    def __init__(self, wines, *, min_score=0.35, review_score=0.8, ambiguous_margin=0.05,
+                 min_word_similarity=0.5, max_candidate_postings=100):
+        """
+        wines is an iterable of (WineId, FullName, WineName, Vintage, ProducerName)
+        """
+        self.min_score = min_score
+        self.review_score = review_score
+        self.ambiguous_margin = ambiguous_margin
+        self.min_word_similarity = min_word_similarity
+        self.max_candidate_postings = max_candidate_postings
+
+        self._wine_vintages = {}
+        self._wine_words = {}
+        self._word_wines = defaultdict(set)
+        for wine_id, full_name, wine_name, vintage, producer_name in wines:
+            words, name_vintage = split_words(f'{producer_name or ""} {wine_name or ""} {full_name or ""}')
+            self._wine_words[wine_id] = set(words)
+            self._wine_vintages[wine_id] = vintage if vintage is not None and vintage > 0 else name_vintage
+            for word in words:
+                self._word_wines[word].add(wine_id)
+
+        # Weight words by their inverse document frequency
+        wine_cnt = max(len(self._wine_words), 1)
+        self._word_weights = {word: math.log(1 + wine_cnt / len(wine_ids))
+                              for word, wine_ids in self._word_wines.items()}
+        self._wine_weights = {wine_id: sum(self._word_weights[word] for word in words)
+                              for wine_id, words in self._wine_words.items()}
+        # an unknown word in an item counts as a rare word which didn't match
+        self._unknown_word_weight = math.log(1 + wine_cnt)
+
+        self._trigram_words = defaultdict(set)
+        for word in self._word_wines:
+            for trigram in trigrams(word):
+                self._trigram_words[trigram].add(word)
+
+        self._similar_words_cache = {}
+        self._match_cache = {}
+
+    @property
+    def wine_count(self):
+        return len(self._wine_words)
+
+    def similar_words(self, word):
+        """
+        Get the indexed words similar to the given word, as a list of (word, similarity)
+        The similarity is 1 for an indexed word, otherwise it's the Jaccard similarity
+        of the trigrams of the words (if it is at least min_word_similarity).
+        """
+        if word in self._word_wines:
+            return [(word, 1.0)]
+        if word in self._similar_words_cache:
+            return self._similar_words_cache[word]
+
+        word_trigrams = trigrams(word)
+        shared_cnts = defaultdict(int)
+        for trigram in word_trigrams:
+            for indexed_word in self._trigram_words.get(trigram, ()):
+                shared_cnts[indexed_word] += 1
+
+        similar = []
+        for indexed_word, shared_cnt in shared_cnts.items():
+            similarity = shared_cnt / (len(word_trigrams) + len(trigrams(indexed_word)) - shared_cnt)
+            if similarity >= self.min_word_similarity:
+                similar.append((indexed_word, similarity))
+
+        self._similar_words_cache[word] = similar
+        return similar
+
+    def get_candidates(self, word_matches):
+        """
+        Get the candidate wines for the item words from the postings of its rarest
+        words, the postings of the more common words are only added until there are
+        candidates and the postings are longer than max_candidate_postings.
+        If there are still too many candidates (all the words are common, e.g.
+        "Les Clos") they are narrowed to the wines w/ the most of the words.
+        """
+        postings = sorted((self._word_wines[w] for matches in word_matches for w, _ in matches), key=len)
+        candidates = set()
+        for wine_ids in postings:
+            if candidates and len(wine_ids) > self.max_candidate_postings:
+                break
+            candidates.update(wine_ids)
+
+        if len(candidates) > self.max_candidate_postings:
+            for wine_ids in postings[1:]:
+                narrowed = candidates & wine_ids
+                if narrowed:
+                    candidates = narrowed
+        return candidates
+
+    def score_candidates(self, item_words):
+        """
+        Score the candidate wines for the item words (see get_candidates)
+        returning a dict of wine id to score
+        """
+        word_matches = []
+        item_weight = 0.0
+        for word in item_words:
+            similar = self.similar_words(word)
+            item_weight += max((self._word_weights[w] for w, _ in similar), default=self._unknown_word_weight)
+            if similar:
+                word_matches.append([(w, self._word_weights[w] * similarity) for w, similarity in similar])
+
+        scores = {}
+        for wine_id in self.get_candidates(word_matches):
+            wine_words = self._wine_words[wine_id]
+            matched = sum(max((weight for w, weight in matches if w in wine_words), default=0.0)
+                          for matches in word_matches)
+            recall = matched / item_weight
+            precision = min(matched / self._wine_weights[wine_id], 1.0)
+            scores[wine_id] = 2 * precision * recall / (precision + recall)
+        return scores
+
+    def match(self, item, vintage=None):
+        """
+        Match the order item text (w/ the order's vintage for the item if known)
+        to a wine returning a WineMatch.
+        """
+        item_words, item_vintage = split_words(item)
+        if vintage is None:
+            vintage = item_vintage
+
+        key = (tuple(item_words), vintage)
+        if key not in self._match_cache:
+            self._match_cache[key] = self._match(item_words, vintage)
+        return self._match_cache[key]
+
+    def _match(self, item_words, vintage):
+        if not item_words:
+            return WineMatch(None, 0.0, True, 'No item text')
+
+        scores = self.score_candidates(item_words)
+        if vintage is not None:
+            # prefer the wine of the ordered vintage over equally named wines of other vintages
+            for wine_id, score in scores.items():
+                if self._wine_vintages[wine_id] not in (None, vintage):
+                    scores[wine_id] = score * 0.9
+
+        ranked = heapq.nlargest(2, scores.items(), key=lambda ws: ws[1])
+        if not ranked or ranked[0][1] < self.min_score:
+            return WineMatch(None, ranked[0][1] if ranked else 0.0, True, 'No matching wine')
+
+        wine_id, score = ranked[0]
+        notes = []
+        if score < self.review_score:
+            notes.append('Low match score')
+        if len(ranked) > 1 and ranked[1][1] >= score - self.ambiguous_margin:
+            notes.append(f'Also matches WineId {ranked[1][0]}')
+        if vintage is not None and self._wine_vintages[wine_id] not in (None, vintage):
+            notes.append(f'Vintage {self._wine_vintages[wine_id]} does not match ordered vintage {vintage}')
+
+        return WineMatch(wine_id, score, len(notes) > 0, '; '.join(notes) if notes else None)
+
+
+def _test():
+    matcher = WineMatcher([
+        (1, 'Château Laurent Cuvée Spéciale 2009', 'Cuvée Spéciale', 2009, 'Château Laurent'),
+        (2, 'Château Laurent Cuvée Spéciale 2010', 'Cuvée Spéciale', 2010, 'Château Laurent'),
+        (3, 'Domaine Mercier Rosé 2012', 'Rosé', 2012, 'Domaine Mercier'),
+    ])
+    for item, vintage in (('laurent cuvee speciale', 2010), ('Domain Mercer Rose', None), ('Rouge', None)):
+        print(item, vintage, matcher.match(item, vintage))
+
+
+if __name__ == '__main__':
+    _test()
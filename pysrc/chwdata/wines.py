@@ -23,12 +23,17 @@ Copyright       (c) 2025-present Michael Jay Lippert
 import time
 import logging
 import re
+from datetime import date
 
 # Third party imports
 
 # Local application imports
-from .chw_db import CHW_DB, mariadb
+from .change_feed import change_timestamp
+from .chw_db import CHW_DB
 from .chw_sql import CHW_SQL
+from .price_history import END_OF_TIME, VersionChanges, row_hash, to_date
+from .transactions import TransactionPolicy
+from .wine_families import MAX_FAMILY_NAME_LEN, WineFamilyIndex, family_hash, get_family_name
 
 
 default_update_user = 'Gillian'
@@ -79,9 +84,10 @@ class Wines(CHW_DB):
         WineMasterTable_11-06-xform.csv csv file mapped into
         the mariadb container's /tmp/data/infiles/ directory
         """
+        load_data_params = self.get_load_data_params(Wines.DB_CNTR_DATADIR)
         sql = CHW_SQL.get_legacy_wine_master_load_data({'suffix':  Wines.LEGACY_WINE_TABLE_SUFFIX,
                                                         'csvfile': Wines.LEGACY_WINE_CSV_FILENAME,
-                                                        'datadir': Wines.DB_CNTR_DATADIR})
+                                                        **load_data_params})
 
         try:
             with (self._connection.cursor() as legacy_wines_load_data_cursor):
@@ -93,14 +99,14 @@ class Wines(CHW_DB):
                 print(f'Load Data successful, {rows_affected} rows affected, {warnings} warnings ({exectime:.3f} secs)')
 
             self._connection.commit()
-        except mariadb.DataError as e:
+        except self._dbapi.DataError as e:
             print(type(e))
             print(e.args)
             print(e)
             print(sql)
             raise e from None
 
-    def create_producers_from_legacy(self):
+    def create_producers_from_legacy(self, policy=None):
         """
         Create producers from LegacyWineMaster
         - Find all unique ProducerNames
@@ -112,6 +118,10 @@ class Wines(CHW_DB):
         - INSERT a Producers_LegacyWineMaster record for EVERY LegacyWineMaster record which
           has that unique ProducerName. Add a conversion note if the description, code or
           year established changed from the previous record.
+
+        The producers are committed every policy.commit_every producers, and the ProducerNames
+        which have already been migrated are skipped, so after a transient error this resumes
+        on a new connection where it left off (see CHW_DB.run_resumable), and it can be rerun.
         """
         # Column indices
         WineId              = 0
@@ -123,75 +133,89 @@ class Wines(CHW_DB):
         re_year = re.compile(r'\d{4}$')
         re_decade = re.compile(r'\d{4}s$')
 
-        legacy_wines_by_producer_sql = CHW_SQL.get_legacy_wines_by_producer_sql({'suffix':  Wines.LEGACY_WINE_TABLE_SUFFIX})
-
-        with (self._connection.cursor() as legacy_wines_by_producer_cursor,
-              self._connection.cursor(prepared=True) as insert_producer_cursor,
-              self._connection.cursor(prepared=True) as insert_producer_legacywine_cursor):
-
-            starttime = time.process_time()
-            producers_added = 0
-            producer_note_cnt = 0
-            legacy_wines_by_producer_cursor.execute(legacy_wines_by_producer_sql)
-            last_producer_name = ''
-            last_producer_id = -1
-            prev_producer_description = ''
-
-            for producer_wine_row in legacy_wines_by_producer_cursor:
-                # When the producer changes, process the new producer
-                producer_name = producer_wine_row[ProducerName]
-                wine_id = producer_wine_row[WineId]
-                producer_description = producer_wine_row[ProducerDescription]
-                conversion_notes = None
-
-                if producer_name != last_producer_name:
-                    # Insert new Producer record
-                    producer_code = producer_wine_row[ProducerCode]
-                    year_established = producer_wine_row[YearEstablished].strip()
-
-                    if re_year.match(year_established) is not None:
-                        year_established = int(year_established)
-                    elif year_established == '':
-                        year_established = None
-                    elif re_decade.match(year_established) is not None:
-                        year_established = int(year_established[:4])
-                        conversion_notes = 'year established is decade'
-
-                    new_producer = (producer_name,
-                                    producer_description,
-                                    None if producer_code == '' else producer_code,
-                                    year_established,
-                                   )
-
-                    try:
-                        insert_producer_cursor.execute(CHW_SQL.insert_producer_sql, new_producer)
-                        producers_added += 1
-                    except mariadb.DataError as e:
-                        print(type(e))
-                        print(e.args)
-                        print(e)
-                        print(new_producer)
-                        raise e from None
-
-                    last_producer_id = insert_producer_cursor.lastrowid
-                    last_producer_name = producer_name
+        suffix = {'suffix':  Wines.LEGACY_WINE_TABLE_SUFFIX}
+        legacy_wines_by_producer_sql = CHW_SQL.get_legacy_wines_by_producer_sql(suffix)
+        migrated_producer_names_sql = CHW_SQL.get_migrated_producer_names_sql(suffix)
+
+        def create_producers(committer):
+            migrated_producer_names = {row[0] for row in self.stream_rows(migrated_producer_names_sql)}
+
+            with (self._connection.cursor(prepared=True) as insert_producer_cursor,
+                  self._connection.cursor(prepared=True) as insert_producer_legacywine_cursor):
+
+                starttime = time.process_time()
+                producers_added = 0
+                producer_note_cnt = 0
+                last_producer_name = ''
+                last_producer_id = -1
+                prev_producer_description = ''
+
+                for producer_wine_row in self.stream_rows(legacy_wines_by_producer_sql):
+                    # When the producer changes, process the new producer
+                    producer_name = producer_wine_row[ProducerName]
+                    wine_id = producer_wine_row[WineId]
+                    producer_description = producer_wine_row[ProducerDescription]
+                    conversion_notes = None
+
+                    if producer_name in migrated_producer_names:
+                        continue
+
+                    if producer_name != last_producer_name:
+                        # The last producer and all of its legacy wines are done
+                        if producers_added > 0:
+                            committer.unit_done()
+
+                        # Insert new Producer record
+                        producer_code = producer_wine_row[ProducerCode]
+                        year_established = producer_wine_row[YearEstablished].strip()
+
+                        if re_year.match(year_established) is not None:
+                            year_established = int(year_established)
+                        elif year_established == '':
+                            year_established = None
+                        elif re_decade.match(year_established) is not None:
+                            year_established = int(year_established[:4])
+                            conversion_notes = 'year established is decade'
+
+                        new_producer = (producer_name,
+                                        producer_description,
+                                        None if producer_code == '' else producer_code,
+                                        year_established,
+                                       )
+
+                        try:
+                            insert_producer_cursor.execute(CHW_SQL.insert_producer_sql, new_producer)
+                            producers_added += 1
+                        except self._dbapi.DataError as e:
+                            print(type(e))
+                            print(e.args)
+                            print(e)
+                            print(new_producer)
+                            raise e from None
+
+                        last_producer_id = insert_producer_cursor.lastrowid
+                        last_producer_name = producer_name
+                        prev_producer_description = producer_description
+
+                    if producer_description != prev_producer_description:
+                        conversion_notes = 'Description changed'
+
+                    if conversion_notes is not None:
+                        producer_note_cnt += 1
+
+                    producer_legacywine = (last_producer_id, wine_id, conversion_notes)
+                    insert_producer_legacywine_cursor.execute(CHW_SQL.insert_producer_legacywine_sql,
+                                                              producer_legacywine)
                     prev_producer_description = producer_description
 
-                if producer_description != prev_producer_description:
-                    conversion_notes = 'Description changed'
-
-                if conversion_notes is not None:
-                    producer_note_cnt += 1
+                exectime = time.process_time() - starttime
+                print(f'Insert producers from legacy successful, {producers_added} rows affected,'
+                      f' {producer_note_cnt} notes, {len(migrated_producer_names)} already migrated'
+                      f' ({exectime:.3f} secs)')
 
-                producer_legacywine = (last_producer_id, wine_id, conversion_notes)
-                insert_producer_legacywine_cursor.execute(CHW_SQL.insert_producer_legacywine_sql,
-                                                          producer_legacywine)
-                prev_producer_description = producer_description
+            committer.commit()
 
-            exectime = time.process_time() - starttime
-            print(f'Insert producers from legacy successful, {producers_added} rows affected, {producer_note_cnt} notes ({exectime:.3f} secs)')
-
-        self._connection.commit()
+        self.run_resumable(create_producers, policy=policy)
 
     def setup_lookup_table_records(self):
         """
@@ -229,22 +253,27 @@ class Wines(CHW_DB):
 
                 init_lookup_table_cursor.connection.commit()
 
-    def create_wines_from_legacy(self):
+    def create_wines_from_legacy(self, policy=None):
         """
         Create wine records in the Wines table from the LegacyWineMaster
 
         Producer records must have already been created and lookup tables
         populated.
+
+        The records are inserted by a single statement in one transaction, which is
+        retried on a new connection after a transient error (see CHW_DB.run_resumable).
+        The wines already migrated are skipped, so a retry after a commit whose
+        acknowledgement was lost, or a later sync, only inserts the new wines.
         """
         # TODO: set this flag from a parameter
         show_warnings = True
 
         sql = CHW_SQL.get_insert_wines_from_legacy_sql({'suffix':  Wines.LEGACY_WINE_TABLE_SUFFIX})
 
-        try:
+        def insert_wines(committer):
             with (self._connection.cursor() as insert_wines_from_legacy_cursor):
                 t = time.process_time()
-                insert_wines_from_legacy_cursor.execute(sql)
+                insert_wines_from_legacy_cursor.execute(sql, (change_timestamp(),))
                 exectime = time.process_time() - t
 
                 rows_affected = insert_wines_from_legacy_cursor.rowcount
@@ -253,25 +282,121 @@ class Wines(CHW_DB):
                 if show_warnings and warnings > 0:
                     self.print_cursor_warnings(insert_wines_from_legacy_cursor)
 
-            self._connection.commit()
-        except mariadb.Error as e:
+            committer.commit()
+
+        try:
+            self.run_resumable(insert_wines, policy=policy)
+        except self._dbapi.Error as e:
             print(type(e))
             print(e.args)
             print(e)
             print(sql)
-            # We don't need the stacktrace output, so don't reraise the exception
-            # raise e from None
+            raise e from None
+
+        self.update_wine_families()
+
+    def update_wine_families(self, batch_size=5000):
+        """
+        Group the Wines into WineFamilies (the vintages and bottle sizes of the same
+        wine of a producer, see chwdata.wine_families) and set the family of each
+        wine (Wines_WineFamilies) in one pass over the wines.
+
+        The existing families and wine families are read first, and only the new
+        families, and the families of the new and changed wines, are written. The
+        families of deleted wines are removed. So this is run by create_wines_from_legacy
+        and can be rerun after the wines are changed.
+        """
+        t = time.process_time()
+        family_cnt = added_cnt = changed_cnt = 0
+
+        with (self._connection.cursor() as families_cursor,
+              self._connection.cursor(prepared=True) as insert_family_cursor,
+              self._connection.cursor(prepared=True) as insert_wine_family_cursor,
+              self._connection.cursor(prepared=True) as update_wine_family_cursor):
+            family_index = WineFamilyIndex()
+            for family_id, hash_ in self.stream_rows(CHW_SQL.wine_families_sql):
+                family_index.add(hash_, family_id)
+            wine_family_ids = dict(self.stream_rows(CHW_SQL.wine_family_ids_sql))
+            families_cursor.execute(CHW_SQL.max_family_id_sql)
+            last_family_id = families_cursor.fetchone()[0] or 0
+
+            new_families = []
+            new_wine_families = []
+            changed_wine_families = []
+
+            def write_batches():
+                # the families must be inserted before the rows referencing them
+                insert_family_cursor.executemany(CHW_SQL.insert_wine_family_sql, new_families)
+                insert_wine_family_cursor.executemany(CHW_SQL.insert_wine_winefamily_sql, new_wine_families)
+                update_wine_family_cursor.executemany(CHW_SQL.update_wine_winefamily_sql,
+                                                      changed_wine_families)
+                for batch in (new_families, new_wine_families, changed_wine_families):
+                    batch.clear()
+
+            wine_ids = set()
+            for wine_id, producer_id, full_name, wine_name, producer_name in self.stream_rows(
+                    CHW_SQL.wines_for_families_sql):
+                wine_ids.add(wine_id)
+                name = get_family_name(full_name, wine_name, producer_name) or full_name
+                name = name[:MAX_FAMILY_NAME_LEN]
+                hash_ = family_hash(producer_id, name)
+                family_id = family_index.get(hash_)
+                if family_id is None:
+                    last_family_id += 1
+                    family_id = last_family_id
+                    family_index.add(hash_, family_id)
+                    new_families.append((family_id, producer_id, name, hash_))
+                    family_cnt += 1
+
+                prev_family_id = wine_family_ids.get(wine_id)
+                if prev_family_id is None:
+                    new_wine_families.append((wine_id, family_id))
+                    added_cnt += 1
+                elif prev_family_id != family_id:
+                    changed_wine_families.append((family_id, wine_id))
+                    changed_cnt += 1
+
+                if len(new_wine_families) + len(changed_wine_families) >= batch_size:
+                    write_batches()
+
+            write_batches()
+
+            deleted_wine_ids = [(wine_id,) for wine_id in wine_family_ids.keys() - wine_ids]
+            if deleted_wine_ids:
+                families_cursor.executemany(CHW_SQL.delete_wine_winefamily_sql, deleted_wine_ids)
+            families_cursor.execute(CHW_SQL.delete_unused_wine_families_sql)
+            unused_cnt = families_cursor.rowcount
+
+        self._connection.commit()
+        exectime = time.process_time() - t
+        print(f'Wine families: {len(family_index) - unused_cnt} ({family_cnt} created, {unused_cnt} removed),'
+              f' wines: {added_cnt} added, {changed_cnt} changed, {len(deleted_wine_ids)} removed'
+              f' ({exectime:.3f} secs)')
 
-    def create_winepricing_from_legacy(self):
+    def get_family_wines(self, wine_id):
+        """
+        Get the (WineId, Vintage, FullName) of all the wines of the family of the wine
+        (including the wine), ordered by vintage
+        """
+        with self._connection.cursor(prepared=True) as family_wines_cursor:
+            family_wines_cursor.execute(CHW_SQL.family_wines_sql, (wine_id,))
+            return family_wines_cursor.fetchall()
+
+    def create_winepricing_from_legacy(self, policy=None):
         """
         Create wine records in the WinePricing table from the LegacyWineMaster
+
+        The records are inserted by a single statement in one transaction, which is
+        retried on a new connection after a transient error (see CHW_DB.run_resumable).
+        The wines already migrated are skipped, so a retry after a commit whose
+        acknowledgement was lost, or a later sync, only inserts the new wines.
         """
         # TODO: set this flag from a parameter
         show_warnings = True
 
         sql = CHW_SQL.get_insert_winepricing_from_legacy_sql({'suffix':  Wines.LEGACY_WINE_TABLE_SUFFIX})
 
-        try:
+        def insert_winepricing(committer):
             with (self._connection.cursor() as insert_winepricing_from_legacy_cursor):
                 t = time.process_time()
                 insert_winepricing_from_legacy_cursor.execute(sql)
@@ -283,25 +408,34 @@ class Wines(CHW_DB):
                 if show_warnings and warnings > 0:
                     self.print_cursor_warnings(insert_winepricing_from_legacy_cursor)
 
-            self._connection.commit()
-        except mariadb.Error as e:
+            committer.commit()
+
+        try:
+            self.run_resumable(insert_winepricing, policy=policy)
+        except self._dbapi.Error as e:
             print(type(e))
             print(e.args)
             print(e)
             print(sql)
-            # We don't need the stacktrace output, so don't reraise the exception
-            # raise e from None
+            raise e from None
+
+        self.update_pricing_history()
 
-    def create_winepurchases_from_legacy(self):
+    def create_winepurchases_from_legacy(self, policy=None):
         """
         Create wine records in the WinePurchases table from the LegacyWineMaster
+
+        The records are inserted by a single statement in one transaction, which is
+        retried on a new connection after a transient error (see CHW_DB.run_resumable).
+        The wines already migrated are skipped, so a retry after a commit whose
+        acknowledgement was lost, or a later sync, only inserts the new wines.
         """
         # TODO: set this flag from a parameter
         show_warnings = True
 
         sql = CHW_SQL.get_insert_winepurchases_from_legacy_sql({'suffix':  Wines.LEGACY_WINE_TABLE_SUFFIX})
 
-        try:
+        def insert_winepurchases(committer):
             with (self._connection.cursor() as insert_winepurchases_from_legacy_cursor):
                 t = time.process_time()
                 insert_winepurchases_from_legacy_cursor.execute(sql)
@@ -313,14 +447,117 @@ class Wines(CHW_DB):
                 if show_warnings and warnings > 0:
                     self.print_cursor_warnings(insert_winepurchases_from_legacy_cursor)
 
-            self._connection.commit()
-        except mariadb.Error as e:
+            committer.commit()
+
+        try:
+            self.run_resumable(insert_winepurchases, policy=policy)
+        except self._dbapi.Error as e:
             print(type(e))
             print(e.args)
             print(e)
             print(sql)
-            # We don't need the stacktrace output, so don't reraise the exception
-            # raise e from None
+            raise e from None
+
+        self.update_purchase_history()
+
+    def get_snapshot_date(self, suffix):
+        """
+        Get the date of the legacy wine master snapshot w/ the suffix, the date it
+        was last updated (today if it has no LastUpdated dates)
+        """
+        with self._connection.cursor() as snapshot_date_cursor:
+            snapshot_date_cursor.execute(CHW_SQL.get_snapshot_date_sql({'suffix': suffix}))
+            last_updated = snapshot_date_cursor.fetchone()[0]
+        return to_date(last_updated) if last_updated is not None else date.today()
+
+    def _write_version_changes(self, changes, insert_sql, close_sql, replace_sql):
+        with self._connection.cursor(prepared=True) as history_cursor:
+            # the current versions are closed before the new versions are inserted
+            for sql, batch in ((close_sql, changes.closes), (insert_sql, changes.inserts),
+                               (replace_sql, changes.replaces)):
+                if batch:
+                    history_cursor.executemany(sql, batch)
+        changes.clear()
+
+    def update_pricing_history(self, suffix=None, effective_date=None, batch_size=5000):
+        """
+        Add the prices of the wines of the legacy wine master snapshot w/ the suffix
+        (default LEGACY_WINE_TABLE_SUFFIX) to the WinePricingHistory, as of the
+        effective_date (default the snapshot's date, see get_snapshot_date).
+
+        Only the wines whose prices changed (by hash) get a new version, and the
+        wines which aren't in the snapshot have their current version closed, see
+        chwdata.price_history. Snapshots must be added in date order, so this is
+        run by create_winepricing_from_legacy for the snapshot being migrated.
+        """
+        suffix = suffix if suffix is not None else Wines.LEGACY_WINE_TABLE_SUFFIX
+        effective_date = effective_date if effective_date is not None else self.get_snapshot_date(suffix)
+        t = time.process_time()
+        history_sqls = (CHW_SQL.insert_pricing_history_sql, CHW_SQL.close_pricing_history_sql,
+                        CHW_SQL.replace_pricing_history_sql)
+
+        changes = VersionChanges(
+            {wine_id: (valid_from, valid_to, hash_) for wine_id, valid_from, valid_to, hash_
+             in self.stream_rows(CHW_SQL.latest_pricing_history_sql)})
+        for wine_id, *values in self.stream_rows(CHW_SQL.get_snapshot_pricing_sql({'suffix': suffix})):
+            changes.add(wine_id, effective_date, values, row_hash(values))
+            if len(changes) >= batch_size:
+                self._write_version_changes(changes, *history_sqls)
+        changes.close_missing(effective_date)
+        self._write_version_changes(changes, *history_sqls)
+
+        self._connection.commit()
+        exectime = time.process_time() - t
+        print(f'Pricing history of LegacyWineMaster{suffix} as of {effective_date}: {changes.summary()}'
+              f' ({exectime:.3f} secs)')
+
+    def update_purchase_history(self, suffix=None, batch_size=5000):
+        """
+        Add the last purchases of the wines of the legacy wine master snapshot w/ the
+        suffix (default LEGACY_WINE_TABLE_SUFFIX) to the WinePurchaseHistory, valid
+        from their purchase dates.
+
+        A wine's purchase w/ a later date than its last purchase closes its last
+        purchase, see chwdata.price_history. This is run by create_winepurchases_from_legacy
+        for the snapshot being migrated.
+        """
+        suffix = suffix if suffix is not None else Wines.LEGACY_WINE_TABLE_SUFFIX
+        t = time.process_time()
+        history_sqls = (CHW_SQL.insert_purchase_history_sql, CHW_SQL.close_purchase_history_sql,
+                        CHW_SQL.replace_purchase_history_sql)
+
+        changes = VersionChanges(
+            {wine_id: (valid_from, valid_to, hash_) for wine_id, valid_from, valid_to, hash_
+             in self.stream_rows(CHW_SQL.latest_purchase_history_sql)})
+        snapshot_purchases_sql = CHW_SQL.get_snapshot_purchases_sql({'suffix': suffix})
+        for wine_id, purchase_date, *values in self.stream_rows(snapshot_purchases_sql):
+            purchase_date = to_date(purchase_date)
+            changes.add(wine_id, purchase_date, values, row_hash((purchase_date, *values)))
+            if len(changes) >= batch_size:
+                self._write_version_changes(changes, *history_sqls)
+        self._write_version_changes(changes, *history_sqls)
+
+        self._connection.commit()
+        exectime = time.process_time() - t
+        print(f'Purchase history of LegacyWineMaster{suffix}: {changes.summary()} ({exectime:.3f} secs)')
+
+    def get_price_as_of(self, wine_id, as_of):
+        """
+        Get the WinePricingHistory version (ValidFrom, ValidTo, Available, SoldOut, FOBPrice, ...)
+        of the wine's prices as of the date, None if it had no prices then
+        """
+        with self._connection.cursor(prepared=True) as price_as_of_cursor:
+            price_as_of_cursor.execute(CHW_SQL.price_as_of_sql, (wine_id, as_of, as_of))
+            return price_as_of_cursor.fetchone()
+
+    def get_purchase_as_of(self, wine_id, as_of):
+        """
+        Get the WinePurchaseHistory version (ValidFrom, ValidTo, PurchasePrice, TariffDiscount)
+        of the wine's last purchase as of the date, None if it hadn't been purchased
+        """
+        with self._connection.cursor(prepared=True) as purchase_as_of_cursor:
+            purchase_as_of_cursor.execute(CHW_SQL.purchase_as_of_sql, (wine_id, as_of, as_of))
+            return purchase_as_of_cursor.fetchone()
 
     @staticmethod
     def print_cursor_warnings(cursor):
@@ -339,9 +576,10 @@ def do_load_legacy_wine_master_from_csv():
     wines.load_legacy_table_from_csv()
 
 
-def do_create_producers_from_legacy():
+def do_create_producers_from_legacy(commit_every=None):
     wines = Wines()
-    wines.create_producers_from_legacy()
+    policy = TransactionPolicy(commit_every=commit_every) if commit_every is not None else None
+    wines.create_producers_from_legacy(policy=policy)
 
 
 def do_setup_lookup_table_records():
@@ -354,6 +592,21 @@ def do_create_wines_from_legacy():
     wines.create_wines_from_legacy()
 
 
+def do_update_wine_families():
+    wines = Wines()
+    wines.update_wine_families()
+
+
+def do_write_family_wines(wine_id):
+    wines = Wines()
+    family_wines = wines.get_family_wines(wine_id)
+    if not family_wines:
+        print(f'Wine {wine_id} has no family (has update-wine-families been run?)')
+        return
+    for family_wine_id, vintage, full_name in family_wines:
+        print(f'{family_wine_id:>7} {vintage if vintage != -1 else "NV":>4}  {full_name}')
+
+
 def do_create_winepricing_from_legacy():
     wines = Wines()
     wines.create_winepricing_from_legacy()
@@ -364,6 +617,35 @@ def do_create_winepurchases_from_legacy():
     wines.create_winepurchases_from_legacy()
 
 
+def do_update_price_history(suffix=None, effective_date=None):
+    wines = Wines()
+    wines.update_pricing_history(suffix, effective_date)
+    wines.update_purchase_history(suffix)
+
+
+def do_write_wine_price_as_of(wine_id, as_of):
+    wines = Wines()
+    price = wines.get_price_as_of(wine_id, as_of)
+    purchase = wines.get_purchase_as_of(wine_id, as_of)
+    if price is None:
+        print(f'Wine {wine_id} had no prices on {as_of}')
+    else:
+        valid_from, valid_to, available, sold_out, *prices = price
+        valid_to = valid_to if to_date(valid_to) != END_OF_TIME else 'now'
+        print(f'Wine {wine_id} prices from {valid_from} to {valid_to}'
+              f' ({"available" if available else "unavailable"}{", sold out" if sold_out else ""}):')
+        for name, value in zip(('FOB', 'FOB MA', 'FOB ARB', 'NY wholesale', 'NY multi-case',
+                                'NY multi-case qty', 'NJ wholesale', 'NJ multi-case', 'NJ multi-case qty'),
+                               prices):
+            print(f'  {name:17} {value if value is not None else "-"}')
+    if purchase is None:
+        print(f'Wine {wine_id} had not been purchased by {as_of}')
+    else:
+        purchase_date, _, purchase_price, tariff_discount = purchase
+        print(f'Last purchase on {purchase_date}: {purchase_price}'
+              + (f' (tariff discount {tariff_discount})' if tariff_discount is not None else ''))
+
+
 def _test():
     pass
 
@@ -17,139 +17,170 @@ Copyright       (c) 2025-present Michael Jay Lippert
 """
 
 # Standard library imports
+import sys
 
 # Third party imports
 import click
 
 # Local application imports
-from chwdata.retail_orders import (do_load_legacy_email_orders_from_csv,
-                                   do_write_top_customer_order_report,
-                                   do_create_customers_from_legacy)
-from chwdata.wines import (do_load_legacy_wine_master_from_csv,
-                           do_create_producers_from_legacy,
-                           do_setup_lookup_table_records,
-                           do_create_wines_from_legacy,
-                           do_create_winepricing_from_legacy,
-                           do_create_winepurchases_from_legacy)
-
-
-@click.command()
-@click.option('--user', '-u', type=click.Choice(['Gillian', 'Mike']), default='Gillian',
-              required=False, help='User name for CreatedBy and LastModifiedBy fields')
-def import_legacy_customers(user):
-    """
-    Create email customers from the legacy customer orders table
-
-    \b
-    options:
-    user    - user name for CreatedBy and LastModifiedBy fields. Default: Gillian
-    """
-    do_create_customers_from_legacy(user=user)
-
-
-@click.command()
-def load_legacy_email_orders_from_csv():
-    """
-    Load the LegacyEmailOrders table from the csv file in the data/infile dir
-
-    \b
-    Note that currently the datadir, csvfile and table suffix are hardcoded
-    so if they have changed the supporting function must be updated.
-    """
-    do_load_legacy_email_orders_from_csv()
-
-
-@click.command()
-def load_legacy_wine_master_from_csv():
-    """
-    Load the LegacyWineMaster table from the csv file in the data/infile dir
-
-    \b
-    Note that currently the datadir, csvfile and table suffix are hardcoded
-    so if they have changed the supporting function must be updated.
-    """
-    do_load_legacy_wine_master_from_csv()
-
-
-@click.command()
-def setup_wine_lookup_tables():
-    """
-    Insert the standard records into empty wine lookup tables
-
-    \b
-    - LookupWineColors
-    - LookupWineTypes
-    - LookupCaseUnits
-    - LookupWineCountries
-    - LookupWineRegions
-    - LookupWineSubregions
-    - LookupWineAppellations
-    """
-    do_setup_lookup_table_records()
-
-
-@click.command()
-def write_top_customer_order_report():
-    """
-    Write out the top customer order item report (to stdout)
-    """
-    do_write_top_customer_order_report()
-
-
-@click.command()
-def import_legacy_producers():
-    """
-    Create producers from the legacy wine master table
-    """
-    do_create_producers_from_legacy()
-
+from chwcommands.lazy_group import LazyGroup
+
+
+# The chw-action commands, they are only imported when invoked, so keep the short help
+# here in sync w/ the first line of the command's docstring.
+chw_action_commands = {
+    'load-legacy-wine-master-from-csv':
+        ('chwcommands.wines.load_legacy_wine_master_from_csv',
+         'Load the LegacyWineMaster table from the csv file in the data/infile dir'),
+    'setup-wine-lookup-tables':
+        ('chwcommands.wines.setup_wine_lookup_tables',
+         'Insert the standard records into empty wine lookup tables'),
+    'import-legacy-producers':
+        ('chwcommands.wines.import_legacy_producers',
+         'Create producers from the legacy wine master table'),
+    'create-wines-from-legacy':
+        ('chwcommands.wines.create_wines_from_legacy',
+         'Create records in the Wines table from the legacy wine master table'),
+    'update-wine-families':
+        ('chwcommands.wines.update_wine_families',
+         'Group the vintages and bottle sizes of each wine into wine families'),
+    'wine-family':
+        ('chwcommands.wines.wine_family',
+         'List all the vintages and bottle sizes in the family of the wine WINE_ID'),
+    'create-winepricing-from-legacy':
+        ('chwcommands.wines.create_winepricing_from_legacy',
+         'Create records in the WinePricing table from the legacy wine master table'),
+    'create-winepurchases-from-legacy':
+        ('chwcommands.wines.create_winepurchases_from_legacy',
+         'Create records in the WinePurchases table from the legacy wine master table'),
+    'detect-price-changes':
+        ('chwcommands.price_changes.detect_price_changes',
+         'Compare the prices and costs of 2 legacy wine master snapshots and set the change flags'),
+    'update-price-history':
+        ('chwcommands.wines.update_price_history',
+         'Add the prices and last purchases of a legacy wine master snapshot to the price history'),
+    'wine-price-as-of':
+        ('chwcommands.wines.wine_price_as_of',
+         'Print the prices and last purchase of the wine WINE_ID as of the date AS_OF'),
+    'load-legacy-email-orders-from-csv':
+        ('chwcommands.retail_orders.load_legacy_email_orders_from_csv',
+         'Load the LegacyEmailOrders table from the csv file in the data/infile dir'),
+    'import-legacy-customers':
+        ('chwcommands.retail_orders.import_legacy_customers',
+         'Create email customers from the legacy customer orders table'),
+    'match-legacy-order-items':
+        ('chwcommands.retail_orders.match_legacy_order_items',
+         'Match the legacy email order items to wines (Wines_LegacyEmailOrders table)'),
+    'create-orders-from-legacy':
+        ('chwcommands.retail_orders.create_orders_from_legacy',
+         'Create Orders and Orders_Wines records from the legacy email orders'),
+    'import-legacy-addresses':
+        ('chwcommands.retail_orders.import_legacy_addresses',
+         'Create the customer shipping Addresses from the legacy email orders'),
+    'write-top-customer-order-report':
+        ('chwcommands.retail_orders.write_top_customer_order_report',
+         'Write out the top customer order item report (to stdout)'),
+    'order-analytics':
+        ('chwcommands.retail_orders.order_analytics',
+         'List the top customers, retailers, items, etc. of the legacy email orders'),
+    'compute-customer-summaries':
+        ('chwcommands.customer_analytics.compute_customer_summaries',
+         'Compute the RFM and lifetime value of every customer (EmailCustomerSummaries table)'),
+    'quote-orders':
+        ('chwcommands.price_quotes.quote_orders',
+         'Quote the prices of order lines (from CSV_FILE or the migrated orders) from a price list'),
+    'change-feed':
+        ('chwcommands.change_feed.change_feed',
+         'Write the rows of TABLE changed since the consumer last read it as JSON lines'),
+    'build-customer-documents':
+        ('chwcommands.customer_documents.build_customer_documents',
+         'Build the customer documents (each customer w/ their orders) in the document store'),
+    'customer-document':
+        ('chwcommands.customer_documents.customer_document',
+         'Print the document of a customer w/ their orders from the document store'),
+    'export-snapshot':
+        ('chwcommands.snapshots.export_snapshot',
+         'Export the chw tables to columnar files for offline analytics'),
+    'apply-schema':
+        ('chwcommands.schema.apply_schema',
+         'Create the chw schema in phases: tables, data load, indexes and foreign keys'),
+    'snapshot':
+        ('chwcommands.snapshots.snapshot',
+         'Save a snapshot of the chw tables which can be restored w/ the restore command'),
+    'restore':
+        ('chwcommands.snapshots.restore',
+         'Replace the rows of the chw tables w/ the rows of a saved snapshot'),
+    'query-plans':
+        ('chwcommands.query_plans.query_plans',
+         'Check the query plans of the chw-action statements and suggest indexes'),
+    'session':
+        ('chwcommands.session.session',
+         'Run chw-action commands read from COMMAND_FILE (or stdin) in one process'),
+}
+
+
+@click.group(cls=LazyGroup, lazy_subcommands=chw_action_commands)
+# the backend choices are chw_db.backends, not imported here to keep the startup fast
+@click.option('--backend', type=click.Choice(('mariadb', 'mysql', 'sqlite')), default='mariadb',
+              envvar='CHW_DB_BACKEND', show_default=True,
+              help='Database backend, mysql uses the chw-mysql container (port 3307) and sqlite'
+                   ' uses a local file in data/sqlite/ instead of the mariadb server')
+@click.option('--profile', is_flag=True, default=False,
+              help='Profile the command, writing a .pstats file and a summary .txt file to the profile dir')
+@click.option('--profile-dir', type=click.Path(file_okay=False), default=None,
+              help='Directory to write the profile files to  [default: data/profile]')
+@click.option('--profile-top', type=int, default=30, show_default=True,
+              help='Number of functions, statements and allocations to list in the profile summary')
+@click.option('--tracemalloc', 'trace_memory', is_flag=True, default=False,
+              help='Also trace memory allocations when profiling (much slower)')
+@click.option('--query-cache', is_flag=True, default=False,
+              help='Cache the results of the lookup queries, reporting the cache hits and misses')
+@click.option('--temp-indexes', is_flag=True, default=False,
+              help="Create the indexes suggested for the command's statements while it runs")
+@click.pass_context
+def cli(ctx, backend, profile, profile_dir, profile_top, trace_memory, query_cache, temp_indexes):
+    """Run CHW database actions
 
-@click.command()
-def create_wines_from_legacy():
-    """
-    Create records in the Wines table from the legacy wine master table
+    Connects to the mariadb at localhost:3306, or to the embedded sqlite
+    database when --backend=sqlite (or env var CHW_DB_BACKEND=sqlite).
 
-    The producers must have already been imported, and the wine lookup
-    tables initialized.
-    """
-    do_create_wines_from_legacy()
+    With --profile the command is run under cProfile and the time spent in
+    database calls is reported separately from the python time.
 
+    With --query-cache the results of the lookup queries are cached (until the
+    tables they read are written), which pays off when running a session.
 
-@click.command()
-def create_winepricing_from_legacy():
-    """
-    Create records in the WinePricing table from the legacy wine master table
+    With --temp-indexes the indexes the query-plans command suggests for the
+    statements of the command are created before it runs and dropped after.
     """
-    do_create_winepricing_from_legacy()
+    # the chwdata modules are imported here rather than at the top so that the
+    # cli starts quickly (see chwcommands.lazy_group)
+    # pylint: disable=import-outside-toplevel
+    from chwdata import chw_db
+    chw_db.default_backend = backend
 
+    if query_cache and ctx.invoked_subcommand is not None:
+        cache = chw_db.enable_query_cache()
+        ctx.call_on_close(lambda: print(cache.get_summary(), file=sys.stderr))
 
-@click.command()
-def create_winepurchases_from_legacy():
-    """
-    Create records in the WinePurchases table from the legacy wine master table
-    """
-    do_create_winepurchases_from_legacy()
+    if temp_indexes and ctx.invoked_subcommand is not None:
+        from chwdata import query_plans
+        suggestions = ctx.with_resource(query_plans.temporary_indexes(stages=(ctx.invoked_subcommand,)))
+        print(f'Created {len(suggestions)} temporary indexes', file=sys.stderr)
 
+    if profile and ctx.invoked_subcommand is not None:
+        from chwdata import profiling
+        session = profiling.ProfileSession(ctx.invoked_subcommand, profile_dir=profile_dir,
+                                           top_n=profile_top, trace_memory=trace_memory)
 
-@click.group()
-def cli():
-    """Run CHW database actions
+        def stop_profile():
+            pstats_path, summary_path = session.stop()
+            print(f'Profile: wall {session.wall_secs:.3f} secs,'
+                  f' database {session.query_stats.total_secs:.3f} secs', file=sys.stderr)
+            print(f'Profile written to {pstats_path} and {summary_path}', file=sys.stderr)
 
-    Connects to the mariadb at localhost:3306
-    """
-    # pylint: disable=unnecessary-pass
-    pass
-
-
-cli.add_command(import_legacy_customers)
-cli.add_command(write_top_customer_order_report)
-cli.add_command(import_legacy_producers)
-cli.add_command(load_legacy_email_orders_from_csv)
-cli.add_command(load_legacy_wine_master_from_csv)
-cli.add_command(setup_wine_lookup_tables)
-cli.add_command(create_wines_from_legacy)
-cli.add_command(create_winepricing_from_legacy)
-cli.add_command(create_winepurchases_from_legacy)
+        ctx.call_on_close(stop_profile)
+        session.start()
 
 
 if __name__ == '__main__':
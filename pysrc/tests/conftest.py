@@ -0,0 +1,27 @@
+"""
+Shared fixtures of the chwdata tests, run w/ `make test` (or `python -m pytest`) in pysrc.
+"""
+
+# Standard library imports
+import sys
+from pathlib import Path
+
+# Third party imports
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+# Local application imports
+from chwdata import chw_db, sqlite_db  # noqa: E402  pylint: disable=wrong-import-position
+
+
+@pytest.fixture
+def sqlite_backend(tmp_path, monkeypatch):
+    """
+    Use a new (empty) SQLite chw database in tmp_path for the CHW_DB instances
+    """
+    monkeypatch.setattr(chw_db, 'default_backend', 'sqlite')
+    monkeypatch.setattr(chw_db, '_shared_connections', None)
+    monkeypatch.setattr(chw_db, 'query_cache', None)
+    monkeypatch.setattr(sqlite_db, 'default_sqlite_dir', tmp_path)
+    return tmp_path
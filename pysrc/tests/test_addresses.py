@@ -0,0 +1,67 @@
+"""
+Tests of the normalization and deduplication of the addresses (chwdata.addresses)
+"""
+
+# Third party imports
+import pytest
+
+# Local application imports
+from chwdata.addresses import Address, AddressIndex, address_hash, normalize_postal_code
+
+
+@pytest.fixture(name='index')
+def fixture_index():
+    return AddressIndex([('NY', 'New York', 'N.Y.'), ('MA', 'Massachusetts', 'Mass.')])
+
+
+@pytest.mark.parametrize('postal_code, normalized', [
+    ('02134', '02134'),
+    ('2134', '02134'),
+    ('02134-5678', '02134-5678'),
+    ('02134 5678', '02134-5678'),
+    ('021345678', '02134-5678'),
+    ('  2134 - 5678 ', '02134-5678'),
+    ('sw1a  1aa', 'SW1A 1AA'),
+    ('123', '123'),
+    (None, ''),
+])
+def test_normalize_postal_code(postal_code, normalized):
+    assert normalize_postal_code(postal_code) == normalized
+
+
+@pytest.mark.parametrize('state, normalized', [
+    ('NY', 'NY'),
+    ('new york', 'NY'),
+    ('N.Y.', 'NY'),
+    ('Mass', 'MA'),
+    ('  massachusetts ', 'MA'),
+    ('ct', 'CT'),
+    ('Ontario', 'Ontario'),
+    (None, ''),
+])
+def test_normalize_state(index, state, normalized):
+    assert index.normalize_state(state) == normalized
+
+
+def test_normalize(index):
+    assert index.normalize('12  MAIN STREET', 'apt. 4b', 'new york', 'N.Y.', '1001') == \
+        Address('12 Main St', 'Apt 4B', 'New York', 'NY', '01001')
+    assert index.normalize('350 Fifth avenue, suite 200', '', 'boston', 'Massachusetts', '02134 5678') == \
+        Address('350 Fifth Ave Ste 200', None, 'Boston', 'MA', '02134-5678')
+    assert index.normalize('  ', 'Apt 2', 'Boston', 'MA', '02134') is None
+
+
+def test_address_hash_ignores_the_zip_plus_4_and_case():
+    address = Address('12 Main St', 'Apt 4B', 'New York', 'NY', '01001')
+    assert address_hash(address) == address_hash(address._replace(postal_code='01001-1234'))
+    assert address_hash(address) == address_hash(Address('12 MAIN ST', 'APT 4B', 'NEW YORK', 'NY', '01001'))
+    assert address_hash(address) != address_hash(address._replace(street2=None))
+    assert address_hash(address) != address_hash(address._replace(postal_code='01002'))
+
+
+def test_index_finds_the_same_address_written_differently(index):
+    assert len(index) == 0
+    index.add(index.normalize('12 Main Street', 'apt. 4b', 'new york', 'N.Y.', '1001'), 7)
+    assert len(index) == 1
+    assert index.get(index.normalize('12 Main St.', 'Apt 4B', 'New York', 'ny', '01001-1234')) == 7
+    assert index.get(index.normalize('14 Main St.', 'Apt 4B', 'New York', 'ny', '01001')) is None
@@ -0,0 +1,90 @@
+"""
+Tests of the LastModified change feed (chwdata.change_feed)
+"""
+
+# Standard library imports
+from datetime import datetime, timedelta
+
+# Third party imports
+import pytest
+
+# Local application imports
+from chwdata.change_feed import ChangeFeed, Watermark, start_watermark
+
+
+modified = datetime(2025, 1, 1, 12, 0)
+
+
+@pytest.fixture
+def change_feed(sqlite_backend):
+    change_feed = ChangeFeed()
+    # customers 1-5 modified at the same time, 6-7 a second later in reverse id order
+    rows = [(customer_id, modified) for customer_id in (3, 1, 5, 2, 4)]
+    rows += [(7, modified + timedelta(seconds=1)), (6, modified + timedelta(seconds=1))]
+    with change_feed._connection.cursor(prepared=True) as cursor:
+        cursor.executemany('INSERT INTO EmailCustomers'
+                           ' (EmailCustomerId, GivenName, Surname, Email, Created, CreatedBy,'
+                           ' LastModified, LastModifiedBy)'
+                           " VALUES (?, 'Given', 'Surname', 'a@example.com', ?, 'test', ?, 'test')",
+                           [(customer_id, last_modified, last_modified)
+                            for customer_id, last_modified in rows])
+    change_feed._connection.commit()
+    yield change_feed
+    change_feed.close()
+
+
+def _ids(batches):
+    return [[row['EmailCustomerId'] for row in batch] for batch in batches]
+
+
+def test_changes_are_in_last_modified_and_key_order_in_batches(change_feed):
+    batches = list(change_feed.read_changes('test', 'EmailCustomers', batch_size=3, lag=timedelta(0)))
+    assert _ids(batches) == [[1, 2, 3], [4, 5, 6], [7]]
+    assert change_feed.get_watermark('test', 'EmailCustomers') == \
+        Watermark(modified + timedelta(seconds=1), 7)
+    assert not list(change_feed.read_changes('test', 'EmailCustomers', lag=timedelta(0)))
+
+
+def test_rows_w_the_watermark_last_modified_and_a_larger_key_are_read(change_feed):
+    change_feed.save_watermark('test', 'EmailCustomers', Watermark(modified, 3))
+    assert _ids(change_feed.read_changes('test', 'EmailCustomers', lag=timedelta(0))) == [[4, 5, 6, 7]]
+
+
+def test_the_watermark_is_saved_after_the_batch_is_handled(change_feed):
+    batches = change_feed.read_changes('test', 'EmailCustomers', batch_size=2, lag=timedelta(0))
+    next(batches)
+    assert change_feed.get_watermark('test', 'EmailCustomers') == start_watermark
+    next(batches)
+    assert change_feed.get_watermark('test', 'EmailCustomers') == Watermark(modified, 2)
+    batches.close()
+    # the consumer failed handling the 2nd batch, so it is read again
+    assert _ids(change_feed.read_changes('test', 'EmailCustomers', batch_size=2, max_batches=1,
+                                         lag=timedelta(0))) == [[3, 4]]
+
+
+def test_peek_and_reset(change_feed):
+    assert _ids(change_feed.read_changes('test', 'EmailCustomers', max_batches=1, batch_size=2,
+                                         lag=timedelta(0), advance=False)) == [[1, 2]]
+    assert change_feed.get_watermark('test', 'EmailCustomers') == start_watermark
+    list(change_feed.read_changes('test', 'EmailCustomers', lag=timedelta(0)))
+    change_feed.reset_watermark('test', 'EmailCustomers')
+    assert change_feed.get_watermark('test', 'EmailCustomers') == start_watermark
+
+
+def test_recent_changes_are_not_read_before_the_lag(change_feed):
+    with change_feed._connection.cursor(prepared=True) as cursor:
+        cursor.execute('UPDATE EmailCustomers SET LastModified = ? WHERE EmailCustomerId = 1',
+                       (datetime.now().replace(microsecond=0),))
+    change_feed._connection.commit()
+    assert _ids(change_feed.read_changes('test', 'EmailCustomers')) == [[2, 3, 4, 5, 6, 7]]
+
+
+def test_watermarks_are_per_consumer_and_table(change_feed):
+    list(change_feed.read_changes('export', 'EmailCustomers', lag=timedelta(0)))
+    assert change_feed.get_watermark('price-list', 'EmailCustomers') == start_watermark
+    assert change_feed.get_watermark('export', 'Wines') == start_watermark
+
+
+def test_a_table_w_o_a_change_feed(change_feed):
+    with pytest.raises(ValueError):
+        change_feed.get_watermark('test', 'Producers')
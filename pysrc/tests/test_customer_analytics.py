@@ -0,0 +1,21 @@
+"""
+Tests of the customer RFM scores (chwdata.customer_analytics)
+"""
+
+# Local application imports
+from chwdata.customer_analytics import quintile_scores
+
+
+def test_quintile_scores_of_distinct_values():
+    assert list(quintile_scores([10, 1, 9, 2, 8, 3, 7, 4, 6, 5])) == [5, 1, 5, 1, 4, 2, 4, 2, 3, 3]
+
+
+def test_quintile_scores_of_equal_values_are_the_same():
+    scores = quintile_scores([7, 7, 7, 1, 100])
+    assert scores[0] == scores[1] == scores[2]
+    assert scores[3] == 1
+    assert scores[4] == 5
+
+
+def test_quintile_scores_of_no_values():
+    assert len(quintile_scores([])) == 0
@@ -0,0 +1,100 @@
+"""
+Tests of the snapshot and restore of the chw tables (chwdata.db_snapshots)
+"""
+
+# Third party imports
+import pytest
+
+# Local application imports
+from chwdata import db_snapshots, sqlite_db
+from chwdata.chw_db import CHW_DB
+from chwdata.chw_sql import CHW_SQL
+
+pytest.importorskip('pyarrow')
+
+
+def _query(sql):
+    chw = CHW_DB()
+    with chw._connection.cursor() as cursor:
+        cursor.execute(sql)
+        rows = cursor.fetchall()
+    chw.close()
+    return rows
+
+
+def _execute(*stmts):
+    chw = CHW_DB()
+    with chw._connection.cursor() as cursor:
+        for sql, params in stmts:
+            cursor.execute(sql, params)
+    chw._connection.commit()
+    chw.close()
+
+
+def _retailers():
+    return _query('SELECT RetailerId, Name, Email FROM Retailers ORDER BY RetailerId')
+
+
+def _indexes(table):
+    return sorted(name for name, _ in _query(f"SELECT name, sql FROM sqlite_master WHERE type = 'index'"
+                                             f" AND tbl_name = '{table}' AND sql IS NOT NULL"))
+
+
+@pytest.fixture
+def snapshot(sqlite_backend):
+    _execute(*((CHW_SQL.insert_retailer_sql, (name,)) for name in ('Wine Library', 'Moore Brothers')),
+             ("INSERT INTO Producers (Name) VALUES ('Domaine Ferrari')", ()))
+    path, manifest = db_snapshots.create_snapshot('test', snapshot_dir=sqlite_backend / 'snapshots',
+                                                  tables=['Retailers', 'Producers'])
+    assert [(table['table'], table['rows']) for table in manifest['tables']] == [('Retailers', 2),
+                                                                                 ('Producers', 1)]
+    return path
+
+
+def test_restore_the_snapshot(snapshot):
+    retailers = _retailers()
+    _execute(('DELETE FROM Retailers WHERE Name = ?', ('Wine Library',)),
+             (CHW_SQL.insert_retailer_sql, ('Brand New Shop',)),
+             ('DELETE FROM Producers', ()))
+
+    restored = db_snapshots.restore_snapshot(snapshot)
+    assert [(table['table'], table['rows']) for table in restored] == [('Retailers', 2), ('Producers', 1)]
+    assert _retailers() == retailers
+    assert _query('SELECT Name FROM Producers') == [('Domaine Ferrari',)]
+    assert _indexes('Retailers') == ['retailers_name_idx']
+
+
+def test_restore_unknown_tables(snapshot):
+    with pytest.raises(ValueError):
+        db_snapshots.restore_snapshot(snapshot, tables=['Wines'])
+
+
+def test_a_failed_restore_rolls_back_and_rebuilds_the_indexes(snapshot, monkeypatch):
+    _execute((CHW_SQL.insert_retailer_sql, ('Brand New Shop',)))
+    retailers = _retailers()
+
+    def fail_reading(*_args):
+        raise OSError('snapshot file is truncated')
+        yield
+
+    monkeypatch.setattr(db_snapshots, '_read_batches', fail_reading)
+    with pytest.raises(OSError):
+        db_snapshots.restore_snapshot(snapshot, tables=['Retailers'])
+    assert _retailers() == retailers
+    assert _indexes('Retailers') == ['retailers_name_idx']
+
+
+def test_every_index_is_rebuilt_when_one_cant_be(sqlite_backend, monkeypatch):
+    # a snapshot of retailers whose names aren't unique
+    _execute(('DROP INDEX retailers_name_idx', ()),
+             *((CHW_SQL.insert_retailer_sql, (name,)) for name in ('Wine Library', 'WINE LIBRARY')))
+    path, _ = db_snapshots.create_snapshot('dups', snapshot_dir=sqlite_backend / 'snapshots',
+                                           tables=['Retailers'])
+
+    monkeypatch.setattr(sqlite_db, 'default_sqlite_dir', sqlite_backend / 'restored')
+    (sqlite_backend / 'restored').mkdir()
+    _execute(('CREATE INDEX retailers_email_idx ON Retailers (Email)', ()))
+    with pytest.raises(sqlite_db.IntegrityError):
+        db_snapshots.restore_snapshot(path)
+    # the load was rolled back, so the unique index could be rebuilt too
+    assert _indexes('Retailers') == ['retailers_email_idx', 'retailers_name_idx']
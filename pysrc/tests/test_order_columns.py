@@ -0,0 +1,63 @@
+"""
+Tests of the in-memory order columns (chwdata.order_columns)
+"""
+
+# Standard library imports
+from datetime import date
+
+# Third party imports
+import pytest
+
+# Local application imports
+from chwdata.order_columns import NO_DATE, OrderColumns
+
+
+@pytest.fixture
+def columns():
+    columns = OrderColumns()
+    row = columns.append_order(1, date(2019, 2, 1), 120, 'Smith, Jo', 'Wine Library', 'NY')
+    columns.append_item(row, 'Cantina Bernard Tradition', 2015, 1, 6)
+    columns.append_item(row, 'Domaine Ferrari Blanc', 2020, 0, 2)
+    row = columns.append_order(2, None, None, 'Doe, Al', 'Unknown', 'CA')
+    columns.append_item(row, 'Cantina Bernard Tradition', 2016, 0, 3)
+    row = columns.append_order(3, date(2020, 6, 15), 80.5, 'Smith, Jo', 'Moore Brothers', 'NJ')
+    columns.append_item(row, 'Domaine Ferrari Blanc', None, 2, 0)
+    return columns
+
+
+def test_append(columns):
+    assert len(columns) == 3 and columns.item_count == 4
+    assert columns.order_date[1] == NO_DATE
+    assert columns.customer.values[columns.customer.codes[2]] == 'Smith, Jo'
+
+
+@pytest.mark.parametrize('kwargs, rows', [
+    ({}, [0, 1, 2]),
+    ({'start': date(2019, 1, 1)}, [0, 2]),
+    ({'end': date(2019, 12, 31)}, [0]),
+    ({'start': date(2019, 2, 1), 'end': date(2020, 6, 15)}, [0, 2]),
+    ({'customer': 'Smith, Jo'}, [0, 2]),
+    ({'customer': 'Smith, Jo', 'state': 'NJ'}, [2]),
+    ({'item': 'Cantina Bernard Tradition'}, [0, 1]),
+    ({'retailer': 'No Such Shop'}, []),
+])
+def test_filter(columns, kwargs, rows):
+    assert list(columns.filter(**kwargs)) == rows
+
+
+def test_group_by(columns):
+    assert columns.group_by('customer') == {'Smith, Jo': 2, 'Doe, Al': 1}
+    # the unknown subtotals aren't summed
+    assert columns.group_by('year', value='subtotal') == {2019: 120, 2020: 80.5}
+    assert columns.group_by('item', value='bottles') == {'Cantina Bernard Tradition': 21,
+                                                         'Domaine Ferrari Blanc': 26}
+    assert columns.group_by('customer', columns.filter(state='NJ'), value='items') == {'Smith, Jo': 1}
+
+
+def test_group_by_item_only_aggregates_items_or_bottles(columns):
+    with pytest.raises(ValueError):
+        columns.group_by('item', value='subtotal')
+
+
+def test_top_n(columns):
+    assert columns.top_n('item', 1, value='bottles') == [('Domaine Ferrari Blanc', 26)]
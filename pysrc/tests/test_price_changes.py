@@ -0,0 +1,27 @@
+"""
+Tests of the price change flags (chwdata.price_changes)
+"""
+
+# Third party imports
+import pytest
+
+# Local application imports
+from chwdata.price_changes import PriceChange, get_price_change_flags
+
+
+def _change(*, added=False, fob=False, wholesale=False, multi_case=False, lpp=False):
+    return PriceChange(1, 'Wine', added, fob, wholesale, multi_case, lpp, None, None, None, None, None, None)
+
+
+@pytest.mark.parametrize('change, flags', [
+    # (LPP_Change, FOB_Change, PricingNeedsReview)
+    (_change(added=True, fob=True, lpp=True), (False, False, True)),
+    (_change(), (False, False, False)),
+    (_change(lpp=True), (True, False, True)),
+    (_change(fob=True, wholesale=True, lpp=True), (True, True, False)),
+    (_change(wholesale=True), (False, False, True)),
+    (_change(multi_case=True), (False, False, True)),
+    (_change(fob=True), (False, True, False)),
+])
+def test_get_price_change_flags(change, flags):
+    assert get_price_change_flags(change) == flags
@@ -0,0 +1,110 @@
+"""
+Tests of the versioning of the price and purchase history (chwdata.price_history)
+"""
+
+# Standard library imports
+from datetime import date
+from decimal import Decimal
+
+# Local application imports
+from chwdata.price_history import END_OF_TIME, VersionChanges, row_hash, to_date
+from chwdata.wines import Wines
+
+
+snapshot_date = date(2025, 3, 1)
+
+
+def test_row_hash_is_the_same_for_equal_amounts():
+    assert row_hash((Decimal('76.20'), 135)) == row_hash((76.2, Decimal('135.00')))
+    assert row_hash((None, 1)) != row_hash((0, 1))
+
+
+def test_to_date():
+    assert to_date('2025-01-01 10:00:00') == date(2025, 1, 1)
+    assert to_date(date(2025, 1, 1)) == date(2025, 1, 1)
+    assert to_date(None) is None
+
+
+def test_new_wine_is_added():
+    changes = VersionChanges({})
+    changes.add(1, snapshot_date, (100, 135), row_hash((100, 135)))
+    assert changes.inserts == [(1, snapshot_date, END_OF_TIME, 100, 135, row_hash((100, 135)))]
+    assert changes.added_cnt == 1
+
+
+def test_unchanged_wine_has_no_changes():
+    changes = VersionChanges({1: (date(2025, 1, 1), END_OF_TIME, row_hash((100, 135)))})
+    changes.add(1, snapshot_date, (Decimal('100.00'), 135), row_hash((Decimal('100.00'), 135)))
+    assert len(changes) == 0
+    assert changes.unchanged_cnt == 1
+
+
+def test_changed_wine_closes_the_current_version():
+    changes = VersionChanges({1: ('2025-01-01', '9999-12-31', row_hash((50, 67.5)))})
+    changes.add(1, snapshot_date, (55, 74.25), row_hash((55, 74.25)))
+    assert changes.closes == [(snapshot_date, 1, date(2025, 1, 1))]
+    assert changes.inserts == [(1, snapshot_date, END_OF_TIME, 55, 74.25, row_hash((55, 74.25)))]
+    assert changes.changed_cnt == 1
+
+
+def test_changed_wine_on_the_same_date_replaces_the_current_version():
+    changes = VersionChanges({1: (snapshot_date, END_OF_TIME, row_hash((50, 67.5)))})
+    changes.add(1, snapshot_date, (55, 74.25), row_hash((55, 74.25)))
+    assert changes.replaces == [(55, 74.25, row_hash((55, 74.25)), 1, snapshot_date)]
+    assert not changes.inserts and not changes.closes
+
+
+def test_older_snapshot_is_skipped():
+    changes = VersionChanges({1: (date(2025, 6, 1), END_OF_TIME, row_hash((80, 108)))})
+    changes.add(1, snapshot_date, (81, 109), row_hash((81, 109)))
+    assert len(changes) == 0
+    assert changes.skipped_cnt == 1
+
+
+def test_closed_wine_is_added_again_only_after_it_was_closed():
+    latest = (date(2024, 1, 1), date(2025, 1, 1), row_hash((30, 40)))
+    changes = VersionChanges({1: latest, 2: (date(2024, 1, 1), date(2025, 6, 1), row_hash((30, 40)))})
+    changes.add(1, snapshot_date, (30, 40), row_hash((30, 40)))
+    changes.add(2, snapshot_date, (30, 40), row_hash((30, 40)))
+    assert [insert[0] for insert in changes.inserts] == [1]
+    assert changes.skipped_cnt == 1
+
+
+def test_missing_wines_are_closed():
+    changes = VersionChanges({1: (date(2025, 1, 1), END_OF_TIME, row_hash((10, 13))),
+                              2: (date(2025, 6, 1), END_OF_TIME, row_hash((10, 13))),
+                              3: (date(2024, 1, 1), date(2025, 1, 1), row_hash((10, 13)))})
+    changes.close_missing(snapshot_date)
+    assert changes.closes == [(snapshot_date, 1, date(2025, 1, 1))]
+    assert changes.closed_cnt == 1
+
+
+def test_pricing_history_is_updated_by_a_later_sync_of_the_pricing(sqlite_backend):
+    wines = Wines()
+    legacy_wine_master = f'LegacyWineMaster{Wines.LEGACY_WINE_TABLE_SUFFIX}'
+    with wines._connection.cursor() as cursor:
+        cursor.execute(f'INSERT INTO {legacy_wine_master}'
+                       ' (WineId, Excluded, SoldOut, FOBPrice, NY_Wholesale, LastUpdated)'
+                       " VALUES (1, '', '', 100, 135, '2025-01-01')")
+    wines.create_winepricing_from_legacy()
+
+    # the next snapshot changes the price of wine 1 and adds wine 2
+    with wines._connection.cursor() as cursor:
+        cursor.execute(f"UPDATE {legacy_wine_master} SET FOBPrice = 110, LastUpdated = '2025-03-01'")
+        cursor.execute(f'INSERT INTO {legacy_wine_master}'
+                       ' (WineId, Excluded, SoldOut, FOBPrice, NY_Wholesale, LastUpdated)'
+                       " VALUES (2, '', '', 50, 67.5, '2025-02-01')")
+    wines.create_winepricing_from_legacy()
+
+    with wines._connection.cursor() as cursor:
+        cursor.execute('SELECT WineId FROM WinePricing ORDER BY WineId')
+        assert cursor.fetchall() == [(1,), (2,)]
+        cursor.execute('SELECT WineId, ValidFrom, ValidTo, FOBPrice FROM WinePricingHistory'
+                       ' ORDER BY WineId, ValidFrom')
+        assert [(wine_id, to_date(valid_from), to_date(valid_to), float(price))
+                for wine_id, valid_from, valid_to, price in cursor.fetchall()] == [
+            (1, date(2025, 1, 1), date(2025, 3, 1), 100),
+            (1, date(2025, 3, 1), END_OF_TIME, 110),
+            (2, date(2025, 3, 1), END_OF_TIME, 50),
+        ]
+    wines.close()
@@ -0,0 +1,79 @@
+"""
+Tests of the batch price quotes (chwdata.price_quotes)
+"""
+
+# Standard library imports
+from decimal import Decimal
+
+# Third party imports
+import pytest
+
+# Local application imports
+from chwdata.price_quotes import (MAX_LINE_QUANTITY, NO_PRICE, QUOTED, SOLD_OUT, UNAVAILABLE, UNKNOWN_WINE,
+                                  PriceBook, read_order_lines_csv)
+
+
+@pytest.fixture
+def price_book():
+    # WineId, Available, SoldOut, UnitsPerCase, FOBPrice, FOB_MA, FOB_ARB,
+    # NY_Wholesale, NY_MultiCasePrice, NY_MultiCaseQty, NJ_Wholesale, NJ_MultiCasePrice, NJ_MultiCaseQty
+    return PriceBook([(1, 1, 0, 12, Decimal('100.00'), None, Decimal('95.00'),
+                       Decimal('240.00'), Decimal('216.00'), 3, Decimal('250.00'), None, None),
+                      (2, 1, 1, 6, 50, None, None, 120, None, None, 125, None, None),
+                      (3, 0, 0, 12, 50, None, None, 120, None, None, 125, None, None),
+                      (4, 1, 0, 12, None, None, None, None, None, None, None, None, None)])
+
+
+def test_quote_line_totals_and_statuses(price_book):
+    quote = price_book.quote([1, 2, 3, 4, 99], [1, 1, 1, 1, 1], [6, 0, 0, 0, 0])
+    assert list(quote.statuses) == [QUOTED, SOLD_OUT, UNAVAILABLE, NO_PRICE, UNKNOWN_WINE]
+    assert quote.line_totals[0] == pytest.approx(240 + 6 * 240 / 12)
+    assert list(quote.line_totals[1:]) == [0, 0, 0, 0]
+    assert quote.status_counts() == {'quoted': 1, 'unavailable': 1, 'sold out': 1, 'no price': 1,
+                                     'unknown wine': 1}
+
+
+def test_quote_multi_case_price_from_the_break_quantity(price_book):
+    quote = price_book.quote([1, 1], [2, 3], [0, 0])
+    assert list(quote.case_prices) == [240, 216]
+    assert quote.total == pytest.approx(2 * 240 + 3 * 216)
+
+
+def test_quote_fob_prices_default_to_the_fob_price(price_book):
+    assert price_book.quote([1], [1], [0], price_list='FOB_MA').case_prices[0] == 100
+    assert price_book.quote([1], [1], [0], price_list='FOB_ARB').case_prices[0] == 95
+    assert price_book.quote([1], [1], [0], price_list='NJ').case_prices[0] == 250
+
+
+def test_quote_order_totals(price_book):
+    quote = price_book.quote([1, 1, 2], [1, 0, 1], [0, 12, 0], price_list='NJ', order_keys=['a', 'a', 'b'])
+    assert quote.order_totals == {'a': pytest.approx(500), 'b': 0}
+
+
+def test_quote_unknown_price_list(price_book):
+    with pytest.raises(ValueError):
+        price_book.quote([1], [1], [0], price_list='CA')
+
+
+def test_read_order_lines_csv(tmp_path):
+    csv_path = tmp_path / 'orders.csv'
+    csv_path.write_text('order,wine_id,cases,units\nA,1,2,6\nA,2,1,\nB,1,0,3\n', encoding='utf-8')
+    order_keys, wine_ids, cases, units = read_order_lines_csv(csv_path)
+    assert order_keys == ['A', 'A', 'B']
+    assert list(wine_ids) == [1, 2, 1] and list(cases) == [2, 1, 0] and list(units) == [6, 0, 3]
+
+
+@pytest.mark.parametrize('line', ['A,1,-1,0', f'A,1,{MAX_LINE_QUANTITY + 1},0', 'A,1,1,70000', 'A,x,1,0',
+                                  'A,1,1.5,0'])
+def test_read_order_lines_csv_reports_the_bad_line(tmp_path, line):
+    csv_path = tmp_path / 'orders.csv'
+    csv_path.write_text(f'order,wine_id,cases,units\nA,1,2,6\n{line}\n', encoding='utf-8')
+    with pytest.raises(ValueError, match='line 3'):
+        read_order_lines_csv(csv_path)
+
+
+def test_read_order_lines_csv_w_o_the_columns(tmp_path):
+    csv_path = tmp_path / 'orders.csv'
+    csv_path.write_text('order,wine\nA,1\n', encoding='utf-8')
+    with pytest.raises(ValueError, match='wine_id'):
+        read_order_lines_csv(csv_path)
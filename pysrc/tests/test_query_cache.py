@@ -0,0 +1,100 @@
+"""
+Tests of the cache of the lookup query results (chwdata.query_cache, CHW_DB.cached_query)
+"""
+
+# Local application imports
+from chwdata import chw_db
+from chwdata.chw_db import CHW_DB
+from chwdata.chw_sql import CHW_SQL
+from chwdata.query_cache import ALL_TABLES, QueryCache, read_tables, written_tables
+
+
+def test_read_and_written_tables():
+    assert read_tables('SELECT * FROM chw.Wines W JOIN `Producers` P ON P.ProducerId = W.ProducerId') == \
+        {'wines', 'producers'}
+    assert written_tables('INSERT IGNORE INTO chw.Producers (Name) VALUES (?)') == {'producers'}
+    assert written_tables("LOAD DATA LOCAL INFILE 'x.csv' INTO TABLE LegacyWineMaster_1218") == \
+        {'legacywinemaster_1218'}
+    assert written_tables('DROP TABLE Wines') == {ALL_TABLES}
+    assert written_tables('SELECT * FROM Wines') == set()
+
+
+def test_lru_eviction_and_ttl():
+    cache = QueryCache(max_entries=2)
+    cache.put('SELECT * FROM A', (), [(1,)])
+    cache.put('SELECT * FROM B', (), [(2,)])
+    assert cache.get('SELECT * FROM A') == [(1,)]
+    cache.put('SELECT * FROM C', (), [(3,)])
+    assert cache.get('SELECT * FROM B') is None
+    assert cache.evictions == 1
+
+    expired = QueryCache(ttl_secs=-1)
+    expired.put('SELECT * FROM A', (), [(1,)])
+    assert expired.get('SELECT * FROM A') is None
+
+
+def test_results_larger_than_max_bytes_are_not_cached():
+    cache = QueryCache(max_bytes=100)
+    cache.put('SELECT * FROM A', (), [(n,) for n in range(100)])
+    assert len(cache) == 0 and cache.bytes == 0
+
+
+def test_invalidate_the_queries_of_the_written_tables():
+    cache = QueryCache()
+    cache.put('SELECT * FROM Wines W JOIN Producers P ON P.ProducerId = W.ProducerId', (), [(1,)])
+    cache.put('SELECT * FROM LookupUSStates', (), [(2,)])
+    cache.invalidate({'producers'})
+    assert len(cache) == 1
+    cache.invalidate({ALL_TABLES})
+    assert len(cache) == 0
+
+
+def _retailer_names(chw):
+    return [row[0] for row in chw.cached_query(CHW_SQL.retailers_sql)]
+
+
+def _enable_query_cache(monkeypatch):
+    cache = QueryCache()
+    monkeypatch.setattr(chw_db, 'query_cache', cache)
+    return cache
+
+
+def test_committed_writes_invalidate_the_cached_results(sqlite_backend, monkeypatch):
+    cache = _enable_query_cache(monkeypatch)
+    chw = CHW_DB()
+    assert _retailer_names(chw) == []
+    assert _retailer_names(chw) == [] and cache.hits == 1
+    with chw._connection.cursor() as cursor:
+        cursor.execute(CHW_SQL.insert_retailer_sql, ('Wine Library',))
+    chw._connection.commit()
+    assert _retailer_names(chw) == ['Wine Library']
+    chw.close()
+
+
+def test_rolled_back_writes_are_not_cached(sqlite_backend, monkeypatch):
+    cache = _enable_query_cache(monkeypatch)
+    chw = CHW_DB()
+    assert _retailer_names(chw) == []
+    with chw._connection.cursor() as cursor:
+        cursor.execute(CHW_SQL.insert_retailer_sql, ('Wine Library',))
+    # the uncommitted row is read, but not cached
+    assert _retailer_names(chw) == ['Wine Library']
+    chw._connection.rollback()
+    assert _retailer_names(chw) == []
+    assert len(cache) == 1
+    chw.close()
+
+
+def test_rollback_of_the_shared_connections_invalidates_their_writes(sqlite_backend, monkeypatch):
+    _enable_query_cache(monkeypatch)
+    monkeypatch.setattr(chw_db, '_shared_connections', {})
+    reader = CHW_DB()
+    assert _retailer_names(reader) == []
+    writer = CHW_DB()
+    with writer._connection.cursor() as cursor:
+        cursor.execute(CHW_SQL.insert_retailer_sql, ('Wine Library',))
+    # the other instance sees the uncommitted write on the shared connection, w/o caching it
+    assert _retailer_names(reader) == ['Wine Library']
+    chw_db.rollback_shared_connections()
+    assert _retailer_names(reader) == []
+    chw_db.close_shared_connections()
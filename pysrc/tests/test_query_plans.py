@@ -0,0 +1,41 @@
+"""
+Tests of the query plan checks (chwdata.query_plans)
+"""
+
+# Local application imports
+from chwdata.query_plans import PlanStep, compare_plans, save_plans
+
+
+def _plan(*steps, full_scans=()):
+    return {'stage': 'test', 'full_scans': list(full_scans), 'steps': list(steps)}
+
+
+wines_by_id = PlanStep('Wines', 'search', None, 'SEARCH W USING INTEGER PRIMARY KEY (rowid=?)')
+wines_scan = PlanStep('Wines', 'scan', None, 'SCAN W')
+producers_by_name = PlanStep('Producers', 'search', 'producers_name_idx',
+                             'SEARCH P USING INDEX producers_name_idx (Name=?)')
+
+
+def test_compare_plans(tmp_path):
+    baseline_path = tmp_path / 'plan_baseline.json'
+    no_table = 'OperationalError: no such table'
+    save_plans(baseline_path, {'unchanged': _plan(wines_by_id),
+                               'changed': _plan(wines_by_id),
+                               'regressed': _plan(wines_by_id),
+                               'failed': _plan(wines_by_id),
+                               'failed_before': {'stage': 'test', 'error': no_table}},
+               'sqlite')
+
+    comparison = compare_plans(baseline_path, {
+        'unchanged': _plan(wines_by_id),
+        'changed': _plan(producers_by_name, wines_by_id),
+        'regressed': _plan(wines_scan, full_scans=['Wines']),
+        'failed': {'stage': 'test', 'error': 'OperationalError: no such column: W.Vintage'},
+        'failed_before': {'stage': 'test', 'error': no_table},
+        'new': _plan(wines_by_id),
+    })
+    assert comparison == [('unchanged', 'unchanged', []),
+                          ('changed', 'changed', []),
+                          ('regressed', 'regressed', ['Wines']),
+                          ('failed', 'failed', ['OperationalError: no such column: W.Vintage']),
+                          ('new', 'unbaselined', [])]
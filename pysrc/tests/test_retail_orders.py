@@ -0,0 +1,59 @@
+"""
+Tests of the migration of the legacy email orders (chwdata.retail_orders)
+"""
+
+# Third party imports
+import pytest
+
+# Local application imports
+from chwdata.chw_sql import CHW_SQL
+from chwdata.retail_orders import RetailOrders
+
+
+@pytest.mark.parametrize('quantity, cases_units', [
+    ('2 cases', (2, 0)),
+    ('1 case', (1, 0)),
+    ('6 btls', (0, 6)),
+    ('6 Btls.', (0, 6)),
+    ('1 cs + 6', (1, 6)),
+    ('2 cs. & 3 bottles', (2, 3)),
+    ('12', (0, 12)),
+    ('3x750ml', (0, 3)),
+    ('6 x 1.5L', (0, 6)),
+    ('1 case 375ml', (1, 0)),
+    ('', (0, 0)),
+    (None, (0, 0)),
+])
+def test_parse_quantity(quantity, cases_units):
+    assert RetailOrders.parse_quantity(quantity) == cases_units
+
+
+@pytest.mark.parametrize('quantity', ['1/2 case', '1.5 cases', 'half case', '750ml', 'a few'])
+def test_parse_quantity_rejects_other_quantities(quantity, caplog):
+    assert RetailOrders.parse_quantity(quantity) == (0, 0)
+    assert quantity in caplog.text
+
+
+def test_get_retailer_name():
+    assert RetailOrders.get_retailer_name('  Wine   Library ') == 'Wine Library'
+    assert RetailOrders.get_retailer_name(None) == RetailOrders.UNKNOWN_RETAILER_NAME
+
+
+def test_get_retailer_ids_dedupes_names_case_insensitively(sqlite_backend):
+    retail_orders = RetailOrders()
+    connection = retail_orders._connection
+    with connection.cursor(prepared=True) as cursor:
+        cursor.execute(CHW_SQL.insert_retailer_sql, ('Wine Library',))
+        wine_library_id = cursor.lastrowid
+        cursor.executemany('INSERT INTO LegacyEmailOrders_0219 (EmailOrderId, Retailer) VALUES (?, ?)',
+                           [(1, 'WINE LIBRARY'), (2, 'wine  library'), (3, 'Moore Brothers'),
+                            (4, 'MOORE BROTHERS'), (5, '')])
+    connection.commit()
+
+    retailer_ids = retail_orders.get_retailer_ids()
+    assert retailer_ids['wine library'] == wine_library_id
+    assert set(retailer_ids) == {'wine library', 'moore brothers', 'unknown'}
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT COUNT(*) FROM Retailers')
+        assert cursor.fetchone()[0] == 3
+    retail_orders.close()
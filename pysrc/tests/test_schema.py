@@ -0,0 +1,87 @@
+"""
+Tests of the parsing of the DDL and the creation of the schema in phases (chwdata.schema)
+"""
+
+# Local application imports
+from chwdata.chw_db import CHW_DB
+from chwdata.schema import SchemaApply, SchemaStatement, apply_schema, load_schema, parse_ddl
+
+
+retailers_ddl = """
+CREATE TABLE Retailers (
+                RetailerId INT AUTO_INCREMENT NOT NULL,
+                Name VARCHAR(100) NOT NULL,
+                PRIMARY KEY (RetailerId)
+);
+
+ALTER TABLE Retailers MODIFY COLUMN Name VARCHAR(100) COMMENT 'The name; not the id';
+
+CREATE TABLE RetailerOrders (
+                RetailerOrderId INT AUTO_INCREMENT NOT NULL,
+                RetailerId INT NOT NULL,
+                PRIMARY KEY (RetailerOrderId)
+);
+
+CREATE UNIQUE INDEX retailers_name_idx
+ ON Retailers
+ ( Name );
+
+ALTER TABLE RetailerOrders ADD CONSTRAINT retailers_retailerorders_fk
+FOREIGN KEY (RetailerId)
+REFERENCES Retailers (RetailerId)
+ON DELETE NO ACTION
+ON UPDATE NO ACTION;
+"""
+
+
+def _indexes():
+    chw = CHW_DB()
+    with chw._connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL")
+        indexes = sorted(row[0] for row in cursor.fetchall())
+    chw.close()
+    return indexes
+
+
+def test_parse_ddl():
+    statements = parse_ddl(retailers_ddl + 'SET FOREIGN_KEY_CHECKS = 1;')
+    assert [(stmt.phase, stmt.table) for stmt in statements] == [('tables', 'Retailers'),
+                                                                 ('tables', 'Retailers'),
+                                                                 ('tables', 'RetailerOrders'),
+                                                                 ('indexes', 'Retailers'),
+                                                                 ('constraints', 'RetailerOrders'),
+                                                                 ('tables', None)]
+    # the ; in the quoted comment doesn't end the statement
+    assert statements[1].sql == \
+        "ALTER TABLE Retailers MODIFY COLUMN Name VARCHAR(100) COMMENT 'The name; not the id'"
+    assert statements[5] == SchemaStatement('tables', None, 'SET FOREIGN_KEY_CHECKS = 1')
+
+
+def test_load_schema_takes_a_table_from_the_first_file_creating_it(tmp_path):
+    (tmp_path / 'first.sql').write_text(retailers_ddl, encoding='utf-8')
+    (tmp_path / 'second.sql').write_text("""
+CREATE TABLE Retailers (RetailerId INT NOT NULL, PRIMARY KEY (RetailerId));
+CREATE INDEX retailers_id_idx ON Retailers (RetailerId);
+CREATE TABLE Wines (WineId INT NOT NULL, PRIMARY KEY (WineId));
+""", encoding='utf-8')
+
+    statements = load_schema([tmp_path / 'first.sql', tmp_path / 'second.sql'])
+    assert [(stmt.phase, stmt.table) for stmt in statements[5:]] == [('tables', 'Wines')]
+
+
+def test_apply_schema_in_phases(sqlite_backend):
+    ddl_file = sqlite_backend / 'retailers.sql'
+    ddl_file.write_text(retailers_ddl, encoding='utf-8')
+
+    def load():
+        assert sorted(CHW_DB().get_tables()) == ['RetailerOrders', 'Retailers']
+        assert not _indexes()
+
+    # the ALTER TABLE statements aren't applied to SQLite
+    applied = apply_schema(load=load, ddl_files=[ddl_file])
+    assert [(phase['phase'], phase['statements']) for phase in applied] == [('tables', 2),
+                                                                            ('load', None),
+                                                                            ('indexes', 1),
+                                                                            ('constraints', 0)]
+    assert _indexes() == ['retailers_name_idx']
+    assert SchemaApply().drop_tables() == 2
@@ -0,0 +1,64 @@
+"""
+Tests of the translation of the CHW_SQL statements and DDL to SQLite (chwdata.sqlite_db)
+"""
+
+# Local application imports
+from chwdata import sqlite_db
+from chwdata.chw_sql import CHW_SQL
+from chwdata.sqlite_db import split_top_level, translate_ddl, translate_sql
+
+
+def test_translate_sql_schema_prefix_and_insert_ignore():
+    assert translate_sql('INSERT IGNORE INTO chw.Producers (Name) VALUES (?)') == \
+        'INSERT OR IGNORE INTO Producers (Name) VALUES (?)'
+
+
+def test_translate_sql_if_function_and_escaped_quote():
+    assert translate_sql(r"SELECT if(UPC = '', NULL, UPC), 'Domaine l\'Oratoire' FROM chw.Wines") == \
+        "SELECT iif(UPC = '', NULL, UPC), 'Domaine l''Oratoire' FROM Wines"
+
+
+def test_translate_sql_parenthesized_union():
+    assert translate_sql('(SELECT a FROM t1) UNION (SELECT a FROM t2)') == \
+        'SELECT a FROM t1 UNION SELECT a FROM t2'
+
+
+def test_split_top_level_ignores_nested_and_quoted_separators():
+    assert split_top_level("a, f(b, c), 'd, e'") == ['a', ' f(b, c)', " 'd, e'"]
+
+
+def test_translate_ddl():
+    ddl = """
+CREATE TABLE Retailers (
+                RetailerId INT AUTO_INCREMENT NOT NULL,
+                Name VARCHAR(100) NOT NULL,
+                PRIMARY KEY (RetailerId)
+);
+
+ALTER TABLE Retailers MODIFY COLUMN Name VARCHAR(100) COMMENT 'The name';
+
+CREATE UNIQUE INDEX retailers_name_idx
+ ON Retailers
+ ( Name );
+"""
+    create_table, create_index = translate_ddl(ddl)
+    assert 'RetailerId INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL' in create_table
+    assert 'Name VARCHAR(100) NOT NULL COLLATE NOCASE' in create_table
+    assert 'PRIMARY KEY (RetailerId)' not in create_table
+    assert create_index.startswith('CREATE UNIQUE INDEX retailers_name_idx')
+
+
+def test_cursor_lastrowid_rowcount_and_case_insensitive_names(tmp_path):
+    connection = sqlite_db.connect(tmp_path / 'chw.sqlite3')
+    try:
+        with connection.cursor(prepared=True) as cursor:
+            cursor.execute(CHW_SQL.insert_retailer_sql, ('Wine Library',))
+            first_id = cursor.lastrowid
+            cursor.execute(CHW_SQL.insert_retailer_sql, ('Moore Brothers',))
+            assert cursor.lastrowid == first_id + 1
+            cursor.execute('UPDATE chw.Retailers SET Email = ? WHERE Name = ?',
+                           ('x@example.com', 'WINE LIBRARY'))
+            assert cursor.rowcount == 1
+        connection.commit()
+    finally:
+        connection.close()
@@ -0,0 +1,90 @@
+"""
+Tests of the batched commits and the retry of resumable actions (chwdata.transactions, CHW_DB.run_resumable)
+"""
+
+# Standard library imports
+import sqlite3
+from datetime import date
+
+# Third party imports
+import pytest
+
+# Local application imports
+from chwdata.chw_db import CHW_DB
+from chwdata.retail_orders import RetailOrders
+from chwdata.transactions import TransactionPolicy
+
+
+# no backoff, so the retries don't slow the tests
+no_backoff = TransactionPolicy(commit_every=2, max_retries=2, backoff_secs=0)
+
+
+def test_backoff_doubles_up_to_the_max():
+    policy = TransactionPolicy(backoff_secs=1.0, max_backoff_secs=5.0)
+    assert 2.0 <= policy.get_backoff(3) <= 4.0
+    assert 2.5 <= policy.get_backoff(10) <= 5.0
+
+
+def test_non_transient_errors_are_not_retried(sqlite_backend):
+    chw_db = CHW_DB()
+    attempts = []
+
+    def work(_committer):
+        attempts.append(1)
+        raise sqlite3.IntegrityError('UNIQUE constraint failed')
+
+    with pytest.raises(sqlite3.IntegrityError):
+        chw_db.run_resumable(work, policy=no_backoff)
+    assert len(attempts) == 1
+    chw_db.close()
+
+
+def test_transient_errors_are_retried_up_to_max_retries(sqlite_backend):
+    chw_db = CHW_DB()
+    attempts = []
+
+    def work(_committer):
+        attempts.append(1)
+        raise sqlite3.OperationalError('database is locked')
+
+    with pytest.raises(sqlite3.OperationalError):
+        chw_db.run_resumable(work, policy=no_backoff)
+    assert len(attempts) == 1 + no_backoff.max_retries
+    chw_db.close()
+
+
+def test_customer_import_resumes_after_the_committed_customers(sqlite_backend, monkeypatch):
+    retail_orders = RetailOrders()
+    fullnames = ['Alice Adams', 'Bob Brown', 'Carol Clark', 'Dan Davis', 'Eve Evans']
+    with retail_orders._connection.cursor(prepared=True) as cursor:
+        cursor.executemany('INSERT INTO LegacyEmailOrders_0219 (EmailOrderId, FirstDate, FullName, Email1)'
+                           ' VALUES (?, ?, ?, ?)',
+                           [(order_id, date(2019, 1, order_id), fullname,
+                             f'{fullname.split()[0].lower()}@example.com')
+                            for order_id, fullname in enumerate(fullnames + fullnames[:2], start=1)])
+    retail_orders._connection.commit()
+
+    # the connection is lost while the 3rd customer is imported, after the 1st 2 were committed
+    parsed = []
+    parse_fullname = RetailOrders.parse_fullname
+
+    def lose_connection_once(fullname):
+        parsed.append(fullname)
+        if len(parsed) == 3:
+            raise sqlite3.OperationalError('disk I/O error')
+        return parse_fullname(fullname)
+
+    monkeypatch.setattr(RetailOrders, 'parse_fullname', staticmethod(lose_connection_once))
+    retail_orders.create_customers_from_legacy(policy=no_backoff)
+
+    assert parsed == fullnames[:3] + fullnames[2:]
+    with retail_orders._connection.cursor() as cursor:
+        cursor.execute('SELECT GivenName, Surname FROM EmailCustomers ORDER BY EmailCustomerId')
+        assert [' '.join(row) for row in cursor.fetchall()] == fullnames
+        cursor.execute('SELECT COUNT(*) FROM EmailCustomers_LegacyEmailOrders')
+        assert cursor.fetchone()[0] == 7
+
+    # a rerun has nothing left to import
+    retail_orders.create_customers_from_legacy(policy=no_backoff)
+    assert len(parsed) == 6
+    retail_orders.close()
@@ -0,0 +1,82 @@
+"""
+Tests of the grouping of the wines into wine families (chwdata.wine_families, Wines.update_wine_families)
+"""
+
+# Third party imports
+import pytest
+
+# Local application imports
+from chwdata.wine_families import WineFamilyIndex, family_hash, get_family_name, strip_family_name
+from chwdata.wines import Wines
+
+
+@pytest.mark.parametrize('name, family_name', [
+    ('Blanc 2020 1.5 Liter (Magnum)', 'Blanc'),
+    ('Vieilles Vignes 2012 375ml', 'Vieilles Vignes'),
+    ('Cuvée Spéciale NV', 'Cuvée Spéciale'),
+    ('Rosé, 2016 Half-Bottle', 'Rosé'),
+    ('Clos 1920', 'Clos'),
+    (None, ''),
+])
+def test_strip_family_name(name, family_name):
+    assert strip_family_name(name) == family_name
+
+
+def test_get_family_name_prefers_the_wine_name():
+    assert get_family_name('Domaine Ferrari Blanc 2020', 'Blanc 2020', 'Domaine Ferrari') == 'Blanc'
+
+
+def test_get_family_name_strips_the_producer_from_the_full_name():
+    assert get_family_name('Bodegas Bernard Cuvée Spéciale NV', '', 'Bodegas Bernard') == 'Cuvée Spéciale'
+    assert get_family_name('BODEGAS BERNARD Cuvee Speciale 2016 375ml', None, 'Bodegas Bernard') == \
+        'Cuvee Speciale'
+    assert get_family_name('Other Producer Rouge 2019', None, 'Bodegas Bernard') == 'Other Producer Rouge'
+
+
+def test_family_hash_of_the_normalized_name_per_producer():
+    assert family_hash(1, 'Cuvée Spéciale') == family_hash(1, 'cuvee  speciale')
+    assert family_hash(1, 'Cuvée Spéciale') != family_hash(2, 'Cuvée Spéciale')
+    assert family_hash(1, 'Blanc') != family_hash(1, 'Rouge')
+
+
+def test_wine_family_index():
+    family_index = WineFamilyIndex()
+    family_index.add(family_hash(1, 'Blanc'), 7)
+    assert family_index.get(family_hash(1, 'blanc')) == 7
+    assert family_index.get(family_hash(1, 'Rouge')) is None
+    assert len(family_index) == 1
+
+
+def _insert_legacy_wines(wines, legacy_wines):
+    columns = ('WineId', 'AccountingItemNo', 'FullName', 'WineName', 'Vintage', 'ProducerName',
+               'StillSparklingFortified', 'Color', 'Country', 'BottleSize', 'BottlesPerCase', 'ABV',
+               'COLA_TTB_ID', 'UPC', 'BottleColor', 'DateCreated')
+    with wines._connection.cursor(prepared=True) as cursor:
+        cursor.executemany(f'INSERT INTO LegacyWineMaster{Wines.LEGACY_WINE_TABLE_SUFFIX}'
+                           f' ({", ".join(columns)}) VALUES ({", ".join("?" * len(columns))})',
+                           [(wine_id, f'ITEM{wine_id}', full_name, wine_name, vintage, 'Domaine Ferrari',
+                             'Still', 'White', 'France', '750ml', 12, 13.5, '', '', '', '2025-01-01')
+                            for wine_id, full_name, wine_name, vintage in legacy_wines])
+    wines._connection.commit()
+
+
+def test_families_are_updated_by_a_later_sync_of_the_wines(sqlite_backend):
+    wines = Wines()
+    with wines._connection.cursor() as cursor:
+        cursor.execute("INSERT INTO Producers (Name) VALUES ('Domaine Ferrari')")
+        cursor.execute("INSERT INTO LookupWineTypes (WineType) VALUES ('Still')")
+        cursor.execute("INSERT INTO LookupWineColors (WineColor) VALUES ('White')")
+        cursor.execute("INSERT INTO LookupWineCountries (CountryName) VALUES ('France')")
+        cursor.execute("INSERT INTO LookupCaseUnits (Name, VolumeInLabelUnits, LegacyBottleSize)"
+                       " VALUES ('750ml', 750, '750ml')")
+    _insert_legacy_wines(wines, [(1, 'Domaine Ferrari Blanc 2020', 'Blanc', '2020')])
+    wines.create_wines_from_legacy()
+
+    # the next snapshot has the next vintage, the wines already migrated are skipped
+    _insert_legacy_wines(wines, [(2, 'Domaine Ferrari Blanc 2021', 'Blanc', '2021'),
+                                 (3, 'Domaine Ferrari Rouge 2021', 'Rouge', '2021')])
+    wines.create_wines_from_legacy()
+
+    assert [row[0] for row in wines.get_family_wines(1)] == [1, 2]
+    assert [row[0] for row in wines.get_family_wines(3)] == [3]
+    wines.close()
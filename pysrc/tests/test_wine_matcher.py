@@ -0,0 +1,98 @@
+"""
+Tests of the matching of the legacy order items to the wines (chwdata.wine_matcher)
+"""
+
+# Third party imports
+import pytest
+
+# Local application imports
+from chwdata.wine_matcher import WineMatcher, normalize_text, split_words, trigrams
+
+
+wines = [
+    (1, 'Château Laurent Cuvée Spéciale 2009', 'Cuvée Spéciale', 2009, 'Château Laurent'),
+    (2, 'Château Laurent Cuvée Spéciale 2010', 'Cuvée Spéciale', 2010, 'Château Laurent'),
+    (3, 'Domaine Mercier Rosé 2012', 'Rosé', 2012, 'Domaine Mercier'),
+    (4, 'Weingut Müller Riesling Sélection 2015', 'Riesling Sélection', None, 'Weingut Müller'),
+]
+
+
+@pytest.fixture(name='matcher')
+def fixture_matcher():
+    return WineMatcher(wines)
+
+
+def test_normalize_text():
+    assert normalize_text('Château Laurent Cuvée Spéciale') == 'chateau laurent cuvee speciale'
+    assert normalize_text("  Müller-Thurgau (1.5L)! ") == 'muller thurgau 1 5l'
+    assert normalize_text(None) == ''
+
+
+def test_split_words():
+    assert split_words('Mas Boillot Vieilles Vignes 2012') == (['mas', 'boillot', 'vieilles', 'vignes'], 2012)
+    assert split_words('Clos 375') == (['clos', '375'], None)
+
+
+def test_trigrams():
+    assert trigrams('ab') == {' ab', 'ab '}
+    assert trigrams('rose') == {' ro', 'ros', 'ose', 'se '}
+
+
+def test_match_the_ordered_vintage(matcher):
+    match = matcher.match('laurent cuvee speciale', 2010)
+    assert match.wine_id == 2
+    assert not match.needs_review
+    assert match.notes is None
+
+    assert matcher.match('Chateau Laurent Cuvee Speciale 2009').wine_id == 1
+
+
+def test_match_without_a_vintage_is_ambiguous(matcher):
+    match = matcher.match('Chateau Laurent Cuvee Speciale')
+    assert match.wine_id in {1, 2}
+    assert match.needs_review
+    assert 'Also matches WineId' in match.notes
+
+
+def test_match_a_misspelled_item(matcher):
+    match = matcher.match('Domain Mercer Rose')
+    assert match.wine_id == 3
+    assert match.needs_review
+    assert match.notes == 'Low match score'
+
+    assert matcher.match('muller sélection riesling').wine_id == 4
+
+
+def test_match_a_different_vintage_needs_review(matcher):
+    match = matcher.match('Domaine Mercier Rose', 2014)
+    assert match.wine_id == 3
+    assert match.needs_review
+    assert match.notes == 'Vintage 2012 does not match ordered vintage 2014'
+
+
+@pytest.mark.parametrize('item, notes', [
+    ('Rouge', 'No matching wine'),
+    ('', 'No item text'),
+    ('2012', 'No item text'),
+])
+def test_no_match(matcher, item, notes):
+    match = matcher.match(item)
+    assert match.wine_id is None
+    assert match.needs_review
+    assert match.notes == notes
+
+
+def test_similar_words(matcher):
+    assert matcher.similar_words('laurent') == [('laurent', 1.0)]
+    assert [word for word, _ in matcher.similar_words('lauren')] == ['laurent']
+    assert matcher.similar_words('zzz') == []
+
+
+def test_candidates_are_the_wines_with_the_rarest_words():
+    many_wines = [(wine_id, f'Domaine Producer{wine_id} Rouge', 'Rouge', 2010, f'Domaine Producer{wine_id}')
+                  for wine_id in range(1, 201)]
+    matcher = WineMatcher(many_wines, max_candidate_postings=10)
+    word_matches = [matcher.similar_words(word) for word in ('domaine', 'producer42', 'rouge')]
+    assert matcher.get_candidates(word_matches) == {42}
+    assert matcher.match('Producer42 Rouge 2010').wine_id == 42
+    assert matcher.match('Domaine Producer42 Rouge 2010').wine_id == 42